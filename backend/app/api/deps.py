@@ -1,43 +1,111 @@
 # backend/app/api/deps.py
-from fastapi import Depends, HTTPException, status
+import logging
+
+from fastapi import Depends, HTTPException, Query, Request, status
 from fastapi.security import HTTPAuthorizationCredentials, HTTPBearer
-from supabase import Client
+from supabase import AsyncClient
+from supabase_auth.errors import AuthApiError
 from supabase_auth.types import User
 
+from app.core.config import settings
+from app.core.pagination import InvalidCursorError, PageParams, decode_cursor
 from app.db.client import get_supabase
+from app.services.ai_service import AIService
+from app.services.auth_service import TokenVerifier, get_token_verifier
+from app.services.profile_service import (
+    ProfileCache,
+    ProfileNotFoundError,
+    UserContext,
+    get_profile_cache,
+)
+from app.services.scoping_session_service import ScopingSessionService
+
+logger = logging.getLogger(__name__)
 
 # Bearerトークン（"Bearer eyJ..."）をヘッダーから取得するクラス
 security = HTTPBearer()
 
 
-def get_current_user(
+async def get_current_user(
     auth: HTTPAuthorizationCredentials = Depends(security),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    verifier: TokenVerifier = Depends(get_token_verifier),
 ) -> User:
     """
-    リクエストヘッダーのJWTトークンを検証し、Supabase上のユーザー情報を返す。
+    リクエストヘッダーのJWTトークンを検証し、ユーザー情報を返す。
+    署名と有効期限はローカルで検証するため、通常は認証サーバーへの問い合わせは発生しない。
     無効なトークンの場合は401エラーを発生させる。
     """
     token = auth.credentials
 
-    try:
-        # Supabaseに問い合わせてトークンを検証 & ユーザー取得
-        user_response = supabase.auth.get_user(token)
+    async def verify_remotely(token: str) -> User | None:
+        # JWTシークレット未設定でHS256トークンを受け取った場合のみ使われる
+        try:
+            user_response = await supabase.auth.get_user(token)
+        except AuthApiError:
+            return None
+        return user_response.user if user_response else None
 
-        if not user_response or not user_response.user:
-            raise HTTPException(
-                status_code=status.HTTP_401_UNAUTHORIZED,
-                detail="Invalid authentication credentials",
-                headers={"WWW-Authenticate": "Bearer"},
-            )
-
-        return user_response.user
+    try:
+        return await verifier.verify(token, remote_verify=verify_remotely)
 
     except Exception as e:
         # トークン期限切れや不正な形式の場合など
-        print(f"Auth Error: {e}")
+        logger.info("Auth Error: %s", e)
         raise HTTPException(
             status_code=status.HTTP_401_UNAUTHORIZED,
             detail="Could not validate credentials",
             headers={"WWW-Authenticate": "Bearer"},
-        )
+        ) from e
+
+
+async def get_user_context(
+    current_user: User = Depends(get_current_user),
+    supabase: AsyncClient = Depends(get_supabase),
+    profile_cache: ProfileCache = Depends(get_profile_cache),
+) -> UserContext:
+    """
+    ログインユーザーの所属テナントとAI設定を取得する依存関数
+    プロセス内ではTTL付きでキャッシュし、同一リクエスト内ではFastAPIの依存キャッシュで1回だけ解決される。
+    プロフィールが存在しない場合は404エラーを発生させる。
+    """
+    try:
+        return await profile_cache.get(supabase, current_user.id)
+    except ProfileNotFoundError:
+        raise HTTPException(status_code=404, detail="Profile not found") from None
+
+
+def get_ai_service(request: Request) -> AIService:
+    """lifespanで生成した共有のAIServiceを取得する依存関数"""
+    return request.app.state.ai_service
+
+
+def get_scoping_session_service(
+    supabase: AsyncClient = Depends(get_supabase),
+    ai_service: AIService = Depends(get_ai_service),
+) -> ScopingSessionService:
+    """対話型スコーピングのセッションを扱うサービスを取得する依存関数"""
+    return ScopingSessionService(supabase, ai_service)
+
+
+def get_page_params(
+    limit: int = Query(
+        settings.PAGE_SIZE_DEFAULT,
+        ge=1,
+        le=settings.PAGE_SIZE_MAX,
+        description="1ページあたりの件数",
+    ),
+    cursor: str | None = Query(
+        None, description="前のページのレスポンスに含まれる next_cursor"
+    ),
+) -> PageParams:
+    """一覧APIのページング条件を取得する依存関数（不正なカーソルは400エラー）"""
+    if cursor is None:
+        return PageParams(limit=limit)
+
+    try:
+        created_at, row_id = decode_cursor(cursor)
+    except InvalidCursorError:
+        raise HTTPException(status_code=400, detail="Invalid cursor") from None
+
+    return PageParams(limit=limit, created_at=created_at, id=row_id)
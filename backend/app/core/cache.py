@@ -0,0 +1,59 @@
+# backend/app/core/cache.py
+import time
+from collections import OrderedDict
+from typing import Any
+
+
+class TTLCache:
+    """サイズ上限と有効期限付きのインメモリLRUキャッシュ
+
+    プロセス内で共有する軽量キャッシュ。上限を超えた場合は最も古く参照された
+    エントリから追い出す。asyncioの単一スレッド上での利用を前提とする。
+    """
+
+    def __init__(self, maxsize: int, ttl: float):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self.hits = 0
+        self.misses = 0
+        self._data: OrderedDict[Any, tuple[float, Any]] = OrderedDict()
+
+    def get(self, key: Any, default: Any = None) -> Any:
+        """キーに対応する値を返す（期限切れ・未登録の場合は default）"""
+        entry = self._data.get(key)
+        if entry is None:
+            self.misses += 1
+            return default
+
+        expires_at, value = entry
+        if expires_at <= time.monotonic():
+            del self._data[key]
+            self.misses += 1
+            return default
+
+        self._data.move_to_end(key)
+        self.hits += 1
+        return value
+
+    def set(self, key: Any, value: Any, ttl: float | None = None) -> None:
+        """値を登録する。ttl を指定するとデフォルトの有効期限より優先される"""
+        expires_at = time.monotonic() + (self.ttl if ttl is None else ttl)
+        self._data[key] = (expires_at, value)
+        self._data.move_to_end(key)
+
+        while len(self._data) > self.maxsize:
+            self._data.popitem(last=False)
+
+    def pop(self, key: Any) -> None:
+        """キーを削除する（存在しなくてもエラーにしない）"""
+        self._data.pop(key, None)
+
+    def clear(self) -> None:
+        self._data.clear()
+
+    def __len__(self) -> int:
+        return len(self._data)
+
+    def stats(self) -> dict:
+        """ヒット・ミス件数と現在のエントリ数を返す"""
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._data)}
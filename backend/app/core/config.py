@@ -13,6 +13,113 @@ class Settings(BaseSettings):
     # デフォルトのAIモデル
     GEMINI_MODEL: str = "gemini-2.5-flash"
 
+    # --- JWT検証 ---
+    # HS256(旧来の共有シークレット方式)のトークンをローカル検証する場合に設定する
+    # 未設定の場合、HS256トークンは認証サーバーへ問い合わせて検証する
+    SUPABASE_JWT_SECRET: str | None = None
+    # 非対称鍵(RS256/ES256)の公開鍵セットを取得するURL（未指定時はSUPABASE_URLから組み立てる）
+    SUPABASE_JWKS_URL: str | None = None
+    JWT_AUDIENCE: str = "authenticated"
+    # 公開鍵セットのキャッシュ秒数
+    JWKS_CACHE_TTL_SECONDS: int = 600
+    # 検証済みトークンのキャッシュ件数と、拒否したトークンを覚えておく秒数
+    AUTH_TOKEN_CACHE_SIZE: int = 1024
+    AUTH_NEGATIVE_CACHE_TTL_SECONDS: int = 30
+
+    # --- プロフィール（テナントID・AI設定）キャッシュ ---
+    # AI設定の更新時は同じワーカーのキャッシュを即時破棄し、他ワーカーはこの秒数で失効する
+    PROFILE_CACHE_TTL_SECONDS: int = 60
+    PROFILE_CACHE_SIZE: int = 1024
+
+    # --- 週報バッチ ---
+    # 日報を取得する1ページあたりの件数（メモリ使用量はこの件数で頭打ちになる）
+    BATCH_PAGE_SIZE: int = 500
+    # 日報を取得する1回のクエリで対象にするユーザー数（in 条件のURLの長さを抑える）
+    BATCH_USERS_PER_QUERY: int = 100
+    # AI生成の同時実行数（Geminiのクォータに合わせて調整する）
+    BATCH_AI_CONCURRENCY: int = 5
+    # 週報を一括Insertする件数
+    BATCH_INSERT_SIZE: int = 50
+
+    # --- 日報プレビューの結果トークン ---
+    # 署名鍵（未設定の場合は SUPABASE_KEY から導出する）と有効期限
+    PREVIEW_TOKEN_SECRET: str | None = None
+    PREVIEW_TOKEN_TTL_SECONDS: int = 900
+
+    # --- 日報の一括作成 ---
+    # 1リクエスト内のAI変換の同時実行数
+    REPORT_BATCH_AI_CONCURRENCY: int = 4
+
+    # --- 週報生成の入力トークン予算 ---
+    # 日報の合計がこのトークン数を超える場合、期間を分割して要約してから週報を生成する
+    WEEKLY_SUMMARY_TOKEN_BUDGET: int = 8000
+    # 1回の部分要約に渡す最大トークン数と最大件数（日報または中間要約の数）
+    WEEKLY_SUMMARY_CHUNK_TOKENS: int = 4000
+    WEEKLY_SUMMARY_FAN_IN: int = 7
+    # 部分要約の同時実行数（1回の週報生成あたり。長期間でも一度にGeminiへ送りすぎない）
+    WEEKLY_SUMMARY_MAX_CONCURRENCY: int = 4
+    # 部分要約1件あたりの文字数の目安
+    WEEKLY_SUMMARY_CHUNK_MAX_CHARS: int = 600
+
+    # --- 対話型スコーピングのセッション ---
+    # セッションの有効期限（作成からの時間）
+    SCOPING_SESSION_TTL_HOURS: int = 24
+    # 要約と未要約の履歴の合計がこのトークン数を超えたら、古いやり取りを要約にまとめる
+    SCOPING_HISTORY_TOKEN_BUDGET: int = 3000
+    # 要約せずにそのまま残す直近のメッセージ数
+    SCOPING_KEEP_RECENT_MESSAGES: int = 6
+    # 要約の文字数の目安
+    SCOPING_SUMMARY_MAX_CHARS: int = 1200
+
+    # --- 一覧APIのページング ---
+    # limit 未指定時の件数と、指定できる上限
+    PAGE_SIZE_DEFAULT: int = 20
+    PAGE_SIZE_MAX: int = 100
+
+    # --- AI応答キャッシュ ---
+    AI_CACHE_ENABLED: bool = True
+    # プロセス内キャッシュの最大件数
+    AI_CACHE_MAX_ENTRIES: int = 512
+    AI_CACHE_TTL_SECONDS: int = 86400
+    # 共有テーブルから期限切れの行を削除する間隔（書き込み時にワーカーごとに実行）
+    AI_CACHE_PURGE_INTERVAL_SECONDS: int = 3600
+
+    # --- Gemini API呼び出しの再試行・サーキットブレーカー・ヘッジ ---
+    # 一時的なエラー（429/503など）の最大試行回数と、バックオフの基準・上限秒数
+    GEMINI_RETRY_MAX_ATTEMPTS: int = 3
+    GEMINI_RETRY_BASE_DELAY_SECONDS: float = 0.5
+    GEMINI_RETRY_MAX_DELAY_SECONDS: float = 8.0
+    # 一時的なエラーがこの回数続いたら、指定秒数のあいだ呼び出しを止めて即座に失敗させる
+    GEMINI_BREAKER_FAILURE_THRESHOLD: int = 5
+    GEMINI_BREAKER_RESET_SECONDS: float = 30
+    # 応答が操作ごとのp95（下限あり）を超えたら2本目のリクエストを送る（Geminiの利用量が増える）
+    GEMINI_HEDGE_ENABLED: bool = False
+    GEMINI_HEDGE_MIN_DELAY_SECONDS: float = 1.0
+
+    # --- Geminiのコンテキストキャッシュ（固定のシステムプロンプトを毎回送らない） ---
+    GEMINI_CONTEXT_CACHE_ENABLED: bool = True
+    GEMINI_CONTEXT_CACHE_TTL_SECONDS: int = 3600
+    # 期限のこの秒数前になったら延長する
+    GEMINI_CONTEXT_CACHE_REFRESH_MARGIN_SECONDS: int = 300
+    # 作成に失敗した場合（最小トークン数に満たないなど）、この秒数は作成を試みない
+    GEMINI_CONTEXT_CACHE_RETRY_SECONDS: int = 600
+
+    # --- Gemini APIの送信レート制限（トークンバケット + AIMD） ---
+    GEMINI_RATE_LIMIT_ENABLED: bool = True
+    # バケットをPostgresに置いて全ワーカーで共有する（False の場合はワーカーごとに持つ）
+    GEMINI_RATE_LIMIT_SHARED: bool = True
+    # 1分あたりのリクエスト数の上限（Geminiのクォータ）と、429で下げる場合の下限
+    GEMINI_RATE_LIMIT_MAX_RPM: float = 60
+    GEMINI_RATE_LIMIT_MIN_RPM: float = 5
+    # 一度に送れるリクエスト数（バケットの容量）
+    GEMINI_RATE_LIMIT_BURST: float = 10
+    # 成功ごとに増やすrpmと、429を受けたときに掛ける係数・次に下げるまでの間隔
+    GEMINI_RATE_LIMIT_INCREASE_RPM: float = 1
+    GEMINI_RATE_LIMIT_DECREASE_FACTOR: float = 0.5
+    GEMINI_RATE_LIMIT_DECREASE_COOLDOWN_SECONDS: float = 5
+    # 週報バッチは、対話的なリクエスト用にこの数のトークンを残して取得する
+    GEMINI_RATE_LIMIT_BATCH_RESERVE: float = 3
+
     # .env ファイルを読み込む設定
     model_config = SettingsConfigDict(env_file=".env", extra="ignore")
 
@@ -8,9 +8,33 @@ TABLE_PROJECTS = "projects"
 TABLE_TASKS = "tasks"
 TABLE_TASK_WORK_LOGS = "task_work_logs"
 TABLE_WEEKLY_SUMMARIES = "weekly_summaries"
+TABLE_AI_RESPONSE_CACHE = "ai_response_cache"
+TABLE_AI_RATE_LIMITS = "ai_rate_limits"
+TABLE_SCOPING_SESSIONS = "scoping_sessions"
+TABLE_SCOPING_MESSAGES = "scoping_messages"
+TABLE_TASK_HOURS_DAILY = "task_hours_daily"
+TABLE_WEEKLY_BATCH_CHECKPOINTS = "weekly_batch_checkpoints"
+
+# --- Database View Names ---
+VIEW_PROJECT_SUMMARIES = "project_summaries"
+
+# --- Database Function Names (RPC) ---
+RPC_CREATE_DAILY_REPORT_WITH_LOGS = "create_daily_report_with_logs"
+RPC_CREATE_DAILY_REPORTS_WITH_LOGS = "create_daily_reports_with_logs"
+RPC_CREATE_PROJECT_WITH_TASKS = "create_project_with_tasks"
+RPC_ACQUIRE_AI_RATE_LIMIT = "acquire_ai_rate_limit"
+RPC_ADJUST_AI_RATE_LIMIT = "adjust_ai_rate_limit"
+RPC_GET_PROJECT_HOURS = "get_project_hours"
+RPC_SAVE_WEEKLY_BATCH_RESULTS = "save_weekly_batch_results"
+RPC_RECORD_WEEKLY_BATCH_FAILURES = "record_weekly_batch_failures"
 
 # --- Common Column Names ---
 COL_ID = "id"
 COL_USER_ID = "user_id"
 COL_TENANT_ID = "tenant_id"
 COL_CREATED_AT = "created_at"
+
+# --- Common Select Columns ---
+# 週報生成に渡す日報の列（本文・工数ログの代わりに保存時に作ったダイジェストを使う）
+# content_raw はダイジェストに要点がない日報（AI変換失敗時など）のフォールバック用
+WEEKLY_SOURCE_COLUMNS = "report_date, content_raw, digest"
@@ -0,0 +1,86 @@
+# backend/app/core/json_stream.py
+import json
+import re
+
+
+class JsonStringFieldStream:
+    """生成途中のJSONから、指定した文字列フィールドの値を少しずつ取り出す
+
+    構造化出力（JSON）をストリーミングで受け取る際、
+    完成前の断片からでも message などの文字列を先にクライアントへ流すために使う。
+    エスケープ（\\n や \\uXXXX、サロゲートペア）が断片の境目で分かれていても正しく復元する。
+
+    使い方:
+        decoder = JsonStringFieldStream("message")
+        for chunk in chunks:
+            text = decoder.feed(chunk)  # 新たに確定した文字列（なければ空文字）
+    """
+
+    def __init__(self, field: str):
+        self._key_pattern = re.compile(rf'"{re.escape(field)}"\s*:\s*"')
+        self._buffer = ""
+        # 値の読み取り位置（None の間はキーを探している）
+        self._pos: int | None = None
+        self.done = False
+
+    def feed(self, chunk: str) -> str:
+        """断片を追加し、新たに確定したフィールド値の文字列を返す"""
+        self._buffer += chunk
+        if self.done:
+            return ""
+
+        if self._pos is None:
+            match = self._key_pattern.search(self._buffer)
+            if not match:
+                return ""
+            self._pos = match.end()
+
+        return self._decode_available()
+
+    def _decode_available(self) -> str:
+        buffer = self._buffer
+        pos = self._pos
+        assert pos is not None
+        out = []
+
+        while pos < len(buffer):
+            char = buffer[pos]
+
+            if char == '"':
+                self.done = True
+                pos += 1
+                break
+
+            if char != "\\":
+                out.append(char)
+                pos += 1
+                continue
+
+            # エスケープシーケンス: 必要な文字数が揃うまで待つ
+            length = self._escape_length(buffer, pos)
+            if length is None:
+                break
+            out.append(json.loads(f'"{buffer[pos : pos + length]}"'))
+            pos += length
+
+        self._pos = pos
+        return "".join(out)
+
+    @staticmethod
+    def _escape_length(buffer: str, pos: int) -> int | None:
+        """pos から始まるエスケープの長さを返す（断片が足りない場合は None）"""
+        if pos + 1 >= len(buffer):
+            return None
+        if buffer[pos + 1] != "u":
+            return 2
+        if pos + 6 > len(buffer):
+            return None
+
+        # 上位サロゲートの場合は、続く下位サロゲートと合わせて1文字にする
+        code = int(buffer[pos + 2 : pos + 6], 16)
+        if 0xD800 <= code <= 0xDBFF:
+            if pos + 12 > len(buffer):
+                return None
+            if buffer[pos + 6 : pos + 8] == "\\u":
+                return 12
+        return 6
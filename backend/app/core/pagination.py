@@ -0,0 +1,74 @@
+# backend/app/core/pagination.py
+import base64
+import json
+from dataclasses import dataclass
+from datetime import datetime
+from uuid import UUID
+
+from app.core.constants import COL_CREATED_AT, COL_ID
+
+
+class InvalidCursorError(ValueError):
+    """カーソル文字列が不正な場合のエラー"""
+
+
+@dataclass(frozen=True)
+class PageParams:
+    """一覧APIのページング条件（created_at, id の降順でたどる）"""
+
+    limit: int
+    created_at: datetime | None = None
+    id: UUID | None = None
+
+
+def encode_cursor(row: dict) -> str:
+    """行の (created_at, id) を不透明なカーソル文字列にする"""
+    raw = json.dumps({COL_CREATED_AT: row[COL_CREATED_AT], COL_ID: str(row[COL_ID])})
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str) -> tuple[datetime, UUID]:
+    """カーソル文字列を (created_at, id) に戻す
+
+    値はフィルタ文字列に埋め込むため、型として解釈できることを必ず確認する。
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        data = json.loads(base64.urlsafe_b64decode(padded))
+        return datetime.fromisoformat(data[COL_CREATED_AT]), UUID(data[COL_ID])
+    except Exception as e:
+        raise InvalidCursorError(f"Invalid cursor: {cursor}") from e
+
+
+async def fetch_page(query, page: PageParams) -> dict:
+    """select済みのクエリに (created_at, id) のキーセット条件を付けて1ページ分を取得する
+
+    OFFSETを使わず、前ページ最後の行より後ろだけを索引でたどるため、
+    何ページ目であっても取得コストは変わらない。
+    limit + 1 件を取得し、超過分があれば次ページのカーソルを返す。
+
+    Returns:
+        {"items": [...], "next_cursor": str | None}（Page モデルの形）
+    """
+    if page.created_at is not None and page.id is not None:
+        query = query.or_(_before_cursor_filter(page.created_at, page.id))
+
+    res = await (
+        query.order(COL_CREATED_AT, desc=True)
+        .order(COL_ID, desc=True)
+        .limit(page.limit + 1)
+        .execute()
+    )
+    rows = res.data or []
+
+    items = rows[: page.limit]
+    next_cursor = encode_cursor(items[-1]) if len(rows) > page.limit else None
+    return {"items": items, "next_cursor": next_cursor}
+
+
+def _before_cursor_filter(created_at: datetime, row_id: UUID) -> str:
+    """(created_at, id) が cursor より前（降順で後ろ）の行に絞り込む or 条件を組み立てる"""
+    ts = f'"{created_at.isoformat()}"'
+    return (
+        f"{COL_CREATED_AT}.lt.{ts},and({COL_CREATED_AT}.eq.{ts},{COL_ID}.lt.{row_id})"
+    )
@@ -85,10 +85,11 @@ WBS_GENERATION_SYSTEM_PROMPT = """
 # {input_text} と {task_list} をプレースホルダーとして持ちます
 DAILY_REPORT_WITH_LOGS_PROMPT = """
 
-入力された「事実だけの粗いメモ」をもとに、以下の2つを行ってください。
+入力された「事実だけの粗いメモ」をもとに、以下の3つを行ってください。
 
 1. **清書:** 上司や取引先に送っても失礼のない、完璧なビジネスメール形式の日報を作成してください。
 2. **工数抽出:** 以下の「あなたの担当タスク一覧」を参照し、日報の内容から「どのタスクに何時間使ったか」を推論してJSONデータに含めてください。
+3. **要点抽出:** 週報の作成に使うため、メモにある事実（成果・進捗・課題・予定）を最大5件、各40文字以内の箇条書きにして key_facts に含めてください。敬語や挨拶は不要です。
 
 ### 工数抽出のルール
 - 「担当タスク一覧」にあるタスクのみを対象としてください。IDは必ず一覧のものを使用してください。
@@ -124,6 +125,27 @@ WEEKLY_REPORT_SYSTEM_PROMPT = """
 {input_text}
 """
 
+# 長期間の日報を分割して要約するためのプロンプト（要約結果は WEEKLY_REPORT_SYSTEM_PROMPT の入力になる）
+REPORTS_CHUNK_SUMMARY_PROMPT = """
+あなたは優秀なプロジェクトマネージャーです。
+以下は長い期間の日報データ（または、その一部をまとめた中間要約）のうち、連続した一部の期間の分です。
+後で期間全体の報告書を作成するための材料として、この部分を要約してください。
+
+### 制約
+- 1行目に対象期間（最初と最後の日付）を「■ YYYY-MM-DD 〜 YYYY-MM-DD」の形式で書いてください。
+- 成果・進捗・課題・タスクごとの工数の合計を、箇条書きで簡潔にまとめてください。
+- 全体で{max_chars}文字以内にしてください。
+- 入力データにない情報は捏造しないでください。
+
+### 入力データ
+{input_text}
+"""
+
+# 分割要約した入力を週報生成に渡す場合の注記
+SUMMARIZED_REPORTS_NOTE = (
+    "（対象期間が長いため、日報は期間ごとの要約に置き換えています）\n"
+)
+
 # トーン設定に基づくカスタムプロンプト
 TONE_PROMPTS = {
     "professional": """
@@ -214,6 +236,30 @@ WBS生成時には、以下の形式でタスクを生成してください：
 """
 
 
+# 対話型スコーピングの古いやり取りを要約するプロンプト
+SCOPING_HISTORY_SUMMARY_PROMPT = """
+あなたは熟練のプロジェクトマネージャーです。
+以下はプロジェクト要件のヒアリングの記録です（これまでの要約と、その後のやり取り）。
+この後もヒアリングを続けてWBSを作成するための材料として、1つの要約にまとめ直してください。
+
+### 制約
+- ユーザーが回答した事実（目的、機能要件、納期、チーム構成、技術スタック、制約など）はすべて残してください。
+- 質問済みで未回答の事項があれば「未確認:」として残してください。
+- 挨拶や相づちは省き、箇条書きで簡潔にまとめてください。
+- 全体で{max_chars}文字以内にしてください。
+- 記録にない情報は捏造しないでください。
+
+### これまでの要約
+{summary}
+
+### その後のやり取り
+{conversation}
+"""
+
+# 要約した履歴をスコーピングの会話に渡す場合の注記
+SCOPING_SUMMARY_NOTE = "（これまでのヒアリング内容の要約です）\n{summary}"
+
+
 def build_custom_prompt(base_prompt: str, tone: str, custom_instructions: str) -> str:
     """
     ユーザーのAI設定に基づいてプロンプトをカスタマイズする
@@ -230,8 +276,13 @@ def build_custom_prompt(base_prompt: str, tone: str, custom_instructions: str) -
     tone_prompt = TONE_PROMPTS.get(tone, TONE_PROMPTS["professional"])
 
     # カスタム指示がある場合は追加
-    custom_section = ""
-    if custom_instructions and custom_instructions.strip():
-        custom_section = f"\n\n### ユーザーからの追加指示\n{custom_instructions}\n"
+    custom_section = build_custom_instructions(custom_instructions)
 
     return base_prompt + "\n" + tone_prompt + custom_section
+
+
+def build_custom_instructions(custom_instructions: str) -> str:
+    """ユーザーのカスタム指示のセクション（指示がない場合は空文字）"""
+    if custom_instructions and custom_instructions.strip():
+        return f"\n\n### ユーザーからの追加指示\n{custom_instructions}\n"
+    return ""
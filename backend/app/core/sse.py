@@ -0,0 +1,19 @@
+# backend/app/core/sse.py
+import json
+
+from fastapi.responses import StreamingResponse
+
+# プロキシ(nginx等)にバッファリングさせず、断片をそのままクライアントへ流す
+SSE_HEADERS = {"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+
+
+def format_sse(event: str, data: dict) -> str:
+    """Server-Sent Events の1イベント分の文字列を組み立てる（data はJSONで送る）"""
+    return f"event: {event}\ndata: {json.dumps(data, ensure_ascii=False)}\n\n"
+
+
+def sse_response(events) -> StreamingResponse:
+    """format_sse で組み立てたイベントを返す非同期イテレータをSSEレスポンスにする"""
+    return StreamingResponse(
+        events, media_type="text/event-stream", headers=SSE_HEADERS
+    )
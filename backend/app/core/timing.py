@@ -0,0 +1,45 @@
+# backend/app/core/timing.py
+import time
+from collections.abc import Iterator
+from contextlib import contextmanager
+
+
+class PhaseTimer:
+    """1リクエスト内の処理をフェーズごとに計測する
+
+    計測結果は Server-Timing ヘッダー（ブラウザの開発者ツールで確認できる）とログに出力する。
+
+    使い方:
+        timer = PhaseTimer()
+        with timer.phase("ai"):
+            ...
+        response.headers["Server-Timing"] = timer.server_timing()
+    """
+
+    def __init__(self):
+        self._started = time.perf_counter()
+        self.phases: dict[str, float] = {}
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = (time.perf_counter() - started) * 1000
+
+    def total_ms(self) -> float:
+        """計測開始からの経過時間(ms)"""
+        return (time.perf_counter() - self._started) * 1000
+
+    def server_timing(self) -> str:
+        """Server-Timing ヘッダーの値を組み立てる（例: "ai;dur=812.3, total;dur=845.0"）"""
+        entries = [f"{name};dur={ms:.1f}" for name, ms in self.phases.items()]
+        entries.append(f"total;dur={self.total_ms():.1f}")
+        return ", ".join(entries)
+
+    def summary(self) -> str:
+        """ログ出力用の文字列（例: "ai=812ms total=845ms"）"""
+        entries = [f"{name}={ms:.0f}ms" for name, ms in self.phases.items()]
+        entries.append(f"total={self.total_ms():.0f}ms")
+        return " ".join(entries)
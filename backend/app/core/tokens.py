@@ -0,0 +1,12 @@
+# backend/app/core/tokens.py
+import math
+
+
+def estimate_tokens(text: str) -> int:
+    """Geminiに渡すテキストのトークン数の概算（APIを呼ばずに見積もる）
+
+    英数字・記号などのASCII文字は約4文字で1トークン、日本語などのASCII以外の文字は
+    1文字1トークンとして数える。実際のトークン数より多めに見積もるため、予算の判定に使える。
+    """
+    ascii_chars = len(text.encode("ascii", "ignore"))
+    return math.ceil(ascii_chars / 4) + (len(text) - ascii_chars)
@@ -1,17 +1,37 @@
 # backend/app/db/client.py
-from supabase import Client, create_client
+from supabase import AsyncClient, acreate_client
 
 from app.core.config import settings
 
 # 再接続のオーバーヘッドを防ぐためグローバル変数として保持
-_supabase_client: Client | None = None
+# 非同期クライアントを使うことで、PostgRESTへの往復中もイベントループを止めない
+_supabase_client: AsyncClient | None = None
 
 
-def get_supabase() -> Client:
-    """Supabaseクライアントを取得する依存関数"""
+async def get_supabase() -> AsyncClient:
+    """Supabase非同期クライアントを取得する依存関数
+
+    通常はlifespanで初期化済みのものを返す。
+    スクリプトやテストなどlifespan外から呼ばれた場合はここで生成する。
+    """
     global _supabase_client
 
     if _supabase_client is None:
-        _supabase_client = create_client(settings.SUPABASE_URL, settings.SUPABASE_KEY)
+        _supabase_client = await acreate_client(
+            settings.SUPABASE_URL, settings.SUPABASE_KEY
+        )
 
     return _supabase_client
+
+
+async def close_supabase() -> None:
+    """保持しているクライアントのHTTP接続を閉じる（シャットダウン時用）"""
+    global _supabase_client
+
+    if _supabase_client is None:
+        return
+
+    try:
+        await _supabase_client.postgrest.aclose()
+    finally:
+        _supabase_client = None
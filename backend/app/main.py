@@ -1,18 +1,50 @@
 # backend/apps/main.py
 import os
+from contextlib import asynccontextmanager
 
 from fastapi import Depends, FastAPI, HTTPException
 from fastapi.middleware.cors import CORSMiddleware
-from supabase import Client
+from supabase import AsyncClient
 
-from app.db.client import get_supabase
-from app.models.report import DailyReportDraft, DailyReportPolished
+from app.api.deps import get_ai_service
+from app.core.config import settings
+from app.db.client import close_supabase, get_supabase
+from app.models.report import DailyReportPreview
 
 # プロジェクト関連のルーターを追加
 from app.routers import members, profiles, projects, reports, tasks, weeks
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_rate_limiter import AIRateLimiter
+from app.services.ai_resilience import ResilientCaller
 from app.services.ai_service import AIService
 
-app = FastAPI(title="AI Project Governor API")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """アプリ全体で共有するリソースの初期化と後始末"""
+    # 起動時に非同期Supabaseクライアントを生成しておく
+    supabase = await get_supabase()
+
+    # AIServiceはプロセス内で1つだけ生成し、接続を使い回す
+    cache = (
+        AIResponseCache.from_settings(supabase) if settings.AI_CACHE_ENABLED else None
+    )
+    # Geminiへの送信レートは全ワーカーで共有するトークンバケットで制限する
+    caller = ResilientCaller.from_settings(
+        limiter=AIRateLimiter.from_settings(supabase)
+    )
+    app.state.ai_service = AIService(cache=cache, caller=caller)
+    if settings.GEMINI_CONTEXT_CACHE_ENABLED:
+        app.state.ai_service.enable_context_cache()
+    await app.state.ai_service.warm_up()
+
+    yield
+
+    await app.state.ai_service.aclose()
+    await close_supabase()
+
+
+app = FastAPI(title="AI Project Governor API", lifespan=lifespan)
 
 
 # 環境変数から許可オリジンを取得（カンマ区切りで複数指定可能に）
@@ -49,14 +81,24 @@ def health():
     return {"status": "ok", "service": "ai-project-governor-backend"}
 
 
+@app.get("/health/ai-cache")
+def ai_cache_stats(ai_service: AIService = Depends(get_ai_service)):
+    """AI応答キャッシュのヒット・ミス件数（このワーカー分）"""
+    if ai_service.cache is None:
+        return {"enabled": False}
+    return {"enabled": True, **ai_service.cache.stats()}
+
+
 @app.get("/health/db")
-def db_health_check(supabase: Client = Depends(get_supabase)):
+async def db_health_check(supabase: AsyncClient = Depends(get_supabase)):
     """
     DB接続確認
     実際にSupabaseへクエリを投げて応答があるか確認します
     """
     try:
-        response = supabase.table("tenants").select("count", count="exact").execute()  # type: ignore
+        response = (
+            await supabase.table("tenants").select("count", count="exact").execute()  # type: ignore
+        )
 
         return {
             "status": "ok",
@@ -67,13 +109,13 @@ def db_health_check(supabase: Client = Depends(get_supabase)):
         raise HTTPException(status_code=500, detail=f"DB Connection Error: {str(e)}")
 
 
-@app.post("/api/preview", response_model=DailyReportPolished)
-async def preview_report(draft: DailyReportDraft):
-    """
-    【AI変換テスト用】
-    粗いテキストを受け取り、JTC構文に変換して返します。
-    DBへの保存は行いません。
-    """
-    service = AIService()
-    result = await service.polish_report(draft.raw_content)
-    return result
+# 旧プレビューAPI: /reports/preview と同じ処理を行い、preview_token を返す
+# （作成APIにトークンを渡せばAI変換をやり直さずに保存される）
+app.add_api_route(
+    "/api/preview",
+    reports.preview_report,
+    methods=["POST"],
+    response_model=DailyReportPreview,
+    tags=["reports"],
+    deprecated=True,
+)
@@ -0,0 +1,16 @@
+# backend/app/models/common.py
+from typing import Generic, TypeVar
+
+from pydantic import BaseModel, Field
+
+T = TypeVar("T")
+
+
+class Page(BaseModel, Generic[T]):
+    """一覧APIのページ（キーセット方式）"""
+
+    items: list[T]
+    next_cursor: str | None = Field(
+        None,
+        description="次のページを取得するためのカーソル（最終ページの場合はNone）",
+    )
@@ -66,8 +66,8 @@ class TaskResponse(TaskCreate):
     # start_date, end_dateはTaskCreateから継承
 
 
-class ProjectResponse(BaseModel):
-    """プロジェクトレスポンス"""
+class ProjectBaseResponse(BaseModel):
+    """プロジェクト本体のレスポンス（タスクを含まない）"""
 
     id: UUID
     tenant_id: UUID
@@ -78,10 +78,59 @@ class ProjectResponse(BaseModel):
     end_date: date | None
     milestones: str | None
     created_at: datetime
-    # リスト表示などでタスクを含める場合
+
+
+class ProjectResponse(ProjectBaseResponse):
+    """プロジェクトレスポンス（詳細・作成時はタスクを含める）"""
+
     tasks: list[TaskResponse] | None = []
 
 
+class ProjectSummaryResponse(ProjectBaseResponse):
+    """プロジェクト一覧用レスポンス（タスク本体の代わりにDBで集計した値を持つ）"""
+
+    task_count: int = Field(0, description="タスク数")
+    todo_count: int = Field(0, description="未着手のタスク数")
+    in_progress_count: int = Field(0, description="進行中のタスク数")
+    done_count: int = Field(0, description="完了したタスク数")
+    estimated_hours_total: int = Field(0, description="想定工数の合計(時間)")
+    done_estimated_hours: int = Field(
+        0, description="完了したタスクの想定工数の合計(時間)"
+    )
+
+
+class ProjectHoursDay(BaseModel):
+    """日ごとの実績工数"""
+
+    work_date: date
+    hours: float
+
+
+class ProjectHoursTask(BaseModel):
+    """タスクごとの実績工数"""
+
+    task_id: UUID
+    title: str
+    hours: float
+
+
+class ProjectHoursResponse(BaseModel):
+    """プロジェクトの実績工数（日報の工数ログから集計した値）"""
+
+    project_id: UUID
+    start_date: date | None = Field(
+        None, description="集計期間の開始日（省略時は全期間）"
+    )
+    end_date: date | None = Field(
+        None, description="集計期間の終了日（省略時は全期間）"
+    )
+    total_hours: float = Field(0, description="期間内の工数の合計(h)")
+    days: list[ProjectHoursDay] = Field(default=[], description="日別の工数（日付順）")
+    tasks: list[ProjectHoursTask] = Field(
+        default=[], description="タスク別の工数（工数の多い順）"
+    )
+
+
 class TaskUpdate(BaseModel):
     """タスク更新用スキーマ"""
 
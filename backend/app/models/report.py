@@ -1,9 +1,15 @@
 # backend/app/models/report.py
 from datetime import date, datetime
+from typing import Literal
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
+# 一括作成APIで1回に受け付ける最大件数
+MAX_REPORT_BATCH_SIZE = 50
+# 週報生成用のダイジェストに保存する要点の最大件数
+MAX_KEY_FACTS = 5
+
 
 class WorkLogExtraction(BaseModel):
     """AIが推論したタスク別工数"""
@@ -30,6 +36,10 @@ class DailyReportDraft(BaseModel):
         json_schema_extra={"example": "サーバー落ちた。復旧作業中。"},
     )
     politeness_level: int = Field(..., description="丁寧さレベル(1-5)", ge=1, le=5)
+    preview_token: str | None = Field(
+        None,
+        description="プレビューで受け取ったトークン（入力が同じならAI変換を省略する）",
+    )
 
 
 class DailyReportPolished(BaseModel):
@@ -49,6 +59,54 @@ class DailyReportPolished(BaseModel):
     work_logs: list[WorkLogExtraction] = Field(
         default=[], description="タスクごとの工数配分"
     )
+    key_facts: list[str] = Field(
+        default=[],
+        description="週報生成用の要点（成果・進捗・課題・予定の短い箇条書き）",
+    )
+
+
+class DailyReportPreview(DailyReportPolished):
+    """保存前のプレビュー（作成APIに preview_token を渡すと同じ結果で保存される）"""
+
+    preview_token: str = Field(..., description="変換結果の署名付きトークン（短期）")
+
+
+class DailyReportBatchItem(DailyReportDraft):
+    """一括作成する日報の下書き（まとめて登録する過去の日報は日付を指定できる）"""
+
+    report_date: date | None = Field(
+        default=None, description="日報の日付（省略時は当日）"
+    )
+
+
+class DailyReportBatchRequest(BaseModel):
+    """日報の一括作成リクエスト"""
+
+    drafts: list[DailyReportBatchItem] = Field(
+        ..., min_length=1, max_length=MAX_REPORT_BATCH_SIZE
+    )
+
+
+class DailyReportBatchResult(BaseModel):
+    """一括作成の1件ごとの結果（drafts と同じ順）"""
+
+    index: int = Field(..., description="drafts 内の位置")
+    status: Literal["created", "failed"]
+    report_id: UUID | None = Field(
+        default=None, description="保存した日報のID（成功時）"
+    )
+    report: DailyReportPolished | None = Field(
+        default=None, description="変換結果（成功時）"
+    )
+    error: str | None = Field(default=None, description="失敗の理由（失敗時）")
+
+
+class DailyReportBatchResponse(BaseModel):
+    """日報の一括作成レスポンス（一部が失敗しても成功分は保存される）"""
+
+    results: list[DailyReportBatchResult]
+    created: int
+    failed: int
 
 
 class DailyReportResponse(BaseModel):
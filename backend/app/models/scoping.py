@@ -1,4 +1,7 @@
 # backend/app/models/scoping.py
+from datetime import datetime
+from uuid import UUID
+
 from pydantic import BaseModel, Field
 
 from app.models.project import WBSTask
@@ -19,6 +22,19 @@ class ScopingChatRequest(BaseModel):
     )
 
 
+class ScopingSessionResponse(BaseModel):
+    """作成した対話型スコーピングのセッション"""
+
+    id: UUID
+    expires_at: datetime = Field(..., description="セッションの有効期限")
+
+
+class ScopingMessageRequest(BaseModel):
+    """セッションに送る新しいメッセージ（会話履歴はサーバー側で保持する）"""
+
+    content: str = Field(..., min_length=1, description="ユーザーのメッセージ内容")
+
+
 class WBSData(BaseModel):
     """対話完了時に生成されるWBSデータ"""
 
@@ -2,7 +2,10 @@
 from datetime import date, datetime
 from uuid import UUID
 
-from pydantic import BaseModel
+from pydantic import BaseModel, model_validator
+
+# 1回の生成で対象にできる最大日数（長い期間は分割要約してから生成する）
+MAX_GENERATE_RANGE_DAYS = 366
 
 
 class WeekGenerateRequest(BaseModel):
@@ -11,6 +14,17 @@ class WeekGenerateRequest(BaseModel):
     start_date: date
     end_date: date
 
+    @model_validator(mode="after")
+    def check_range(self) -> "WeekGenerateRequest":
+        days = (self.end_date - self.start_date).days + 1
+        if days < 1:
+            raise ValueError("end_date must be on or after start_date")
+        if days > MAX_GENERATE_RANGE_DAYS:
+            raise ValueError(
+                f"date range must be {MAX_GENERATE_RANGE_DAYS} days or less"
+            )
+        return self
+
 
 class WeekGenerateResponse(BaseModel):
     """AI生成結果（プレビュー用）"""
@@ -1,14 +1,15 @@
 # backend/app/routers/members.py
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends
 from gotrue.types import User
 from pydantic import BaseModel
-from supabase import Client
+from supabase import AsyncClient
 
-from app.api.deps import get_current_user
-from app.core.constants import COL_ID, COL_TENANT_ID, TABLE_PROFILES
+from app.api.deps import get_current_user, get_user_context
+from app.core.constants import COL_TENANT_ID, TABLE_PROFILES
 from app.db.client import get_supabase
+from app.services.profile_service import UserContext
 
 router = APIRouter()
 
@@ -22,28 +23,18 @@ class MemberResponse(BaseModel):
 @router.get("/members", response_model=list[MemberResponse])
 async def get_tenant_members(
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    context: UserContext = Depends(get_user_context),
 ):
     """
     同じテナントのメンバー一覧を取得する（タスクのアサイン用）
     """
-    # 1. 自分のテナントIDを取得
-    my_profile = (
-        supabase.table(TABLE_PROFILES)
-        .select(COL_TENANT_ID)
-        .eq(COL_ID, current_user.id)
-        .single()
-        .execute()
-    )
-
-    if not my_profile.data:
-        raise HTTPException(status_code=400, detail="Profile not found")
-
-    tenant_id = my_profile.data[COL_TENANT_ID]  # type: ignore
+    # 1. 自分のテナントID（キャッシュ済みの値を利用）
+    tenant_id = context.tenant_id
 
     # 2. 同じテナントIDを持つプロフィールを取得
     # ※ 本来は 'auth.users' と結合したいところですが、MVPなので profiles テーブルのみで完結させます
-    members_res = (
+    members_res = await (
         supabase.table(TABLE_PROFILES)
         .select("id, full_name, role")
         .eq(COL_TENANT_ID, tenant_id)
@@ -5,11 +5,12 @@ from typing import Literal
 from fastapi import APIRouter, Depends, HTTPException
 from gotrue.types import User
 from pydantic import BaseModel
-from supabase import Client
+from supabase import AsyncClient
 
 from app.api.deps import get_current_user
 from app.core.constants import COL_ID, TABLE_PROFILES
 from app.db.client import get_supabase
+from app.services.profile_service import ProfileCache, get_profile_cache
 
 router = APIRouter()
 
@@ -35,12 +36,13 @@ class AISettingsResponse(BaseModel):
 @router.get("/profiles/ai-settings", response_model=AISettingsResponse)
 async def get_ai_settings(
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
 ):
     """
     現在のユーザーのAI設定を取得する
+    設定画面には更新直後の値を返すため、ProfileCache を通さずDBから取得する
     """
-    profile_res = (
+    profile_res = await (
         supabase.table(TABLE_PROFILES)
         .select("ai_settings")
         .eq(COL_ID, current_user.id)
@@ -51,7 +53,7 @@ async def get_ai_settings(
     if not profile_res.data:
         raise HTTPException(status_code=404, detail="Profile not found")
 
-    ai_settings_data = profile_res.data.get("ai_settings") or {
+    ai_settings_data: dict = profile_res.data.get("ai_settings") or {  # type: ignore
         "tone": "professional",
         "language": "ja",
         "custom_instructions": "",
@@ -64,7 +66,8 @@ async def get_ai_settings(
 async def update_ai_settings(
     settings: AISettings,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    profile_cache: ProfileCache = Depends(get_profile_cache),
 ):
     """
     現在のユーザーのAI設定を更新する
@@ -72,7 +75,7 @@ async def update_ai_settings(
     # 設定をJSONBとして保存
     update_data = {"ai_settings": settings.model_dump()}
 
-    res = (
+    res = await (
         supabase.table(TABLE_PROFILES)
         .update(update_data)
         .eq(COL_ID, current_user.id)
@@ -84,4 +87,7 @@ async def update_ai_settings(
             status_code=404, detail="Profile not found or update failed"
         )
 
+    # キャッシュ済みの古い設定を破棄する（次のリクエストでDBから再取得される）
+    profile_cache.invalidate(current_user.id)
+
     return AISettingsResponse(ai_settings=settings)
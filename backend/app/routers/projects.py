@@ -1,36 +1,67 @@
 # backend/app/routers/projects.py
+import logging
+import time
+from collections.abc import AsyncIterator
+from datetime import date
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException
 from gotrue.types import User
-from supabase import Client
+from supabase import AsyncClient
 
-from app.api.deps import get_current_user
+from app.api.deps import (
+    get_ai_service,
+    get_current_user,
+    get_page_params,
+    get_scoping_session_service,
+    get_user_context,
+)
 from app.core.constants import (
     COL_ID,
-    COL_TENANT_ID,
-    TABLE_PROFILES,
+    RPC_CREATE_PROJECT_WITH_TASKS,
+    RPC_GET_PROJECT_HOURS,
     TABLE_PROJECTS,
-    TABLE_TASKS,
+    VIEW_PROJECT_SUMMARIES,
 )
+from app.core.pagination import PageParams, fetch_page
+from app.core.sse import format_sse, sse_response
 from app.db.client import get_supabase
+from app.models.common import Page
 from app.models.project import (
     ProjectCreate,
+    ProjectHoursResponse,
     ProjectResponse,
+    ProjectSummaryResponse,
     WBSRequest,
     WBSResponse,
 )
-from app.models.scoping import ScopingChatRequest, ScopingChatResponse
+from app.models.scoping import (
+    ScopingChatRequest,
+    ScopingChatResponse,
+    ScopingMessageRequest,
+    ScopingSessionResponse,
+)
 from app.services.ai_service import AIService
+from app.services.profile_service import UserContext
+from app.services.scoping_session_service import (
+    ScopingSession,
+    ScopingSessionConflictError,
+    ScopingSessionNotFoundError,
+    ScopingSessionService,
+)
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
 # --- 対話型プロジェクトスコーピングAPI ---
 @router.post("/projects/scoping/chat", response_model=ScopingChatResponse)
-async def scoping_chat(request: ScopingChatRequest):
+async def scoping_chat(
+    request: ScopingChatRequest, ai_service: AIService = Depends(get_ai_service)
+):
     """
     対話型でプロジェクト要件を明確化し、十分な情報が揃ったらWBSを生成する
+    会話履歴を毎回すべて送る旧API（新しいクライアントは /projects/scoping/sessions を使う）
 
     Args:
         request: これまでの会話履歴を含むリクエスト
@@ -38,18 +69,137 @@ async def scoping_chat(request: ScopingChatRequest):
     Returns:
         ScopingChatResponse: AIの応答、完了フラグ、WBSデータ（完了時）
     """
-    ai_service = AIService()
     result = await ai_service.interactive_scoping(request.messages)
     return result
 
 
+@router.post("/projects/scoping/chat/stream")
+async def stream_scoping_chat(
+    request: ScopingChatRequest, ai_service: AIService = Depends(get_ai_service)
+):
+    """
+    /projects/scoping/chat のストリーミング版（Server-Sent Events）
+
+    - chunk : AIの応答メッセージの断片 {"text": "..."}
+    - result: 生成完了後の応答全体（ScopingChatResponse と同じ形。完了時は wbs_data を含む）
+    - done  : 終了 {"ttft_ms": 最初の断片までの時間, "total_ms": 全体の時間}
+    - error : 生成失敗 {"message": "..."}
+    """
+    return sse_response(
+        _scoping_event_stream(ai_service.stream_interactive_scoping(request.messages))
+    )
+
+
+@router.post("/projects/scoping/sessions", response_model=ScopingSessionResponse)
+async def create_scoping_session(
+    current_user: User = Depends(get_current_user),
+    service: ScopingSessionService = Depends(get_scoping_session_service),
+):
+    """
+    対話型スコーピングのセッションを作成する
+    以降は /projects/scoping/sessions/{session_id}/messages に新しいメッセージだけを送る
+    """
+    try:
+        session = await service.create(current_user.id)
+    except Exception as e:
+        logger.exception("Scoping Session Create Error: user=%s", current_user.id)
+        raise HTTPException(
+            status_code=500, detail="Failed to create scoping session."
+        ) from e
+    return ScopingSessionResponse(id=session.id, expires_at=session.expires_at)  # type: ignore
+
+
+async def _get_scoping_session(
+    service: ScopingSessionService, session_id: UUID, user_id: str
+) -> ScopingSession:
+    try:
+        return await service.get(str(session_id), user_id)
+    except ScopingSessionNotFoundError:
+        raise HTTPException(
+            status_code=404, detail="Scoping session not found"
+        ) from None
+
+
+@router.post(
+    "/projects/scoping/sessions/{session_id}/messages",
+    response_model=ScopingChatResponse,
+)
+async def send_scoping_message(
+    session_id: UUID,
+    request: ScopingMessageRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    service: ScopingSessionService = Depends(get_scoping_session_service),
+):
+    """
+    セッションに新しいメッセージを送り、AIの応答を返す（/projects/scoping/chat と同じ応答）
+    会話履歴はセッションから組み立て、長くなった分は応答を返した後に要約する
+    """
+    session = await _get_scoping_session(service, session_id, current_user.id)
+    try:
+        result = await service.chat(session, request.content)
+    except ScopingSessionConflictError:
+        raise HTTPException(
+            status_code=409, detail="Another message is being processed."
+        ) from None
+
+    background_tasks.add_task(service.compact_if_needed, session)
+    return result
+
+
+@router.post("/projects/scoping/sessions/{session_id}/messages/stream")
+async def stream_scoping_message(
+    session_id: UUID,
+    request: ScopingMessageRequest,
+    background_tasks: BackgroundTasks,
+    current_user: User = Depends(get_current_user),
+    service: ScopingSessionService = Depends(get_scoping_session_service),
+):
+    """
+    /projects/scoping/sessions/{session_id}/messages のストリーミング版
+    イベントは /projects/scoping/chat/stream と同じ
+    """
+    session = await _get_scoping_session(service, session_id, current_user.id)
+
+    # 返したレスポンスにも付与され、ストリームの送信が終わった後に実行される
+    background_tasks.add_task(service.compact_if_needed, session)
+    return sse_response(
+        _scoping_event_stream(service.stream_chat(session, request.content))
+    )
+
+
+async def _scoping_event_stream(items: AsyncIterator[str | ScopingChatResponse]):
+    """スコーピングの応答（断片と最後の応答全体）をSSEのイベントに変換する"""
+    started = time.perf_counter()
+    ttft_ms = None
+    try:
+        async for item in items:
+            if isinstance(item, ScopingChatResponse):
+                yield format_sse("result", item.model_dump(mode="json"))
+                continue
+
+            if ttft_ms is None:
+                ttft_ms = round((time.perf_counter() - started) * 1000)
+            yield format_sse("chunk", {"text": item})
+    except Exception as e:
+        print(f"AI Scoping Stream Error: {e}")
+        yield format_sse("error", {"message": "応答の生成に失敗しました"})
+        return
+
+    total_ms = round((time.perf_counter() - started) * 1000)
+    # チャットのレイテンシ指標は最初の断片が届くまでの時間(TTFT)
+    print(f"Scoping Chat TTFT: {ttft_ms}ms (total: {total_ms}ms)")
+    yield format_sse("done", {"ttft_ms": ttft_ms, "total_ms": total_ms})
+
+
 # --- AIによるWBS生成API (保存はしない) ---
 @router.post("/projects/generate-wbs", response_model=WBSResponse)
-async def generate_wbs(request: WBSRequest):
+async def generate_wbs(
+    request: WBSRequest, ai_service: AIService = Depends(get_ai_service)
+):
     """
     プロジェクト概要を受け取り、AIがタスクリストを提案する
     """
-    ai_service = AIService()
     result = await ai_service.generate_wbs(request)
     return result
 
@@ -59,84 +209,57 @@ async def generate_wbs(request: WBSRequest):
 async def create_project(
     project_in: ProjectCreate,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    context: UserContext = Depends(get_user_context),
 ):
     """
     プロジェクトとタスクを一括でDBに保存する
+    プロジェクトと全タスクは1回のRPC・1トランザクションで作成する（タスクのないプロジェクトは残らない）
     """
-    # 1. ユーザーのテナントIDを取得
-    profile_res = (
-        supabase.table(TABLE_PROFILES)
-        .select(COL_TENANT_ID)
-        .eq(COL_ID, current_user.id)
-        .single()
-        .execute()
-    )
-    if not profile_res.data:
-        raise HTTPException(status_code=400, detail="User profile not found.")
-
-    tenant_id = profile_res.data[COL_TENANT_ID]  # type: ignore
-
-    # 2. プロジェクト本体の作成
-    project_data = {
-        "tenant_id": tenant_id,
-        "name": project_in.name,
-        "description": project_in.description,
-        "start_date": (
+    params = {
+        # ユーザーのテナントID（キャッシュ済みの値を利用）
+        "p_tenant_id": context.tenant_id,
+        "p_name": project_in.name,
+        "p_description": project_in.description,
+        "p_start_date": (
             project_in.start_date.isoformat() if project_in.start_date else None
         ),
-        "end_date": project_in.end_date.isoformat() if project_in.end_date else None,
-        "milestones": project_in.milestones,
-        "status": "planning",
+        "p_end_date": (
+            project_in.end_date.isoformat() if project_in.end_date else None
+        ),
+        "p_milestones": project_in.milestones,
+        # assigned_to(UUID)・日付はJSONに変換して渡す
+        "p_tasks": [task.model_dump(mode="json") for task in project_in.tasks],
     }
 
-    proj_res = supabase.table(TABLE_PROJECTS).insert(project_data).execute()
-    if not proj_res.data:
-        raise HTTPException(status_code=500, detail="Failed to create project.")
-
-    new_project = proj_res.data[0]
-    project_id = new_project["id"]  # type: ignore
-
-    # 3. タスクの一括作成
-    if project_in.tasks:
-        tasks_data = []
-        for task in project_in.tasks:
-            t_data = task.model_dump()
-            t_data["project_id"] = project_id
-            t_data["tenant_id"] = tenant_id  # RLS用
-            t_data["assigned_to"] = str(task.assigned_to) if task.assigned_to else None
-            tasks_data.append(t_data)
+    try:
+        res = await supabase.rpc(RPC_CREATE_PROJECT_WITH_TASKS, params).execute()
+    except Exception as e:
+        print(f"Project Create Error: {e}")
+        raise HTTPException(status_code=500, detail="Failed to create project.") from e
 
-        # Bulk Insert
-        tasks_res = supabase.table(TABLE_TASKS).insert(tasks_data).execute()
-        if not tasks_res.data:
-            print("Warning: Failed to save tasks.")
-
-    # 4. レスポンス用に整形（作成されたタスクを含める）
-    # 今回は簡略化のため、作成直後のデータを返す形にする
-    # 本来は再度JOINして取得するのが確実だが、Supabaseのレスポンスを利用
-    new_project["tasks"] = tasks_res.data if project_in.tasks else []  # type: ignore
+    if not res.data:
+        raise HTTPException(status_code=500, detail="Failed to create project.")
 
-    return new_project
+    # 作成されたタスクを含むプロジェクト（GET /projects/{id} と同じ形）
+    return res.data
 
 
 # --- プロジェクト一覧取得API ---
-@router.get("/projects", response_model=list[ProjectResponse])
+@router.get("/projects", response_model=Page[ProjectSummaryResponse])
 async def get_projects(
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    page: PageParams = Depends(get_page_params),
 ):
     """
-    テナント内のプロジェクト一覧を取得する
+    テナント内のプロジェクト一覧を取得する（作成日の新しい順に1ページ分）
+    タスク本体は含めず、ステータス別のタスク数と想定工数の合計だけを返す
+    （タスクは詳細APIで取得する）
     """
-    # RLSが効いているので、select("*") だけで自テナントのものだけが返る
-    res = (
-        supabase.table(TABLE_PROJECTS)
-        .select("*, tasks(*)")  # タスクも結合して取得
-        .order("created_at", desc=True)
-        .execute()
-    )
-    return res.data
+    # 集計はビュー側で行う。RLSが効いているので、自テナントのものだけが返る
+    query = supabase.table(VIEW_PROJECT_SUMMARIES).select("*")
+    return await fetch_page(query, page)
 
 
 # --- プロジェクト詳細取得API ---
@@ -144,13 +267,13 @@ async def get_projects(
 async def get_project_detail(
     project_id: UUID,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
 ):
     """
     指定されたIDのプロジェクト詳細とタスク一覧を取得する
     """
     # RLSにより、自テナントのデータしか取得できないため安全
-    res = (
+    res = await (
         supabase.table(TABLE_PROJECTS)
         .select("*, tasks(*)")  # タスクも結合して取得
         .eq(COL_ID, project_id)
@@ -162,3 +285,42 @@ async def get_project_detail(
         raise HTTPException(status_code=404, detail="Project not found")
 
     return res.data
+
+
+# --- プロジェクト実績工数API ---
+@router.get("/projects/{project_id}/hours", response_model=ProjectHoursResponse)
+async def get_project_hours(
+    project_id: UUID,
+    start_date: date | None = None,
+    end_date: date | None = None,
+    current_user: User = Depends(get_current_user),
+    supabase: AsyncClient = Depends(get_supabase),
+):
+    """
+    プロジェクトの実績工数を日別・タスク別に集計して返す（期間の省略時は全期間）
+
+    工数ログのトリガーで差分更新している集計テーブル(task_hours_daily)から、
+    DB側で日別・タスク別にまとめるため、日報や工数ログ本体は読まない。
+    """
+    if start_date and end_date and start_date > end_date:
+        raise HTTPException(
+            status_code=400, detail="end_date must be on or after start_date"
+        )
+
+    params = {
+        "p_project_id": str(project_id),
+        "p_start_date": start_date.isoformat() if start_date else None,
+        "p_end_date": end_date.isoformat() if end_date else None,
+    }
+    # RLSにより、他テナントのプロジェクトは工数0件として返る
+    res = await supabase.rpc(RPC_GET_PROJECT_HOURS, params).execute()
+
+    hours: dict = res.data or {}  # type: ignore
+    return ProjectHoursResponse.model_validate(
+        {
+            **hours,
+            "project_id": project_id,
+            "start_date": start_date,
+            "end_date": end_date,
+        }
+    )
@@ -1,30 +1,52 @@
 # backend/app/routers/reports.py
+import asyncio
+import logging
 from uuid import UUID
 
-from fastapi import APIRouter, Depends, HTTPException
+from fastapi import APIRouter, Depends, HTTPException, Response
 from gotrue.types import User
-from supabase import Client
+from supabase import AsyncClient
 
-from app.api.deps import get_current_user
+from app.api.deps import get_ai_service, get_current_user, get_page_params
+from app.core.config import settings
 from app.core.constants import (
-    COL_CREATED_AT,
     COL_ID,
-    COL_TENANT_ID,
     COL_USER_ID,
+    RPC_CREATE_DAILY_REPORT_WITH_LOGS,
+    RPC_CREATE_DAILY_REPORTS_WITH_LOGS,
     TABLE_DAILY_REPORTS,
-    TABLE_PROFILES,
-    TABLE_TASK_WORK_LOGS,
     TABLE_TASKS,
 )
+from app.core.pagination import PageParams, fetch_page
+from app.core.timing import PhaseTimer
 from app.db.client import get_supabase
+from app.models.common import Page
 from app.models.report import (
+    MAX_KEY_FACTS,
+    DailyReportBatchItem,
+    DailyReportBatchRequest,
+    DailyReportBatchResponse,
+    DailyReportBatchResult,
     DailyReportDraft,
     DailyReportPolished,
+    DailyReportPreview,
     DailyReportResponse,
     DailyReportUpdate,
 )
 from app.services.ai_service import AIService
+from app.services.preview_token import (
+    PreviewTokenSigner,
+    get_preview_signer,
+    preview_fingerprint,
+)
+from app.services.profile_service import (
+    ProfileCache,
+    ProfileNotFoundError,
+    UserContext,
+    get_profile_cache,
+)
 
+logger = logging.getLogger(__name__)
 router = APIRouter()
 
 
@@ -32,107 +54,321 @@ router = APIRouter()
 @router.post("/reports", response_model=DailyReportPolished)
 async def create_report(
     draft: DailyReportDraft,
+    response: Response,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    ai_service: AIService = Depends(get_ai_service),
+    profile_cache: ProfileCache = Depends(get_profile_cache),
+    signer: PreviewTokenSigner = Depends(get_preview_signer),
 ):
     """
     日報を作成し、AI変換を行ってDBに保存する。
-    さらに、AIが推論した工数ログも保存する。
+    さらに、AIが推論した工数ログと、週報生成用のダイジェスト（要点と工数表）も保存する。
+
+    プレビュー(/reports/preview)の preview_token が渡され、入力が変わっていなければ
+    AI変換は行わずにプレビューの結果をそのまま保存する。
+    フェーズごとの所要時間は Server-Timing ヘッダーで返す。
     """
+    timer = PhaseTimer()
 
-    # 1. ユーザーの所属テナントとAI設定を取得
-    profile_res = (
-        supabase.table(TABLE_PROFILES)
-        .select(f"{COL_TENANT_ID}, ai_settings")
-        .eq(COL_ID, current_user.id)
-        .single()
-        .execute()
+    # 1. AI変換の入力（テナント・AI設定とアクティブタスク）を同時に取得
+    with timer.phase("prefetch"):
+        context, active_tasks = await _prefetch(
+            supabase, profile_cache, current_user.id
+        )
+
+    tenant_id = context.tenant_id
+
+    # 2. AI変換の実行 (タスクリストとAI設定を渡す)
+    with timer.phase("ai"):
+        polished_result = _reuse_preview(
+            signer, draft, current_user.id, context, active_tasks
+        )
+        if polished_result is None:
+            polished_result = await ai_service.generate_report_with_logs(
+                draft.raw_content,
+                draft.politeness_level,
+                active_tasks,
+                context.ai_settings,
+            )
+
+    # 3. 日報本体と工数ログを1回のRPCで保存（1トランザクションのため、日報だけが残ることはない）
+    # AIがハルシネーションで存在しないタスクIDを返した場合、そのログはDB関数側で除外される
+    with timer.phase("save"):
+        params = {
+            "p_user_id": current_user.id,
+            "p_tenant_id": tenant_id,
+            "p_content_raw": draft.raw_content,
+            "p_content_polished": polished_result.content_polished,
+            "p_subject": polished_result.subject,
+            "p_politeness_level": draft.politeness_level,
+            "p_work_logs": _work_logs_payload(polished_result),
+            "p_key_facts": _key_facts_payload(polished_result),
+        }
+        try:
+            saved = await supabase.rpc(
+                RPC_CREATE_DAILY_REPORT_WITH_LOGS, params
+            ).execute()
+        except Exception as e:
+            print(f"Report Save Error: {e}")
+            raise HTTPException(status_code=500, detail="Failed to save report") from e
+
+        if not saved.data:
+            raise HTTPException(status_code=500, detail="Failed to save report")
+
+    response.headers["Server-Timing"] = timer.server_timing()
+    logger.debug("POST /reports timing: %s", timer.summary())
+
+    return polished_result
+
+
+# --- プレビューAPI ---
+@router.post("/reports/preview", response_model=DailyReportPreview)
+async def preview_report(
+    draft: DailyReportDraft,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    supabase: AsyncClient = Depends(get_supabase),
+    ai_service: AIService = Depends(get_ai_service),
+    profile_cache: ProfileCache = Depends(get_profile_cache),
+    signer: PreviewTokenSigner = Depends(get_preview_signer),
+):
+    """
+    作成APIと同じ入力でAI変換だけを行い、保存せずに返す
+
+    結果には署名付きの preview_token が付く。ユーザーが内容を確認して作成APIに
+    このトークンを渡すと、AIを再度呼ばずに同じ結果が保存される。
+    """
+    timer = PhaseTimer()
+
+    with timer.phase("prefetch"):
+        context, active_tasks = await _prefetch(
+            supabase, profile_cache, current_user.id
+        )
+
+    # エラー時の日報に署名して保存されないよう、変換に失敗した場合はエラーにする
+    with timer.phase("ai"):
+        try:
+            result = await ai_service.generate_report_with_logs(
+                draft.raw_content,
+                draft.politeness_level,
+                active_tasks,
+                context.ai_settings,
+                fallback=False,
+            )
+        except Exception as e:
+            raise HTTPException(status_code=502, detail="AI conversion failed") from e
+
+    fingerprint = preview_fingerprint(
+        draft.raw_content, draft.politeness_level, context.ai_settings, active_tasks
     )
-    if not profile_res.data:
-        raise HTTPException(status_code=400, detail="Profile not found")
+    token = signer.issue(current_user.id, fingerprint, result)
 
-    tenant_id = profile_res.data[COL_TENANT_ID]  # type: ignore
-    ai_settings = profile_res.data.get("ai_settings")  # type: ignore
+    response.headers["Server-Timing"] = timer.server_timing()
+    return DailyReportPreview(**result.model_dump(), preview_token=token)
 
-    # 2. ユーザーのアクティブタスクを取得 (AIへのコンテキスト用)
-    # ※ tasks.py で作ったAPIロジックと同等だが、内部呼び出し用に直接クエリする
-    tasks_res = (
-        supabase.table(TABLE_TASKS)
-        .select("id, title")
-        .eq("assigned_to", current_user.id)
-        .neq("status", "done")
-        .execute()
+
+async def _prefetch(
+    supabase: AsyncClient, profile_cache: ProfileCache, user_id: str
+) -> tuple[UserContext, list]:
+    """
+    AI変換の入力（テナント・AI設定とアクティブタスク）を取得する
+    どちらもユーザーIDだけで引けるため、順番に待たずに並行して問い合わせる
+    """
+    try:
+        context, active_tasks = await asyncio.gather(
+            profile_cache.get(supabase, user_id),
+            _fetch_active_tasks(supabase, user_id),
+        )
+    except ProfileNotFoundError:
+        raise HTTPException(status_code=400, detail="Profile not found") from None
+    return context, active_tasks
+
+
+def _reuse_preview(
+    signer: PreviewTokenSigner,
+    draft: DailyReportDraft,
+    user_id: str,
+    context: UserContext,
+    active_tasks: list,
+) -> DailyReportPolished | None:
+    """下書きにプレビューのトークンがあり、入力が変わっていなければその結果を返す"""
+    if not draft.preview_token:
+        return None
+
+    fingerprint = preview_fingerprint(
+        draft.raw_content, draft.politeness_level, context.ai_settings, active_tasks
     )
-    active_tasks = tasks_res.data or []
+    result = signer.verify(draft.preview_token, user_id, fingerprint)
+    if result is None:
+        logger.debug("Preview token not reused: regenerating")
+    return result
 
-    # 3. AI変換の実行 (タスクリストとAI設定を渡す)
-    ai_service = AIService()
-    polished_result = await ai_service.generate_report_with_logs(
-        draft.raw_content, draft.politeness_level, active_tasks, ai_settings
+
+# --- 一括作成API ---
+@router.post("/reports/batch", response_model=DailyReportBatchResponse)
+async def create_reports_batch(
+    request: DailyReportBatchRequest,
+    response: Response,
+    current_user: User = Depends(get_current_user),
+    supabase: AsyncClient = Depends(get_supabase),
+    ai_service: AIService = Depends(get_ai_service),
+    profile_cache: ProfileCache = Depends(get_profile_cache),
+    signer: PreviewTokenSigner = Depends(get_preview_signer),
+):
+    """
+    複数の日報をまとめて作成する（出張明けのまとめ入力やインポート用）
+
+    プロフィールとアクティブタスクの取得は全件で1回だけ行い、
+    AI変換は REPORT_BATCH_AI_CONCURRENCY 件ずつ並行に実行し、保存は1回のRPCで行う。
+    1件ごとの成否を results で返す（失敗した日報は保存されず、成功した分だけが保存される）。
+    preview_token 付きの下書きは、作成APIと同様にプレビューの結果を再利用する。
+    """
+    timer = PhaseTimer()
+    drafts = request.drafts
+
+    with timer.phase("prefetch"):
+        context, active_tasks = await _prefetch(
+            supabase, profile_cache, current_user.id
+        )
+
+    # 1. AI変換（同時実行数を制限して並行に実行し、失敗した日報はエラー時の本文で保存しない）
+    semaphore = asyncio.Semaphore(settings.REPORT_BATCH_AI_CONCURRENCY)
+
+    async def polish(draft: DailyReportDraft) -> DailyReportPolished:
+        reused = _reuse_preview(signer, draft, current_user.id, context, active_tasks)
+        if reused is not None:
+            return reused
+        async with semaphore:
+            return await ai_service.generate_report_with_logs(
+                draft.raw_content,
+                draft.politeness_level,
+                active_tasks,
+                context.ai_settings,
+                fallback=False,
+            )
+
+    with timer.phase("ai"):
+        outcomes = await asyncio.gather(
+            *(polish(draft) for draft in drafts), return_exceptions=True
+        )
+
+    results: list[DailyReportBatchResult] = [
+        DailyReportBatchResult(index=i, status="failed", error="AI conversion failed")
+        for i in range(len(drafts))
+    ]
+    polished = [
+        (i, outcome)
+        for i, outcome in enumerate(outcomes)
+        if isinstance(outcome, DailyReportPolished)
+    ]
+
+    # 2. 変換できた日報をまとめて保存（日報ごとにDB側で成否が分かれる）
+    with timer.phase("save"):
+        if polished:
+            params = {
+                "p_user_id": current_user.id,
+                "p_tenant_id": context.tenant_id,
+                "p_reports": [
+                    _batch_item_payload(drafts[i], result) for i, result in polished
+                ],
+            }
+            try:
+                saved = await supabase.rpc(
+                    RPC_CREATE_DAILY_REPORTS_WITH_LOGS, params
+                ).execute()
+                rows: list[dict] = saved.data or []  # type: ignore
+            except Exception:
+                logger.exception("Report Batch Save Error")
+                rows = []
+
+            for n, (i, result) in enumerate(polished):
+                row: dict = (
+                    rows[n] if n < len(rows) else {"error": "Failed to save report"}
+                )
+                if row.get("error") or not row.get(COL_ID):
+                    logger.warning(
+                        "Report Batch Item Save Error: %d: %s", i, row.get("error")
+                    )
+                    results[i].error = "Failed to save report"
+                    continue
+                results[i] = DailyReportBatchResult(
+                    index=i, status="created", report_id=row[COL_ID], report=result
+                )
+
+    response.headers["Server-Timing"] = timer.server_timing()
+    created = sum(1 for r in results if r.status == "created")
+    logger.debug(
+        "POST /reports/batch: %d/%d created, timing: %s",
+        created,
+        len(drafts),
+        timer.summary(),
     )
 
-    # 4. 日報本体のDB保存
-    report_data = {
-        COL_USER_ID: current_user.id,
-        COL_TENANT_ID: tenant_id,
+    return DailyReportBatchResponse(
+        results=results, created=created, failed=len(drafts) - created
+    )
+
+
+def _work_logs_payload(polished: DailyReportPolished) -> list[dict]:
+    """AIが推論した工数ログをRPCの引数（JSON）に変換する"""
+    return [
+        {"task_id": str(log.task_id), "hours": log.hours} for log in polished.work_logs
+    ]
+
+
+def _batch_item_payload(
+    draft: DailyReportBatchItem, polished: DailyReportPolished
+) -> dict:
+    """一括作成のRPCに渡す日報1件分の引数（JSON）"""
+    report_date = draft.report_date
+    return {
         "content_raw": draft.raw_content,
-        "content_polished": polished_result.content_polished,
-        "subject": polished_result.subject,
+        "content_polished": polished.content_polished,
+        "subject": polished.subject,
         "politeness_level": draft.politeness_level,
+        "report_date": report_date.isoformat() if report_date else None,
+        "work_logs": _work_logs_payload(polished),
+        "key_facts": _key_facts_payload(polished),
     }
-    insert_res = supabase.table(TABLE_DAILY_REPORTS).insert(report_data).execute()
-
-    if not insert_res.data:
-        raise HTTPException(status_code=500, detail="Failed to save report")
-
-    new_report_id = insert_res.data[0]["id"]  # type: ignore
-
-    # 5. 工数ログの一括保存
-    if polished_result.work_logs:
-        logs_data = []
-        for log in polished_result.work_logs:
-            # AIがハルシネーションで存在しないIDを返す可能性を考慮して
-            # active_tasks に含まれるIDかチェックしても良いが、
-            # 外部キー制約があるのでDB側でエラーになる。ここではそのままトライする。
-            logs_data.append(
-                {
-                    "tenant_id": tenant_id,
-                    "daily_report_id": new_report_id,
-                    "task_id": str(log.task_id),
-                    "hours": log.hours,
-                }
-            )
 
-        if logs_data:
-            try:
-                supabase.table(TABLE_TASK_WORK_LOGS).insert(logs_data).execute()
-            except Exception as e:
-                print(f"Warning: Failed to save work logs: {e}")
-                # ログ保存失敗で日報自体をロールバックするかは要件次第だが、
-                # 今回は日報保存を優先し、ログ失敗は無視（または警告）とする
 
-    return polished_result
+def _key_facts_payload(polished: DailyReportPolished) -> list[str]:
+    """AIが抽出した要点を、週報生成用のダイジェストとして保存する形に整える"""
+    facts = [fact.strip() for fact in polished.key_facts if fact.strip()]
+    return facts[:MAX_KEY_FACTS]
+
+
+async def _fetch_active_tasks(supabase: AsyncClient, user_id: str) -> list:
+    """ユーザーのアクティブタスクを取得する (AIへのコンテキスト用)"""
+    # ※ tasks.py で作ったAPIロジックと同等だが、内部呼び出し用に直接クエリする
+    res = await (
+        supabase.table(TABLE_TASKS)
+        .select("id, title")
+        .eq("assigned_to", user_id)
+        .neq("status", "done")
+        .execute()
+    )
+    return res.data or []
 
 
 # --- 一覧取得API ---
-@router.get("/reports", response_model=list[DailyReportResponse])
+@router.get("/reports", response_model=Page[DailyReportResponse])
 async def get_reports(
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    page: PageParams = Depends(get_page_params),
 ):
     """
     ログインユーザーの日報一覧を工数ログ付きで取得する
+    作成日の新しい順に1ページ分を返す（続きは next_cursor で取得）
     """
-    # 自分のIDでフィルタリングし、作成日の新しい順に取得
-    res = (
+    query = (
         supabase.table(TABLE_DAILY_REPORTS)
         .select("*, task_work_logs(*, tasks(title))")
         .eq(COL_USER_ID, current_user.id)
-        .order(COL_CREATED_AT, desc=True)
-        .execute()
     )
-
-    return res.data
+    return await fetch_page(query, page)
 
 
 # --- 詳細取得API ---
@@ -140,14 +376,14 @@ async def get_reports(
 async def get_report_detail(
     report_id: UUID,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
 ):
     """
     指定されたIDの日報詳細を取得する
     （他人の日報は見れないようにガード）
     """
     # ID指定かつ、自分のuser_idにマッチするものだけを取得
-    res = (
+    res = await (
         supabase.table(TABLE_DAILY_REPORTS)
         .select("*, task_work_logs(*, tasks(title))")
         .eq(COL_ID, str(report_id))
@@ -168,13 +404,13 @@ async def get_report_detail(
 async def delete_report(
     report_id: UUID,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
 ):
     """
     指定されたIDの日報を削除する
     """
     # 1. まず存在確認 & 権限確認
-    existing = (
+    existing = await (
         supabase.table(TABLE_DAILY_REPORTS)
         .select(COL_ID)
         .eq(COL_ID, str(report_id))
@@ -190,7 +426,12 @@ async def delete_report(
         )
 
     # 2. 削除実行
-    supabase.table(TABLE_DAILY_REPORTS).delete().eq(COL_ID, str(report_id)).execute()
+    await (
+        supabase.table(TABLE_DAILY_REPORTS)
+        .delete()
+        .eq(COL_ID, str(report_id))
+        .execute()
+    )
 
     return  # 204 No Content なので中身は返さない
 
@@ -201,7 +442,7 @@ async def update_report(
     report_id: UUID,
     report_update: DailyReportUpdate,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
 ):
     """
     指定されたIDの日報を更新する
@@ -214,7 +455,7 @@ async def update_report(
 
     # 2. 自分のデータかつ指定IDのものを更新
     # update() して select() することで更新後のデータを取得して返す
-    res = (
+    res = await (
         supabase.table(TABLE_DAILY_REPORTS)
         .update(update_data)
         .eq(COL_ID, str(report_id))
@@ -4,7 +4,7 @@ from uuid import UUID
 from fastapi import APIRouter, Depends, HTTPException
 from gotrue.types import User
 from pydantic import BaseModel
-from supabase import Client
+from supabase import AsyncClient
 
 from app.api.deps import get_current_user
 from app.core.constants import COL_ID, TABLE_TASKS
@@ -24,13 +24,13 @@ class ActiveTaskResponse(BaseModel):
 @router.get("/tasks/my-active", response_model=list[ActiveTaskResponse])
 async def get_my_active_tasks(
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
 ):
     """
     自分の仕掛中タスク一覧を取得する（完了済みは除く）
     """
     # tasksテーブルとprojectsテーブルをJOIN
-    res = (
+    res = await (
         supabase.table(TABLE_TASKS)
         .select("id, title, projects(name)")
         .eq("assigned_to", current_user.id)
@@ -60,7 +60,7 @@ async def update_task(
     task_id: UUID,
     task_update: TaskUpdate,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
 ):
     """
     タスクのステータスや担当者を更新する
@@ -83,7 +83,7 @@ async def update_task(
         update_data["end_date"] = update_data["end_date"].isoformat()
 
     # 更新実行, RLSにより自テナントのタスクしか更新できない
-    res = (
+    res = await (
         supabase.table(TABLE_TASKS)
         .update(update_data)
         .eq(COL_ID, str(task_id))
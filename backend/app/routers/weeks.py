@@ -3,19 +3,24 @@ from uuid import UUID
 
 from fastapi import APIRouter, Depends, HTTPException
 from gotrue.types import User
-from supabase import Client
+from supabase import AsyncClient
 
-from app.api.deps import get_current_user
+from app.api.deps import (
+    get_ai_service,
+    get_current_user,
+    get_page_params,
+    get_user_context,
+)
 from app.core.constants import (
-    COL_CREATED_AT,
-    COL_ID,
-    COL_TENANT_ID,
     COL_USER_ID,
     TABLE_DAILY_REPORTS,
-    TABLE_PROFILES,
     TABLE_WEEKLY_SUMMARIES,
+    WEEKLY_SOURCE_COLUMNS,
 )
+from app.core.pagination import PageParams, fetch_page
+from app.core.sse import format_sse, sse_response
 from app.db.client import get_supabase
+from app.models.common import Page
 from app.models.week import (
     WeekGenerateRequest,
     WeekGenerateResponse,
@@ -23,67 +28,100 @@ from app.models.week import (
     WeeklyReportResponse,
 )
 from app.services.ai_service import AIService
+from app.services.profile_service import UserContext
 
 router = APIRouter()
 
 
+async def _fetch_daily_reports(
+    supabase: AsyncClient, user_id: str, request: WeekGenerateRequest
+) -> list:
+    """指定期間の日報を、週報生成用のダイジェストとともに取得する"""
+    res = await (
+        supabase.table(TABLE_DAILY_REPORTS)
+        .select(WEEKLY_SOURCE_COLUMNS)
+        .eq(COL_USER_ID, user_id)
+        .gte("report_date", request.start_date.isoformat())
+        .lte("report_date", request.end_date.isoformat())
+        .order("report_date", desc=False)  # 日付順
+        .execute()
+    )
+    return res.data
+
+
 @router.post("/weeks/generate", response_model=WeekGenerateResponse)
 async def generate_weekly_report_preview(
     request: WeekGenerateRequest,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    ai_service: AIService = Depends(get_ai_service),
 ):
     """
     指定期間の日報を集計し、AIで週報を生成する（保存はしない）
     """
-    # 1. 指定期間の日報を取得（工数ログも結合）
-    res = (
-        supabase.table(TABLE_DAILY_REPORTS)
-        .select("*, task_work_logs(*, tasks(title))")
-        .eq(COL_USER_ID, current_user.id)
-        .gte("report_date", request.start_date.isoformat())
-        .lte("report_date", request.end_date.isoformat())
-        .order("report_date", desc=False)  # 日付順
-        .execute()
-    )
-
-    daily_reports = res.data
+    # 1. 指定期間の日報を取得（ダイジェスト付き）
+    daily_reports = await _fetch_daily_reports(supabase, current_user.id, request)
 
     # 2. AI生成
-    ai_service = AIService()
     generated_text = await ai_service.generate_weekly_summary(daily_reports)
 
     return WeekGenerateResponse(content_generated=generated_text)
 
 
+@router.post("/weeks/generate/stream")
+async def stream_weekly_report_preview(
+    request: WeekGenerateRequest,
+    current_user: User = Depends(get_current_user),
+    supabase: AsyncClient = Depends(get_supabase),
+    ai_service: AIService = Depends(get_ai_service),
+):
+    """
+    /weeks/generate のストリーミング版（Server-Sent Events）
+
+    - chunk: 生成されたテキストの断片 {"text": "..."}
+    - done : 生成完了 {}
+    - error: 生成失敗 {"message": "..."}
+    """
+    daily_reports = await _fetch_daily_reports(supabase, current_user.id, request)
+
+    async def event_stream():
+        try:
+            async for text in ai_service.stream_weekly_summary(daily_reports):
+                yield format_sse("chunk", {"text": text})
+        except Exception as e:
+            print(f"AI Weekly Stream Error: {e}")
+            yield format_sse("error", {"message": "週報の生成に失敗しました"})
+            return
+
+        yield format_sse("done", {})
+
+    return sse_response(event_stream())
+
+
 @router.post("/weeks", response_model=WeeklyReportResponse)
 async def create_weekly_report(
     report_in: WeeklyReportCreate,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    context: UserContext = Depends(get_user_context),
 ):
     """
     生成された週報を確定して保存する
+    同じ週の週報が既にある場合（週次バッチが生成したものなど）は、確定した内容で上書きする
     """
-    # テナントID取得
-    profile = (
-        supabase.table(TABLE_PROFILES)
-        .select(COL_TENANT_ID)
-        .eq(COL_ID, current_user.id)
-        .single()
-        .execute()
-    )
-    tenant_id = profile.data[COL_TENANT_ID]  # type: ignore
-
     data = {
-        "tenant_id": tenant_id,
+        "tenant_id": context.tenant_id,
         "user_id": current_user.id,
         "content": report_in.content,
         "week_start_date": report_in.week_start_date.isoformat(),
         "week_end_date": report_in.week_end_date.isoformat(),
     }
 
-    res = supabase.table(TABLE_WEEKLY_SUMMARIES).insert(data).execute()
+    res = await (
+        supabase.table(TABLE_WEEKLY_SUMMARIES)
+        .upsert(data, on_conflict="user_id,week_start_date")
+        .execute()
+    )
 
     if not res.data:
         raise HTTPException(status_code=500, detail="Failed to save weekly report")
@@ -91,34 +129,33 @@ async def create_weekly_report(
     return res.data[0]
 
 
-@router.get("/weeks", response_model=list[WeeklyReportResponse])
+@router.get("/weeks", response_model=Page[WeeklyReportResponse])
 async def get_weekly_reports(
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
+    page: PageParams = Depends(get_page_params),
 ):
     """
-    自分の週報一覧を取得
+    自分の週報一覧を取得（作成日の新しい順に1ページ分）
     """
-    res = (
+    query = (
         supabase.table(TABLE_WEEKLY_SUMMARIES)
         .select("*")
         .eq(COL_USER_ID, current_user.id)
-        .order(COL_CREATED_AT, desc=True)
-        .execute()
     )
-    return res.data
+    return await fetch_page(query, page)
 
 
 @router.get("/weeks/{report_id}", response_model=WeeklyReportResponse)
 async def get_weekly_report_detail(
     report_id: UUID,
     current_user: User = Depends(get_current_user),
-    supabase: Client = Depends(get_supabase),
+    supabase: AsyncClient = Depends(get_supabase),
 ):
     """
     週報詳細を取得
     """
-    res = (
+    res = await (
         supabase.table(TABLE_WEEKLY_SUMMARIES)
         .select("*")
         .eq("id", str(report_id))
@@ -0,0 +1,156 @@
+# backend/app/services/ai_cache.py
+import hashlib
+import json
+import time
+from datetime import UTC, datetime, timedelta
+
+from pydantic import BaseModel
+from supabase import AsyncClient
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.constants import TABLE_AI_RESPONSE_CACHE
+
+
+class AIResponseCache:
+    """AI応答の2段キャッシュ
+
+    - 1段目: プロセス内のLRU（サイズ上限・TTL付き）
+    - 2段目: Postgresの共有テーブル（全ワーカー・全インスタンスで共有）
+    キーは「モデル名・プロンプト・応答スキーマ」のハッシュで、同一入力なら同一キーになる。
+    2段目の読み書きに失敗してもAI呼び出し自体は止めない（ミス扱いにする）。
+    2段目の期限切れの行は、書き込みのついでに一定間隔で削除する。
+    """
+
+    def __init__(
+        self,
+        supabase: AsyncClient | None,
+        max_entries: int = 512,
+        ttl_seconds: int = 86400,
+        purge_interval_seconds: int = 3600,
+    ):
+        self.supabase = supabase
+        self.ttl_seconds = ttl_seconds
+        self.purge_interval_seconds = purge_interval_seconds
+        self._purged_at: float | None = None
+        self._memory = TTLCache(maxsize=max_entries, ttl=ttl_seconds)
+
+        self.memory_hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+
+    @classmethod
+    def from_settings(cls, supabase: AsyncClient | None) -> "AIResponseCache":
+        return cls(
+            supabase,
+            max_entries=settings.AI_CACHE_MAX_ENTRIES,
+            ttl_seconds=settings.AI_CACHE_TTL_SECONDS,
+            purge_interval_seconds=settings.AI_CACHE_PURGE_INTERVAL_SECONDS,
+        )
+
+    @staticmethod
+    def make_key(
+        model: str, contents: object, response_schema: type[BaseModel] | None
+    ) -> str:
+        """モデル名・プロンプト・応答スキーマからキャッシュキーを作る"""
+        payload = {
+            "model": model,
+            "contents": contents,
+            "schema": response_schema.model_json_schema() if response_schema else None,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+    async def get(self, key: str) -> str | None:
+        value = self._memory.get(key)
+        if value is not None:
+            self.memory_hits += 1
+            return value
+
+        value = await self._get_shared(key)
+        if value is not None:
+            self.shared_hits += 1
+            # 次回以降はプロセス内で返せるようにする
+            self._memory.set(key, value)
+            return value
+
+        self.misses += 1
+        return None
+
+    async def set(self, key: str, value: str, model: str) -> None:
+        self._memory.set(key, value)
+        await self._set_shared(key, value, model)
+
+    async def _get_shared(self, key: str) -> str | None:
+        if self.supabase is None:
+            return None
+
+        try:
+            res = await (
+                self.supabase.table(TABLE_AI_RESPONSE_CACHE)
+                .select("response")
+                .eq("cache_key", key)
+                .gt("expires_at", datetime.now(UTC).isoformat())
+                .limit(1)
+                .execute()
+            )
+        except Exception as e:
+            print(f"AI Cache Read Error: {e}")
+            return None
+
+        return res.data[0]["response"] if res.data else None  # type: ignore
+
+    async def _set_shared(self, key: str, value: str, model: str) -> None:
+        if self.supabase is None:
+            return
+
+        expires_at = datetime.now(UTC) + timedelta(seconds=self.ttl_seconds)
+        data = {
+            "cache_key": key,
+            "model": model,
+            "response": value,
+            "expires_at": expires_at.isoformat(),
+        }
+        try:
+            await (
+                self.supabase.table(TABLE_AI_RESPONSE_CACHE)
+                .upsert(data, on_conflict="cache_key")
+                .execute()
+            )
+        except Exception as e:
+            print(f"AI Cache Write Error: {e}")
+
+        await self._purge_expired()
+
+    async def _purge_expired(self) -> None:
+        """期限切れの行を共有テーブルから削除する（前回から一定時間経った場合のみ）"""
+        if self.supabase is None:
+            return
+
+        now = time.monotonic()
+        if (
+            self._purged_at is not None
+            and now - self._purged_at < self.purge_interval_seconds
+        ):
+            return
+        # 失敗しても書き込みのたびに再試行しないよう、先に実行時刻を記録する
+        self._purged_at = now
+
+        try:
+            await (
+                self.supabase.table(TABLE_AI_RESPONSE_CACHE)
+                .delete()
+                .lt("expires_at", datetime.now(UTC).isoformat())
+                .execute()
+            )
+        except Exception as e:
+            print(f"AI Cache Purge Error: {e}")
+
+    def stats(self) -> dict:
+        """ヒット・ミス件数を返す"""
+        return {
+            "memory_hits": self.memory_hits,
+            "shared_hits": self.shared_hits,
+            "misses": self.misses,
+            "memory_size": len(self._memory),
+        }
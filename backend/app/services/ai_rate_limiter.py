@@ -0,0 +1,211 @@
+# backend/app/services/ai_rate_limiter.py
+import asyncio
+import time
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import Protocol
+
+from supabase import AsyncClient
+
+from app.core.config import settings
+from app.core.constants import RPC_ACQUIRE_AI_RATE_LIMIT, RPC_ADJUST_AI_RATE_LIMIT
+
+
+@dataclass(frozen=True)
+class RateLimitConfig:
+    """トークンバケットとAIMDの設定（rpm = 1分あたりのリクエスト数）"""
+
+    max_rpm: float = 60
+    min_rpm: float = 5
+    burst: float = 10
+    increase_rpm: float = 1
+    decrease_factor: float = 0.5
+    decrease_cooldown: float = 5
+
+    @classmethod
+    def from_settings(cls) -> "RateLimitConfig":
+        return cls(
+            max_rpm=settings.GEMINI_RATE_LIMIT_MAX_RPM,
+            min_rpm=settings.GEMINI_RATE_LIMIT_MIN_RPM,
+            burst=settings.GEMINI_RATE_LIMIT_BURST,
+            increase_rpm=settings.GEMINI_RATE_LIMIT_INCREASE_RPM,
+            decrease_factor=settings.GEMINI_RATE_LIMIT_DECREASE_FACTOR,
+            decrease_cooldown=settings.GEMINI_RATE_LIMIT_DECREASE_COOLDOWN_SECONDS,
+        )
+
+
+class RateLimitBackend(Protocol):
+    """トークンバケットの状態を保持するバックエンド"""
+
+    async def acquire(self, key: str, reserve: float) -> float:
+        """トークンを1つ取得する。取得できれば 0、できなければ待つべき秒数を返す"""
+        ...
+
+    async def adjust(self, key: str, throttled: bool) -> float:
+        """呼び出し結果に応じてレートを調整し、調整後のrpmを返す"""
+        ...
+
+
+@dataclass
+class _Bucket:
+    tokens: float
+    rate: float
+    updated_at: float
+    throttled_at: float | None = None
+
+
+class LocalRateLimitBackend:
+    """プロセス内で完結するバックエンド（ローカル開発・テスト・単一ワーカー用）
+
+    アルゴリズムは SupabaseRateLimitBackend が呼ぶDB関数と同じ。
+    """
+
+    def __init__(
+        self,
+        config: RateLimitConfig | None = None,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.config = config or RateLimitConfig()
+        self._clock = clock
+        self._buckets: dict[str, _Bucket] = {}
+
+    def _bucket(self, key: str) -> _Bucket:
+        bucket = self._buckets.get(key)
+        if bucket is None:
+            bucket = _Bucket(self.config.burst, self.config.max_rpm, self._clock())
+            self._buckets[key] = bucket
+        return bucket
+
+    async def acquire(self, key: str, reserve: float = 0) -> float:
+        bucket = self._bucket(key)
+        now = self._clock()
+        bucket.rate = min(bucket.rate, self.config.max_rpm)
+        # 前回からの経過時間分を補充する（上限は burst）
+        bucket.tokens = min(
+            self.config.burst,
+            bucket.tokens + (now - bucket.updated_at) * bucket.rate / 60,
+        )
+        bucket.updated_at = now
+
+        if bucket.tokens >= 1 + reserve:
+            bucket.tokens -= 1
+            return 0
+        return (1 + reserve - bucket.tokens) * 60 / bucket.rate
+
+    async def adjust(self, key: str, throttled: bool) -> float:
+        bucket = self._bucket(key)
+        now = self._clock()
+
+        if not throttled:
+            bucket.rate = min(
+                self.config.max_rpm, bucket.rate + self.config.increase_rpm
+            )
+        elif (
+            bucket.throttled_at is None
+            or now - bucket.throttled_at > self.config.decrease_cooldown
+        ):
+            # 同時に送っていた複数のリクエストが一斉に429になっても1回分だけ下げる
+            bucket.rate = max(
+                self.config.min_rpm, bucket.rate * self.config.decrease_factor
+            )
+            bucket.tokens = 0
+            bucket.updated_at = now
+            bucket.throttled_at = now
+
+        return bucket.rate
+
+
+class SupabaseRateLimitBackend:
+    """Postgresのテーブルにバケットを置き、全ワーカー・全インスタンスで共有するバックエンド
+
+    DBに接続できない場合はレート制限なし（取得成功）として扱い、AI呼び出し自体は止めない。
+    """
+
+    def __init__(self, supabase: AsyncClient, config: RateLimitConfig | None = None):
+        self.supabase = supabase
+        self.config = config or RateLimitConfig()
+
+    async def acquire(self, key: str, reserve: float = 0) -> float:
+        params = {
+            "p_bucket_key": key,
+            "p_max_rpm": self.config.max_rpm,
+            "p_burst": self.config.burst,
+            "p_reserve": reserve,
+        }
+        try:
+            res = await self.supabase.rpc(RPC_ACQUIRE_AI_RATE_LIMIT, params).execute()
+        except Exception as e:
+            print(f"AI Rate Limit Error: {e}")
+            return 0
+        return float(res.data or 0)  # type: ignore
+
+    async def adjust(self, key: str, throttled: bool) -> float:
+        params = {
+            "p_bucket_key": key,
+            "p_throttled": throttled,
+            "p_max_rpm": self.config.max_rpm,
+            "p_min_rpm": self.config.min_rpm,
+            "p_increase_rpm": self.config.increase_rpm,
+            "p_decrease_factor": self.config.decrease_factor,
+            "p_cooldown_seconds": self.config.decrease_cooldown,
+        }
+        try:
+            res = await self.supabase.rpc(RPC_ADJUST_AI_RATE_LIMIT, params).execute()
+        except Exception as e:
+            print(f"AI Rate Limit Error: {e}")
+            return self.config.max_rpm
+        return float(res.data or self.config.max_rpm)  # type: ignore
+
+
+class AIRateLimiter:
+    """Gemini APIへの送信レートを制限する
+
+    リクエストを送る前に acquire でトークンを取得し（なければ補充まで待つ）、
+    結果を record_success / record_throttled で通知してレートを増減させる（AIMD）。
+    reserve を指定した limiter（週報バッチ用）は、その数のトークンを対話的なリクエスト用に残す。
+    """
+
+    def __init__(
+        self,
+        backend: RateLimitBackend,
+        key: str = "gemini",
+        reserve: float = 0,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+    ):
+        self.backend = backend
+        self.key = key
+        self.reserve = reserve
+        self._sleep = sleep
+
+    @classmethod
+    def from_settings(
+        cls, supabase: AsyncClient | None, reserve: float = 0
+    ) -> "AIRateLimiter | None":
+        """設定に応じた limiter を返す（レート制限が無効な場合は None）"""
+        if not settings.GEMINI_RATE_LIMIT_ENABLED:
+            return None
+
+        config = RateLimitConfig.from_settings()
+        backend: RateLimitBackend
+        if supabase is not None and settings.GEMINI_RATE_LIMIT_SHARED:
+            backend = SupabaseRateLimitBackend(supabase, config)
+        else:
+            backend = LocalRateLimitBackend(config)
+        return cls(backend, reserve=reserve)
+
+    async def acquire(self) -> float:
+        """トークンを取得できるまで待ち、待った秒数を返す"""
+        waited = 0.0
+        while True:
+            wait = await self.backend.acquire(self.key, self.reserve)
+            if wait <= 0:
+                return waited
+            await self._sleep(wait)
+            waited += wait
+
+    async def record_success(self) -> None:
+        await self.backend.adjust(self.key, throttled=False)
+
+    async def record_throttled(self) -> None:
+        rate = await self.backend.adjust(self.key, throttled=True)
+        print(f"AI Rate Limited (429): current rate {rate:.1f} rpm")
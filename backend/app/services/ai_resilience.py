@@ -0,0 +1,278 @@
+# backend/app/services/ai_resilience.py
+import asyncio
+import random
+import time
+from collections import deque
+from collections.abc import Awaitable, Callable
+from dataclasses import dataclass
+from typing import TypeVar
+
+import httpx
+from google.genai import errors
+
+from app.core.config import settings
+from app.services.ai_rate_limiter import AIRateLimiter
+
+T = TypeVar("T")
+
+# 再試行すれば成功する見込みのあるHTTPステータス（レート制限・一時的な過負荷など）
+TRANSIENT_STATUS_CODES = frozenset({408, 429, 500, 502, 503, 504})
+
+
+class CircuitOpenError(Exception):
+    """Gemini APIが停止中とみなして呼び出しを止めている場合の例外"""
+
+
+def is_transient_error(error: BaseException) -> bool:
+    """再試行の対象となる一時的なエラーかどうか（400などのリクエスト自体の誤りは対象外）"""
+    if isinstance(error, errors.APIError):
+        return error.code in TRANSIENT_STATUS_CODES
+    return isinstance(
+        error, httpx.TimeoutException | httpx.NetworkError | asyncio.TimeoutError
+    )
+
+
+@dataclass(frozen=True)
+class RetryPolicy:
+    """指数バックオフ（フルジッター）による再試行の設定"""
+
+    max_attempts: int = 3
+    base_delay: float = 0.5
+    max_delay: float = 8.0
+
+    def backoff(self, attempt: int, rand: Callable[[], float] = random.random) -> float:
+        """attempt 回目の失敗後に待つ秒数（0 〜 base_delay * 2^(attempt-1) の一様乱数）
+
+        待ち時間をランダムに散らすことで、複数ワーカーの再試行が同時に集中するのを防ぐ。
+        """
+        return rand() * min(self.max_delay, self.base_delay * 2 ** (attempt - 1))
+
+
+class CircuitBreaker:
+    """一時的なエラーが続いたら、一定時間Gemini APIの呼び出しを止める
+
+    - closed   : 通常どおり呼び出す
+    - open     : 呼び出さずに即座に CircuitOpenError を送出する（タイムアウトを待たせない）
+    - half_open: reset_timeout 経過後、1件だけ試行を通し、成功すれば closed に戻す
+    """
+
+    def __init__(
+        self,
+        failure_threshold: int = 5,
+        reset_timeout: float = 30.0,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._clock = clock
+        self._failures = 0
+        self._opened_at: float | None = None
+        self._trial_in_flight = False
+
+    @property
+    def state(self) -> str:
+        if self._opened_at is None:
+            return "closed"
+        if self._clock() - self._opened_at >= self.reset_timeout:
+            return "half_open"
+        return "open"
+
+    def before_call(self) -> None:
+        """
+        呼び出し前の確認
+
+        Raises:
+            CircuitOpenError: open の場合、または half_open で試行中の呼び出しがある場合
+        """
+        state = self.state
+        if state == "open" or (state == "half_open" and self._trial_in_flight):
+            raise CircuitOpenError("Gemini API is unavailable (circuit open)")
+        if state == "half_open":
+            self._trial_in_flight = True
+
+    def release_trial(self) -> None:
+        """結果が出ないまま終わった試行（キャンセルなど）の枠を空け、次の呼び出しで試行し直す"""
+        self._trial_in_flight = False
+
+    def record_success(self) -> None:
+        self._failures = 0
+        self._opened_at = None
+        self._trial_in_flight = False
+
+    def record_failure(self) -> None:
+        self._trial_in_flight = False
+        self._failures += 1
+        # half_open での試行の失敗は、閾値に関係なく再び open に戻す
+        if self._opened_at is not None or self._failures >= self.failure_threshold:
+            if self._opened_at is None:
+                print(f"AI Circuit Opened: {self._failures} consecutive failures")
+            self._opened_at = self._clock()
+
+
+class LatencyTracker:
+    """直近の成功した呼び出しのレイテンシ(秒)を保持し、パーセンタイルを返す"""
+
+    def __init__(self, window: int = 200, min_samples: int = 20):
+        self._samples: deque[float] = deque(maxlen=window)
+        self.min_samples = min_samples
+
+    def record(self, seconds: float) -> None:
+        self._samples.append(seconds)
+
+    def percentile(self, q: float) -> float | None:
+        """q (0〜1) パーセンタイルの値（サンプルが min_samples 未満の間は None）"""
+        if len(self._samples) < self.min_samples:
+            return None
+        ordered = sorted(self._samples)
+        return ordered[min(len(ordered) - 1, int(q * len(ordered)))]
+
+
+class ResilientCaller:
+    """Gemini API呼び出しの共通ラッパー
+
+    - 一時的なエラー（429/503/タイムアウトなど）はジッター付き指数バックオフで再試行する
+    - サーキットブレーカーが開いている間は呼び出さずに即座に失敗する
+    - limiter を指定した場合、各リクエスト（再試行・ヘッジを含む）の前にトークンを取得し、
+      429 ならレートを下げ、成功ならレートを上げる
+    - hedge=True の場合、応答が操作ごとのp95を超えても返らなければ同じリクエストをもう1本送り、
+      先に返ってきた方を使う（遅い1本にユーザーを待たせない。冪等な生成リクエストのみで使う）
+
+    使い方:
+        response = await caller.call("generate_wbs", lambda: client.aio.models.generate_content(...))
+    """
+
+    def __init__(
+        self,
+        retry: RetryPolicy | None = None,
+        breaker: CircuitBreaker | None = None,
+        hedge: bool = False,
+        hedge_min_delay: float = 1.0,
+        limiter: AIRateLimiter | None = None,
+        sleep: Callable[[float], Awaitable[None]] = asyncio.sleep,
+        rand: Callable[[], float] = random.random,
+    ):
+        self.retry = retry or RetryPolicy()
+        self.breaker = breaker or CircuitBreaker()
+        self.hedge = hedge
+        self.hedge_min_delay = hedge_min_delay
+        self.limiter = limiter
+        self._sleep = sleep
+        self._rand = rand
+        self._latencies: dict[str, LatencyTracker] = {}
+
+    @classmethod
+    def from_settings(cls, limiter: AIRateLimiter | None = None) -> "ResilientCaller":
+        return cls(
+            retry=RetryPolicy(
+                max_attempts=settings.GEMINI_RETRY_MAX_ATTEMPTS,
+                base_delay=settings.GEMINI_RETRY_BASE_DELAY_SECONDS,
+                max_delay=settings.GEMINI_RETRY_MAX_DELAY_SECONDS,
+            ),
+            breaker=CircuitBreaker(
+                failure_threshold=settings.GEMINI_BREAKER_FAILURE_THRESHOLD,
+                reset_timeout=settings.GEMINI_BREAKER_RESET_SECONDS,
+            ),
+            hedge=settings.GEMINI_HEDGE_ENABLED,
+            hedge_min_delay=settings.GEMINI_HEDGE_MIN_DELAY_SECONDS,
+            limiter=limiter,
+        )
+
+    async def call(self, name: str, func: Callable[[], Awaitable[T]]) -> T:
+        """
+        func を呼び出し、一時的なエラーであれば再試行する
+
+        Args:
+            name: 操作名（レイテンシの統計は操作ごとに分けて持つ）
+            func: 呼び出すたびに新しいリクエストを送る関数
+
+        Raises:
+            CircuitOpenError: サーキットブレーカーが開いている場合
+            Exception: 再試行の対象外のエラー、または再試行回数を使い切った場合の最後のエラー
+        """
+        attempt = 1
+        while True:
+            self.breaker.before_call()
+            try:
+                if self.hedge:
+                    result = await self._hedged(name, func)
+                else:
+                    result = await self._timed(name, func)
+            except Exception as e:
+                if not is_transient_error(e):
+                    # APIは応答しているため、ブレーカー上は成功として扱う
+                    self.breaker.record_success()
+                    raise
+                self.breaker.record_failure()
+                if attempt >= self.retry.max_attempts:
+                    raise
+                delay = self.retry.backoff(attempt, self._rand)
+                print(
+                    f"AI Retry: {name} attempt {attempt} failed ({e}), retry in {delay:.2f}s"
+                )
+                await self._sleep(delay)
+                attempt += 1
+            except BaseException:
+                # キャンセル（SSEの切断・ヘッジで負けた側など）は成否が分からないため、
+                # half_open の試行中のまま残さないよう枠だけ空ける
+                self.breaker.release_trial()
+                raise
+            else:
+                self.breaker.record_success()
+                return result
+
+    def hedge_delay(self, name: str) -> float | None:
+        """2本目のリクエストを送るまでの秒数（統計が揃うまでは None = ヘッジしない）"""
+        tracker = self._latencies.get(name)
+        p95 = tracker.percentile(0.95) if tracker else None
+        if p95 is None:
+            return None
+        return max(self.hedge_min_delay, p95)
+
+    async def _timed(self, name: str, func: Callable[[], Awaitable[T]]) -> T:
+        if self.limiter:
+            await self.limiter.acquire()
+
+        started = time.perf_counter()
+        try:
+            result = await func()
+        except errors.APIError as e:
+            if self.limiter and e.code == 429:
+                await self.limiter.record_throttled()
+            raise
+
+        if self.limiter:
+            await self.limiter.record_success()
+        self._latencies.setdefault(name, LatencyTracker()).record(
+            time.perf_counter() - started
+        )
+        return result
+
+    async def _hedged(self, name: str, func: Callable[[], Awaitable[T]]) -> T:
+        delay = self.hedge_delay(name)
+        if delay is None:
+            return await self._timed(name, func)
+
+        tasks = [asyncio.ensure_future(self._timed(name, func))]
+        try:
+            done, _ = await asyncio.wait(tasks, timeout=delay)
+            if done:
+                return tasks[0].result()
+
+            print(f"AI Hedge: {name} exceeded {delay:.2f}s, sending a second request")
+            tasks.append(asyncio.ensure_future(self._timed(name, func)))
+
+            # 先に成功した方を返す（両方失敗した場合は後に失敗した方のエラーを送出する）
+            pending = set(tasks)
+            error: BaseException | None = None
+            while pending:
+                done, pending = await asyncio.wait(
+                    pending, return_when=asyncio.FIRST_COMPLETED
+                )
+                for task in done:
+                    error = task.exception()
+                    if error is None:
+                        return task.result()
+            raise error  # type: ignore
+        finally:
+            for task in tasks:
+                task.cancel()
@@ -1,44 +1,292 @@
+import asyncio
 import json
+from collections.abc import AsyncIterator
+from dataclasses import dataclass
 
 from google import genai
-from google.genai import types
+from google.genai import errors, types
+from pydantic import BaseModel
 
 from app.core.config import settings
+from app.core.json_stream import JsonStringFieldStream
 from app.core.prompts import (
     DAILY_REPORT_WITH_LOGS_PROMPT,
     INTERACTIVE_SCOPING_SYSTEM_PROMPT,
     JTC_DAILY_REPORT_SYSTEM_PROMPT,
     PROMPTS_WITH_LEVEL_DESCRIPTION,
+    REPORTS_CHUNK_SUMMARY_PROMPT,
+    SCOPING_HISTORY_SUMMARY_PROMPT,
+    SCOPING_SUMMARY_NOTE,
+    SUMMARIZED_REPORTS_NOTE,
     WBS_GENERATION_SYSTEM_PROMPT,
     WEEKLY_REPORT_SYSTEM_PROMPT,
+    build_custom_instructions,
     build_custom_prompt,
 )
+from app.core.tokens import estimate_tokens
 from app.models.project import WBSRequest, WBSResponse
 from app.models.report import DailyReportPolished
 from app.models.scoping import ChatMessage, ScopingChatResponse
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_resilience import ResilientCaller
+from app.services.context_cache import ContextCacheManager, StaticPrefix
+
+NO_DAILY_REPORTS_MESSAGE = "（対象期間の日報データがありません）"
+# 分割要約の最大段数（fan-in が 7 なら 7^4 = 2401 件分まで）
+MAX_SUMMARY_LEVELS = 4
+
+
+# キャッシュを参照したリクエストが拒否された（期限切れ・削除済みなど）とみなすHTTPステータス
+CONTEXT_CACHE_REJECTED_CODES = frozenset({400, 403, 404})
+
+
+def _template_instruction(template: str) -> str:
+    """{input_text} より前の固定部分（システムプロンプトとして送る）"""
+    return template.split("{input_text}")[0]
+
+
+# 対話型スコーピングの固定部分（システムプロンプトと、それに対するAIの了承）
+SCOPING_PREFIX = StaticPrefix(
+    "interactive_scoping",
+    contents=[
+        {"role": "user", "parts": [{"text": INTERACTIVE_SCOPING_SYSTEM_PROMPT}]},
+        {
+            "role": "model",
+            "parts": [
+                {
+                    "text": "承知しました。プロジェクトマネージャーとして、適切な質問を通じて要件を明確にし、必要な情報が揃い次第WBSを生成します。"
+                }
+            ],
+        },
+    ],
+)
+JTC_REPORT_PREFIX = StaticPrefix(
+    "polish_report",
+    system_instruction=_template_instruction(JTC_DAILY_REPORT_SYSTEM_PROMPT),
+)
+WBS_PREFIX = StaticPrefix(
+    "generate_wbs",
+    system_instruction=_template_instruction(WBS_GENERATION_SYSTEM_PROMPT),
+)
+
+
+@dataclass
+class CachedResponse:
+    """キャッシュから復元した応答（generate_content のレスポンスと同じ使い方ができる）"""
+
+    text: str
+    parsed: BaseModel | None = None
 
 
 class AIService:
-    def __init__(self):
+    """Gemini APIを利用するサービス
+
+    genai.Client は接続(keep-alive/TLSセッション)を保持するため、
+    アプリ起動時に1つだけ生成し、全リクエストで共有する。
+    """
+
+    def __init__(
+        self,
+        cache: AIResponseCache | None = None,
+        caller: ResilientCaller | None = None,
+        context_cache: ContextCacheManager | None = None,
+    ):
         # 新しいクライアントの初期化
         self.client = genai.Client(api_key=settings.GEMINI_API_KEY)
+        # 同一入力に対する応答キャッシュ（未指定の場合は毎回生成する）
+        self.cache = cache
+        # 再試行・サーキットブレーカー・ヘッジ付きの呼び出し（プロセス内で状態を共有する）
+        self.caller = caller or ResilientCaller.from_settings()
+        # 固定のシステムプロンプトのコンテキストキャッシュ（未指定の場合は毎回送る）
+        self.context_cache = context_cache
+
+    def enable_context_cache(self) -> None:
+        """このクライアントでGeminiのコンテキストキャッシュを使う"""
+        self.context_cache = ContextCacheManager.from_settings(self.client)
+
+    async def warm_up(self) -> None:
+        """
+        起動時にモデル情報を取得し、Gemini APIへの接続を確立しておく
+        失敗しても起動は止めない（初回リクエスト時に改めて接続される）
+        """
+        try:
+            await self.client.aio.models.get(model=settings.GEMINI_MODEL)
+        except Exception as e:
+            print(f"AI Warm-up Error: {e}")
 
-    async def polish_report(self, raw_text: str) -> DailyReportPolished:
+    async def aclose(self) -> None:
+        """作成したコンテキストキャッシュを削除し、保持しているHTTP接続を閉じる（シャットダウン時用）"""
+        if self.context_cache:
+            await self.context_cache.aclose()
+        await self.client.aio.aclose()
+
+    async def _context_cache_name(self, prefix: StaticPrefix | None) -> str | None:
+        """固定部分のコンテキストキャッシュ名（使えない場合は None = 固定部分も毎回送る）"""
+        if prefix is None or self.context_cache is None:
+            return None
+        return await self.context_cache.get(settings.GEMINI_MODEL, prefix)
+
+    async def _generate_content(
+        self,
+        name: str,
+        contents: str | list,
+        response_schema: type[BaseModel] | None = None,
+        prefix: StaticPrefix | None = None,
+    ):
         """
-        粗いテキストをJTC構文の日報に変換する
+        Gemini APIで生成する
+        一時的なエラーは再試行し、Geminiが停止中の場合は即座に失敗する（ResilientCaller）
+        prefix（固定のシステムプロンプトなど）はコンテキストキャッシュがあればそれを参照する
         """
+        cache_name = await self._context_cache_name(prefix)
+        try:
+            return await self._call_generate_content(
+                name, contents, response_schema, prefix, cache_name
+            )
+        except errors.ClientError as e:
+            if (
+                cache_name is None
+                or prefix is None
+                or self.context_cache is None
+                or e.code not in CONTEXT_CACHE_REJECTED_CODES
+            ):
+                raise
+            # キャッシュが期限切れ・削除済みの場合などは、固定部分もそのまま送って再試行する
+            print(f"AI Context Cache Rejected: {prefix.name}: {e}")
+            self.context_cache.invalidate(settings.GEMINI_MODEL, prefix)
+            return await self._call_generate_content(
+                name, contents, response_schema, prefix, None
+            )
+
+    async def _call_generate_content(
+        self,
+        name: str,
+        contents: str | list,
+        response_schema: type[BaseModel] | None,
+        prefix: StaticPrefix | None,
+        cache_name: str | None,
+    ):
+        contents, config = _build_request(contents, response_schema, prefix, cache_name)
+        return await self.caller.call(
+            name,
+            lambda: self.client.aio.models.generate_content(
+                model=settings.GEMINI_MODEL,
+                contents=contents,
+                config=config,
+            ),
+        )
 
-        prompt = JTC_DAILY_REPORT_SYSTEM_PROMPT.format(input_text=raw_text)
+    async def _generate_content_stream(
+        self,
+        name: str,
+        contents: str | list,
+        response_schema: type[BaseModel] | None = None,
+        prefix: StaticPrefix | None = None,
+    ) -> AsyncIterator[types.GenerateContentResponse]:
+        """
+        Gemini APIでストリーミング生成し、受け取った断片を順に返す
 
+        リクエストはストリームの最初の断片を読むときに送られるため、最初の断片を受け取るまでを
+        ResilientCaller 経由で行う（レート制限のトークン取得と429の通知、再試行、サーキットブレーカー）。
+        キャッシュ参照が拒否された場合は _generate_content と同じく固定部分も送って開き直す。
+        最初の断片を返した後のエラーは、返した断片を取り消せないためそのまま送出する。
+        """
+        cache_name = await self._context_cache_name(prefix)
         try:
-            # 非同期でAIの応答を取得
-            response = await self.client.aio.models.generate_content(
+            stream, first = await self._open_content_stream(
+                name, contents, response_schema, prefix, cache_name
+            )
+        except errors.ClientError as e:
+            if (
+                cache_name is None
+                or prefix is None
+                or self.context_cache is None
+                or e.code not in CONTEXT_CACHE_REJECTED_CODES
+            ):
+                raise
+            print(f"AI Context Cache Rejected: {prefix.name}: {e}")
+            self.context_cache.invalidate(settings.GEMINI_MODEL, prefix)
+            stream, first = await self._open_content_stream(
+                name, contents, response_schema, prefix, None
+            )
+
+        if first is None:
+            return
+        yield first
+        async for chunk in stream:
+            yield chunk
+
+    async def _open_content_stream(
+        self,
+        name: str,
+        contents: str | list,
+        response_schema: type[BaseModel] | None,
+        prefix: StaticPrefix | None,
+        cache_name: str | None,
+    ) -> tuple[
+        AsyncIterator[types.GenerateContentResponse],
+        types.GenerateContentResponse | None,
+    ]:
+        """ストリームを開いて最初の断片まで受け取り、(ストリーム, 最初の断片) を返す"""
+        contents, config = _build_request(contents, response_schema, prefix, cache_name)
+
+        async def open_stream():
+            stream = await self.client.aio.models.generate_content_stream(
                 model=settings.GEMINI_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=DailyReportPolished,
-                ),
+                contents=contents,
+                config=config,
+            )
+            return stream, await anext(stream, None)
+
+        return await self.caller.call(name, open_stream)
+
+    async def _generate_content_cached(
+        self,
+        name: str,
+        contents: str,
+        response_schema: type[BaseModel] | None = None,
+        prefix: StaticPrefix | None = None,
+    ):
+        """
+        キャッシュを確認し、なければGeminiで生成する
+        スキーマ通りにパースできた応答（またはプレーンテキスト）のみキャッシュする
+        """
+        cache_key = None
+        if self.cache:
+            key_contents = (
+                [prefix.system_instruction, prefix.contents, contents]
+                if prefix
+                else contents
+            )
+            cache_key = self.cache.make_key(
+                settings.GEMINI_MODEL, key_contents, response_schema
+            )
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                return CachedResponse(text=cached)
+
+        response = await self._generate_content(name, contents, response_schema, prefix)
+
+        if self.cache and cache_key:
+            if response_schema is None and response.text:
+                await self.cache.set(cache_key, response.text, settings.GEMINI_MODEL)
+            elif isinstance(response.parsed, BaseModel):
+                await self.cache.set(
+                    cache_key, response.parsed.model_dump_json(), settings.GEMINI_MODEL
+                )
+
+        return response
+
+    async def polish_report(self, raw_text: str) -> DailyReportPolished:
+        """
+        粗いテキストをJTC構文の日報に変換する
+        """
+
+        try:
+            # 非同期でAIの応答を取得（同一入力ならキャッシュから返す）
+            # システムプロンプトは固定部分としてコンテキストキャッシュを参照する
+            response = await self._generate_content_cached(
+                "polish_report", raw_text, DailyReportPolished, JTC_REPORT_PREFIX
             )
 
             # AIの応答をパースして返す
@@ -76,18 +324,14 @@ class AIService:
             level, PROMPTS_WITH_LEVEL_DESCRIPTION[3]
         )
 
-        # 入力テキストとプロンプトを組み合わせる
-        content = prompt + "\n\n### 入力テキスト\n" + content_raw
+        # レベルごとのプロンプトは固定部分としてコンテキストキャッシュを参照し、入力テキストだけを送る
+        prefix = StaticPrefix(f"daily_report_level_{level}", system_instruction=prompt)
+        content = "### 入力テキスト\n" + content_raw
 
         try:
-            # 非同期でAIの応答を取得
-            response = await self.client.aio.models.generate_content(
-                model=settings.GEMINI_MODEL,
-                contents=content,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=DailyReportPolished,
-                ),
+            # 非同期でAIの応答を取得（同一入力ならキャッシュから返す）
+            response = await self._generate_content_cached(
+                "generate_polished_report", content, DailyReportPolished, prefix
             )
 
             # AIの応答をパースして返す
@@ -122,16 +366,9 @@ class AIService:
         マイルストーン: {request.milestones or "特になし"}
         """
 
-        prompt = WBS_GENERATION_SYSTEM_PROMPT.format(input_text=input_text)
-
         try:
-            response = await self.client.aio.models.generate_content(
-                model=settings.GEMINI_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=WBSResponse,
-                ),
+            response = await self._generate_content_cached(
+                "generate_wbs", input_text, WBSResponse, WBS_PREFIX
             )
 
             if response.parsed:
@@ -152,6 +389,7 @@ class AIService:
         politeness_level: int,
         active_tasks: list,
         ai_settings: dict | None = None,
+        fallback: bool = True,
     ) -> DailyReportPolished:
         """
         日報の清書と同時に、タスク実績の抽出を行う
@@ -161,6 +399,7 @@ class AIService:
             politeness_level: 丁寧度レベル (1-5)
             active_tasks: アクティブなタスクのリスト
             ai_settings: ユーザーのAI設定（tone, language, custom_instructions）
+            fallback: False の場合、変換に失敗したらエラー時の日報を返さずに例外を送出する
         """
         # タスクリストをテキスト形式に整形
         if not active_tasks:
@@ -171,7 +410,10 @@ class AIService:
             )
 
         # プロンプトの構築
-        prompt = PROMPTS_WITH_LEVEL_DESCRIPTION.get(politeness_level, "")
+        # レベル・トーンのプロンプトは組み合わせが限られるため、固定部分としてコンテキストキャッシュを参照する
+        system_prompt = PROMPTS_WITH_LEVEL_DESCRIPTION.get(politeness_level, "")
+        prefix_name = f"daily_report_level_{politeness_level}"
+        prompt = ""
 
         # AI設定がある場合はカスタムプロンプトを適用
         if ai_settings and isinstance(ai_settings, dict):
@@ -180,21 +422,24 @@ class AIService:
             # トーンが有効な値かチェック
             if tone not in ["professional", "concise", "english", "enthusiastic"]:
                 tone = "professional"
-            prompt = build_custom_prompt(prompt, tone, custom_instructions)
+            system_prompt = build_custom_prompt(system_prompt, tone, "")
+            prefix_name += f"_{tone}"
+            # ユーザーごとのカスタム指示はリクエスト側に含める
+            prompt += build_custom_instructions(custom_instructions)
 
-        # 工数抽出機能付きのシステムプロンプトを追加
+        # 工数抽出機能付きのプロンプトを追加
         prompt += DAILY_REPORT_WITH_LOGS_PROMPT.format(
             input_text=content_raw, task_list=task_list_text
         )
+        prefix = (
+            StaticPrefix(prefix_name, system_instruction=system_prompt)
+            if system_prompt.strip()
+            else None
+        )
 
         try:
-            response = await self.client.aio.models.generate_content(
-                model=settings.GEMINI_MODEL,
-                contents=prompt,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=DailyReportPolished,
-                ),
+            response = await self._generate_content(
+                "generate_report_with_logs", prompt, DailyReportPolished, prefix
             )
 
             if response.parsed:
@@ -205,6 +450,8 @@ class AIService:
 
         except Exception as e:
             print(f"AI Conversion Error: {e}")
+            if not fallback:
+                raise
             # エラー時は空のログを返す
             return DailyReportPolished(
                 subject="【報告】業務日報（AI変換失敗）",
@@ -213,107 +460,336 @@ class AIService:
                 work_logs=[],
             )
 
-    async def generate_weekly_summary(self, daily_reports: list) -> str:
+    async def generate_weekly_summary(
+        self, daily_reports: list, fallback: bool = True
+    ) -> str:
         """
         日報リストを整形してAIに渡し、週報テキストを生成する
+
+        Args:
+            daily_reports: 対象期間の日報
+            fallback: False の場合、生成に失敗したらエラー時の文面を返さずに例外を送出する
+                      （週報バッチでは失敗した週報を保存せず、失敗として記録するため）
         """
-        # 日報データをテキスト形式に変換
-        reports_text = ""
-        for report in daily_reports:
-            date_str = report.get("report_date", "Unknown Date")
-            content = report.get("content_raw", "")
-            # 工数ログがあれば付記（結合済みデータを想定）
-            logs = report.get("task_work_logs", [])
-            logs_text = ""
-            if logs:
-                logs_list = [
-                    f"- {log['tasks']['title']}: {log['hours']}h"
-                    for log in logs
-                    if log.get("tasks")
-                ]
-                logs_text = "\n  (工数: " + ", ".join(logs_list) + ")"
-
-            reports_text += f"\n■ {date_str}\n{content}{logs_text}\n"
-
-        if not reports_text:
-            return "（対象期間の日報データがありません）"
-
-        prompt = WEEKLY_REPORT_SYSTEM_PROMPT.format(input_text=reports_text)
+        if not daily_reports:
+            return NO_DAILY_REPORTS_MESSAGE
 
         try:
-            # GenerateContentConfigでresponse_mime_typeを指定せず、プレーンテキストを受け取る
-            response = await self.client.aio.models.generate_content(
-                model=settings.GEMINI_MODEL,
-                contents=prompt,
+            # 長期間の場合は、トークン予算に収まるまで分割要約してから渡す
+            input_text = await self._fit_to_token_budget(daily_reports)
+            prompt = WEEKLY_REPORT_SYSTEM_PROMPT.format(input_text=input_text)
+
+            # スキーマを指定せず、プレーンテキストを受け取る
+            response = await self._generate_content_cached(
+                "generate_weekly_summary", prompt
             )
             return response.text
 
         except Exception as e:
             print(f"AI Weekly Gen Error: {e}")
+            if not fallback:
+                raise
             return f"週報の生成に失敗しました。\nエラー: {e}"
 
+    async def stream_weekly_summary(self, daily_reports: list) -> AsyncIterator[str]:
+        """
+        週報テキストを生成しながら、生成された断片を順次返す
+
+        generate_weekly_summary と同じプロンプト（長期間の場合は同じ分割要約）を使う。
+        生成途中のエラーは呼び出し側（SSEのerrorイベント）で扱うため、そのまま送出する。
+        """
+        if not daily_reports:
+            yield NO_DAILY_REPORTS_MESSAGE
+            return
+
+        # 分割要約（必要な場合）は最初の断片を返す前に済ませ、最終段の生成だけをストリーミングする
+        input_text = await self._fit_to_token_budget(daily_reports)
+        prompt = WEEKLY_REPORT_SYSTEM_PROMPT.format(input_text=input_text)
+
+        # 生成済みの内容があれば一括で返す（generate_weekly_summary とキャッシュを共有）
+        cache_key = None
+        if self.cache:
+            cache_key = self.cache.make_key(settings.GEMINI_MODEL, prompt, None)
+            cached = await self.cache.get(cache_key)
+            if cached is not None:
+                yield cached
+                return
+
+        chunks = []
+        async for chunk in self._generate_content_stream(
+            "stream_weekly_summary", prompt
+        ):
+            if chunk.text:
+                chunks.append(chunk.text)
+                yield chunk.text
+
+        if self.cache and cache_key and chunks:
+            await self.cache.set(cache_key, "".join(chunks), settings.GEMINI_MODEL)
+
+    async def _fit_to_token_budget(self, daily_reports: list) -> str:
+        """
+        週報生成に渡す日報テキストを、トークン予算(WEEKLY_SUMMARY_TOKEN_BUDGET)に収める
+
+        予算を超える場合は、連続する日報を最大 WEEKLY_SUMMARY_FAN_IN 件ずつに分けて並行に要約し、
+        要約の合計がまだ予算を超えるなら、要約同士をさらにまとめて要約する（map-reduce）。
+        段数は件数に対して対数的にしか増えず、各段の要約は並行に実行されるため、
+        期間が長くなってもレイテンシはほぼ段数分しか増えない。
+        同時に実行する要約は WEEKLY_SUMMARY_MAX_CONCURRENCY 件までに抑える。
+        """
+        blocks = [_format_daily_report(report) for report in daily_reports]
+        text = "".join(blocks)
+        semaphore = asyncio.Semaphore(settings.WEEKLY_SUMMARY_MAX_CONCURRENCY)
+
+        async def summarize(chunk: list[str]) -> str:
+            async with semaphore:
+                return await self._summarize_chunk("".join(chunk))
+
+        level = 0
+        while estimate_tokens(text) > settings.WEEKLY_SUMMARY_TOKEN_BUDGET:
+            if level >= MAX_SUMMARY_LEVELS:
+                print(f"Warning: weekly summary input still exceeds budget: {level=}")
+                break
+            level += 1
+
+            chunks = _chunk_blocks(
+                blocks,
+                max_tokens=settings.WEEKLY_SUMMARY_CHUNK_TOKENS,
+                max_items=settings.WEEKLY_SUMMARY_FAN_IN,
+            )
+            # 順序は gather の戻り値の順（＝期間の順）で保たれる
+            blocks = list(await asyncio.gather(*(summarize(chunk) for chunk in chunks)))
+            text = SUMMARIZED_REPORTS_NOTE + "".join(blocks)
+            print(f"Weekly Summary: level {level} summarized {len(chunks)} chunks")
+
+        return text
+
+    async def _summarize_chunk(self, input_text: str) -> str:
+        """連続した期間の日報（または中間要約）を1つの要約にまとめる"""
+        prompt = REPORTS_CHUNK_SUMMARY_PROMPT.format(
+            input_text=input_text,
+            max_chars=settings.WEEKLY_SUMMARY_CHUNK_MAX_CHARS,
+        )
+        # 同じ期間の要約は、別の期間指定のリクエストでもキャッシュから再利用される
+        response = await self._generate_content_cached(
+            "summarize_reports_chunk", prompt
+        )
+        return "\n" + (response.text or "").strip() + "\n"
+
     async def interactive_scoping(
-        self, messages: list[ChatMessage]
+        self, messages: list[ChatMessage], summary: str | None = None
     ) -> ScopingChatResponse:
         """
         対話型のプロジェクトスコーピングを実行する
 
         Args:
             messages: これまでの会話履歴（ユーザーとAIのやり取り）
+            summary: messages より前のやり取りの要約（セッションで履歴を要約済みの場合）
 
         Returns:
             ScopingChatResponse: AIの応答、完了フラグ、WBSデータ（完了時）
         """
-        # 会話履歴をGemini APIの形式に変換
-        # "assistant" ロールは Gemini API の "model" に変換
-        conversation_history = [
-            {
-                "role": "model" if msg.role == "assistant" else msg.role,
-                "parts": [{"text": msg.content}],
-            }
-            for msg in messages
-        ]
+        try:
+            return await self.generate_scoping_reply(messages, summary)
+        except Exception as e:
+            print(f"AI Interactive Scoping Error: {e}")
+            # エラー時は安全なレスポンスを返す
+            return scoping_error_response()
 
-        # システムプロンプトを最初のメッセージとして追加
-        system_message = {
-            "role": "user",
-            "parts": [{"text": INTERACTIVE_SCOPING_SYSTEM_PROMPT}],
-        }
-        ai_ack = {
-            "role": "model",
-            "parts": [
-                {
-                    "text": "承知しました。プロジェクトマネージャーとして、適切な質問を通じて要件を明確にし、必要な情報が揃い次第WBSを生成します。"
-                }
-            ],
-        }
+    async def generate_scoping_reply(
+        self, messages: list[ChatMessage], summary: str | None = None
+    ) -> ScopingChatResponse:
+        """
+        interactive_scoping と同じ応答を生成する（失敗時はフォールバックせずに例外を送出する）
 
-        # システムプロンプトを含めた会話履歴を構築
-        full_conversation = [system_message, ai_ack] + conversation_history
+        エラー時の応答を会話履歴として保存しないよう、セッションではこちらを使う。
+        """
+        # Gemini APIを呼び出して応答を取得
+        # システムプロンプトとAIの了承は固定部分としてコンテキストキャッシュを参照する
+        response = await self._generate_content(
+            "interactive_scoping",
+            _build_scoping_history(messages, summary),
+            ScopingChatResponse,
+            SCOPING_PREFIX,
+        )
 
-        try:
-            # Gemini APIを呼び出して応答を取得
-            response = await self.client.aio.models.generate_content(
-                model=settings.GEMINI_MODEL,
-                contents=full_conversation,
-                config=types.GenerateContentConfig(
-                    response_mime_type="application/json",
-                    response_schema=ScopingChatResponse,
-                ),
-            )
+        if response.parsed:
+            return response.parsed
 
-            if response.parsed:
-                return response.parsed
+        # JSON文字列が返ってきた場合はパースして返す
+        result_json = json.loads(response.text)
+        return ScopingChatResponse(**result_json)
 
-            # JSON文字列が返ってきた場合はパースして返す
-            result_json = json.loads(response.text)
-            return ScopingChatResponse(**result_json)
+    async def stream_interactive_scoping(
+        self, messages: list[ChatMessage], summary: str | None = None
+    ) -> AsyncIterator[str | ScopingChatResponse]:
+        """
+        interactive_scoping のストリーミング版
 
-        except Exception as e:
-            print(f"AI Interactive Scoping Error: {e}")
-            # エラー時は安全なレスポンスを返す
-            return ScopingChatResponse(
-                message="申し訳ございません。エラーが発生しました。もう一度お試しください。",
-                is_complete=False,
-                wbs_data=None,
-            )
+        生成途中のJSONから message の文字列を取り出し、確定した分から順に返す。
+        生成完了後、最後に全体をパースした ScopingChatResponse（wbs_data を含む）を1つ返す。
+        生成途中のエラーは呼び出し側（SSEのerrorイベント）で扱うため、そのまま送出する。
+        """
+        decoder = JsonStringFieldStream("message")
+        chunks = []
+
+        async for chunk in self._generate_content_stream(
+            "stream_interactive_scoping",
+            _build_scoping_history(messages, summary),
+            ScopingChatResponse,
+            SCOPING_PREFIX,
+        ):
+            if not chunk.text:
+                continue
+            chunks.append(chunk.text)
+            text = decoder.feed(chunk.text)
+            if text:
+                yield text
+
+        yield ScopingChatResponse.model_validate_json("".join(chunks))
+
+    async def summarize_scoping_history(
+        self, summary: str | None, messages: list[ChatMessage]
+    ) -> str:
+        """
+        スコーピングのこれまでの要約と、その後のやり取りを1つの要約にまとめ直す
+
+        Raises:
+            Exception: 生成に失敗した場合（呼び出し側は要約せずに履歴をそのまま使う）
+        """
+        conversation = "\n".join(
+            f"{'ユーザー' if msg.role == 'user' else 'AI'}: {msg.content}"
+            for msg in messages
+        )
+        prompt = SCOPING_HISTORY_SUMMARY_PROMPT.format(
+            summary=summary or "（なし）",
+            conversation=conversation,
+            max_chars=settings.SCOPING_SUMMARY_MAX_CHARS,
+        )
+        response = await self._generate_content("summarize_scoping_history", prompt)
+        text = (response.text or "").strip()
+        if not text:
+            raise ValueError("Empty scoping summary")
+        return text
+
+
+def scoping_error_response() -> ScopingChatResponse:
+    """スコーピングの応答を生成できなかった場合に返す応答"""
+    return ScopingChatResponse(
+        message="申し訳ございません。エラーが発生しました。もう一度お試しください。",
+        is_complete=False,
+        wbs_data=None,
+    )
+
+
+def _build_scoping_history(
+    messages: list[ChatMessage], summary: str | None = None
+) -> list[dict]:
+    """会話履歴をGemini APIの contents の形式に変換する（固定部分は SCOPING_PREFIX）"""
+    history = []
+    if summary:
+        # 要約済みのやり取りは、ユーザーからの補足とAIの了承の1往復として先頭に置く
+        history = [
+            {
+                "role": "user",
+                "parts": [{"text": SCOPING_SUMMARY_NOTE.format(summary=summary)}],
+            },
+            {"role": "model", "parts": [{"text": "承知しました。続けます。"}]},
+        ]
+    # "assistant" ロールは Gemini API の "model" に変換
+    return history + [
+        {
+            "role": "model" if msg.role == "assistant" else msg.role,
+            "parts": [{"text": msg.content}],
+        }
+        for msg in messages
+    ]
+
+
+def _build_request(
+    contents: str | list,
+    response_schema: type[BaseModel] | None,
+    prefix: StaticPrefix | None,
+    cache_name: str | None,
+) -> tuple[str | list, types.GenerateContentConfig | None]:
+    """
+    generate_content に渡す contents と config を組み立てる
+
+    コンテキストキャッシュがあれば cached_content で参照し、可変部分だけを送る。
+    なければ固定部分（system_instruction・先頭の会話）もそのまま付けて送る。
+    """
+    options: dict = {}
+    if response_schema:
+        options["response_mime_type"] = "application/json"
+        options["response_schema"] = response_schema
+
+    if cache_name:
+        options["cached_content"] = cache_name
+    elif prefix:
+        if prefix.system_instruction:
+            options["system_instruction"] = prefix.system_instruction
+        if prefix.contents:
+            if isinstance(contents, str):
+                contents = [{"role": "user", "parts": [{"text": contents}]}]
+            contents = prefix.contents + contents
+
+    config = types.GenerateContentConfig(**options) if options else None
+    return contents, config
+
+
+def _format_daily_report(report: dict) -> str:
+    """
+    日報1件を週報生成用のテキストに変換する
+
+    保存時に作ったダイジェスト（要点と工数表）があればそれを使い、本文の全文は渡さない。
+    要点がない日報は content_raw を、工数表がない日報は結合済みの工数ログを使う。
+    """
+    date_str = report.get("report_date", "Unknown Date")
+    digest = report.get("digest") or {}
+
+    facts = digest.get("facts")
+    if facts:
+        content = "\n".join(f"- {fact}" for fact in facts)
+    else:
+        content = report.get("content_raw", "")
+
+    if "hours" in digest:
+        hours = [(h["task"], h["hours"]) for h in digest["hours"]]
+    else:
+        hours = [
+            (log["tasks"]["title"], log["hours"])
+            for log in report.get("task_work_logs", [])
+            if log.get("tasks")
+        ]
+
+    logs_text = ""
+    if hours:
+        logs_list = [f"- {title}: {h}h" for title, h in hours]
+        logs_text = "\n  (工数: " + ", ".join(logs_list) + ")"
+
+    return f"\n■ {date_str}\n{content}{logs_text}\n"
+
+
+def _chunk_blocks(
+    blocks: list[str], max_tokens: int, max_items: int
+) -> list[list[str]]:
+    """
+    順序を保ったまま、連続するテキストを「max_items 件以下・max_tokens 以下」のまとまりに分ける
+    1件で max_tokens を超えるものは単独のまとまりにする
+    """
+    chunks: list[list[str]] = []
+    current: list[str] = []
+    current_tokens = 0
+
+    for block in blocks:
+        tokens = estimate_tokens(block)
+        if current and (
+            len(current) >= max_items or current_tokens + tokens > max_tokens
+        ):
+            chunks.append(current)
+            current, current_tokens = [], 0
+        current.append(block)
+        current_tokens += tokens
+
+    if current:
+        chunks.append(current)
+    return chunks
@@ -0,0 +1,242 @@
+# backend/app/services/auth_service.py
+import asyncio
+import hashlib
+import time
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+
+import httpx
+import jwt
+from supabase_auth.types import User
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+
+# 未知の kid を受け取ったときに公開鍵セットを再取得する最短間隔（秒）
+# 不正なトークンを大量に送られても認証サーバーへ問い合わせが殺到しないようにする
+JWKS_MIN_REFRESH_INTERVAL_SECONDS = 10
+
+ASYMMETRIC_ALGORITHMS = ("RS256", "ES256")
+
+RemoteVerifier = Callable[[str], Awaitable[User | None]]
+
+
+class TokenVerificationError(Exception):
+    """トークンが無効（署名不正・期限切れ・形式不正など）な場合の例外"""
+
+
+class SigningKeyUnavailableError(TokenVerificationError):
+    """未知の kid だがJWKSの最短再取得間隔内のため、鍵を確認できなかった場合の例外
+
+    鍵のローテーション直後は少し待てば検証できるため、拒否したトークンとしては覚えない。
+    """
+
+
+class TokenVerifier:
+    """Supabase AuthのJWTをローカルで検証するクラス
+
+    - HS256: プロジェクトのJWTシークレットで検証
+    - RS256/ES256: JWKSから取得した公開鍵で検証（鍵のローテーションに追従）
+    検証結果は短時間キャッシュし、拒否したトークンも一定時間覚えておく。
+    """
+
+    def __init__(
+        self,
+        jwt_secret: str | None,
+        jwks_url: str,
+        audience: str = "authenticated",
+        jwks_ttl: float = 600,
+        cache_size: int = 1024,
+        negative_ttl: float = 30,
+    ):
+        self.jwt_secret = jwt_secret
+        self.jwks_url = jwks_url
+        self.audience = audience
+        self.jwks_ttl = jwks_ttl
+
+        self._valid_tokens = TTLCache(maxsize=cache_size, ttl=jwks_ttl)
+        self._rejected_tokens = TTLCache(maxsize=cache_size, ttl=negative_ttl)
+
+        self._jwks: dict[str, jwt.PyJWK] = {}
+        self._jwks_fetched_at = 0.0
+        self._jwks_lock = asyncio.Lock()
+
+    @classmethod
+    def from_settings(cls) -> "TokenVerifier":
+        jwks_url = (
+            settings.SUPABASE_JWKS_URL
+            or f"{settings.SUPABASE_URL.rstrip('/')}/auth/v1/.well-known/jwks.json"
+        )
+        return cls(
+            jwt_secret=settings.SUPABASE_JWT_SECRET,
+            jwks_url=jwks_url,
+            audience=settings.JWT_AUDIENCE,
+            jwks_ttl=settings.JWKS_CACHE_TTL_SECONDS,
+            cache_size=settings.AUTH_TOKEN_CACHE_SIZE,
+            negative_ttl=settings.AUTH_NEGATIVE_CACHE_TTL_SECONDS,
+        )
+
+    async def verify(
+        self, token: str, remote_verify: RemoteVerifier | None = None
+    ) -> User:
+        """
+        トークンを検証してユーザー情報を返す
+
+        Args:
+            token: Bearerトークン（JWT）
+            remote_verify: ローカル検証できない場合（HS256でシークレット未設定）に
+                認証サーバーへ問い合わせる関数
+
+        Raises:
+            TokenVerificationError: トークンが無効な場合
+        """
+        cache_key = hashlib.sha256(token.encode()).hexdigest()
+
+        if self._rejected_tokens.get(cache_key):
+            raise TokenVerificationError("Token was recently rejected")
+
+        cached_user = self._valid_tokens.get(cache_key)
+        if cached_user is not None:
+            return cached_user
+
+        try:
+            user, expires_in = await self._verify_uncached(token, remote_verify)
+        except SigningKeyUnavailableError:
+            raise
+        except TokenVerificationError:
+            self._rejected_tokens.set(cache_key, True)
+            raise
+
+        # トークンの有効期限を超えてキャッシュしない
+        self._valid_tokens.set(cache_key, user, ttl=min(expires_in, self.jwks_ttl))
+        return user
+
+    async def _verify_uncached(
+        self, token: str, remote_verify: RemoteVerifier | None
+    ) -> tuple[User, float]:
+        try:
+            header = jwt.get_unverified_header(token)
+        except jwt.InvalidTokenError as e:
+            raise TokenVerificationError(f"Malformed token: {e}") from e
+
+        alg = header.get("alg")
+
+        if alg == "HS256" and not self.jwt_secret:
+            return await self._verify_remotely(token, remote_verify)
+
+        key: str | object
+        if alg == "HS256":
+            key = self.jwt_secret  # type: ignore
+        elif alg in ASYMMETRIC_ALGORITHMS:
+            key = await self._get_signing_key(header.get("kid"))
+        else:
+            raise TokenVerificationError(f"Unsupported algorithm: {alg}")
+
+        try:
+            claims = jwt.decode(
+                token,
+                key,  # type: ignore
+                algorithms=[alg],
+                audience=self.audience,
+                options={"require": ["exp", "sub"]},
+            )
+        except jwt.InvalidTokenError as e:
+            raise TokenVerificationError(str(e)) from e
+
+        return _user_from_claims(claims), claims["exp"] - time.time()
+
+    async def _verify_remotely(
+        self, token: str, remote_verify: RemoteVerifier | None
+    ) -> tuple[User, float]:
+        """認証サーバーに問い合わせて検証する（ローカル検証できない場合のフォールバック）"""
+        if remote_verify is None:
+            raise TokenVerificationError("HS256 token but no JWT secret configured")
+
+        try:
+            # 署名は認証サーバー側で検証されるため、ここでは有効期限の取得のみ行う
+            claims = jwt.decode(token, options={"verify_signature": False})
+        except jwt.InvalidTokenError as e:
+            raise TokenVerificationError(str(e)) from e
+
+        expires_in = claims.get("exp", 0) - time.time()
+        if expires_in <= 0:
+            raise TokenVerificationError("Token has expired")
+
+        user = await remote_verify(token)
+        if user is None:
+            raise TokenVerificationError("Rejected by auth server")
+
+        return user, expires_in
+
+    async def _get_signing_key(self, kid: str | None) -> object:
+        """kid に対応する公開鍵を返す。未知の kid ならJWKSを再取得する（鍵ローテーション対応）"""
+        now = time.monotonic()
+        is_stale = now - self._jwks_fetched_at > self.jwks_ttl
+        refreshed = False
+
+        if is_stale or kid not in self._jwks:
+            async with self._jwks_lock:
+                # ロック待ちの間に他のリクエストが取得済みの場合は再取得しない
+                elapsed = time.monotonic() - self._jwks_fetched_at
+                if elapsed > self.jwks_ttl or (
+                    kid not in self._jwks
+                    and elapsed > JWKS_MIN_REFRESH_INTERVAL_SECONDS
+                ):
+                    self._jwks = await self._fetch_jwks()
+                    self._jwks_fetched_at = time.monotonic()
+                    refreshed = True
+
+        signing_key = self._jwks.get(kid)  # type: ignore
+        if signing_key is None:
+            if not refreshed:
+                raise SigningKeyUnavailableError(
+                    f"Unknown signing key (JWKS refresh throttled): {kid}"
+                )
+            raise TokenVerificationError(f"Unknown signing key: {kid}")
+
+        return signing_key.key
+
+    async def _fetch_jwks(self) -> dict[str, jwt.PyJWK]:
+        async with httpx.AsyncClient(timeout=5.0) as client:
+            res = await client.get(self.jwks_url)
+            res.raise_for_status()
+
+        jwk_set = jwt.PyJWKSet.from_dict(res.json())
+        return {key.key_id: key for key in jwk_set.keys if key.key_id}
+
+    def stats(self) -> dict:
+        return {
+            "valid_tokens": self._valid_tokens.stats(),
+            "rejected_tokens": self._rejected_tokens.stats(),
+        }
+
+
+def _user_from_claims(claims: dict) -> User:
+    """JWTのクレームからUserオブジェクトを組み立てる"""
+    aud = claims.get("aud", "")
+    return User(
+        id=claims["sub"],
+        aud=aud[0] if isinstance(aud, list) else aud,
+        role=claims.get("role"),
+        email=claims.get("email"),
+        phone=claims.get("phone"),
+        app_metadata=claims.get("app_metadata") or {},
+        user_metadata=claims.get("user_metadata") or {},
+        is_anonymous=claims.get("is_anonymous", False),
+        # JWTには作成日時が含まれないため、発行日時で代用する
+        created_at=datetime.fromtimestamp(claims.get("iat", 0), tz=UTC),
+    )
+
+
+# プロセス内で鍵とキャッシュを共有するためグローバル変数として保持
+_token_verifier: TokenVerifier | None = None
+
+
+def get_token_verifier() -> TokenVerifier:
+    """TokenVerifierを取得する依存関数"""
+    global _token_verifier
+
+    if _token_verifier is None:
+        _token_verifier = TokenVerifier.from_settings()
+
+    return _token_verifier
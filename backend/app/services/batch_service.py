@@ -1,27 +1,68 @@
 # backend/app/services/batch_service.py
+import asyncio
 from datetime import date, timedelta
 
-from supabase import Client
+from supabase import AsyncClient
 
+from app.core.config import settings
 from app.core.constants import (
     COL_ID,
     COL_TENANT_ID,
     COL_USER_ID,
+    RPC_RECORD_WEEKLY_BATCH_FAILURES,
+    RPC_SAVE_WEEKLY_BATCH_RESULTS,
     TABLE_DAILY_REPORTS,
-    TABLE_PROFILES,
-    TABLE_WEEKLY_SUMMARIES,
+    TABLE_WEEKLY_BATCH_CHECKPOINTS,
+    WEEKLY_SOURCE_COLUMNS,
 )
+from app.services.ai_rate_limiter import AIRateLimiter
+from app.services.ai_resilience import ResilientCaller
 from app.services.ai_service import AIService
 
+# ステージ間のキューに流す終了通知
+_STOP = object()
+# 処理結果に記録するエラーメッセージの最大長
+MAX_CHECKPOINT_ERROR_LENGTH = 500
+
+
+def batch_ai_caller(supabase: AsyncClient) -> ResilientCaller:
+    """バッチ用のGemini呼び出し（対話的なリクエスト用にトークンを残してレート制限する）"""
+    limiter = AIRateLimiter.from_settings(
+        supabase, reserve=settings.GEMINI_RATE_LIMIT_BATCH_RESERVE
+    )
+    return ResilientCaller.from_settings(limiter=limiter)
+
 
 class WeeklyBatchService:
-    def __init__(self, supabase: Client):
+    """週報一括生成バッチ
+
+    日報取得 → AI生成 → DB保存 の3ステージをキューでつなぎ、
+    ステージごとに同時実行数を制限して並行に処理する。
+
+    ユーザーごとの成否は weekly_batch_checkpoints に記録する。
+    途中で落ちても再実行すれば、成功済みのユーザーは飛ばして失敗・未処理のユーザーだけを処理する。
+    """
+
+    def __init__(
+        self,
+        supabase: AsyncClient,
+        page_size: int | None = None,
+        ai_concurrency: int | None = None,
+        insert_batch_size: int | None = None,
+        ai_service: AIService | None = None,
+    ):
         self.supabase = supabase
-        self.ai_service = AIService()
+        self.ai_service = ai_service or AIService(caller=batch_ai_caller(supabase))
+        self.page_size = page_size or settings.BATCH_PAGE_SIZE
+        self.users_per_query = settings.BATCH_USERS_PER_QUERY
+        # Geminiのクォータを超えないよう、AI生成の同時実行数は個別に制限する
+        self.ai_concurrency = ai_concurrency or settings.BATCH_AI_CONCURRENCY
+        self.insert_batch_size = insert_batch_size or settings.BATCH_INSERT_SIZE
 
     async def run_weekly_batch(self, target_date: date | None = None):
         """
         指定された日付を含む週（月〜金）の週報を全ユーザー分生成する
+        同じ週で既に成功したユーザーは処理しない（skipped に数える）
         """
         if target_date is None:
             target_date = date.today()
@@ -32,55 +73,280 @@ class WeeklyBatchService:
 
         print(f"📅 Target Week: {start_of_week} ~ {end_of_week}")
 
-        # 2. ユーザー一覧取得
-        profiles_res = (
-            self.supabase.table(TABLE_PROFILES)
-            .select(f"{COL_ID}, {COL_TENANT_ID}")
-            .execute()
-        )
-        profiles = profiles_res.data or []
+        results = {"success": 0, "error": 0, "skipped": 0}
+        completed = await self._load_completed_users(start_of_week)
+
+        # 上限付きキューにすることで、後段が詰まったら前段も待つ（バックプレッシャー）
+        generate_queue: asyncio.Queue = asyncio.Queue(maxsize=self.ai_concurrency * 2)
+        persist_queue: asyncio.Queue = asyncio.Queue(maxsize=self.insert_batch_size * 2)
 
-        results = {"success": 0, "skip": 0, "error": 0}
+        generators = [
+            asyncio.create_task(
+                self._generate_worker(
+                    generate_queue, persist_queue, start_of_week, end_of_week, results
+                )
+            )
+            for _ in range(self.ai_concurrency)
+        ]
+        persister = asyncio.create_task(self._persist_worker(persist_queue, results))
 
-        for user in profiles:
-            user_id = user[COL_ID]  # type: ignore
-            tenant_id = user[COL_TENANT_ID]  # type: ignore
+        # 前段から順に完了させ、終了通知を後段へ流す
+        try:
+            await self._fetch_stage(
+                generate_queue, start_of_week, end_of_week, completed, results
+            )
+        finally:
+            for _ in generators:
+                await generate_queue.put(_STOP)
+            await asyncio.gather(*generators)
+            await persist_queue.put(_STOP)
+            await persister
 
-            try:
-                # 3. 日報取得
-                reports_res = (
+        return results
+
+    async def _load_completed_users(self, start_of_week: date) -> set[str]:
+        """対象週の週報を保存済み（成功を記録済み）のユーザーIDを取得する"""
+        completed: set[str] = set()
+        last_user_id = None
+
+        while True:
+            query = (
+                self.supabase.table(TABLE_WEEKLY_BATCH_CHECKPOINTS)
+                .select(COL_USER_ID)
+                .eq("week_start_date", start_of_week.isoformat())
+                .eq("status", "succeeded")
+            )
+            if last_user_id:
+                query = query.gt(COL_USER_ID, last_user_id)
+
+            res = await query.order(COL_USER_ID).limit(self.page_size).execute()
+            rows: list[dict] = res.data or []  # type: ignore
+            completed.update(row[COL_USER_ID] for row in rows)
+
+            if len(rows) < self.page_size:
+                break
+            last_user_id = rows[-1][COL_USER_ID]
+
+        if completed:
+            print(f"⏭️ Skipping {len(completed)} users already completed this week")
+        return completed
+
+    async def _fetch_stage(
+        self,
+        generate_queue: asyncio.Queue,
+        start_of_week: date,
+        end_of_week: date,
+        completed: set[str],
+        results: dict,
+    ):
+        """ステージ1: 対象週に日報があり、未完了のユーザーだけを、日報付きで生成キューへ渡す"""
+        user_ids = await self._load_report_users(start_of_week, end_of_week)
+        pending = [user_id for user_id in user_ids if user_id not in completed]
+        results["skipped"] += len(user_ids) - len(pending)
+
+        async for user_id, tenant_id, daily_reports in self._iter_user_reports(
+            pending, start_of_week, end_of_week
+        ):
+            await generate_queue.put((user_id, tenant_id, daily_reports))
+
+    async def _load_report_users(
+        self, start_of_week: date, end_of_week: date
+    ) -> list[str]:
+        """
+        対象週に日報を書いたユーザーIDを user_id 順に取得する
+
+        日ごとに (report_date, user_id) のインデックスを user_id のキーセットで読むため、
+        読む行数は対象週の日報の件数にしか比例しない（過去の日報がいくら増えても変わらない）。
+        """
+        user_ids: set[str] = set()
+        day = start_of_week
+        while day <= end_of_week:
+            last_user_id = None
+            while True:
+                query = (
                     self.supabase.table(TABLE_DAILY_REPORTS)
-                    .select("*, task_work_logs(*, tasks(title))")
-                    .eq(COL_USER_ID, user_id)
+                    .select(COL_USER_ID)
+                    .eq("report_date", day.isoformat())
+                )
+                if last_user_id:
+                    # 同じユーザーの同じ日の残りの日報は読み飛ばしてよい（ユーザーIDだけが必要）
+                    query = query.gt(COL_USER_ID, last_user_id)
+
+                res = await query.order(COL_USER_ID).limit(self.page_size).execute()
+                rows: list[dict] = res.data or []  # type: ignore
+                user_ids.update(row[COL_USER_ID] for row in rows)
+
+                if len(rows) < self.page_size:
+                    break
+                last_user_id = rows[-1][COL_USER_ID]
+            day += timedelta(days=1)
+
+        return sorted(user_ids)
+
+    async def _iter_user_reports(
+        self, user_ids: list[str], start_of_week: date, end_of_week: date
+    ):
+        """
+        指定したユーザーの対象週の日報を取得し、ユーザーごとにまとめて返す
+
+        users_per_query 人ずつ (user_id, report_date) のインデックスで取得し、
+        page_size 件を超える分は (user_id, report_date, id) のキーセットで続きを取得する。
+        メモリに載るのは1ページ分と1ユーザー分の日報だけで済む。
+        """
+        current_user_id = None
+        current_tenant_id = None
+        current_reports: list[dict] = []
+
+        for i in range(0, len(user_ids), self.users_per_query):
+            users = user_ids[i : i + self.users_per_query]
+            cursor: dict | None = None
+
+            while True:
+                query = (
+                    self.supabase.table(TABLE_DAILY_REPORTS)
+                    .select(
+                        f"{COL_ID}, {COL_USER_ID}, {COL_TENANT_ID}, {WEEKLY_SOURCE_COLUMNS}"
+                    )
+                    .in_(COL_USER_ID, users)
                     .gte("report_date", start_of_week.isoformat())
                     .lte("report_date", end_of_week.isoformat())
-                    .order("report_date", desc=False)
+                )
+                if cursor:
+                    query = query.or_(_after_cursor_filter(cursor))
+
+                res = await (
+                    query.order(COL_USER_ID)
+                    .order("report_date")
+                    .order(COL_ID)
+                    .limit(self.page_size)
                     .execute()
                 )
-                daily_reports = reports_res.data
+                rows: list[dict] = res.data or []  # type: ignore
 
-                if not daily_reports:
-                    results["skip"] += 1
-                    continue
+                for row in rows:
+                    if row[COL_USER_ID] != current_user_id:
+                        if current_reports:
+                            yield current_user_id, current_tenant_id, current_reports
+                        current_user_id = row[COL_USER_ID]
+                        current_tenant_id = row[COL_TENANT_ID]
+                        current_reports = []
+                    current_reports.append(row)
 
-                # 4. AI生成
+                if len(rows) < self.page_size:
+                    break
+                cursor = rows[-1]
+
+        if current_reports:
+            yield current_user_id, current_tenant_id, current_reports
+
+    async def _generate_worker(
+        self,
+        generate_queue: asyncio.Queue,
+        persist_queue: asyncio.Queue,
+        start_of_week: date,
+        end_of_week: date,
+        results: dict,
+    ):
+        """ステージ2: AIで週報を生成して保存キューへ渡す"""
+        while True:
+            item = await generate_queue.get()
+            if item is _STOP:
+                return
+
+            user_id, tenant_id, daily_reports = item
+            try:
                 generated_text = await self.ai_service.generate_weekly_summary(
-                    daily_reports
+                    daily_reports, fallback=False
+                )
+            except Exception as e:
+                print(f"Error generating summary for user {user_id}: {e}")
+                results["error"] += 1
+                await self._record_failures(
+                    [
+                        {
+                            COL_TENANT_ID: tenant_id,
+                            COL_USER_ID: user_id,
+                            "week_start_date": start_of_week.isoformat(),
+                        }
+                    ],
+                    e,
                 )
+                continue
 
-                # 5. DB保存 (重複チェックは省略し、Insert)
-                data = {
+            await persist_queue.put(
+                {
                     COL_TENANT_ID: tenant_id,
                     COL_USER_ID: user_id,
                     "content": generated_text,
                     "week_start_date": start_of_week.isoformat(),
                     "week_end_date": end_of_week.isoformat(),
                 }
-                self.supabase.table(TABLE_WEEKLY_SUMMARIES).insert(data).execute()
-                results["success"] += 1
+            )
 
-            except Exception as e:
-                print(f"Error processing user {user_id}: {e}")
-                results["error"] += 1
+    async def _persist_worker(self, persist_queue: asyncio.Queue, results: dict):
+        """ステージ3: 生成結果をまとめて一括保存する"""
+        buffer: list[dict] = []
 
-        return results
+        while True:
+            row = await persist_queue.get()
+            if row is _STOP:
+                break
+
+            buffer.append(row)
+            if len(buffer) >= self.insert_batch_size:
+                await self._flush(buffer, results)
+                buffer = []
+
+        if buffer:
+            await self._flush(buffer, results)
+
+    async def _flush(self, rows: list[dict], results: dict):
+        """
+        週報の保存と成功の記録を1回のRPC（1トランザクション）で行う
+        同じユーザー・同じ週の週報が既にあれば上書きしないため、再実行しても重複しない
+        """
+        try:
+            res = await self.supabase.rpc(
+                RPC_SAVE_WEEKLY_BATCH_RESULTS, {"p_rows": rows}
+            ).execute()
+        except Exception as e:
+            print(f"Error saving {len(rows)} weekly summaries: {e}")
+            results["error"] += len(rows)
+            await self._record_failures(rows, e)
+            return
+
+        results["success"] += len(rows)
+        saved = res.data if isinstance(res.data, int) else len(rows)
+        if saved < len(rows):
+            print(f"Kept {len(rows) - saved} existing weekly summaries")
+
+    async def _record_failures(self, rows: list[dict], error: Exception):
+        """失敗したユーザーを記録する（記録に失敗しても、未処理として次回に再実行されるだけ）"""
+        message = str(error)[:MAX_CHECKPOINT_ERROR_LENGTH]
+        failures = [
+            {
+                COL_TENANT_ID: row[COL_TENANT_ID],
+                COL_USER_ID: row[COL_USER_ID],
+                "week_start_date": row["week_start_date"],
+                "error": message,
+            }
+            for row in rows
+        ]
+        try:
+            await self.supabase.rpc(
+                RPC_RECORD_WEEKLY_BATCH_FAILURES, {"p_rows": failures}
+            ).execute()
+        except Exception as e:
+            print(f"Error recording {len(rows)} weekly batch failures: {e}")
+
+
+def _after_cursor_filter(cursor: dict) -> str:
+    """(user_id, report_date, id) が cursor より後ろの行に絞り込む or 条件を組み立てる"""
+    user_id = cursor[COL_USER_ID]
+    report_date = cursor["report_date"]
+    report_id = cursor[COL_ID]
+    return (
+        f"{COL_USER_ID}.gt.{user_id},"
+        f"and({COL_USER_ID}.eq.{user_id},report_date.gt.{report_date}),"
+        f"and({COL_USER_ID}.eq.{user_id},report_date.eq.{report_date},{COL_ID}.gt.{report_id})"
+    )
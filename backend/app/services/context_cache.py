@@ -0,0 +1,194 @@
+# backend/app/services/context_cache.py
+import asyncio
+import hashlib
+import json
+import time
+from collections.abc import Callable
+from dataclasses import dataclass, field
+from typing import Protocol
+
+from google import genai
+from google.genai import types
+
+from app.core.config import settings
+
+
+@dataclass(frozen=True)
+class StaticPrefix:
+    """リクエストごとに変わらないプロンプトの先頭部分（システムプロンプトや固定の会話）
+
+    コンテキストキャッシュが使える場合はキャッシュとして一度だけ送り、
+    使えない場合は毎回のリクエストにそのまま付けて送る。
+    """
+
+    name: str
+    system_instruction: str | None = None
+    contents: list[dict] = field(default_factory=list)
+
+    def key(self, model: str) -> str:
+        """モデルと内容から決まるキー（プロンプトを変更すると別のキャッシュになる）"""
+        payload = {
+            "model": model,
+            "system_instruction": self.system_instruction,
+            "contents": self.contents,
+        }
+        raw = json.dumps(payload, sort_keys=True, ensure_ascii=False)
+        return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class ContextCacheBackend(Protocol):
+    """コンテキストキャッシュの作成・延長・削除を行うバックエンド"""
+
+    async def create(self, model: str, prefix: StaticPrefix, ttl_seconds: int) -> str:
+        """キャッシュを作成し、generate_content の cached_content に渡す名前を返す"""
+        ...
+
+    async def refresh(self, name: str, ttl_seconds: int) -> None: ...
+
+    async def delete(self, name: str) -> None: ...
+
+
+class GeminiContextCacheBackend:
+    """Gemini APIのコンテキストキャッシュ（client.aio.caches）"""
+
+    def __init__(self, client: genai.Client):
+        self.client = client
+
+    async def create(self, model: str, prefix: StaticPrefix, ttl_seconds: int) -> str:
+        cached = await self.client.aio.caches.create(
+            model=model,
+            config=types.CreateCachedContentConfig(
+                display_name=prefix.name,
+                system_instruction=prefix.system_instruction,
+                contents=prefix.contents or None,
+                ttl=f"{ttl_seconds}s",
+            ),
+        )
+        return cached.name  # type: ignore
+
+    async def refresh(self, name: str, ttl_seconds: int) -> None:
+        await self.client.aio.caches.update(
+            name=name, config=types.UpdateCachedContentConfig(ttl=f"{ttl_seconds}s")
+        )
+
+    async def delete(self, name: str) -> None:
+        await self.client.aio.caches.delete(name=name)
+
+
+@dataclass
+class _Handle:
+    name: str
+    expires_at: float
+
+
+class ContextCacheManager:
+    """固定プロンプトごとのコンテキストキャッシュの管理
+
+    - 初回の利用時に作成し、期限が近づいたら延長する（同時に呼ばれても作成は1回だけ）
+    - 作成に失敗した場合（最小トークン数に満たない・APIエラーなど）は None を返し、
+      呼び出し側はプロンプトをそのまま送る。しばらくの間は作成を再試行しない
+    - キャッシュはワーカーごとに持ち、シャットダウン時に削除する（残ったものもTTLで失効する）
+    """
+
+    def __init__(
+        self,
+        backend: ContextCacheBackend,
+        ttl_seconds: int = 3600,
+        refresh_margin: float = 300,
+        retry_after: float = 600,
+        clock: Callable[[], float] = time.monotonic,
+    ):
+        self.backend = backend
+        self.ttl_seconds = ttl_seconds
+        self.refresh_margin = refresh_margin
+        self.retry_after = retry_after
+        self._clock = clock
+        self._handles: dict[str, _Handle] = {}
+        self._unavailable_until: dict[str, float] = {}
+        self._locks: dict[str, asyncio.Lock] = {}
+
+        self.hits = 0
+        self.creates = 0
+        self.refreshes = 0
+        self.failures = 0
+
+    @classmethod
+    def from_settings(cls, client: genai.Client) -> "ContextCacheManager":
+        return cls(
+            GeminiContextCacheBackend(client),
+            ttl_seconds=settings.GEMINI_CONTEXT_CACHE_TTL_SECONDS,
+            refresh_margin=settings.GEMINI_CONTEXT_CACHE_REFRESH_MARGIN_SECONDS,
+            retry_after=settings.GEMINI_CONTEXT_CACHE_RETRY_SECONDS,
+        )
+
+    def _fresh(self, key: str) -> _Handle | None:
+        handle = self._handles.get(key)
+        if handle and handle.expires_at - self._clock() > self.refresh_margin:
+            return handle
+        return None
+
+    async def get(self, model: str, prefix: StaticPrefix) -> str | None:
+        """
+        固定プロンプトのキャッシュ名を返す（使えない場合は None）
+        """
+        key = prefix.key(model)
+        if self._unavailable_until.get(key, 0) > self._clock():
+            return None
+
+        handle = self._fresh(key)
+        if handle:
+            self.hits += 1
+            return handle.name
+
+        async with self._locks.setdefault(key, asyncio.Lock()):
+            # 待っている間に他のリクエストが作成・延長した場合はそれを使う
+            handle = self._fresh(key)
+            if handle:
+                self.hits += 1
+                return handle.name
+
+            handle = self._handles.get(key)
+            if handle and handle.expires_at > self._clock():
+                try:
+                    await self.backend.refresh(handle.name, self.ttl_seconds)
+                    handle.expires_at = self._clock() + self.ttl_seconds
+                    self.refreshes += 1
+                    return handle.name
+                except Exception as e:
+                    # 延長できない（削除済みなど）場合は作り直す
+                    print(f"AI Context Cache Refresh Error: {prefix.name}: {e}")
+
+            self._handles.pop(key, None)
+            try:
+                name = await self.backend.create(model, prefix, self.ttl_seconds)
+            except Exception as e:
+                print(f"AI Context Cache Create Error: {prefix.name}: {e}")
+                self.failures += 1
+                self._unavailable_until[key] = self._clock() + self.retry_after
+                return None
+
+            self._handles[key] = _Handle(name, self._clock() + self.ttl_seconds)
+            self.creates += 1
+            return name
+
+    def invalidate(self, model: str, prefix: StaticPrefix) -> None:
+        """キャッシュが使えなくなった（期限切れ・削除済み）場合に手元の情報を破棄する"""
+        self._handles.pop(prefix.key(model), None)
+
+    async def aclose(self) -> None:
+        """作成したキャッシュを削除する（シャットダウン時用）"""
+        handles, self._handles = self._handles, {}
+        for handle in handles.values():
+            try:
+                await self.backend.delete(handle.name)
+            except Exception as e:
+                print(f"AI Context Cache Delete Error: {e}")
+
+    def stats(self) -> dict:
+        return {
+            "hits": self.hits,
+            "creates": self.creates,
+            "refreshes": self.refreshes,
+            "failures": self.failures,
+            "size": len(self._handles),
+        }
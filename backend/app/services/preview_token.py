@@ -0,0 +1,122 @@
+# backend/app/services/preview_token.py
+import hashlib
+import hmac
+import json
+import time
+from collections.abc import Callable
+
+import jwt
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.models.report import DailyReportPolished
+
+PREVIEW_TOKEN_ALGORITHM = "HS256"
+# 他の用途のJWTを取り違えて受け付けないための audience
+PREVIEW_TOKEN_AUDIENCE = "report-preview"
+
+
+def preview_fingerprint(
+    raw_content: str,
+    politeness_level: int,
+    ai_settings: dict | None,
+    active_tasks: list,
+) -> str:
+    """
+    AI変換の結果を左右する入力のハッシュ
+
+    下書き・丁寧さ・AI設定・アクティブタスクのどれかが変わると別の値になり、
+    プレビューの結果は再利用されない。
+    """
+    payload = {
+        "raw_content": raw_content,
+        "politeness_level": politeness_level,
+        "ai_settings": ai_settings,
+        "tasks": sorted((str(t["id"]), t["title"]) for t in active_tasks),
+    }
+    raw = json.dumps(payload, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(raw.encode()).hexdigest()
+
+
+class PreviewTokenSigner:
+    """プレビューの変換結果を署名付きの短期トークンにする
+
+    トークンに結果そのものを含めるため、サーバー側に状態を持たず、どのワーカーでも検証できる。
+    作成APIは、同じユーザー・同じ入力（fingerprint）で有効期限内のトークンであれば
+    結果をそのまま使い、AIを再度呼ばない。
+    """
+
+    def __init__(
+        self,
+        secret: str | bytes,
+        ttl_seconds: int = 900,
+        clock: Callable[[], float] = time.time,
+    ):
+        self.secret = secret
+        self.ttl_seconds = ttl_seconds
+        self._clock = clock
+
+    @classmethod
+    def from_settings(cls) -> "PreviewTokenSigner":
+        secret: str | bytes | None = settings.PREVIEW_TOKEN_SECRET
+        if not secret:
+            # 未設定の場合は、全ワーカーで共通の SUPABASE_KEY から用途別の鍵を導出する
+            secret = hmac.new(
+                settings.SUPABASE_KEY.encode(), b"report-preview-token", hashlib.sha256
+            ).digest()
+        return cls(secret, ttl_seconds=settings.PREVIEW_TOKEN_TTL_SECONDS)
+
+    def issue(self, user_id: str, fingerprint: str, result: DailyReportPolished) -> str:
+        now = int(self._clock())
+        claims = {
+            "sub": user_id,
+            "aud": PREVIEW_TOKEN_AUDIENCE,
+            "iat": now,
+            "exp": now + self.ttl_seconds,
+            "fp": fingerprint,
+            "result": result.model_dump(mode="json"),
+        }
+        return jwt.encode(claims, self.secret, algorithm=PREVIEW_TOKEN_ALGORITHM)
+
+    def verify(
+        self, token: str, user_id: str, fingerprint: str
+    ) -> DailyReportPolished | None:
+        """
+        トークンが有効で、同じユーザー・同じ入力に対するものであれば変換結果を返す
+        （無効・期限切れ・入力が変わった場合は None = 作り直す）
+        """
+        try:
+            claims = jwt.decode(
+                token,
+                self.secret,
+                algorithms=[PREVIEW_TOKEN_ALGORITHM],
+                audience=PREVIEW_TOKEN_AUDIENCE,
+                options={"require": ["exp", "sub", "fp"], "verify_iat": False},
+            )
+        except jwt.PyJWTError as e:
+            print(f"Preview Token Rejected: {e}")
+            return None
+
+        if claims["sub"] != user_id or not hmac.compare_digest(
+            claims["fp"], fingerprint
+        ):
+            return None
+
+        try:
+            return DailyReportPolished.model_validate(claims.get("result"))
+        except ValidationError:
+            return None
+
+
+# 署名鍵は設定から決まるためグローバル変数として保持
+_preview_signer: PreviewTokenSigner | None = None
+
+
+def get_preview_signer() -> PreviewTokenSigner:
+    """PreviewTokenSignerを取得する依存関数"""
+    global _preview_signer
+
+    if _preview_signer is None:
+        _preview_signer = PreviewTokenSigner.from_settings()
+
+    return _preview_signer
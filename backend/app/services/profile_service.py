@@ -0,0 +1,90 @@
+# backend/app/services/profile_service.py
+from dataclasses import dataclass
+
+from supabase import AsyncClient
+
+from app.core.cache import TTLCache
+from app.core.config import settings
+from app.core.constants import COL_ID, COL_TENANT_ID, TABLE_PROFILES
+
+
+class ProfileNotFoundError(Exception):
+    """ユーザーのプロフィールが存在しない場合の例外"""
+
+
+@dataclass(frozen=True)
+class UserContext:
+    """リクエストしたユーザーの所属テナントとAI設定"""
+
+    user_id: str
+    tenant_id: str
+    ai_settings: dict | None = None
+
+
+class ProfileCache:
+    """ユーザーごとのテナントID・AI設定のキャッシュ
+
+    ほぼすべての書き込みAPIの最初に必要になる profiles の取得を省くため、
+    プロセス内で一定時間キャッシュする。
+    AI設定の更新時は invalidate で明示的に破棄する（他ワーカーのキャッシュはTTLで失効する）。
+    """
+
+    def __init__(self, ttl: float = 60, maxsize: int = 1024):
+        self._cache = TTLCache(maxsize=maxsize, ttl=ttl)
+
+    @classmethod
+    def from_settings(cls) -> "ProfileCache":
+        return cls(
+            ttl=settings.PROFILE_CACHE_TTL_SECONDS,
+            maxsize=settings.PROFILE_CACHE_SIZE,
+        )
+
+    async def get(self, supabase: AsyncClient, user_id: str) -> UserContext:
+        """
+        ユーザーのテナントIDとAI設定を返す（キャッシュになければDBから取得する）
+
+        Raises:
+            ProfileNotFoundError: プロフィールが存在しない場合
+        """
+        context = self._cache.get(user_id)
+        if context is not None:
+            return context
+
+        res = await (
+            supabase.table(TABLE_PROFILES)
+            .select(f"{COL_TENANT_ID}, ai_settings")
+            .eq(COL_ID, user_id)
+            .single()
+            .execute()
+        )
+        if not res.data:
+            raise ProfileNotFoundError(f"Profile not found: {user_id}")
+
+        context = UserContext(
+            user_id=user_id,
+            tenant_id=res.data[COL_TENANT_ID],  # type: ignore
+            ai_settings=res.data.get("ai_settings"),  # type: ignore
+        )
+        self._cache.set(user_id, context)
+        return context
+
+    def invalidate(self, user_id: str) -> None:
+        """ユーザーのキャッシュを破棄する（プロフィール更新時に呼ぶ）"""
+        self._cache.pop(user_id)
+
+    def stats(self) -> dict:
+        return self._cache.stats()
+
+
+# プロセス内でキャッシュを共有するためグローバル変数として保持
+_profile_cache: ProfileCache | None = None
+
+
+def get_profile_cache() -> ProfileCache:
+    """ProfileCacheを取得する依存関数"""
+    global _profile_cache
+
+    if _profile_cache is None:
+        _profile_cache = ProfileCache.from_settings()
+
+    return _profile_cache
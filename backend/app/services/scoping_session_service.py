@@ -0,0 +1,264 @@
+# backend/app/services/scoping_session_service.py
+import logging
+from collections.abc import AsyncIterator
+from dataclasses import dataclass, field
+from datetime import UTC, datetime, timedelta
+
+from postgrest.exceptions import APIError
+from supabase import AsyncClient
+
+from app.core.config import settings
+from app.core.constants import (
+    COL_ID,
+    COL_USER_ID,
+    TABLE_SCOPING_MESSAGES,
+    TABLE_SCOPING_SESSIONS,
+)
+from app.core.tokens import estimate_tokens
+from app.models.scoping import ChatMessage, ScopingChatResponse
+from app.services.ai_service import AIService, scoping_error_response
+
+logger = logging.getLogger(__name__)
+
+# 主キー(session_id, seq)の重複 = 同じセッションに別のターンが先に書き込まれた
+UNIQUE_VIOLATION = "23505"
+
+
+class ScopingSessionNotFoundError(Exception):
+    """セッションが存在しない（期限切れ・他ユーザーのセッションを含む）場合の例外"""
+
+
+class ScopingSessionConflictError(Exception):
+    """同じセッションに同時に複数のメッセージが送られた場合の例外"""
+
+
+@dataclass
+class ScopingSession:
+    """対話型スコーピングのセッション
+
+    messages は未要約のやり取りのみ（seq は compacted_through + 1 から連番）。
+    それより前のやり取りは summary にまとめてある。
+    """
+
+    id: str
+    user_id: str
+    expires_at: str
+    summary: str | None = None
+    compacted_through: int = 0
+    is_complete: bool = False
+    messages: list[ChatMessage] = field(default_factory=list)
+
+    @property
+    def last_seq(self) -> int:
+        return self.compacted_through + len(self.messages)
+
+
+class ScopingSessionService:
+    """サーバー側で会話履歴を保持する対話型スコーピング
+
+    クライアントは新しいメッセージだけを送り、履歴はセッションから組み立てる。
+    履歴が SCOPING_HISTORY_TOKEN_BUDGET を超えたら、直近のやり取りを残して古い分を要約にまとめる。
+    要約は応答を返した後に行うため（compact_if_needed をバックグラウンドで呼ぶ）、
+    ターンごとのレイテンシは会話の長さによらずほぼ一定になる。
+    """
+
+    def __init__(self, supabase: AsyncClient, ai_service: AIService):
+        self.supabase = supabase
+        self.ai_service = ai_service
+
+    async def create(self, user_id: str) -> ScopingSession:
+        expires_at = datetime.now(UTC) + timedelta(
+            hours=settings.SCOPING_SESSION_TTL_HOURS
+        )
+        res = await (
+            self.supabase.table(TABLE_SCOPING_SESSIONS)
+            .insert({COL_USER_ID: user_id, "expires_at": expires_at.isoformat()})
+            .execute()
+        )
+        row: dict = res.data[0]  # type: ignore
+        return ScopingSession(
+            id=row[COL_ID], user_id=user_id, expires_at=row["expires_at"]
+        )
+
+    async def get(self, session_id: str, user_id: str) -> ScopingSession:
+        """
+        セッションと未要約のメッセージを1回のクエリで取得する
+
+        Raises:
+            ScopingSessionNotFoundError: 存在しない・期限切れ・他ユーザーのセッションの場合
+        """
+        res = await (
+            self.supabase.table(TABLE_SCOPING_SESSIONS)
+            .select(
+                "id, user_id, summary, compacted_through, is_complete, expires_at, "
+                f"{TABLE_SCOPING_MESSAGES}(seq, role, content)"
+            )
+            .eq(COL_ID, session_id)
+            .eq(COL_USER_ID, user_id)
+            .gt("expires_at", datetime.now(UTC).isoformat())
+            .limit(1)
+            .execute()
+        )
+        if not res.data:
+            raise ScopingSessionNotFoundError(
+                f"Scoping session not found: {session_id}"
+            )
+
+        row: dict = res.data[0]  # type: ignore
+        compacted_through = row["compacted_through"]
+        # 要約済みで削除し損ねたメッセージが残っていても読み飛ばす
+        rows = sorted(
+            (m for m in row[TABLE_SCOPING_MESSAGES] if m["seq"] > compacted_through),
+            key=lambda m: m["seq"],
+        )
+        return ScopingSession(
+            id=row[COL_ID],
+            user_id=row[COL_USER_ID],
+            expires_at=row["expires_at"],
+            summary=row["summary"],
+            compacted_through=compacted_through,
+            is_complete=row["is_complete"],
+            messages=[ChatMessage(role=m["role"], content=m["content"]) for m in rows],
+        )
+
+    async def chat(self, session: ScopingSession, content: str) -> ScopingChatResponse:
+        """
+        新しいメッセージに対するAIの応答を生成し、やり取りをセッションに保存する
+        生成に失敗した場合はエラー時の応答を返す（履歴には残さない）
+
+        Raises:
+            ScopingSessionConflictError: 同じセッションに別のメッセージが先に保存された場合
+        """
+        message = ChatMessage(role="user", content=content)
+        try:
+            reply = await self.ai_service.generate_scoping_reply(
+                [*session.messages, message], session.summary
+            )
+        except Exception:
+            logger.exception("AI Interactive Scoping Error: session=%s", session.id)
+            return scoping_error_response()
+
+        await self._save_turn(session, message, reply)
+        return reply
+
+    async def stream_chat(
+        self, session: ScopingSession, content: str
+    ) -> AsyncIterator[str | ScopingChatResponse]:
+        """
+        chat のストリーミング版（AIService.stream_interactive_scoping と同じ値を返す）
+        生成が完了した時点でやり取りを保存してから、最後の ScopingChatResponse を返す
+        """
+        message = ChatMessage(role="user", content=content)
+        async for item in self.ai_service.stream_interactive_scoping(
+            [*session.messages, message], session.summary
+        ):
+            if isinstance(item, ScopingChatResponse):
+                await self._save_turn(session, message, item)
+            yield item
+
+    async def _save_turn(
+        self,
+        session: ScopingSession,
+        message: ChatMessage,
+        reply: ScopingChatResponse,
+    ) -> None:
+        turn = [message, ChatMessage(role="assistant", content=reply.message)]
+        rows: list[dict] = [
+            {
+                "session_id": session.id,
+                "seq": session.last_seq + i,
+                "role": m.role,
+                "content": m.content,
+            }
+            for i, m in enumerate(turn, start=1)
+        ]
+        try:
+            await self.supabase.table(TABLE_SCOPING_MESSAGES).insert(rows).execute()
+        except APIError as e:
+            if e.code == UNIQUE_VIOLATION:
+                raise ScopingSessionConflictError(session.id) from e
+            raise
+        session.messages.extend(turn)
+
+        if reply.is_complete and not session.is_complete:
+            await (
+                self.supabase.table(TABLE_SCOPING_SESSIONS)
+                .update({"is_complete": True})
+                .eq(COL_ID, session.id)
+                .execute()
+            )
+            session.is_complete = True
+
+    def needs_compaction(self, session: ScopingSession) -> bool:
+        """要約と未要約の履歴の合計がトークン予算を超えているか"""
+        if len(session.messages) <= settings.SCOPING_KEEP_RECENT_MESSAGES:
+            return False
+        text = (session.summary or "") + "".join(m.content for m in session.messages)
+        return estimate_tokens(text) > settings.SCOPING_HISTORY_TOKEN_BUDGET
+
+    async def compact_if_needed(self, session: ScopingSession) -> bool:
+        """
+        履歴がトークン予算を超えていれば、直近のやり取りを残して古い分を要約にまとめる
+        失敗しても次のターンで再び試みるだけなので、例外は送出しない
+
+        Returns:
+            bool: 要約した場合は True
+        """
+        if not self.needs_compaction(session):
+            return False
+
+        keep_from = _compaction_split(session.messages)
+        if keep_from == 0:
+            return False
+        old = session.messages[:keep_from]
+
+        try:
+            summary = await self.ai_service.summarize_scoping_history(
+                session.summary, old
+            )
+            compacted_through = session.compacted_through + len(old)
+            # 他のリクエストが先に要約した場合は何もしない（compacted_through で楽観ロック）
+            res = await (
+                self.supabase.table(TABLE_SCOPING_SESSIONS)
+                .update({"summary": summary, "compacted_through": compacted_through})
+                .eq(COL_ID, session.id)
+                .eq("compacted_through", session.compacted_through)
+                .execute()
+            )
+            if not res.data:
+                return False
+
+            await (
+                self.supabase.table(TABLE_SCOPING_MESSAGES)
+                .delete()
+                .eq("session_id", session.id)
+                .lte("seq", compacted_through)
+                .execute()
+            )
+        except Exception:
+            logger.exception("Scoping Session Compaction Error: %s", session.id)
+            return False
+
+        logger.info(
+            "Scoping Session Compacted: %s (%d messages through seq %d)",
+            session.id,
+            len(old),
+            compacted_through,
+        )
+        session.summary = summary
+        session.compacted_through = compacted_through
+        session.messages = session.messages[keep_from:]
+        return True
+
+
+def _compaction_split(messages: list[ChatMessage]) -> int:
+    """
+    要約せずに残すメッセージの開始位置を返す
+
+    直近 SCOPING_KEEP_RECENT_MESSAGES 件を残す。残す側がユーザーの発言から始まるように、
+    AIの応答で始まる場合はその応答も要約側に含める。
+    """
+    keep_from = max(0, len(messages) - settings.SCOPING_KEEP_RECENT_MESSAGES)
+    while keep_from < len(messages) and messages[keep_from].role != "user":
+        keep_from += 1
+    return keep_from
@@ -0,0 +1,129 @@
+# backend/scripts/benchmark_ai_client.py
+"""
+AIService（genai.Client）をリクエストごとに生成する場合と、共有する場合のレイテンシ比較
+
+- per-request: 旧実装相当（毎回 AIService() を生成し、接続も毎回張り直す）
+- shared     : 現実装（lifespanで生成した1つのAIServiceを使い回す）
+
+デフォルトではローカルに立てたフェイクのGeminiエンドポイントに対して計測する。
+--real を指定すると実際のGemini APIに対して計測する（GEMINI_API_KEY が必要・課金対象）。
+実APIではTLSハンドシェイクが加わるため、差はさらに大きくなる。
+
+使い方:
+    python scripts/benchmark_ai_client.py --requests 50
+"""
+
+import argparse
+import asyncio
+import os
+import socket
+import statistics
+import sys
+import time
+
+# パスを通す（backendディレクトリをルートとしてappモジュールをインポートするため）
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import uvicorn  # noqa: E402
+from fastapi import FastAPI  # noqa: E402
+from google import genai  # noqa: E402
+from google.genai import types  # noqa: E402
+
+from app.core.config import settings  # type: ignore # noqa: E402
+from app.services.ai_service import AIService  # type: ignore # noqa: E402
+
+# generateContent のレスポンスを模したフェイクAPI
+fake_gemini = FastAPI()
+
+
+@fake_gemini.post("/v1beta/models/{model}:generateContent")
+async def fake_generate_content(model: str):
+    return {
+        "candidates": [
+            {
+                "content": {
+                    "role": "model",
+                    "parts": [{"text": "週報のテスト出力です。"}],
+                },
+                "finishReason": "STOP",
+            }
+        ]
+    }
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def build_service(base_url: str | None) -> AIService:
+    service = AIService()
+    if base_url:
+        # フェイクエンドポイントに向けたクライアントに差し替える
+        service.client = genai.Client(
+            api_key=settings.GEMINI_API_KEY,
+            http_options=types.HttpOptions(base_url=base_url),
+        )
+    return service
+
+
+async def measure(mode: str, base_url: str | None, total_requests: int) -> list[float]:
+    """1リクエストずつ順番に実行し、各リクエストのレイテンシ(ms)を返す"""
+    shared = build_service(base_url) if mode == "shared" else None
+    reports = [{"report_date": "2024-01-08", "content_raw": "API実装"}]
+    latencies = []
+
+    for _ in range(total_requests):
+        started = time.perf_counter()
+        service = shared or build_service(base_url)
+        await service.generate_weekly_summary(reports)
+        if shared is None:
+            await service.aclose()
+        latencies.append((time.perf_counter() - started) * 1000)
+
+    if shared is not None:
+        await shared.aclose()
+    return latencies
+
+
+async def main(total_requests: int, real: bool):
+    base_url = None
+    server = None
+
+    if not real:
+        port = free_port()
+        base_url = f"http://127.0.0.1:{port}"
+        config = uvicorn.Config(fake_gemini, port=port, log_level="warning")
+        server = uvicorn.Server(config)
+        server_task = asyncio.create_task(server.serve())
+        while not server.started:
+            await asyncio.sleep(0.05)
+
+    print(f"target: {'Gemini API' if real else base_url} / requests: {total_requests}")
+    print(f"{'mode':>12} {'p50 ms':>9} {'p95 ms':>9} {'mean ms':>9}")
+
+    for mode in ("per-request", "shared"):
+        latencies = await measure(mode, base_url, total_requests)
+        p95 = statistics.quantiles(latencies, n=20)[18]
+        print(
+            f"{mode:>12} {statistics.median(latencies):>9.2f} {p95:>9.2f} "
+            f"{statistics.mean(latencies):>9.2f}"
+        )
+
+    if server is not None:
+        server.should_exit = True
+        await server_task
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--requests", type=int, default=50)
+    parser.add_argument("--real", action="store_true")
+    args = parser.parse_args()
+
+    asyncio.run(main(args.requests, args.real))
@@ -0,0 +1,149 @@
+# backend/scripts/benchmark_create_report.py
+"""
+POST /reports のフェーズ別レイテンシ比較
+
+実際のSupabase・Gemini APIには接続せず、往復時間を模したフェイクに差し替えて計測する。
+
+- sequential: 旧実装相当（プロフィール取得 → アクティブタスク取得 → AI → 日報Insert → 工数ログInsert）
+- parallel  : 現実装（プロフィールとアクティブタスクを並行取得してからAIを開始し、RPC1回で保存）
+
+どちらもプロフィールキャッシュが効いていない状態（初回リクエスト）で計測する。
+現実装ではキャッシュが効いている間、プロフィール取得の往復自体が発生しない。
+
+使い方:
+    python scripts/benchmark_create_report.py --db-latency-ms 40 --ai-latency-ms 800
+"""
+
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+from types import SimpleNamespace
+from uuid import uuid4
+
+# パスを通す（backendディレクトリをルートとしてappモジュールをインポートするため）
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# 設定クラスの必須項目（ベンチマークでは実際には使わない）
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+from fastapi import Response  # noqa: E402
+
+from app.core.timing import PhaseTimer  # type: ignore # noqa: E402
+from app.models.report import (  # type: ignore # noqa: E402
+    DailyReportDraft,
+    DailyReportPolished,
+    WorkLogExtraction,
+)
+from app.routers.reports import create_report  # type: ignore # noqa: E402
+from app.services.profile_service import ProfileCache  # type: ignore # noqa: E402
+
+PHASES = ["prefetch", "ai", "save", "total"]
+
+
+class FakeQuery:
+    """supabaseのクエリビルダーを模したクラス（テーブルごとにそれらしい結果を返す）"""
+
+    def __init__(self, table: str, latency: float):
+        self.table = table
+        self.latency = latency
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        await asyncio.sleep(self.latency)
+        if self.table == "profiles":
+            return SimpleNamespace(data={"tenant_id": "tenant1", "ai_settings": None})
+        if self.table == "daily_reports":
+            return SimpleNamespace(data=[{"id": str(uuid4())}])
+        if self.table == "rpc":
+            return SimpleNamespace(data={"id": str(uuid4()), "task_work_logs": []})
+        return SimpleNamespace(data=[])
+
+
+class FakeSupabase:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(name, self.latency)
+
+    def rpc(self, name: str, params: dict) -> FakeQuery:
+        return FakeQuery("rpc", self.latency)
+
+
+class FakeAIService:
+    def __init__(self, latency: float):
+        self.latency = latency
+
+    async def generate_report_with_logs(self, *args, **kwargs):
+        await asyncio.sleep(self.latency)
+        return DailyReportPolished(
+            subject="件名",
+            content_polished="本文",
+            politeness_level=3,
+            work_logs=[WorkLogExtraction(task_id=uuid4(), hours=2.0)],
+        )
+
+
+async def sequential(draft, user, supabase, ai_service) -> dict:
+    """旧実装のフェーズ構成（各クエリを順番に待つ）"""
+    timer = PhaseTimer()
+    with timer.phase("prefetch"):
+        profile = await supabase.table("profiles").select("*").execute()
+        tasks = await supabase.table("tasks").select("*").execute()
+    with timer.phase("ai"):
+        result = await ai_service.generate_report_with_logs(
+            draft.raw_content, draft.politeness_level, tasks.data, profile.data
+        )
+    with timer.phase("save"):
+        await supabase.table("daily_reports").insert({}).execute()
+        if result.work_logs:
+            await supabase.table("task_work_logs").insert([]).execute()
+    return {**timer.phases, "total": timer.total_ms()}
+
+
+async def parallel(draft, user, supabase, ai_service) -> dict:
+    """現実装（ルーターの関数をそのまま呼び、Server-Timing ヘッダーから読み取る）"""
+    response = Response()
+    await create_report(draft, response, user, supabase, ai_service, ProfileCache())
+
+    phases = {}
+    for entry in response.headers["Server-Timing"].split(", "):
+        name, dur = entry.split(";dur=")
+        phases[name] = float(dur)
+    return phases
+
+
+async def main(db_latency_ms: float, ai_latency_ms: float, total_requests: int):
+    draft = DailyReportDraft(raw_content="API実装", politeness_level=3)
+    user = SimpleNamespace(id="bench")
+    supabase = FakeSupabase(db_latency_ms / 1000)
+    ai_service = FakeAIService(ai_latency_ms / 1000)
+
+    print(
+        f"DB latency: {db_latency_ms:g}ms / AI latency: {ai_latency_ms:g}ms "
+        f"/ requests: {total_requests}"
+    )
+    print(f"{'mode':>12}" + "".join(f" {p + ' ms':>12}" for p in PHASES))
+
+    for name, run in (("sequential", sequential), ("parallel", parallel)):
+        samples = [
+            await run(draft, user, supabase, ai_service) for _ in range(total_requests)
+        ]
+        medians = [statistics.median(s[p] for s in samples) for p in PHASES]
+        print(f"{name:>12}" + "".join(f" {m:>12.1f}" for m in medians))
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--db-latency-ms", type=float, default=40)
+    parser.add_argument("--ai-latency-ms", type=float, default=800)
+    parser.add_argument("--requests", type=int, default=10)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.db_latency_ms, args.ai_latency_ms, args.requests))
@@ -0,0 +1,114 @@
+# backend/scripts/benchmark_db_concurrency.py
+"""
+DBアクセスの非同期化による同時処理性能のベンチマーク
+
+実際のSupabaseには接続せず、PostgRESTの往復時間を模したフェイククライアントを
+FastAPIアプリに差し込み、同時リクエスト数を増やしたときのスループットを計測する。
+
+- blocking: 旧実装相当（execute() が time.sleep でイベントループを止める）
+- async   : 現実装（execute() が await され、待ち時間中に他のリクエストが進む）
+
+使い方:
+    python scripts/benchmark_db_concurrency.py --latency-ms 50 --requests 128
+"""
+
+import argparse
+import asyncio
+import os
+import sys
+import time
+from types import SimpleNamespace
+
+# パスを通す（backendディレクトリをルートとしてappモジュールをインポートするため）
+sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
+
+# 設定クラスの必須項目（ベンチマークでは実際には使わない）
+os.environ.setdefault("SUPABASE_URL", "http://localhost:54321")
+os.environ.setdefault("SUPABASE_KEY", "benchmark")
+os.environ.setdefault("GEMINI_API_KEY", "benchmark")
+
+import httpx  # noqa: E402
+
+from app.api.deps import get_current_user  # type: ignore # noqa: E402
+from app.db.client import get_supabase  # type: ignore # noqa: E402
+from app.main import app  # type: ignore # noqa: E402
+
+CONCURRENCY_LEVELS = [1, 4, 16, 64]
+
+
+class FakeQuery:
+    """supabaseのクエリビルダーを模したクラス（チェーン呼び出しをすべて受け付ける）"""
+
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+
+    def __getattr__(self, name):
+        return lambda *args, **kwargs: self
+
+    async def execute(self):
+        if self.blocking:
+            time.sleep(self.latency)
+        else:
+            await asyncio.sleep(self.latency)
+        return SimpleNamespace(data=[], count=0)
+
+
+class FakeSupabase:
+    def __init__(self, latency: float, blocking: bool):
+        self.latency = latency
+        self.blocking = blocking
+
+    def table(self, name: str) -> FakeQuery:
+        return FakeQuery(self.latency, self.blocking)
+
+
+async def run_level(
+    client: httpx.AsyncClient, concurrency: int, total_requests: int
+) -> float:
+    """指定した同時実行数で total_requests 件を処理し、req/s を返す"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def one_request():
+        async with semaphore:
+            res = await client.get("/api/v1/weeks")
+            res.raise_for_status()
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one_request() for _ in range(total_requests)))
+    elapsed = time.perf_counter() - started
+    return total_requests / elapsed
+
+
+async def main(latency_ms: float, total_requests: int):
+    latency = latency_ms / 1000
+    app.dependency_overrides[get_current_user] = lambda: SimpleNamespace(id="bench")
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(
+        transport=transport, base_url="http://bench"
+    ) as client:
+        print(f"DB latency: {latency_ms}ms / requests per level: {total_requests}")
+        print(f"{'concurrency':>12} {'blocking req/s':>16} {'async req/s':>14}")
+
+        for concurrency in CONCURRENCY_LEVELS:
+            results = {}
+            for mode in ("blocking", "async"):
+                fake = FakeSupabase(latency, blocking=(mode == "blocking"))
+                app.dependency_overrides[get_supabase] = lambda fake=fake: fake
+                results[mode] = await run_level(client, concurrency, total_requests)
+
+            print(
+                f"{concurrency:>12} {results['blocking']:>16.1f} {results['async']:>14.1f}"
+            )
+
+    app.dependency_overrides.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--latency-ms", type=float, default=50)
+    parser.add_argument("--requests", type=int, default=128)
+    args = parser.parse_args()
+
+    asyncio.run(main(args.latency_ms, args.requests))
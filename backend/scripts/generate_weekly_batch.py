@@ -8,8 +8,10 @@ from dotenv import load_dotenv
 # パスを通す（backendディレクトリをルートとしてappモジュールをインポートするため）
 sys.path.append(os.path.join(os.path.dirname(__file__), ".."))
 
-from supabase import create_client, Client
+from supabase import acreate_client
+from app.services.ai_cache import AIResponseCache  # type: ignore
 from app.services.ai_service import AIService  # type: ignore
+from app.services.batch_service import WeeklyBatchService, batch_ai_caller  # type: ignore
 from app.core.config import settings  # type: ignore
 
 # ローカル実行用（.env読み込み）
@@ -22,9 +24,15 @@ async def main():
     # バッチ用権限設定
     supabase_url = settings.SUPABASE_URL
     supabase_key = os.environ.get("SUPABASE_SERVICE_ROLE_KEY", settings.SUPABASE_KEY)
-    supabase = create_client(supabase_url, supabase_key)
-
-    service = WeeklyBatchService(supabase)
+    supabase = await acreate_client(supabase_url, supabase_key)
+
+    # 再実行時に同じ週の生成結果を使い回せるよう、AI応答キャッシュを有効にする
+    # Geminiへの送信は対話的なリクエストと共有のレート制限に従う（一部のトークンは残す）
+    ai_service = AIService(
+        cache=AIResponseCache.from_settings(supabase),
+        caller=batch_ai_caller(supabase),
+    )
+    service = WeeklyBatchService(supabase, ai_service=ai_service)
 
     # 実行
     results = await service.run_weekly_batch()
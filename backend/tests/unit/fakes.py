@@ -0,0 +1,219 @@
+# backend/tests/unit/fakes.py
+"""テスト用のフェイク実装（Gemini APIのストリーミング応答など）"""
+
+import asyncio
+import json
+from types import SimpleNamespace
+
+from google.genai import errors
+
+
+async def fake_gemini_stream(chunks: list[str], error: Exception | None = None):
+    """generate_content_stream の戻り値を模した非同期イテレータ
+
+    Args:
+        chunks: 順に返すテキスト断片
+        error: 指定した場合、全断片を返した後にこの例外を送出する（途中切断の再現用）
+    """
+    for text in chunks:
+        yield SimpleNamespace(text=text)
+
+    if error is not None:
+        raise error
+
+
+def gemini_error(code: int, status: str = "UNAVAILABLE") -> errors.APIError:
+    """Gemini APIが返すエラー（429/503など）を模した例外"""
+    error_class = errors.ServerError if code >= 500 else errors.ClientError
+    return error_class(
+        code, {"error": {"code": code, "message": status, "status": status}}
+    )
+
+
+class FakeGeminiModels:
+    """client.aio.models を模したクラス（generate_content の結果を順番に返す）
+
+    outcomes には呼び出しごとの (遅延秒数, 戻り値 or 例外) を並べる。
+    使い切った後は最後の要素を繰り返す。
+    """
+
+    def __init__(self, outcomes: list[tuple[float, object]]):
+        self.outcomes = outcomes
+        self.calls = 0
+        self.cancelled = 0
+        self.requests: list[dict] = []
+
+    async def generate_content(self, **kwargs):
+        delay, outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)]
+        self.calls += 1
+        self.requests.append(kwargs)
+        try:
+            await asyncio.sleep(delay)
+        except asyncio.CancelledError:
+            self.cancelled += 1
+            raise
+        if isinstance(outcome, Exception):
+            raise outcome
+        return outcome
+
+    async def generate_content_stream(self, **kwargs):
+        """ストリーミング版（outcome にはテキスト断片のリスト or 例外を指定する）
+
+        実際のSDKと同じく、リクエストは最初の断片を読むときに送られる（エラーもそのときに送出する）。
+        """
+        outcome = self.outcomes[min(self.calls, len(self.outcomes) - 1)][1]
+        self.calls += 1
+        self.requests.append(kwargs)
+        if isinstance(outcome, Exception):
+            return fake_gemini_stream([], outcome)
+        return fake_gemini_stream(outcome)
+
+
+class FakeContextCacheBackend:
+    """ContextCacheBackend を模したクラス（作成・延長・削除の呼び出しを記録する）
+
+    fail_create を指定した場合、create はその例外を送出する。
+    """
+
+    def __init__(self, fail_create: Exception | None = None):
+        self.fail_create = fail_create
+        self.created: list[str] = []
+        self.refreshed: list[str] = []
+        self.deleted: list[str] = []
+
+    async def create(self, model: str, prefix, ttl_seconds: int) -> str:
+        if self.fail_create is not None:
+            raise self.fail_create
+        name = f"cachedContents/{prefix.name}-{len(self.created)}"
+        self.created.append(name)
+        return name
+
+    async def refresh(self, name: str, ttl_seconds: int) -> None:
+        self.refreshed.append(name)
+
+    async def delete(self, name: str) -> None:
+        self.deleted.append(name)
+
+
+class FakeTableQuery:
+    """supabase の table() のクエリを模したクラス
+
+    行（dict）のリストに対して select 以降の絞り込み・並べ替え・件数制限を行う。
+    値は文字列のまま比較する（UUID・ISO形式の日付は文字列の大小と順序が一致する）。
+    """
+
+    def __init__(self, rows: list[dict]):
+        self.rows = rows
+        self.filters: list[tuple[str, str, object]] = []
+        self.orders: list[str] = []
+        self.row_limit: int | None = None
+
+    def select(self, columns: str):
+        return self
+
+    def _filter(self, column: str, op: str, value: object):
+        self.filters.append((column, op, value))
+        return self
+
+    def eq(self, column: str, value: object):
+        return self._filter(column, "eq", value)
+
+    def gt(self, column: str, value: object):
+        return self._filter(column, "gt", value)
+
+    def gte(self, column: str, value: object):
+        return self._filter(column, "gte", value)
+
+    def lte(self, column: str, value: object):
+        return self._filter(column, "lte", value)
+
+    def in_(self, column: str, values: list):
+        return self._filter(column, "in", values)
+
+    def or_(self, expression: str):
+        return self._filter("", "or", expression)
+
+    def order(self, column: str):
+        self.orders.append(column)
+        return self
+
+    def limit(self, count: int):
+        self.row_limit = count
+        return self
+
+    async def execute(self):
+        rows = [row for row in self.rows if all(_matches(row, f) for f in self.filters)]
+        rows.sort(key=lambda row: [row[column] for column in self.orders])
+        if self.row_limit is not None:
+            rows = rows[: self.row_limit]
+        return SimpleNamespace(data=[dict(row) for row in rows])
+
+
+def _matches(row: dict, condition: tuple[str, str, object]) -> bool:
+    column, op, value = condition
+    if op == "or":
+        return any(_matches_and(row, part) for part in _split_or(str(value)))
+    if op == "in":
+        return row[column] in value  # type: ignore
+    return {
+        "eq": row[column] == value,
+        "gt": row[column] > value,  # type: ignore
+        "gte": row[column] >= value,  # type: ignore
+        "lte": row[column] <= value,  # type: ignore
+    }[op]
+
+
+def _split_or(expression: str) -> list[str]:
+    """or_ の条件をトップレベルのカンマで分割する"""
+    parts, depth, current = [], 0, ""
+    for char in expression:
+        if char == "," and depth == 0:
+            parts.append(current)
+            current = ""
+            continue
+        depth += {"(": 1, ")": -1}.get(char, 0)
+        current += char
+    return [*parts, current]
+
+
+def _matches_and(row: dict, part: str) -> bool:
+    """ "col.op.value" または "and(col.op.value,...)" の条件を判定する"""
+    if part.startswith("and("):
+        conditions = part[len("and(") : -1].split(",")
+    else:
+        conditions = [part]
+    for condition in conditions:
+        column, op, value = condition.split(".", 2)
+        if not _matches(row, (column, op, value)):
+            return False
+    return True
+
+
+class FakeSupabaseTables:
+    """supabase.table() を模したクラス（テーブル名ごとの行に対してクエリを実行し、記録する）"""
+
+    def __init__(self, tables: dict[str, list[dict]] | None = None):
+        self.tables = tables or {}
+        self.queries: dict[str, list[FakeTableQuery]] = {}
+
+    def table(self, name: str) -> FakeTableQuery:
+        query = FakeTableQuery(self.tables.setdefault(name, []))
+        self.queries.setdefault(name, []).append(query)
+        return query
+
+
+async def collect_body(response) -> str:
+    """StreamingResponse の本文をすべて読み出して文字列で返す"""
+    body = ""
+    async for part in response.body_iterator:
+        body += part if isinstance(part, str) else part.decode()
+    return body
+
+
+def parse_sse(body: str) -> list[tuple[str, dict]]:
+    """SSEの本文を (event, data) のリストに変換する"""
+    events = []
+    for block in body.strip().split("\n\n"):
+        lines = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((lines["event"], json.loads(lines["data"])))
+    return events
@@ -0,0 +1,154 @@
+# backend/tests/unit/test_ai_cache.py
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.models.project import WBSResponse
+from app.models.report import DailyReportPolished
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_service import AIService
+
+
+class TestAIResponseCache(unittest.IsolatedAsyncioTestCase):
+    """AI応答キャッシュの単体テスト"""
+
+    def setUp(self):
+        self.mock_supabase = MagicMock()
+        # 共有テーブルの読み込み: table().select().eq().gt().limit().execute()
+        self.mock_shared_read = self.mock_supabase.table.return_value.select.return_value.eq.return_value.gt.return_value.limit.return_value
+        self.mock_shared_read.execute = AsyncMock(return_value=MagicMock(data=[]))
+        # 共有テーブルへの書き込み: table().upsert().execute()
+        self.mock_shared_write = (
+            self.mock_supabase.table.return_value.upsert.return_value
+        )
+        self.mock_shared_write.execute = AsyncMock()
+        # 期限切れの行の削除: table().delete().lt().execute()
+        self.mock_shared_purge = (
+            self.mock_supabase.table.return_value.delete.return_value.lt.return_value
+        )
+        self.mock_shared_purge.execute = AsyncMock()
+
+        self.cache = AIResponseCache(self.mock_supabase, max_entries=10)
+
+    def test_make_key_depends_on_model_prompt_and_schema(self):
+        """キーはモデル名・プロンプト・スキーマのいずれが変わっても変わる"""
+        base = AIResponseCache.make_key("gemini-a", "prompt", DailyReportPolished)
+
+        self.assertEqual(
+            base, AIResponseCache.make_key("gemini-a", "prompt", DailyReportPolished)
+        )
+        self.assertNotEqual(
+            base, AIResponseCache.make_key("gemini-b", "prompt", DailyReportPolished)
+        )
+        self.assertNotEqual(
+            base, AIResponseCache.make_key("gemini-a", "other", DailyReportPolished)
+        )
+        self.assertNotEqual(
+            base, AIResponseCache.make_key("gemini-a", "prompt", WBSResponse)
+        )
+        self.assertNotEqual(base, AIResponseCache.make_key("gemini-a", "prompt", None))
+
+    async def test_set_then_get_hits_memory(self):
+        """正常系: 書き込んだ値はプロセス内キャッシュから返る"""
+        await self.cache.set("key1", "value1", "gemini")
+
+        self.assertEqual(await self.cache.get("key1"), "value1")
+        self.assertEqual(self.cache.stats()["memory_hits"], 1)
+        self.mock_shared_read.execute.assert_not_called()
+        # 共有テーブルにも書き込まれている
+        self.mock_shared_write.execute.assert_awaited_once()
+
+    async def test_get_falls_back_to_shared_tier(self):
+        """正常系: プロセス内にない場合は共有テーブルから取得し、以降はメモリから返す"""
+        self.mock_shared_read.execute.return_value = MagicMock(
+            data=[{"response": "shared-value"}]
+        )
+
+        self.assertEqual(await self.cache.get("key1"), "shared-value")
+        self.assertEqual(await self.cache.get("key1"), "shared-value")
+
+        stats = self.cache.stats()
+        self.assertEqual(stats["shared_hits"], 1)
+        self.assertEqual(stats["memory_hits"], 1)
+        self.mock_shared_read.execute.assert_awaited_once()
+
+    async def test_get_miss(self):
+        """正常系: どちらにもない場合はNoneを返し、ミスとして数える"""
+        self.assertIsNone(await self.cache.get("missing"))
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    async def test_shared_tier_error_is_treated_as_miss(self):
+        """異常系: 共有テーブルの読み込みに失敗してもミス扱いで続行する"""
+        self.mock_shared_read.execute.side_effect = Exception("DB Error")
+
+        self.assertIsNone(await self.cache.get("key1"))
+        self.assertEqual(self.cache.stats()["misses"], 1)
+
+    async def test_set_purges_expired_rows_at_interval(self):
+        """正常系: 書き込み時に期限切れの行を削除し、間隔内は再実行しない"""
+        await self.cache.set("key1", "value1", "gemini")
+        await self.cache.set("key2", "value2", "gemini")
+
+        self.mock_shared_purge.execute.assert_awaited_once()
+        column, _ = (
+            self.mock_supabase.table.return_value.delete.return_value.lt.call_args.args
+        )
+        self.assertEqual(column, "expires_at")
+
+        # 間隔が経過した後の書き込みで再び削除する
+        self.cache._purged_at -= self.cache.purge_interval_seconds
+        await self.cache.set("key3", "value3", "gemini")
+        self.assertEqual(self.mock_shared_purge.execute.await_count, 2)
+
+    async def test_purge_error_does_not_fail_set(self):
+        """異常系: 期限切れの行の削除に失敗しても書き込みは続行する"""
+        self.mock_shared_purge.execute.side_effect = Exception("DB Error")
+
+        await self.cache.set("key1", "value1", "gemini")
+
+        self.mock_shared_write.execute.assert_awaited_once()
+        self.assertEqual(await self.cache.get("key1"), "value1")
+
+
+class TestAIServiceWithCache(unittest.IsolatedAsyncioTestCase):
+    """AIServiceとキャッシュの結合テスト（Gemini APIはモック）"""
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_polish_report_second_call_uses_cache(self, MockClient):
+        """同じ入力で2回呼んだ場合、Gemini APIは1回しか呼ばれない"""
+        mock_client_instance = MockClient.return_value
+        mock_response = MagicMock()
+        mock_response.parsed = DailyReportPolished(
+            subject="件名", content_polished="本文", politeness_level=3
+        )
+        mock_client_instance.aio.models.generate_content = AsyncMock(
+            return_value=mock_response
+        )
+
+        service = AIService(cache=AIResponseCache(None))
+
+        first = await service.polish_report("サーバー復旧")
+        second = await service.polish_report("サーバー復旧")
+
+        self.assertEqual(first, second)
+        mock_client_instance.aio.models.generate_content.assert_called_once()
+        self.assertEqual(service.cache.stats()["memory_hits"], 1)
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_failed_generation_is_not_cached(self, MockClient):
+        """異常系: 生成に失敗した場合はキャッシュせず、次回は再度APIを呼ぶ"""
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.models.generate_content = AsyncMock(
+            side_effect=Exception("API Error")
+        )
+
+        service = AIService(cache=AIResponseCache(None))
+        reports = [{"report_date": "2024-01-08", "content_raw": "作業"}]
+
+        await service.generate_weekly_summary(reports)
+        await service.generate_weekly_summary(reports)
+
+        self.assertEqual(mock_client_instance.aio.models.generate_content.call_count, 2)
+
+
+if __name__ == "__main__":
+    unittest.main()
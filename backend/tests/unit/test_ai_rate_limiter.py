@@ -0,0 +1,178 @@
+# backend/tests/unit/test_ai_rate_limiter.py
+import unittest
+from types import SimpleNamespace
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.ai_rate_limiter import (
+    AIRateLimiter,
+    LocalRateLimitBackend,
+    RateLimitConfig,
+    SupabaseRateLimitBackend,
+)
+from app.services.ai_resilience import ResilientCaller
+from app.services.ai_service import AIService
+from tests.unit.fakes import FakeGeminiModels, gemini_error
+
+CONFIG = RateLimitConfig(
+    max_rpm=60,
+    min_rpm=6,
+    burst=2,
+    increase_rpm=1,
+    decrease_factor=0.5,
+    decrease_cooldown=5,
+)
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestLocalRateLimitBackend(unittest.IsolatedAsyncioTestCase):
+    """トークンバケット + AIMD の単体テスト（ローカルバックエンド）"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = LocalRateLimitBackend(CONFIG, clock=self.clock)
+
+    async def test_bucket_allows_burst_then_waits_for_refill(self):
+        """正常系: 容量分は即座に取得でき、それ以降は補充されるまで待つ"""
+        self.assertEqual(await self.backend.acquire("gemini"), 0)
+        self.assertEqual(await self.backend.acquire("gemini"), 0)
+        # 60rpm = 1秒に1トークン
+        self.assertAlmostEqual(await self.backend.acquire("gemini"), 1.0)
+
+        self.clock.now = 1.0
+        self.assertEqual(await self.backend.acquire("gemini"), 0)
+
+    async def test_reserve_leaves_tokens_for_others(self):
+        """正常系: reserve を指定した取得は、その数のトークンを残して待つ"""
+        self.assertGreater(await self.backend.acquire("gemini", reserve=2), 0)
+        # 予約なしの取得はそのまま成功する
+        self.assertEqual(await self.backend.acquire("gemini"), 0)
+
+    async def test_aimd_adjusts_rate(self):
+        """正常系: 429 で半減（下限あり）、成功で加算（上限あり）"""
+        self.assertEqual(await self.backend.adjust("gemini", throttled=True), 30)
+
+        # 同じ輻輳による連続した429では下げない
+        self.clock.now = 1
+        self.assertEqual(await self.backend.adjust("gemini", throttled=True), 30)
+
+        self.clock.now = 10
+        self.assertEqual(await self.backend.adjust("gemini", throttled=True), 15)
+        self.assertEqual(await self.backend.adjust("gemini", throttled=False), 16)
+
+        for step in range(3):
+            self.clock.now = 20 + step * 10
+            await self.backend.adjust("gemini", throttled=True)
+        self.assertEqual(await self.backend.adjust("gemini", throttled=True), 6)
+
+        for _ in range(100):
+            rate = await self.backend.adjust("gemini", throttled=False)
+        self.assertEqual(rate, 60)
+
+    async def test_throttled_drains_bucket(self):
+        """正常系: 429 を受けたらバケットを空にし、下げたレートで補充を待つ"""
+        await self.backend.adjust("gemini", throttled=True)
+
+        # 30rpm = 2秒に1トークン
+        self.assertAlmostEqual(await self.backend.acquire("gemini"), 2.0)
+
+
+class TestAIRateLimiter(unittest.IsolatedAsyncioTestCase):
+    """AIRateLimiter と ResilientCaller の連携テスト"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.sleeps: list[float] = []
+
+        async def fake_sleep(seconds: float):
+            self.sleeps.append(seconds)
+            self.clock.now += seconds
+
+        self.fake_sleep = fake_sleep
+        self.backend = LocalRateLimitBackend(CONFIG, clock=self.clock)
+        self.limiter = AIRateLimiter(self.backend, sleep=fake_sleep)
+
+    async def test_acquire_waits_until_token_is_available(self):
+        """正常系: トークンがなければ補充されるまで待ってから取得する"""
+        for _ in range(3):
+            await self.limiter.acquire()
+
+        self.assertEqual(self.sleeps, [1.0])
+
+    async def test_caller_reports_outcomes_to_limiter(self):
+        """正常系: 429 でレートが下がり、再試行の成功で上がる"""
+        caller = ResilientCaller(
+            limiter=self.limiter, sleep=self.fake_sleep, rand=lambda: 0
+        )
+        models = FakeGeminiModels(
+            [(0, gemini_error(429, "RESOURCE_EXHAUSTED")), (0, SimpleNamespace())]
+        )
+
+        await caller.call("test", lambda: models.generate_content())
+
+        self.assertEqual(models.calls, 2)
+        # 60 → 30 (429) → 31 (成功)
+        self.assertEqual(self.backend._buckets["gemini"].rate, 31)
+        # 429 でバケットが空になったため、再試行の前に補充を待つ
+        self.assertEqual(self.sleeps, [0, 60 / 30])
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_stream_goes_through_limiter(self, MockClient):  # noqa: N803
+        """正常系: ストリーミング生成もトークンを取得し、最初の断片での429を通知して再試行する"""
+        models = FakeGeminiModels(
+            [(0, gemini_error(429, "RESOURCE_EXHAUSTED")), (0, ["週報", "本文"])]
+        )
+        MockClient.return_value.aio.models = models
+        caller = ResilientCaller(
+            limiter=self.limiter, sleep=self.fake_sleep, rand=lambda: 0
+        )
+        service = AIService(caller=caller)
+
+        chunks = [
+            text
+            async for text in service.stream_weekly_summary(
+                [{"report_date": "2024-01-08", "content_raw": "API実装"}]
+            )
+        ]
+
+        self.assertEqual(chunks, ["週報", "本文"])
+        self.assertEqual(models.calls, 2)
+        # 60 → 30 (429) → 31 (成功)
+        self.assertEqual(self.backend._buckets["gemini"].rate, 31)
+
+
+class TestSupabaseRateLimitBackend(unittest.IsolatedAsyncioTestCase):
+    """共有バックエンド（DB関数の呼び出し）の単体テスト"""
+
+    async def test_acquire_calls_rpc(self):
+        """正常系: DB関数にバケットの設定を渡し、待ち秒数を返す"""
+        supabase = MagicMock()
+        supabase.rpc.return_value.execute = AsyncMock(return_value=MagicMock(data=1.5))
+        backend = SupabaseRateLimitBackend(supabase, CONFIG)
+
+        wait = await backend.acquire("gemini", reserve=3)
+
+        self.assertEqual(wait, 1.5)
+        name, params = supabase.rpc.call_args.args
+        self.assertEqual(name, "acquire_ai_rate_limit")
+        self.assertEqual(params["p_reserve"], 3)
+        self.assertEqual(params["p_max_rpm"], 60)
+
+    async def test_db_error_does_not_block_ai_calls(self):
+        """異常系: DBに接続できない場合は待たずにAIを呼ぶ"""
+        supabase = MagicMock()
+        supabase.rpc.return_value.execute = AsyncMock(side_effect=Exception("DB Error"))
+        backend = SupabaseRateLimitBackend(supabase, CONFIG)
+
+        self.assertEqual(await backend.acquire("gemini"), 0)
+        self.assertEqual(await backend.adjust("gemini", throttled=False), 60)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,220 @@
+# backend/tests/unit/test_ai_resilience.py
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from google.genai import errors
+
+from app.models.project import WBSRequest, WBSResponse
+from app.services.ai_resilience import (
+    CircuitBreaker,
+    CircuitOpenError,
+    ResilientCaller,
+    RetryPolicy,
+)
+from app.services.ai_service import AIService
+from tests.unit.fakes import FakeGeminiModels, gemini_error
+
+OK = SimpleNamespace(text="ok")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestResilientCaller(unittest.IsolatedAsyncioTestCase):
+    """ResilientCaller（再試行・サーキットブレーカー・ヘッジ）の単体テスト"""
+
+    def setUp(self):
+        self.sleeps: list[float] = []
+
+        async def fake_sleep(seconds: float):
+            self.sleeps.append(seconds)
+
+        self.clock = FakeClock()
+        self.caller = ResilientCaller(
+            retry=RetryPolicy(max_attempts=3, base_delay=0.5, max_delay=8.0),
+            breaker=CircuitBreaker(
+                failure_threshold=3, reset_timeout=30, clock=self.clock
+            ),
+            sleep=fake_sleep,
+            rand=lambda: 0.5,
+        )
+
+    def call(self, models: FakeGeminiModels):
+        return self.caller.call("test", lambda: models.generate_content())
+
+    async def test_retries_transient_errors_with_backoff(self):
+        """正常系: 429/503 は指数バックオフ（ジッター付き）で再試行され、成功すれば結果を返す"""
+        models = FakeGeminiModels(
+            [
+                (0, gemini_error(503)),
+                (0, gemini_error(429, "RESOURCE_EXHAUSTED")),
+                (0, OK),
+            ]
+        )
+
+        result = await self.call(models)
+
+        self.assertIs(result, OK)
+        self.assertEqual(models.calls, 3)
+        # rand=0.5 のため、上限(0.5s, 1.0s)のちょうど半分
+        self.assertEqual(self.sleeps, [0.25, 0.5])
+        self.assertEqual(self.caller.breaker.state, "closed")
+
+    async def test_non_transient_error_is_not_retried(self):
+        """異常系: 400 などリクエスト自体の誤りは再試行しない"""
+        models = FakeGeminiModels([(0, gemini_error(400, "INVALID_ARGUMENT"))])
+
+        with self.assertRaises(errors.APIError):
+            await self.call(models)
+
+        self.assertEqual(models.calls, 1)
+        self.assertEqual(self.sleeps, [])
+
+    async def test_gives_up_after_max_attempts(self):
+        """異常系: 最大試行回数を使い切ったら最後のエラーを送出する"""
+        models = FakeGeminiModels([(0, gemini_error(503))])
+
+        with self.assertRaises(errors.APIError) as ctx:
+            await self.call(models)
+
+        self.assertEqual(ctx.exception.code, 503)
+        self.assertEqual(models.calls, 3)
+
+    async def test_circuit_opens_and_fails_fast(self):
+        """異常系: 一時的なエラーが続くと呼び出さずに即座に失敗し、一定時間後の試行で復帰する"""
+        down = FakeGeminiModels([(0, gemini_error(503))])
+
+        with self.assertRaises(errors.APIError):
+            await self.call(down)
+        self.assertEqual(self.caller.breaker.state, "open")
+
+        # open の間はGeminiを呼ばない
+        with self.assertRaises(CircuitOpenError):
+            await self.call(down)
+        self.assertEqual(down.calls, 3)
+
+        # reset_timeout 経過後は1件だけ試行を通し、成功すれば closed に戻る
+        self.clock.now = 30
+        self.assertEqual(self.caller.breaker.state, "half_open")
+        result = await self.call(FakeGeminiModels([(0, OK)]))
+
+        self.assertIs(result, OK)
+        self.assertEqual(self.caller.breaker.state, "closed")
+
+    async def test_half_open_failure_reopens(self):
+        """異常系: half_open での試行が失敗したら再び open に戻る"""
+        for _ in range(3):
+            self.caller.breaker.record_failure()
+        self.clock.now = 30
+
+        with self.assertRaises(CircuitOpenError):
+            await self.call(FakeGeminiModels([(0, gemini_error(503))]))
+
+        self.assertEqual(self.caller.breaker.state, "open")
+
+    async def test_cancelled_half_open_trial_releases_slot(self):
+        """異常系: half_open での試行がキャンセルされても、次の呼び出しは再び試行される"""
+        for _ in range(3):
+            self.caller.breaker.record_failure()
+        self.clock.now = 30
+
+        slow = FakeGeminiModels([(10, OK)])
+        trial = asyncio.ensure_future(self.call(slow))
+        await asyncio.sleep(0)
+        trial.cancel()
+        with self.assertRaises(asyncio.CancelledError):
+            await trial
+        self.assertEqual(slow.cancelled, 1)
+
+        models = FakeGeminiModels([(0, OK)])
+        result = await self.call(models)
+
+        self.assertIs(result, OK)
+        self.assertEqual(models.calls, 1)
+        self.assertEqual(self.caller.breaker.state, "closed")
+
+    async def test_hedges_slow_requests(self):
+        """正常系: p95 を超えても応答がなければ2本目を送り、先に返った方を使う"""
+        caller = ResilientCaller(hedge=True, hedge_min_delay=0.01)
+        fast = FakeGeminiModels([(0, OK)])
+        for _ in range(20):
+            await caller.call("test", lambda: fast.generate_content())
+        self.assertEqual(caller.hedge_delay("test"), 0.01)
+
+        hedged = SimpleNamespace(text="hedged")
+        models = FakeGeminiModels([(10, OK), (0, hedged)])
+
+        result = await caller.call("test", lambda: models.generate_content())
+
+        self.assertIs(result, hedged)
+        self.assertEqual(models.calls, 2)
+        # 遅い方のリクエストはキャンセルされる
+        await asyncio.sleep(0)
+        self.assertEqual(models.cancelled, 1)
+
+    async def test_no_hedge_until_latency_is_known(self):
+        """正常系: レイテンシの統計が揃うまではヘッジしない"""
+        caller = ResilientCaller(hedge=True, hedge_min_delay=0)
+        models = FakeGeminiModels([(0.01, OK)])
+
+        await caller.call("test", lambda: models.generate_content())
+
+        self.assertIsNone(caller.hedge_delay("test"))
+        self.assertEqual(models.calls, 1)
+
+
+class TestAIServiceResilience(unittest.IsolatedAsyncioTestCase):
+    """AIServiceがResilientCaller経由でGeminiを呼ぶことの確認"""
+
+    def setUp(self):
+        self.request = WBSRequest(
+            name="テストプロジェクト",
+            description="これはテストです",
+            start_date="2024-04-01",
+            end_date="2024-04-30",
+        )
+
+    async def _fake_sleep(self, seconds: float):
+        pass
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_transient_error_is_retried(self, MockClient):  # noqa: N803
+        """正常系: 503 が返っても再試行で成功すればフォールバックにならない"""
+        models = FakeGeminiModels(
+            [
+                (0, gemini_error(503)),
+                (0, SimpleNamespace(parsed=WBSResponse(tasks=[]), text="")),
+            ]
+        )
+        MockClient.return_value.aio.models = models
+        service = AIService(caller=ResilientCaller(sleep=self._fake_sleep))
+
+        result = await service.generate_wbs(self.request)
+
+        self.assertIsInstance(result, WBSResponse)
+        self.assertEqual(models.calls, 2)
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_open_circuit_returns_fallback_without_calling(self, MockClient):  # noqa: N803
+        """異常系: ブレーカーが開いている間はGeminiを呼ばずにフォールバックを返す"""
+        models = FakeGeminiModels([(0, OK)])
+        MockClient.return_value.aio.models = models
+        breaker = CircuitBreaker(failure_threshold=1)
+        breaker.record_failure()
+        service = AIService(caller=ResilientCaller(breaker=breaker))
+
+        result = await service.generate_wbs(self.request)
+
+        self.assertEqual(result.tasks, [])
+        self.assertEqual(models.calls, 0)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -1,10 +1,14 @@
 # backend/tests/unit/test_ai_service.py
 import unittest
-from unittest.mock import MagicMock, AsyncMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
-from app.services.ai_service import AIService
+
+from google.genai import errors
+
 from app.models.project import WBSRequest, WBSResponse, WBSTask
 from app.models.report import DailyReportPolished, WorkLogExtraction
+from app.services.ai_service import AIService
+from tests.unit.fakes import gemini_error
 
 
 class TestAIService(unittest.IsolatedAsyncioTestCase):
@@ -234,15 +238,12 @@ class TestAIService(unittest.IsolatedAsyncioTestCase):
             "custom_instructions": "技術用語を積極的に使用してください",
         }
 
-        result = await service.generate_report_with_logs(
-            "API開発", 3, [], ai_settings
-        )
+        result = await service.generate_report_with_logs("API開発", 3, [], ai_settings)
 
         self.assertIsInstance(result, DailyReportPolished)
         # カスタム指示が適用されていることを確認
         mock_client_instance.aio.models.generate_content.assert_called_once()
 
-
     @patch("app.services.ai_service.genai.Client")
     async def test_generate_weekly_summary_success(self, MockClient):
         """正常系: 週報生成が成功するケース"""
@@ -283,6 +284,24 @@ class TestAIService(unittest.IsolatedAsyncioTestCase):
         # APIが1回呼ばれたことを確認
         mock_client_instance.aio.models.generate_content.assert_called_once()
 
+    @patch("app.services.ai_service.genai.Client")
+    async def test_generate_weekly_summary_failure(self, MockClient):
+        """異常系: 生成に失敗した場合、既定ではエラー時の文面を返し、fallback=False では例外を送出する"""
+
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.models.generate_content = AsyncMock(
+            side_effect=gemini_error(400, "INVALID_ARGUMENT")
+        )
+
+        service = AIService()
+        daily_reports = [{"report_date": "2024-01-01", "content_raw": "タスクAやった"}]
+
+        result = await service.generate_weekly_summary(daily_reports)
+        self.assertIn("週報の生成に失敗しました", result)
+
+        with self.assertRaises(errors.ClientError):
+            await service.generate_weekly_summary(daily_reports, fallback=False)
+
     @patch("app.services.ai_service.genai.Client")
     async def test_generate_weekly_summary_no_data(self, MockClient):
         """正常系: 日報データが空の場合、APIを呼ばずに終了するケース"""
@@ -300,3 +319,30 @@ class TestAIService(unittest.IsolatedAsyncioTestCase):
         self.assertIn("日報データがありません", result)
         # ★重要: APIが「呼ばれていない」ことを確認（課金回避ロジックの検証）
         mock_client_instance.aio.models.generate_content.assert_not_called()
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_warm_up_failure_does_not_raise(self, MockClient):
+        """異常系: 起動時のウォームアップが失敗しても例外を投げない"""
+
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.models.get = AsyncMock(
+            side_effect=Exception("Network Error")
+        )
+
+        service = AIService()
+
+        # 例外が発生しないこと
+        await service.warm_up()
+        mock_client_instance.aio.models.get.assert_awaited_once()
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_aclose_closes_client(self, MockClient):
+        """正常系: aclose で genai クライアントの接続が閉じられる"""
+
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.aclose = AsyncMock()
+
+        service = AIService()
+        await service.aclose()
+
+        mock_client_instance.aio.aclose.assert_awaited_once()
@@ -0,0 +1,208 @@
+# backend/tests/unit/test_auth_service.py
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+import jwt
+from cryptography.hazmat.primitives.asymmetric import rsa
+
+from app.services.auth_service import (
+    SigningKeyUnavailableError,
+    TokenVerificationError,
+    TokenVerifier,
+)
+
+SECRET = "test-jwt-secret-with-enough-length-for-hs256"
+
+
+def make_claims(**overrides) -> dict:
+    now = int(time.time())
+    claims = {
+        "sub": str(uuid4()),
+        "aud": "authenticated",
+        "role": "authenticated",
+        "email": "user@example.com",
+        "iat": now,
+        "exp": now + 3600,
+    }
+    claims.update(overrides)
+    return claims
+
+
+def make_rsa_jwk(kid: str):
+    """RSA鍵ペアを生成し、(秘密鍵, JWKS用の公開鍵dict) を返す"""
+    private_key = rsa.generate_private_key(public_exponent=65537, key_size=2048)
+    public_jwk = jwt.algorithms.RSAAlgorithm.to_jwk(
+        private_key.public_key(), as_dict=True
+    )
+    public_jwk.update({"kid": kid, "alg": "RS256", "use": "sig"})
+    return private_key, public_jwk
+
+
+class TestTokenVerifier(unittest.IsolatedAsyncioTestCase):
+    """TokenVerifierの単体テスト
+    認証サーバーやJWKSエンドポイントには接続せず、ローカルで署名したトークンで検証する
+    """
+
+    def setUp(self):
+        self.verifier = TokenVerifier(
+            jwt_secret=SECRET, jwks_url="http://localhost/jwks.json"
+        )
+
+    async def test_verify_hs256_success(self):
+        """正常系: 共有シークレットで署名されたトークンを検証できる"""
+        claims = make_claims()
+        token = jwt.encode(claims, SECRET, algorithm="HS256")
+
+        user = await self.verifier.verify(token)
+
+        self.assertEqual(user.id, claims["sub"])
+        self.assertEqual(user.email, "user@example.com")
+        self.assertEqual(user.aud, "authenticated")
+
+    async def test_verify_uses_positive_cache(self):
+        """正常系: 2回目以降はキャッシュから返り、再デコードしない"""
+        token = jwt.encode(make_claims(), SECRET, algorithm="HS256")
+
+        first = await self.verifier.verify(token)
+        with patch("app.services.auth_service.jwt.decode") as mock_decode:
+            second = await self.verifier.verify(token)
+            mock_decode.assert_not_called()
+
+        self.assertIs(first, second)
+
+    async def test_verify_expired_token(self):
+        """異常系: 期限切れのトークンは拒否される"""
+        expired = make_claims(exp=int(time.time()) - 10)
+        token = jwt.encode(expired, SECRET, algorithm="HS256")
+
+        with self.assertRaises(TokenVerificationError):
+            await self.verifier.verify(token)
+
+    async def test_verify_invalid_signature_is_negatively_cached(self):
+        """異常系: 署名不正のトークンは拒否され、再検証せずに拒否される"""
+        token = jwt.encode(
+            make_claims(), "wrong-secret-wrong-secret-wrong-secret", "HS256"
+        )
+
+        with self.assertRaises(TokenVerificationError):
+            await self.verifier.verify(token)
+
+        with patch("app.services.auth_service.jwt.decode") as mock_decode:
+            with self.assertRaises(TokenVerificationError):
+                await self.verifier.verify(token)
+            mock_decode.assert_not_called()
+
+    async def test_verify_wrong_audience(self):
+        """異常系: audience が異なるトークンは拒否される"""
+        token = jwt.encode(make_claims(aud="anon"), SECRET, algorithm="HS256")
+
+        with self.assertRaises(TokenVerificationError):
+            await self.verifier.verify(token)
+
+    async def test_verify_rs256_with_key_rotation(self):
+        """正常系: 未知の kid を受け取るとJWKSを再取得して新しい鍵で検証する"""
+        old_key, old_jwk = make_rsa_jwk("key-1")
+        new_key, new_jwk = make_rsa_jwk("key-2")
+
+        old_set = jwt.PyJWKSet.from_dict({"keys": [old_jwk]})
+        rotated_set = jwt.PyJWKSet.from_dict({"keys": [old_jwk, new_jwk]})
+        self.verifier._fetch_jwks = AsyncMock(
+            side_effect=[
+                {k.key_id: k for k in old_set.keys},
+                {k.key_id: k for k in rotated_set.keys},
+            ]
+        )
+
+        old_token = jwt.encode(
+            make_claims(), old_key, algorithm="RS256", headers={"kid": "key-1"}
+        )
+        user = await self.verifier.verify(old_token)
+        self.assertIsNotNone(user.id)
+
+        # 鍵ローテーション後のトークン（最短再取得間隔は経過済みとみなす）
+        self.verifier._jwks_fetched_at -= 60
+        new_token = jwt.encode(
+            make_claims(), new_key, algorithm="RS256", headers={"kid": "key-2"}
+        )
+        user = await self.verifier.verify(new_token)
+        self.assertIsNotNone(user.id)
+
+        self.assertEqual(self.verifier._fetch_jwks.await_count, 2)
+
+    async def test_verify_unknown_kid_is_rejected(self):
+        """異常系: JWKSに存在しない kid のトークンは拒否される"""
+        _, known_jwk = make_rsa_jwk("key-1")
+        unknown_key, _ = make_rsa_jwk("key-x")
+        jwk_set = jwt.PyJWKSet.from_dict({"keys": [known_jwk]})
+        self.verifier._fetch_jwks = AsyncMock(
+            return_value={k.key_id: k for k in jwk_set.keys}
+        )
+
+        token = jwt.encode(
+            make_claims(), unknown_key, algorithm="RS256", headers={"kid": "key-x"}
+        )
+
+        with self.assertRaises(TokenVerificationError):
+            await self.verifier.verify(token)
+
+    async def test_verify_unknown_kid_within_refresh_interval_is_not_cached(self):
+        """異常系: 最短再取得間隔内の未知の kid は拒否するが、間隔の経過後に再検証できる"""
+        old_key, old_jwk = make_rsa_jwk("key-1")
+        new_key, new_jwk = make_rsa_jwk("key-2")
+
+        old_set = jwt.PyJWKSet.from_dict({"keys": [old_jwk]})
+        rotated_set = jwt.PyJWKSet.from_dict({"keys": [old_jwk, new_jwk]})
+        self.verifier._fetch_jwks = AsyncMock(
+            side_effect=[
+                {k.key_id: k for k in old_set.keys},
+                {k.key_id: k for k in rotated_set.keys},
+            ]
+        )
+
+        old_token = jwt.encode(
+            make_claims(), old_key, algorithm="RS256", headers={"kid": "key-1"}
+        )
+        await self.verifier.verify(old_token)
+
+        # JWKSを取得した直後に、ローテーション後の鍵で署名されたトークンが届く
+        new_token = jwt.encode(
+            make_claims(), new_key, algorithm="RS256", headers={"kid": "key-2"}
+        )
+        with self.assertRaises(SigningKeyUnavailableError):
+            await self.verifier.verify(new_token)
+        self.assertEqual(self.verifier._fetch_jwks.await_count, 1)
+
+        # 最短再取得間隔の経過後は、同じトークンを再取得した鍵で検証できる
+        self.verifier._jwks_fetched_at -= 60
+        user = await self.verifier.verify(new_token)
+        self.assertIsNotNone(user.id)
+        self.assertEqual(self.verifier._fetch_jwks.await_count, 2)
+
+    async def test_verify_falls_back_to_remote_without_secret(self):
+        """正常系: シークレット未設定のHS256トークンは認証サーバーで検証する"""
+        verifier = TokenVerifier(jwt_secret=None, jwks_url="http://localhost/jwks")
+        token = jwt.encode(make_claims(), SECRET, algorithm="HS256")
+
+        remote_user = MagicMock()
+        remote_verify = AsyncMock(return_value=remote_user)
+
+        user = await verifier.verify(token, remote_verify=remote_verify)
+        self.assertIs(user, remote_user)
+
+        # 2回目はキャッシュから返る
+        await verifier.verify(token, remote_verify=remote_verify)
+        remote_verify.assert_awaited_once()
+
+    async def test_verify_remote_rejection(self):
+        """異常系: 認証サーバーが拒否した場合はエラーになる"""
+        verifier = TokenVerifier(jwt_secret=None, jwks_url="http://localhost/jwks")
+        token = jwt.encode(make_claims(), SECRET, algorithm="HS256")
+
+        with self.assertRaises(TokenVerificationError):
+            await verifier.verify(token, remote_verify=AsyncMock(return_value=None))
+
+
+if __name__ == "__main__":
+    unittest.main()
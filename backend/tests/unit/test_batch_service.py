@@ -1,97 +1,323 @@
 # backend/tests/unit/test_batch_service.py
+import asyncio
 import unittest
-from unittest.mock import MagicMock, AsyncMock, patch
 from datetime import date
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.services.ai_resilience import ResilientCaller, RetryPolicy
+from app.services.ai_service import AIService
 from app.services.batch_service import WeeklyBatchService
+from tests.unit.fakes import FakeGeminiModels, FakeSupabaseTables, gemini_error
+
+
+def make_report(user_id: str, report_date: str, report_id: str) -> dict:
+    return {
+        "id": report_id,
+        "user_id": user_id,
+        "tenant_id": "tenant1",
+        "report_date": report_date,
+        "content_raw": "work",
+        "digest": None,
+    }
 
 
 class TestWeeklyBatchService(unittest.IsolatedAsyncioTestCase):
     """週報生成バッチの単体テスト"""
 
     def setUp(self):
-        # Supabaseクライアントのモック
+        # Supabaseクライアントのモック（テーブルは行のリストに対してクエリを実行するフェイク）
+        self.tables = FakeSupabaseTables()
         self.mock_supabase = MagicMock()
+        self.mock_supabase.table.side_effect = self.tables.table
         self.service = WeeklyBatchService(self.mock_supabase)
 
-        # AIサービスのモック (内部でインスタンス化されるため patch が必要だが、
-        # 簡易的にメソッドを差し替える手法をとるか、あるいは @patch でクラスごと置き換える)
+        # AIサービスのモック (内部でインスタンス化されるため、メソッドを差し替える)
         self.service.ai_service = MagicMock()
         self.service.ai_service.generate_weekly_summary = AsyncMock(
             return_value="AI Generated Summary"
         )
 
-    def test_run_weekly_batch_success(self):
-        """正常系: ユーザーがいて日報もある場合"""
+        # 保存・失敗の記録(rpc)のモック
+        self.mock_rpc = self.mock_supabase.rpc.return_value
+        self.mock_rpc.execute = AsyncMock(return_value=MagicMock(data=1))
 
-        # 1. ユーザー一覧のモック
-        mock_profiles = [{"id": "user1", "tenant_id": "tenant1"}]
-        self.mock_supabase.table.return_value.select.return_value.execute.return_value.data = (
-            mock_profiles
-        )
+    def _set_reports(self, *reports: dict):
+        self.tables.tables["daily_reports"] = list(reports)
 
-        # 2. 日報取得のモック (chainメソッドのモック)
-        # table().select().eq().gte().lte().order().execute() のチェーン
-        mock_reports_query = (
-            self.mock_supabase.table.return_value.select.return_value.eq.return_value.gte.return_value.lte.return_value.order.return_value
+    def _set_completed_users(self, user_ids: list[str], week_start: str = "2024-01-08"):
+        """対象週で既に成功を記録済みのユーザー"""
+        self.tables.tables["weekly_batch_checkpoints"] = [
+            {"week_start_date": week_start, "user_id": u, "status": "succeeded"}
+            for u in user_ids
+        ]
+
+    def _set_users_with_reports(self, user_count: int):
+        """user_count 人分のユーザーが、それぞれ1件ずつ日報を書いた状態"""
+        self._set_reports(
+            *(
+                make_report(f"user{i:02d}", "2024-01-08", f"report{i}")
+                for i in range(user_count)
+            )
         )
 
-        mock_reports_query.execute.return_value.data = [
-            {"id": "report1", "content_raw": "work"}
+    def _report_queries(self):
+        """日報の取得クエリ（ユーザー一覧の取得と、ユーザーごとの日報の取得）"""
+        queries = self.tables.queries.get("daily_reports", [])
+        user_queries = [q for q in queries if ("user_id", "in") not in _ops(q)]
+        report_queries = [q for q in queries if ("user_id", "in") in _ops(q)]
+        return user_queries, report_queries
+
+    def _rpc_calls(self, name: str) -> list[dict]:
+        """指定したRPCに渡した p_rows の一覧"""
+        return [
+            c.args[1]["p_rows"]
+            for c in self.mock_supabase.rpc.call_args_list
+            if c.args[0] == name
         ]
 
-        # 3. 保存(insert)のモック
-        mock_insert = self.mock_supabase.table.return_value.insert.return_value
+    def _use_gemini(self, models: FakeGeminiModels):
+        """AIサービスのモックを、Geminiクライアントだけを差し替えた実際の AIService に置き換える"""
+        with patch("app.services.ai_service.genai.Client") as mock_client:
+            mock_client.return_value.aio.models = models
+            # 再試行の待ち時間でテストが遅くならないよう、1回で諦める
+            self.service.ai_service = AIService(
+                caller=ResilientCaller(retry=RetryPolicy(max_attempts=1))
+            )
 
-        # --- 実行 ---
-        # 2024/01/10 (水) を指定 -> 月曜は 1/8, 金曜は 1/12 になるはず
-        target_date = date(2024, 1, 10)
+    async def test_run_weekly_batch_success(self):
+        """正常系: 日報があるユーザーの週報が生成・保存される"""
+        self._set_reports(make_report("user1", "2024-01-08", "report1"))
 
-        # 非同期実行のために run_until_complete は使わず await で呼ぶ (IsolatedAsyncioTestCase内)
-        import asyncio
-
-        loop = asyncio.get_event_loop()
-        results = loop.run_until_complete(self.service.run_weekly_batch(target_date))
+        # 2024/01/10 (水) を指定 -> 月曜は 1/8, 金曜は 1/12 になるはず
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
 
         # --- 検証 ---
         self.assertEqual(results["success"], 1)
-        self.assertEqual(results["skip"], 0)
+        self.assertEqual(results["error"], 0)
 
-        # 日報取得時の日付範囲チェック
-        # gte("report_date", "2024-01-08") が呼ばれたか
-        args, _ = (
-            self.mock_supabase.table.return_value.select.return_value.eq.return_value.gte.call_args
-        )
-        self.assertEqual(args[1], "2024-01-08")
+        # 日報の取得は対象週の範囲に限られる
+        _, report_queries = self._report_queries()
+        self.assertIn(("report_date", "gte", "2024-01-08"), report_queries[0].filters)
+        self.assertIn(("report_date", "lte", "2024-01-12"), report_queries[0].filters)
+
+        # profiles の全件取得やユーザーごとのクエリは発行されない
+        self.assertNotIn("profiles", self.tables.queries)
+        self.assertEqual(len(report_queries), 1)
 
         # AIサービスが呼ばれたか
         self.service.ai_service.generate_weekly_summary.assert_called_once()
 
-        # DB保存が呼ばれたか
-        mock_insert.execute.assert_called_once()
+        # 週報の保存と成功の記録は1回のRPCで行い、テーブルへの直接のInsertは行わない
+        saved = self._rpc_calls("save_weekly_batch_results")
+        self.assertEqual(len(saved), 1)
+        self.assertEqual(saved[0][0]["user_id"], "user1")
+        self.assertEqual(saved[0][0]["tenant_id"], "tenant1")
+        self.assertEqual(saved[0][0]["week_start_date"], "2024-01-08")
 
-    def test_run_weekly_batch_skip_no_reports(self):
-        """正常系: 日報がないユーザーはスキップされるか"""
+    async def test_run_weekly_batch_no_reports(self):
+        """正常系: 対象週に日報が1件もなければAIもDB保存も呼ばれない"""
+        results = await self.service.run_weekly_batch()
 
-        # ユーザーあり
-        self.mock_supabase.table.return_value.select.return_value.execute.return_value.data = [
-            {"id": "user2", "tenant_id": "tenant1"}
-        ]
+        self.assertEqual(results["success"], 0)
+        self.service.ai_service.generate_weekly_summary.assert_not_called()
+        self.mock_supabase.rpc.assert_not_called()
 
-        # 日報なし (空リスト)
-        mock_reports_query = (
-            self.mock_supabase.table.return_value.select.return_value.eq.return_value.gte.return_value.lte.return_value.order.return_value
+    async def test_users_are_listed_day_by_day(self):
+        """正常系: 日報を書いたユーザーは日ごとに (report_date, user_id) の順で読み、過去の日報は読まない"""
+        self.service.page_size = 2
+        self._set_reports(
+            make_report("user1", "2023-12-01", "old1"),
+            make_report("user1", "2024-01-08", "r1"),
+            make_report("user2", "2024-01-08", "r2"),
+            make_report("user3", "2024-01-08", "r3"),
+            make_report("user3", "2024-01-12", "r4"),
+            make_report("user4", "2024-01-15", "next_week"),
         )
-        mock_reports_query.execute.return_value.data = []
 
-        # --- 実行 ---
-        import asyncio
+        users = await self.service._load_report_users(
+            date(2024, 1, 8), date(2024, 1, 12)
+        )
 
-        loop = asyncio.get_event_loop()
-        results = loop.run_until_complete(self.service.run_weekly_batch())
+        self.assertEqual(users, ["user1", "user2", "user3"])
+        user_queries, _ = self._report_queries()
+        # 月曜は2ページ（2件 + 1件）、火〜金は1ページずつ
+        self.assertEqual(len(user_queries), 6)
+        for query in user_queries:
+            self.assertEqual(query.filters[0][:2], ("report_date", "eq"))
+            self.assertEqual(query.orders, ["user_id"])
+        self.assertIn(("user_id", "gt", "user2"), user_queries[1].filters)
+
+    async def test_run_weekly_batch_groups_reports_across_pages(self):
+        """正常系: ページをまたいだ同一ユーザーの日報は1つにまとめて渡される"""
+        self.service.page_size = 2
+        self._set_reports(
+            make_report("user1", "2024-01-08", "r1"),
+            make_report("user1", "2024-01-09", "r2"),
+            make_report("user1", "2024-01-10", "r3"),
+            make_report("user2", "2024-01-08", "r4"),
+        )
+
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
+
+        self.assertEqual(results["success"], 2)
+        calls = self.service.ai_service.generate_weekly_summary.call_args_list
+        reports_per_user = sorted(
+            ([r["id"] for r in c.args[0]] for c in calls), key=len, reverse=True
+        )
+        self.assertEqual(reports_per_user, [["r1", "r2", "r3"], ["r4"]])
+
+        # 2ページ目は1ページ目の最後の行を起点に取得する
+        _, report_queries = self._report_queries()
+        cursor_filter = next(f[2] for f in report_queries[1].filters if f[1] == "or")
+        self.assertIn("user_id.gt.user1", cursor_filter)
+        self.assertIn("id.gt.r2", cursor_filter)
+
+    async def test_reports_fetched_for_users_in_chunks(self):
+        """正常系: 日報は users_per_query 人ずつまとめて取得する"""
+        self._set_users_with_reports(5)
+        self.service.users_per_query = 2
+
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
+
+        self.assertEqual(results["success"], 5)
+        _, report_queries = self._report_queries()
+        self.assertEqual(
+            [next(f[2] for f in q.filters if f[1] == "in") for q in report_queries],
+            [["user00", "user01"], ["user02", "user03"], ["user04"]],
+        )
+
+    async def test_run_weekly_batch_inserts_in_batches(self):
+        """正常系: 週報は指定件数ごとにまとめて保存される"""
+        self._set_users_with_reports(5)
+        self.service.insert_batch_size = 2
+
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
+
+        self.assertEqual(results["success"], 5)
+        # 5件を2件ずつ -> 3回の保存
+        saved = self._rpc_calls("save_weekly_batch_results")
+        self.assertEqual([len(rows) for rows in saved], [2, 2, 1])
+
+    async def test_run_weekly_batch_respects_ai_concurrency(self):
+        """正常系: AI生成の同時実行数が上限を超えない"""
+        self._set_users_with_reports(10)
+        self.service.ai_concurrency = 3
+
+        in_flight = 0
+        max_in_flight = 0
+
+        async def fake_generate(daily_reports, fallback=True):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return "AI Generated Summary"
+
+        self.service.ai_service.generate_weekly_summary = fake_generate
+
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
+
+        self.assertEqual(results["success"], 10)
+        self.assertEqual(max_in_flight, 3)
+
+    async def test_run_weekly_batch_insert_failure_counts_errors(self):
+        """異常系: 一括保存が失敗した場合はその件数分がエラーになり、失敗として記録される"""
+        self._set_users_with_reports(3)
+
+        async def execute_rpc():
+            if self.mock_supabase.rpc.call_args.args[0] == "save_weekly_batch_results":
+                raise Exception("DB Error")
+            return MagicMock(data=None)
+
+        self.mock_rpc.execute = AsyncMock(side_effect=execute_rpc)
+
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
 
-        # --- 検証 ---
         self.assertEqual(results["success"], 0)
-        self.assertEqual(results["skip"], 1)
+        self.assertEqual(results["error"], 3)
+        failures = self._rpc_calls("record_weekly_batch_failures")
+        self.assertEqual(len(failures), 1)
+        self.assertEqual(
+            sorted(f["user_id"] for f in failures[0]), ["user00", "user01", "user02"]
+        )
+        self.assertEqual(failures[0][0]["error"], "DB Error")
+        self.assertNotIn("content", failures[0][0])
 
-        # AIは呼ばれないはず
-        self.service.ai_service.generate_weekly_summary.assert_not_called()
+    async def test_rerun_skips_completed_users(self):
+        """正常系: 再実行時は成功済みのユーザーを飛ばし（日報も取得しない）、失敗・未処理のユーザーだけを処理する"""
+        self._set_users_with_reports(3)
+        self._set_completed_users(["user00", "user02"])
+
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
+
+        self.assertEqual(results, {"success": 1, "error": 0, "skipped": 2})
+        self.service.ai_service.generate_weekly_summary.assert_called_once()
+        saved = self._rpc_calls("save_weekly_batch_results")
+        self.assertEqual([row["user_id"] for row in saved[0]], ["user01"])
+        _, report_queries = self._report_queries()
+        self.assertIn(("user_id", "in", ["user01"]), report_queries[0].filters)
+
+    async def test_completed_users_loaded_page_by_page(self):
+        """正常系: 成功済みユーザーは user_id のキーセットでページ単位に取得する"""
+        self.service.page_size = 2
+        self._set_completed_users(["u1", "u2", "u3"])
+
+        completed = await self.service._load_completed_users(date(2024, 1, 8))
+
+        self.assertEqual(completed, {"u1", "u2", "u3"})
+        queries = self.tables.queries["weekly_batch_checkpoints"]
+        self.assertEqual(len(queries), 2)
+        self.assertIn(("user_id", "gt", "u2"), queries[1].filters)
+
+    async def test_gemini_error_counts_as_failure(self):
+        """異常系: Geminiの呼び出しが失敗したユーザーはエラーとして数えられ、エラー時の文面は保存されない"""
+        self._set_users_with_reports(2)
+        self.service.ai_concurrency = 1
+        ok = MagicMock(text="AI Generated Summary", parsed=None)
+        self._use_gemini(FakeGeminiModels([(0, ok), (0, gemini_error(503))]))
+
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
+
+        self.assertEqual(results, {"success": 1, "error": 1, "skipped": 0})
+        saved = self._rpc_calls("save_weekly_batch_results")
+        self.assertEqual([row["content"] for row in saved[0]], ["AI Generated Summary"])
+        failures = self._rpc_calls("record_weekly_batch_failures")
+        self.assertEqual(len(failures), 1)
+        self.assertNotEqual(failures[0][0]["user_id"], saved[0][0]["user_id"])
+
+    async def test_generation_failure_is_recorded(self):
+        """異常系: AI生成に失敗したユーザーは失敗として記録され、保存はされない"""
+        self._set_users_with_reports(1)
+        error = gemini_error(400, "INVALID_ARGUMENT")
+        models = FakeGeminiModels([(0, error)])
+        self._use_gemini(models)
+
+        results = await self.service.run_weekly_batch(date(2024, 1, 10))
+
+        self.assertEqual(results["error"], 1)
+        self.assertEqual(models.calls, 1)
+        self.assertEqual(self._rpc_calls("save_weekly_batch_results"), [])
+        failures = self._rpc_calls("record_weekly_batch_failures")
+        self.assertEqual(
+            failures,
+            [
+                [
+                    {
+                        "tenant_id": "tenant1",
+                        "user_id": "user00",
+                        "week_start_date": "2024-01-08",
+                        "error": str(error),
+                    }
+                ]
+            ],
+        )
+
+
+def _ops(query) -> set[tuple[str, str]]:
+    """クエリの絞り込み条件（列名と演算子）"""
+    return {(column, op) for column, op, _ in query.filters}
+
+
+if __name__ == "__main__":
+    unittest.main()
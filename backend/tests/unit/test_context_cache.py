@@ -0,0 +1,199 @@
+# backend/tests/unit/test_context_cache.py
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from app.models.project import WBSRequest, WBSResponse
+from app.models.scoping import ChatMessage
+from app.services.ai_resilience import ResilientCaller, RetryPolicy
+from app.services.ai_service import SCOPING_PREFIX, WBS_PREFIX, AIService
+from app.services.context_cache import ContextCacheManager, StaticPrefix
+from tests.unit.fakes import FakeContextCacheBackend, FakeGeminiModels, gemini_error
+
+PREFIX = StaticPrefix("test", system_instruction="あなたは日報のアシスタントです。")
+WBS_OK = SimpleNamespace(parsed=WBSResponse(tasks=[]), text="")
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self) -> float:
+        return self.now
+
+
+class TestContextCacheManager(unittest.IsolatedAsyncioTestCase):
+    """ContextCacheManager の単体テスト"""
+
+    def setUp(self):
+        self.clock = FakeClock()
+        self.backend = FakeContextCacheBackend()
+        self.manager = ContextCacheManager(
+            self.backend,
+            ttl_seconds=3600,
+            refresh_margin=300,
+            retry_after=600,
+            clock=self.clock,
+        )
+
+    async def test_created_once_and_reused(self):
+        """正常系: 同時に呼ばれてもキャッシュの作成は1回だけで、以降は再利用される"""
+        names = await asyncio.gather(
+            *(self.manager.get("model", PREFIX) for _ in range(5))
+        )
+
+        self.assertEqual(len(self.backend.created), 1)
+        self.assertEqual(set(names), {self.backend.created[0]})
+        self.assertEqual(self.manager.stats()["hits"], 4)
+
+    async def test_prefix_change_creates_new_cache(self):
+        """正常系: プロンプトを変更すると別のキャッシュになる"""
+        changed = StaticPrefix("test", system_instruction="変更後のプロンプト")
+
+        first = await self.manager.get("model", PREFIX)
+        second = await self.manager.get("model", changed)
+
+        self.assertNotEqual(first, second)
+        self.assertEqual(len(self.backend.created), 2)
+
+    async def test_refreshed_near_expiry(self):
+        """正常系: 期限が近づいたら作り直さずに延長する"""
+        name = await self.manager.get("model", PREFIX)
+
+        self.clock.now = 3400
+        self.assertEqual(await self.manager.get("model", PREFIX), name)
+
+        self.assertEqual(self.backend.refreshed, [name])
+        self.assertEqual(len(self.backend.created), 1)
+
+    async def test_recreated_after_expiry(self):
+        """正常系: 期限切れの場合は作り直す"""
+        await self.manager.get("model", PREFIX)
+
+        self.clock.now = 4000
+        await self.manager.get("model", PREFIX)
+
+        self.assertEqual(len(self.backend.created), 2)
+        self.assertEqual(self.backend.refreshed, [])
+
+    async def test_create_failure_is_negatively_cached(self):
+        """異常系: 作成に失敗した場合は None を返し、しばらくは再試行しない"""
+        self.backend.fail_create = gemini_error(400, "INVALID_ARGUMENT")
+
+        self.assertIsNone(await self.manager.get("model", PREFIX))
+        self.backend.fail_create = None
+        self.assertIsNone(await self.manager.get("model", PREFIX))
+        self.assertEqual(self.backend.created, [])
+
+        self.clock.now = 601
+        self.assertIsNotNone(await self.manager.get("model", PREFIX))
+
+    async def test_aclose_deletes_caches(self):
+        """正常系: シャットダウン時に作成したキャッシュを削除する"""
+        name = await self.manager.get("model", PREFIX)
+
+        await self.manager.aclose()
+
+        self.assertEqual(self.backend.deleted, [name])
+        self.assertEqual(self.manager.stats()["size"], 0)
+
+
+@patch("app.services.ai_service.genai.Client")
+class TestAIServiceContextCache(unittest.IsolatedAsyncioTestCase):
+    """AIService のコンテキストキャッシュ利用の単体テスト"""
+
+    def setUp(self):
+        self.request = WBSRequest(
+            name="案件",
+            description="概要",
+            start_date="2026-01-01",
+            end_date="2026-03-31",
+        )
+        self.backend = FakeContextCacheBackend()
+
+    def make_service(self) -> AIService:
+        return AIService(
+            caller=ResilientCaller(retry=RetryPolicy(max_attempts=1)),
+            context_cache=ContextCacheManager(self.backend),
+        )
+
+    async def test_sends_only_variable_contents_with_cache(self, MockClient):  # noqa: N803
+        """正常系: キャッシュがあれば cached_content で参照し、入力だけを送る"""
+        models = FakeGeminiModels([(0, WBS_OK)])
+        MockClient.return_value.aio.models = models
+        service = self.make_service()
+
+        await service.generate_wbs(self.request)
+
+        request = models.requests[0]
+        self.assertEqual(request["config"].cached_content, self.backend.created[0])
+        self.assertIsNone(request["config"].system_instruction)
+        self.assertNotIn(WBS_PREFIX.system_instruction, request["contents"])
+
+    async def test_inline_when_cache_unavailable(self, MockClient):  # noqa: N803
+        """異常系: キャッシュを作成できない場合は system_instruction として毎回送る"""
+        models = FakeGeminiModels([(0, WBS_OK)])
+        MockClient.return_value.aio.models = models
+        self.backend.fail_create = gemini_error(400, "INVALID_ARGUMENT")
+        service = self.make_service()
+
+        result = await service.generate_wbs(self.request)
+
+        self.assertIsInstance(result, WBSResponse)
+        config = models.requests[0]["config"]
+        self.assertIsNone(config.cached_content)
+        self.assertEqual(config.system_instruction, WBS_PREFIX.system_instruction)
+
+    async def test_rejected_cache_is_invalidated_and_retried_inline(self, MockClient):  # noqa: N803
+        """異常系: キャッシュ参照が拒否された場合は破棄し、固定部分も送って再試行する"""
+        models = FakeGeminiModels([(0, gemini_error(404, "NOT_FOUND")), (0, WBS_OK)])
+        MockClient.return_value.aio.models = models
+        service = self.make_service()
+
+        result = await service.generate_wbs(self.request)
+
+        self.assertIsInstance(result, WBSResponse)
+        self.assertEqual(models.calls, 2)
+        self.assertIsNone(models.requests[1]["config"].cached_content)
+        self.assertEqual(service.context_cache.stats()["size"], 0)
+
+    async def test_rejected_cache_in_stream_is_retried_inline(self, MockClient):  # noqa: N803
+        """異常系: ストリーミング生成でキャッシュ参照が拒否された場合も、固定部分を送って開き直す"""
+        raw = '{"message": "了解です", "is_complete": false}'
+        models = FakeGeminiModels([(0, gemini_error(404, "NOT_FOUND")), (0, [raw])])
+        MockClient.return_value.aio.models = models
+        service = self.make_service()
+        messages = [ChatMessage(role="user", content="相談")]
+
+        items = [i async for i in service.stream_interactive_scoping(messages)]
+
+        self.assertEqual(items[0], "了解です")
+        self.assertEqual(models.calls, 2)
+        self.assertEqual(
+            models.requests[0]["config"].cached_content, self.backend.created[0]
+        )
+        self.assertIsNone(models.requests[1]["config"].cached_content)
+        self.assertEqual(
+            models.requests[1]["config"].system_instruction,
+            SCOPING_PREFIX.system_instruction,
+        )
+        self.assertEqual(service.context_cache.stats()["size"], 0)
+
+    async def test_scoping_prefix_sent_inline_without_cache(self, MockClient):  # noqa: N803
+        """正常系: キャッシュがない場合、スコーピングの固定の会話は履歴の前に付けて送る"""
+        models = FakeGeminiModels([(0, SimpleNamespace(parsed=None, text=""))])
+        MockClient.return_value.aio.models = models
+        service = AIService(caller=ResilientCaller(retry=RetryPolicy(max_attempts=1)))
+
+        await service.interactive_scoping([ChatMessage(role="user", content="相談")])
+
+        contents = models.requests[0]["contents"]
+        self.assertEqual(
+            contents[: len(SCOPING_PREFIX.contents)], SCOPING_PREFIX.contents
+        )
+        self.assertEqual(contents[-1]["parts"][0]["text"], "相談")
+
+
+if __name__ == "__main__":
+    unittest.main()
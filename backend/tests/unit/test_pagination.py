@@ -0,0 +1,106 @@
+# backend/tests/unit/test_pagination.py
+import unittest
+from datetime import datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID, uuid4
+
+from fastapi import HTTPException
+
+from app.api.deps import get_page_params
+from app.core.pagination import (
+    InvalidCursorError,
+    PageParams,
+    decode_cursor,
+    encode_cursor,
+    fetch_page,
+)
+
+
+def make_row(created_at: str) -> dict:
+    return {"id": str(uuid4()), "created_at": created_at}
+
+
+class TestCursor(unittest.TestCase):
+    """カーソルのエンコード・デコードの単体テスト"""
+
+    def test_round_trip(self):
+        """正常系: エンコードしたカーソルは元の (created_at, id) に戻る"""
+        row = make_row("2024-01-08T10:00:00.123456+00:00")
+
+        created_at, row_id = decode_cursor(encode_cursor(row))
+
+        self.assertEqual(created_at, datetime.fromisoformat(row["created_at"]))
+        self.assertEqual(row_id, UUID(row["id"]))
+
+    def test_invalid_cursor(self):
+        """異常系: 解釈できないカーソルはエラーになる（フィルタには埋め込まない）"""
+        for cursor in (
+            "",
+            "not-base64!",
+            encode_cursor({"created_at": "x", "id": "y"}),
+        ):
+            with self.subTest(cursor=cursor):
+                with self.assertRaises(InvalidCursorError):
+                    decode_cursor(cursor)
+
+    def test_page_params_rejects_invalid_cursor(self):
+        """異常系: 依存関数は不正なカーソルを400エラーにする"""
+        with self.assertRaises(HTTPException) as ctx:
+            get_page_params(limit=20, cursor="broken")
+
+        self.assertEqual(ctx.exception.status_code, 400)
+
+
+class TestFetchPage(unittest.IsolatedAsyncioTestCase):
+    """キーセット方式のページ取得の単体テスト"""
+
+    def setUp(self):
+        self.query = MagicMock()
+
+    def mock_rows(self, query, rows: list[dict]):
+        """query.order().order().limit().execute() の結果をモックする"""
+        chain = query.order.return_value.order.return_value.limit.return_value
+        chain.execute = AsyncMock(return_value=MagicMock(data=rows))
+        return chain
+
+    async def test_first_page_with_more_rows(self):
+        """正常系: limit を超える行があれば limit 件と次ページのカーソルを返す"""
+        rows = [make_row(f"2024-01-0{d}T00:00:00+00:00") for d in (9, 8, 7)]
+        self.mock_rows(self.query, rows)
+
+        page = await fetch_page(self.query, PageParams(limit=2))
+
+        self.assertEqual(page["items"], rows[:2])
+        self.assertEqual(decode_cursor(page["next_cursor"])[1], UUID(rows[1]["id"]))
+        # 1件多く取得して次ページの有無を判定する
+        limit = self.query.order.return_value.order.return_value.limit
+        limit.assert_called_once_with(3)
+        # 1ページ目はカーソル条件を付けない
+        self.query.or_.assert_not_called()
+
+    async def test_last_page(self):
+        """正常系: limit 以下しかなければ next_cursor は None"""
+        rows = [make_row("2024-01-09T00:00:00+00:00")]
+        self.mock_rows(self.query, rows)
+
+        page = await fetch_page(self.query, PageParams(limit=2))
+
+        self.assertEqual(page, {"items": rows, "next_cursor": None})
+
+    async def test_next_page_filters_after_cursor(self):
+        """正常系: カーソル指定時は (created_at, id) がカーソルより前の行に絞り込む"""
+        row = make_row("2024-01-08T10:00:00+00:00")
+        created_at, row_id = decode_cursor(encode_cursor(row))
+        self.mock_rows(self.query.or_.return_value, [])
+
+        await fetch_page(
+            self.query, PageParams(limit=2, created_at=created_at, id=row_id)
+        )
+
+        cursor_filter = self.query.or_.call_args.args[0]
+        self.assertIn('created_at.lt."2024-01-08T10:00:00+00:00"', cursor_filter)
+        self.assertIn(f"id.lt.{row_id}", cursor_filter)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,179 @@
+# backend/tests/unit/test_preview_token.py
+import time
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from fastapi import HTTPException, Response
+
+from app.models.report import DailyReportDraft, DailyReportPolished, WorkLogExtraction
+from app.services.preview_token import PreviewTokenSigner, preview_fingerprint
+from app.services.profile_service import ProfileCache, UserContext
+
+TASKS = [{"id": "task1", "title": "API実装"}]
+# 署名鍵はHS256の推奨長(32バイト)以上にする
+SECRET = "preview-token-test-secret-0123456789"
+OTHER_SECRET = "preview-token-other-secret-0123456789"
+RESULT = DailyReportPolished(
+    subject="件名",
+    content_polished="本文",
+    politeness_level=3,
+    work_logs=[WorkLogExtraction(task_id=uuid4(), hours=2.0)],
+)
+
+
+class TestPreviewTokenSigner(unittest.TestCase):
+    """PreviewTokenSigner の単体テスト"""
+
+    def setUp(self):
+        self.signer = PreviewTokenSigner(SECRET, ttl_seconds=900)
+        self.fingerprint = preview_fingerprint("API実装", 3, None, TASKS)
+
+    def test_round_trip(self):
+        """正常系: 同じユーザー・同じ入力であれば変換結果がそのまま復元される"""
+        token = self.signer.issue("user1", self.fingerprint, RESULT)
+
+        self.assertEqual(self.signer.verify(token, "user1", self.fingerprint), RESULT)
+
+    def test_rejects_other_user(self):
+        """異常系: 他のユーザーのトークンは使えない"""
+        token = self.signer.issue("user1", self.fingerprint, RESULT)
+
+        self.assertIsNone(self.signer.verify(token, "user2", self.fingerprint))
+
+    def test_rejects_changed_input(self):
+        """異常系: 下書き・丁寧さ・AI設定・タスクのどれかが変わったら使えない"""
+        token = self.signer.issue("user1", self.fingerprint, RESULT)
+        changed = [
+            preview_fingerprint("API実装した", 3, None, TASKS),
+            preview_fingerprint("API実装", 4, None, TASKS),
+            preview_fingerprint("API実装", 3, {"tone": "concise"}, TASKS),
+            preview_fingerprint("API実装", 3, None, []),
+        ]
+        for fingerprint in changed:
+            with self.subTest(fingerprint=fingerprint):
+                self.assertIsNone(self.signer.verify(token, "user1", fingerprint))
+
+    def test_rejects_expired_token(self):
+        """異常系: 有効期限を過ぎたトークンは使えない"""
+        issued_long_ago = PreviewTokenSigner(
+            SECRET, ttl_seconds=900, clock=lambda: time.time() - 1000
+        )
+        token = issued_long_ago.issue("user1", self.fingerprint, RESULT)
+
+        self.assertIsNone(self.signer.verify(token, "user1", self.fingerprint))
+
+    def test_rejects_token_signed_with_other_key(self):
+        """異常系: 別の鍵で署名された（改ざんされた）トークンは使えない"""
+        token = PreviewTokenSigner(OTHER_SECRET).issue(
+            "user1", self.fingerprint, RESULT
+        )
+
+        self.assertIsNone(self.signer.verify(token, "user1", self.fingerprint))
+        self.assertIsNone(self.signer.verify("not-a-token", "user1", self.fingerprint))
+
+
+class TestPreviewAndCreate(unittest.IsolatedAsyncioTestCase):
+    """POST /reports/preview と、そのトークンを使った POST /reports の単体テスト"""
+
+    def setUp(self):
+        self.mock_user = MagicMock()
+        self.mock_user.id = str(uuid4())
+        self.draft = DailyReportDraft(raw_content="API実装", politeness_level=3)
+
+        self.mock_supabase = MagicMock()
+        tasks_query = self.mock_supabase.table.return_value.select.return_value.eq.return_value.neq.return_value
+        tasks_query.execute = AsyncMock(return_value=MagicMock(data=TASKS))
+        self.mock_supabase.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data={"id": "report1", "task_work_logs": []})
+        )
+
+        self.profile_cache = MagicMock(spec=ProfileCache)
+        self.profile_cache.get = AsyncMock(
+            return_value=UserContext(self.mock_user.id, "tenant1", None)
+        )
+
+        self.ai_service = MagicMock()
+        self.ai_service.generate_report_with_logs = AsyncMock(return_value=RESULT)
+        self.signer = PreviewTokenSigner(SECRET)
+
+    async def preview(self):
+        from app.routers.reports import preview_report
+
+        return await preview_report(
+            self.draft,
+            Response(),
+            self.mock_user,
+            self.mock_supabase,
+            self.ai_service,
+            self.profile_cache,
+            self.signer,
+        )
+
+    async def create(self, draft: DailyReportDraft):
+        from app.routers.reports import create_report
+
+        return await create_report(
+            draft,
+            Response(),
+            self.mock_user,
+            self.mock_supabase,
+            self.ai_service,
+            self.profile_cache,
+            self.signer,
+        )
+
+    async def test_create_reuses_preview_result(self):
+        """正常系: 入力が同じであれば、作成時はAIを呼ばずにプレビューの結果を保存する"""
+        preview = await self.preview()
+        self.ai_service.generate_report_with_logs.reset_mock()
+
+        draft = self.draft.model_copy(update={"preview_token": preview.preview_token})
+        result = await self.create(draft)
+
+        self.assertEqual(result, RESULT)
+        self.ai_service.generate_report_with_logs.assert_not_called()
+        params = self.mock_supabase.rpc.call_args.args[1]
+        self.assertEqual(params["p_content_polished"], "本文")
+        self.assertEqual(len(params["p_work_logs"]), 1)
+
+    async def test_create_regenerates_when_draft_changed(self):
+        """正常系: プレビュー後に下書きを編集した場合はAI変換をやり直す"""
+        preview = await self.preview()
+        self.ai_service.generate_report_with_logs.reset_mock()
+
+        draft = DailyReportDraft(
+            raw_content="API実装とレビュー",
+            politeness_level=3,
+            preview_token=preview.preview_token,
+        )
+        await self.create(draft)
+
+        self.ai_service.generate_report_with_logs.assert_awaited_once()
+
+    async def test_preview_failure_returns_502(self):
+        """異常系: プレビューでAI変換に失敗した場合はエラー時の日報に署名せず502エラー"""
+        self.ai_service.generate_report_with_logs.side_effect = Exception("API Error")
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.preview()
+
+        self.assertEqual(ctx.exception.status_code, 502)
+        self.assertFalse(
+            self.ai_service.generate_report_with_logs.call_args.kwargs["fallback"]
+        )
+
+    def test_legacy_preview_route_issues_token(self):
+        """正常系: 旧プレビューAPI(/api/preview)も同じ処理でトークンを返す"""
+        from app.main import app
+        from app.models.report import DailyReportPreview
+        from app.routers.reports import preview_report
+
+        route = next(r for r in app.routes if getattr(r, "path", "") == "/api/preview")
+
+        self.assertIs(route.endpoint, preview_report)
+        self.assertIs(route.response_model, DailyReportPreview)
+
+
+if __name__ == "__main__":
+    unittest.main()
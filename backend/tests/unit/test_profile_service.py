@@ -0,0 +1,72 @@
+# backend/tests/unit/test_profile_service.py
+import unittest
+from unittest.mock import AsyncMock, MagicMock
+
+from fastapi import HTTPException
+
+from app.api.deps import get_user_context
+from app.services.profile_service import (
+    ProfileCache,
+    ProfileNotFoundError,
+    UserContext,
+)
+
+
+class TestProfileCache(unittest.IsolatedAsyncioTestCase):
+    """テナントID・AI設定キャッシュの単体テスト"""
+
+    def setUp(self):
+        self.mock_supabase = MagicMock()
+        # table().select().eq().single().execute()
+        self.mock_query = self.mock_supabase.table.return_value.select.return_value.eq.return_value.single.return_value
+        self.mock_query.execute = AsyncMock(
+            return_value=MagicMock(
+                data={"tenant_id": "tenant1", "ai_settings": {"tone": "concise"}}
+            )
+        )
+        self.cache = ProfileCache(ttl=60)
+
+    async def test_second_get_uses_cache(self):
+        """正常系: 2回目以降はDBに問い合わせずキャッシュから返す"""
+        first = await self.cache.get(self.mock_supabase, "user1")
+        second = await self.cache.get(self.mock_supabase, "user1")
+
+        self.assertEqual(first, UserContext("user1", "tenant1", {"tone": "concise"}))
+        self.assertEqual(first, second)
+        self.mock_query.execute.assert_awaited_once()
+
+    async def test_invalidate_refetches(self):
+        """正常系: invalidate 後は最新の値をDBから取得する"""
+        await self.cache.get(self.mock_supabase, "user1")
+        self.mock_query.execute.return_value = MagicMock(
+            data={"tenant_id": "tenant1", "ai_settings": {"tone": "english"}}
+        )
+
+        self.cache.invalidate("user1")
+        context = await self.cache.get(self.mock_supabase, "user1")
+
+        self.assertEqual(context.ai_settings, {"tone": "english"})
+        self.assertEqual(self.mock_query.execute.await_count, 2)
+
+    async def test_profile_not_found(self):
+        """異常系: プロフィールがない場合は例外を送出し、キャッシュしない"""
+        self.mock_query.execute.return_value = MagicMock(data=None)
+
+        with self.assertRaises(ProfileNotFoundError):
+            await self.cache.get(self.mock_supabase, "user1")
+        self.assertEqual(self.cache.stats()["size"], 0)
+
+    async def test_dependency_returns_404_when_profile_missing(self):
+        """異常系: 依存関数はプロフィールがない場合に404エラーを返す"""
+        self.mock_query.execute.return_value = MagicMock(data=None)
+        user = MagicMock()
+        user.id = "user1"
+
+        with self.assertRaises(HTTPException) as ctx:
+            await get_user_context(user, self.mock_supabase, self.cache)
+
+        self.assertEqual(ctx.exception.status_code, 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
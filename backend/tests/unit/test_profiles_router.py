@@ -1,10 +1,12 @@
 # backend/tests/unit/test_profiles_router.py
 import unittest
-from unittest.mock import MagicMock, patch
+from unittest.mock import AsyncMock, MagicMock, patch
 from uuid import uuid4
+
 from fastapi import HTTPException
 
 from app.routers.profiles import AISettings
+from app.services.profile_service import ProfileCache
 
 
 class TestProfilesRouter(unittest.IsolatedAsyncioTestCase):
@@ -16,31 +18,29 @@ class TestProfilesRouter(unittest.IsolatedAsyncioTestCase):
         self.mock_user = MagicMock()
         self.mock_user.id = self.test_user_id
 
-    @patch("app.routers.profiles.get_supabase")
-    async def test_get_ai_settings_success(self, mock_get_supabase):
+    def _mock_profile_query(self, data):
+        """profiles の select().eq().single().execute() が data を返すSupabaseのモック"""
+        mock_supabase = MagicMock()
+        mock_table = MagicMock()
+        mock_table.select.return_value.eq.return_value.single.return_value.execute = (
+            AsyncMock(return_value=MagicMock(data=data))
+        )
+        mock_supabase.table.return_value = mock_table
+        return mock_supabase
+
+    async def test_get_ai_settings_success(self):
         """正常系: AI設定の取得が成功する"""
         from app.routers.profiles import get_ai_settings
 
-        # モックの設定
-        mock_supabase = MagicMock()
-        mock_get_supabase.return_value = mock_supabase
-
-        # プロフィールデータのモック
-        mock_response = MagicMock()
-        mock_response.data = {
-            "ai_settings": {
-                "tone": "concise",
-                "language": "ja",
-                "custom_instructions": "技術用語を使う",
+        mock_supabase = self._mock_profile_query(
+            {
+                "ai_settings": {
+                    "tone": "concise",
+                    "language": "ja",
+                    "custom_instructions": "技術用語を使う",
+                }
             }
-        }
-
-        # Supabaseクエリのモック
-        mock_table = MagicMock()
-        mock_table.select.return_value.eq.return_value.single.return_value.execute.return_value = (
-            mock_response
         )
-        mock_supabase.table.return_value = mock_table
 
         # テスト実行
         result = await get_ai_settings(self.mock_user, mock_supabase)
@@ -50,24 +50,12 @@ class TestProfilesRouter(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.ai_settings.language, "ja")
         self.assertEqual(result.ai_settings.custom_instructions, "技術用語を使う")
 
-    @patch("app.routers.profiles.get_supabase")
-    async def test_get_ai_settings_default_values(self, mock_get_supabase):
+    async def test_get_ai_settings_default_values(self):
         """正常系: ai_settingsが未設定の場合はデフォルト値が返る"""
         from app.routers.profiles import get_ai_settings
 
-        # モックの設定
-        mock_supabase = MagicMock()
-        mock_get_supabase.return_value = mock_supabase
-
         # ai_settingsがNullのプロフィールデータ
-        mock_response = MagicMock()
-        mock_response.data = {"ai_settings": None}
-
-        mock_table = MagicMock()
-        mock_table.select.return_value.eq.return_value.single.return_value.execute.return_value = (
-            mock_response
-        )
-        mock_supabase.table.return_value = mock_table
+        mock_supabase = self._mock_profile_query({"ai_settings": None})
 
         # テスト実行
         result = await get_ai_settings(self.mock_user, mock_supabase)
@@ -77,6 +65,17 @@ class TestProfilesRouter(unittest.IsolatedAsyncioTestCase):
         self.assertEqual(result.ai_settings.language, "ja")
         self.assertEqual(result.ai_settings.custom_instructions, "")
 
+    async def test_get_ai_settings_profile_not_found(self):
+        """異常系: プロフィールがない場合は404エラー"""
+        from app.routers.profiles import get_ai_settings
+
+        mock_supabase = self._mock_profile_query(None)
+
+        with self.assertRaises(HTTPException) as ctx:
+            await get_ai_settings(self.mock_user, mock_supabase)
+
+        self.assertEqual(ctx.exception.status_code, 404)
+
     @patch("app.routers.profiles.get_supabase")
     async def test_update_ai_settings_success(self, mock_get_supabase):
         """正常系: AI設定の更新が成功する"""
@@ -101,18 +100,24 @@ class TestProfilesRouter(unittest.IsolatedAsyncioTestCase):
         ]
 
         mock_table = MagicMock()
-        mock_table.update.return_value.eq.return_value.execute.return_value = (
-            mock_response
+        mock_table.update.return_value.eq.return_value.execute = AsyncMock(
+            return_value=mock_response
         )
         mock_supabase.table.return_value = mock_table
 
+        profile_cache = MagicMock(spec=ProfileCache)
+
         # テスト実行
-        result = await update_ai_settings(new_settings, self.mock_user, mock_supabase)
+        result = await update_ai_settings(
+            new_settings, self.mock_user, mock_supabase, profile_cache
+        )
 
         # 検証
         self.assertEqual(result.ai_settings.tone, "english")
         self.assertEqual(result.ai_settings.language, "en")
         self.assertEqual(result.ai_settings.custom_instructions, "Use technical terms")
+        # キャッシュ済みの古い設定は破棄される
+        profile_cache.invalidate.assert_called_once_with(self.test_user_id)
 
 
 if __name__ == "__main__":
@@ -0,0 +1,233 @@
+# backend/tests/unit/test_projects_router.py
+import unittest
+from datetime import date
+from unittest.mock import AsyncMock, MagicMock
+from uuid import uuid4
+
+from fastapi import HTTPException
+
+from app.core.pagination import PageParams
+from app.models.common import Page
+from app.models.project import (
+    ProjectCreate,
+    ProjectResponse,
+    ProjectSummaryResponse,
+    TaskCreate,
+)
+from app.services.profile_service import UserContext
+
+
+class TestProjectsRouter(unittest.IsolatedAsyncioTestCase):
+    """projects routerの単体テスト"""
+
+    def setUp(self):
+        self.mock_user = MagicMock()
+        self.mock_user.id = str(uuid4())
+        self.mock_supabase = MagicMock()
+
+    async def test_get_projects_returns_summaries(self):
+        """正常系: 一覧は集計ビューから取得し、タスク本体は含めない"""
+        from app.routers.projects import get_projects
+
+        summary = {
+            "id": str(uuid4()),
+            "tenant_id": str(uuid4()),
+            "name": "ECサイト構築",
+            "description": None,
+            "status": "active",
+            "start_date": "2024-04-01",
+            "end_date": None,
+            "milestones": None,
+            "created_at": "2024-04-01T00:00:00+00:00",
+            "task_count": 3,
+            "todo_count": 1,
+            "in_progress_count": 1,
+            "done_count": 1,
+            "estimated_hours_total": 40,
+            "done_estimated_hours": 16,
+        }
+        query = self.mock_supabase.table.return_value.select.return_value
+        query.order.return_value.order.return_value.limit.return_value.execute = (
+            AsyncMock(return_value=MagicMock(data=[summary]))
+        )
+
+        result = await get_projects(
+            self.mock_user, self.mock_supabase, PageParams(limit=20)
+        )
+
+        self.mock_supabase.table.assert_called_once_with("project_summaries")
+        self.mock_supabase.table.return_value.select.assert_called_once_with("*")
+
+        page = Page[ProjectSummaryResponse].model_validate(result)
+        self.assertEqual(page.items[0].done_count, 1)
+        self.assertEqual(page.items[0].estimated_hours_total, 40)
+        self.assertIsNone(page.next_cursor)
+        self.assertNotIn("tasks", page.items[0].model_dump())
+
+    def _project_in(self, total_tasks: int) -> ProjectCreate:
+        return ProjectCreate(
+            name="ECサイト構築",
+            start_date="2024-04-01",
+            tasks=[
+                TaskCreate(
+                    title=f"タスク{i}",
+                    description="詳細",
+                    estimated_hours=8,
+                    suggested_role="Backend",
+                    assigned_to=uuid4() if i == 0 else None,
+                    start_date="2024-04-02",
+                )
+                for i in range(total_tasks)
+            ],
+        )
+
+    async def test_create_project_in_one_rpc(self):
+        """正常系: プロジェクトと全タスクは1回のRPCで作成され、作成結果がそのまま返る"""
+        from app.routers.projects import create_project
+
+        project_in = self._project_in(total_tasks=3)
+        context = UserContext(self.mock_user.id, str(uuid4()))
+        project_id = str(uuid4())
+        created = {
+            "id": project_id,
+            "tenant_id": context.tenant_id,
+            "name": "ECサイト構築",
+            "description": None,
+            "status": "planning",
+            "start_date": "2024-04-01",
+            "end_date": None,
+            "milestones": None,
+            "created_at": "2024-04-01T00:00:00+00:00",
+            "tasks": [
+                {
+                    **task.model_dump(mode="json"),
+                    "id": str(uuid4()),
+                    "project_id": project_id,
+                    "status": "todo",
+                    "created_at": "2024-04-01T00:00:00+00:00",
+                }
+                for task in project_in.tasks
+            ],
+        }
+        self.mock_supabase.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data=created)
+        )
+
+        result = await create_project(
+            project_in, self.mock_user, self.mock_supabase, context
+        )
+
+        self.mock_supabase.rpc.assert_called_once()
+        name, params = self.mock_supabase.rpc.call_args.args
+        self.assertEqual(name, "create_project_with_tasks")
+        self.assertEqual(params["p_tenant_id"], context.tenant_id)
+        self.assertEqual(params["p_start_date"], "2024-04-01")
+        self.assertEqual(len(params["p_tasks"]), 3)
+        # UUID・日付はJSONで送れる文字列に変換されている
+        self.assertEqual(
+            params["p_tasks"][0]["assigned_to"], str(project_in.tasks[0].assigned_to)
+        )
+        self.assertEqual(params["p_tasks"][0]["start_date"], "2024-04-02")
+        # テーブルへの直接のInsertは行わない
+        self.mock_supabase.table.assert_not_called()
+
+        project = ProjectResponse.model_validate(result)
+        self.assertEqual(len(project.tasks), 3)
+
+    async def test_create_project_failure_returns_500(self):
+        """異常系: 作成に失敗した場合は500エラー（プロジェクトもタスクも残らない）"""
+        from app.routers.projects import create_project
+
+        self.mock_supabase.rpc.return_value.execute = AsyncMock(
+            side_effect=Exception("DB Error")
+        )
+
+        with self.assertRaises(HTTPException) as ctx:
+            await create_project(
+                self._project_in(total_tasks=1),
+                self.mock_user,
+                self.mock_supabase,
+                UserContext(self.mock_user.id, str(uuid4())),
+            )
+
+        self.assertEqual(ctx.exception.status_code, 500)
+
+    async def test_get_project_hours_reads_rollup(self):
+        """正常系: 実績工数は集計済みのRPCから取得し、工数ログ本体は読まない"""
+        from app.routers.projects import get_project_hours
+
+        project_id = uuid4()
+        task_id = uuid4()
+        self.mock_supabase.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data={
+                    "total_hours": 5.5,
+                    "days": [
+                        {"work_date": "2024-04-01", "hours": 2},
+                        {"work_date": "2024-04-02", "hours": 3.5},
+                    ],
+                    "tasks": [
+                        {"task_id": str(task_id), "title": "API実装", "hours": 5.5}
+                    ],
+                }
+            )
+        )
+
+        result = await get_project_hours(
+            project_id,
+            date(2024, 4, 1),
+            None,
+            self.mock_user,
+            self.mock_supabase,
+        )
+
+        name, params = self.mock_supabase.rpc.call_args.args
+        self.assertEqual(name, "get_project_hours")
+        self.assertEqual(
+            params,
+            {
+                "p_project_id": str(project_id),
+                "p_start_date": "2024-04-01",
+                "p_end_date": None,
+            },
+        )
+        self.mock_supabase.table.assert_not_called()
+
+        self.assertEqual(result.total_hours, 5.5)
+        self.assertEqual([d.hours for d in result.days], [2, 3.5])
+        self.assertEqual(result.tasks[0].task_id, task_id)
+
+    async def test_get_project_hours_empty(self):
+        """正常系: 工数ログがない（または他テナントの）プロジェクトは0件"""
+        from app.routers.projects import get_project_hours
+
+        self.mock_supabase.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data={"total_hours": 0, "days": [], "tasks": []})
+        )
+
+        result = await get_project_hours(
+            uuid4(), None, None, self.mock_user, self.mock_supabase
+        )
+
+        self.assertEqual(result.total_hours, 0)
+        self.assertEqual(result.days, [])
+
+    async def test_get_project_hours_invalid_range(self):
+        """異常系: 終了日が開始日より前の場合は400エラー"""
+        from app.routers.projects import get_project_hours
+
+        with self.assertRaises(HTTPException) as ctx:
+            await get_project_hours(
+                uuid4(),
+                date(2024, 4, 2),
+                date(2024, 4, 1),
+                self.mock_user,
+                self.mock_supabase,
+            )
+
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.mock_supabase.rpc.assert_not_called()
+
+
+if __name__ == "__main__":
+    unittest.main()
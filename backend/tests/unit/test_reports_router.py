@@ -0,0 +1,332 @@
+# backend/tests/unit/test_reports_router.py
+import asyncio
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from fastapi import HTTPException, Response
+from pydantic import ValidationError
+
+from app.models.report import (
+    MAX_REPORT_BATCH_SIZE,
+    DailyReportBatchItem,
+    DailyReportBatchRequest,
+    DailyReportDraft,
+    DailyReportPolished,
+    WorkLogExtraction,
+)
+from app.services.profile_service import ProfileCache, ProfileNotFoundError, UserContext
+
+
+class TestCreateReport(unittest.IsolatedAsyncioTestCase):
+    """POST /reports の単体テスト"""
+
+    def setUp(self):
+        self.mock_user = MagicMock()
+        self.mock_user.id = str(uuid4())
+        self.draft = DailyReportDraft(raw_content="API実装", politeness_level=3)
+
+        self.mock_supabase = MagicMock()
+        # アクティブタスク: table().select().eq().neq().execute()
+        self.mock_tasks_query = self.mock_supabase.table.return_value.select.return_value.eq.return_value.neq.return_value
+        self.mock_tasks_query.execute = AsyncMock(
+            return_value=MagicMock(data=[{"id": "task1", "title": "API実装"}])
+        )
+        # 保存: rpc().execute()
+        self.mock_supabase.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(data={"id": "report1", "task_work_logs": []})
+        )
+
+        self.profile_cache = MagicMock(spec=ProfileCache)
+        self.profile_cache.get = AsyncMock(
+            return_value=UserContext(self.mock_user.id, "tenant1", {"tone": "concise"})
+        )
+
+        self.ai_service = MagicMock()
+        self.ai_service.generate_report_with_logs = AsyncMock(
+            return_value=DailyReportPolished(
+                subject="件名", content_polished="本文", politeness_level=3
+            )
+        )
+
+    async def call(self, response: Response):
+        from app.routers.reports import create_report
+
+        return await create_report(
+            self.draft,
+            response,
+            self.mock_user,
+            self.mock_supabase,
+            self.ai_service,
+            self.profile_cache,
+        )
+
+    async def test_prefetch_runs_concurrently(self):
+        """正常系: プロフィールとアクティブタスクの取得は並行して行われる"""
+        in_flight = 0
+        max_in_flight = 0
+
+        def slow(result):
+            async def inner(*args, **kwargs):
+                nonlocal in_flight, max_in_flight
+                in_flight += 1
+                max_in_flight = max(max_in_flight, in_flight)
+                await asyncio.sleep(0.01)
+                in_flight -= 1
+                return result
+
+            return inner
+
+        self.profile_cache.get = slow(UserContext(self.mock_user.id, "tenant1", None))
+        self.mock_tasks_query.execute = slow(MagicMock(data=[]))
+
+        await self.call(Response())
+
+        self.assertEqual(max_in_flight, 2)
+
+    async def test_ai_receives_prefetched_inputs_and_timing_is_reported(self):
+        """正常系: 取得したタスクとAI設定がAIに渡され、Server-Timing が返る"""
+        response = Response()
+
+        result = await self.call(response)
+
+        self.assertEqual(result.subject, "件名")
+        args = self.ai_service.generate_report_with_logs.call_args.args
+        self.assertEqual(args[2], [{"id": "task1", "title": "API実装"}])
+        self.assertEqual(args[3], {"tone": "concise"})
+
+        name, params = self.mock_supabase.rpc.call_args.args
+        self.assertEqual(name, "create_daily_report_with_logs")
+        self.assertEqual(params["p_tenant_id"], "tenant1")
+
+        server_timing = response.headers["Server-Timing"]
+        for phase in ("prefetch", "ai", "save", "total"):
+            self.assertIn(f"{phase};dur=", server_timing)
+
+    async def test_profile_not_found(self):
+        """異常系: プロフィールがない場合は400エラーでAIは呼ばない"""
+        self.profile_cache.get = AsyncMock(side_effect=ProfileNotFoundError())
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.call(Response())
+
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.ai_service.generate_report_with_logs.assert_not_called()
+
+    async def test_report_and_logs_saved_in_one_call(self):
+        """正常系: 日報と工数ログは1回のRPCでまとめて保存される"""
+        task_id = uuid4()
+        self.ai_service.generate_report_with_logs.return_value = DailyReportPolished(
+            subject="件名",
+            content_polished="本文",
+            politeness_level=3,
+            work_logs=[WorkLogExtraction(task_id=task_id, hours=1.5)],
+        )
+
+        await self.call(Response())
+
+        self.mock_supabase.rpc.assert_called_once()
+        params = self.mock_supabase.rpc.call_args.args[1]
+        self.assertEqual(
+            params["p_work_logs"], [{"task_id": str(task_id), "hours": 1.5}]
+        )
+        # テーブルへの直接のInsertは行わない
+        self.mock_supabase.table.return_value.insert.assert_not_called()
+
+    async def test_key_facts_saved_for_weekly_digest(self):
+        """正常系: AIが抽出した要点は空行を除き MAX_KEY_FACTS 件までダイジェスト用に渡す"""
+        self.ai_service.generate_report_with_logs.return_value = DailyReportPolished(
+            subject="件名",
+            content_polished="本文",
+            politeness_level=3,
+            key_facts=[" API実装完了 ", ""] + [f"要点{i}" for i in range(6)],
+        )
+
+        await self.call(Response())
+
+        params = self.mock_supabase.rpc.call_args.args[1]
+        self.assertEqual(
+            params["p_key_facts"],
+            ["API実装完了", "要点0", "要点1", "要点2", "要点3"],
+        )
+
+    async def test_save_failure_returns_500(self):
+        """異常系: 保存に失敗した場合は500エラー（日報・工数ログとも保存されない）"""
+        self.mock_supabase.rpc.return_value.execute.side_effect = Exception("DB Error")
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.call(Response())
+
+        self.assertEqual(ctx.exception.status_code, 500)
+
+
+class TestCreateReportsBatch(unittest.IsolatedAsyncioTestCase):
+    """POST /reports/batch の単体テスト"""
+
+    def setUp(self):
+        self.mock_user = MagicMock()
+        self.mock_user.id = str(uuid4())
+        self.request = DailyReportBatchRequest(
+            drafts=[
+                DailyReportBatchItem(
+                    raw_content=f"作業{i}",
+                    politeness_level=3,
+                    report_date=f"2026-10-0{i + 1}",
+                )
+                for i in range(3)
+            ]
+        )
+
+        self.report_ids = [str(uuid4()) for _ in range(3)]
+        self.mock_supabase = MagicMock()
+        self.mock_tasks_query = self.mock_supabase.table.return_value.select.return_value.eq.return_value.neq.return_value
+        self.mock_tasks_query.execute = AsyncMock(
+            return_value=MagicMock(data=[{"id": "task1", "title": "API実装"}])
+        )
+        self.mock_supabase.rpc.return_value.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[{"id": id_, "task_work_logs": []} for id_ in self.report_ids]
+            )
+        )
+
+        self.profile_cache = MagicMock(spec=ProfileCache)
+        self.profile_cache.get = AsyncMock(
+            return_value=UserContext(self.mock_user.id, "tenant1", None)
+        )
+
+        async def polish(content_raw, politeness_level, *args, **kwargs):
+            return DailyReportPolished(
+                subject=f"件名:{content_raw}",
+                content_polished="本文",
+                politeness_level=politeness_level,
+            )
+
+        self.ai_service = MagicMock()
+        self.ai_service.generate_report_with_logs = AsyncMock(side_effect=polish)
+
+    async def call(self, response: Response | None = None):
+        from app.routers.reports import create_reports_batch
+
+        return await create_reports_batch(
+            self.request,
+            response or Response(),
+            self.mock_user,
+            self.mock_supabase,
+            self.ai_service,
+            self.profile_cache,
+        )
+
+    async def test_context_fetched_once_and_saved_in_one_call(self):
+        """正常系: プロフィールとタスクの取得・保存は件数によらず1回ずつ"""
+        response = Response()
+
+        result = await self.call(response)
+
+        self.assertEqual((result.created, result.failed), (3, 0))
+        self.assertEqual([str(r.report_id) for r in result.results], self.report_ids)
+        self.profile_cache.get.assert_awaited_once()
+        self.mock_tasks_query.execute.assert_awaited_once()
+        self.mock_supabase.rpc.assert_called_once()
+
+        name, params = self.mock_supabase.rpc.call_args.args
+        self.assertEqual(name, "create_daily_reports_with_logs")
+        self.assertEqual(
+            [r["report_date"] for r in params["p_reports"]],
+            ["2026-10-01", "2026-10-02", "2026-10-03"],
+        )
+        # AI変換にはエラー時の日報で代用させない
+        for call in self.ai_service.generate_report_with_logs.call_args_list:
+            self.assertFalse(call.kwargs["fallback"])
+        self.assertIn("ai;dur=", response.headers["Server-Timing"])
+
+    @patch("app.routers.reports.settings.REPORT_BATCH_AI_CONCURRENCY", 2)
+    async def test_ai_concurrency_is_limited(self):
+        """正常系: AI変換は並行に実行されるが、同時実行数は上限を超えない"""
+        in_flight = 0
+        max_in_flight = 0
+
+        async def slow(content_raw, politeness_level, *args, **kwargs):
+            nonlocal in_flight, max_in_flight
+            in_flight += 1
+            max_in_flight = max(max_in_flight, in_flight)
+            await asyncio.sleep(0.01)
+            in_flight -= 1
+            return DailyReportPolished(
+                subject="件名", content_polished="本文", politeness_level=3
+            )
+
+        self.ai_service.generate_report_with_logs.side_effect = slow
+
+        await self.call()
+
+        self.assertEqual(max_in_flight, 2)
+
+    async def test_ai_failure_is_reported_per_item(self):
+        """異常系: AI変換に失敗した日報だけが failed になり、保存されない"""
+        polish = self.ai_service.generate_report_with_logs.side_effect
+
+        async def fail_second(content_raw, *args, **kwargs):
+            if content_raw == "作業1":
+                raise Exception("API Error")
+            return await polish(content_raw, *args, **kwargs)
+
+        self.ai_service.generate_report_with_logs.side_effect = fail_second
+        self.mock_supabase.rpc.return_value.execute.return_value = MagicMock(
+            data=[{"id": self.report_ids[0]}, {"id": self.report_ids[2]}]
+        )
+
+        result = await self.call()
+
+        self.assertEqual(
+            [r.status for r in result.results], ["created", "failed", "created"]
+        )
+        self.assertEqual(str(result.results[2].report_id), self.report_ids[2])
+        self.assertEqual(result.results[1].error, "AI conversion failed")
+        params = self.mock_supabase.rpc.call_args.args[1]
+        self.assertEqual(
+            [r["content_raw"] for r in params["p_reports"]], ["作業0", "作業2"]
+        )
+
+    async def test_save_failure_is_reported_per_item(self):
+        """異常系: DB側で保存に失敗した日報だけが failed になる"""
+        self.mock_supabase.rpc.return_value.execute.return_value = MagicMock(
+            data=[
+                {"id": self.report_ids[0]},
+                {"error": "violates check constraint"},
+                {"id": self.report_ids[2]},
+            ]
+        )
+
+        result = await self.call()
+
+        self.assertEqual((result.created, result.failed), (2, 1))
+        self.assertEqual(result.results[1].error, "Failed to save report")
+
+    async def test_rpc_error_fails_all_items(self):
+        """異常系: 保存の呼び出し自体が失敗した場合は全件 failed（500にはしない）"""
+        self.mock_supabase.rpc.return_value.execute.side_effect = Exception("DB Error")
+
+        result = await self.call()
+
+        self.assertEqual((result.created, result.failed), (0, 3))
+
+    async def test_profile_not_found(self):
+        """異常系: プロフィールがない場合は400エラーでAIは呼ばない"""
+        self.profile_cache.get = AsyncMock(side_effect=ProfileNotFoundError())
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.call()
+
+        self.assertEqual(ctx.exception.status_code, 400)
+        self.ai_service.generate_report_with_logs.assert_not_called()
+
+    def test_batch_size_is_limited(self):
+        """異常系: 空のリクエストや上限を超える件数は受け付けない"""
+        draft = {"raw_content": "作業", "politeness_level": 3}
+        for size in (0, MAX_REPORT_BATCH_SIZE + 1):
+            with self.subTest(size=size), self.assertRaises(ValidationError):
+                DailyReportBatchRequest(drafts=[draft] * size)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,262 @@
+# backend/tests/unit/test_scoping_sessions.py
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+from uuid import uuid4
+
+from fastapi import BackgroundTasks, HTTPException
+from postgrest.exceptions import APIError
+
+from app.core.config import settings
+from app.models.scoping import ChatMessage, ScopingChatResponse, ScopingMessageRequest
+from app.services.ai_service import _build_scoping_history
+from app.services.scoping_session_service import (
+    ScopingSession,
+    ScopingSessionConflictError,
+    ScopingSessionNotFoundError,
+    ScopingSessionService,
+)
+
+REPLY = ScopingChatResponse(message="納期はいつですか？", is_complete=False)
+
+
+def conversation(turns: int, size: int = 10) -> list[ChatMessage]:
+    """user/assistant が交互に並ぶ turns 往復分の会話"""
+    messages = []
+    for i in range(turns):
+        messages.append(ChatMessage(role="user", content=f"回答{i}" + "あ" * size))
+        messages.append(ChatMessage(role="assistant", content=f"質問{i}" + "い" * size))
+    return messages
+
+
+class TestScopingSessionService(unittest.IsolatedAsyncioTestCase):
+    """ScopingSessionService の単体テスト"""
+
+    def setUp(self):
+        self.supabase = MagicMock()
+        self.table = self.supabase.table.return_value
+        self.table.insert.return_value.execute = AsyncMock()
+        # 要約の保存: table().update().eq().eq().execute()
+        self.update_query = (
+            self.table.update.return_value.eq.return_value.eq.return_value
+        )
+        self.update_query.execute = AsyncMock(
+            return_value=MagicMock(data=[{"id": "s1"}])
+        )
+        self.delete_query = (
+            self.table.delete.return_value.eq.return_value.lte.return_value
+        )
+        self.delete_query.execute = AsyncMock()
+
+        self.ai_service = MagicMock()
+        self.ai_service.generate_scoping_reply = AsyncMock(return_value=REPLY)
+        self.ai_service.summarize_scoping_history = AsyncMock(return_value="要約")
+        self.service = ScopingSessionService(self.supabase, self.ai_service)
+
+        self.session = ScopingSession(
+            id="s1",
+            user_id="u1",
+            expires_at="2026-10-18T00:00:00+00:00",
+            summary="これまでの要約",
+            compacted_through=4,
+            messages=conversation(1),
+        )
+
+    async def test_chat_sends_summary_and_unsummarized_history(self):
+        """正常系: 要約と未要約の履歴だけをAIに渡し、1往復分を続きの seq で保存する"""
+        result = await self.service.chat(self.session, "来月末です")
+
+        self.assertEqual(result, REPLY)
+        messages, summary = self.ai_service.generate_scoping_reply.call_args.args
+        self.assertEqual(summary, "これまでの要約")
+        self.assertEqual(len(messages), 3)
+        self.assertEqual(messages[-1].content, "来月末です")
+
+        rows = self.table.insert.call_args.args[0]
+        self.assertEqual([r["seq"] for r in rows], [7, 8])
+        self.assertEqual([r["role"] for r in rows], ["user", "assistant"])
+        self.assertEqual(self.session.last_seq, 8)
+
+    async def test_chat_failure_is_not_saved(self):
+        """異常系: 生成に失敗した場合はエラー時の応答を返し、履歴には残さない"""
+        self.ai_service.generate_scoping_reply.side_effect = Exception("API Error")
+
+        result = await self.service.chat(self.session, "来月末です")
+
+        self.assertFalse(result.is_complete)
+        self.table.insert.assert_not_called()
+        self.assertEqual(len(self.session.messages), 2)
+
+    async def test_concurrent_turn_raises_conflict(self):
+        """異常系: 同じ seq が先に保存されていた場合は ScopingSessionConflictError"""
+        self.table.insert.return_value.execute.side_effect = APIError(
+            {"code": "23505", "message": "duplicate key"}
+        )
+
+        with self.assertRaises(ScopingSessionConflictError):
+            await self.service.chat(self.session, "来月末です")
+
+    async def test_get_skips_summarized_messages(self):
+        """正常系: 要約済みの seq のメッセージは読み飛ばし、seq の順に並べる"""
+        query = self.table.select.return_value.eq.return_value.eq.return_value.gt.return_value.limit.return_value
+        query.execute = AsyncMock(
+            return_value=MagicMock(
+                data=[
+                    {
+                        "id": "s1",
+                        "user_id": "u1",
+                        "summary": "要約",
+                        "compacted_through": 2,
+                        "is_complete": False,
+                        "expires_at": "2026-10-18T00:00:00+00:00",
+                        "scoping_messages": [
+                            {"seq": 4, "role": "assistant", "content": "b"},
+                            {"seq": 2, "role": "assistant", "content": "old"},
+                            {"seq": 3, "role": "user", "content": "a"},
+                        ],
+                    }
+                ]
+            )
+        )
+
+        session = await self.service.get("s1", "u1")
+
+        self.assertEqual([m.content for m in session.messages], ["a", "b"])
+        self.assertEqual(session.last_seq, 4)
+
+    async def test_get_not_found(self):
+        """異常系: 存在しない・期限切れ・他ユーザーのセッションは ScopingSessionNotFoundError"""
+        query = self.table.select.return_value.eq.return_value.eq.return_value.gt.return_value.limit.return_value
+        query.execute = AsyncMock(return_value=MagicMock(data=[]))
+
+        with self.assertRaises(ScopingSessionNotFoundError):
+            await self.service.get("s1", "u1")
+
+    @patch.object(settings, "SCOPING_KEEP_RECENT_MESSAGES", 5)
+    @patch.object(settings, "SCOPING_HISTORY_TOKEN_BUDGET", 50)
+    async def test_compacts_old_turns_over_budget(self):
+        """正常系: 予算を超えたら直近を残して古いやり取りを要約し、要約済みのメッセージを削除する"""
+        self.session.messages = conversation(5)
+
+        compacted = await self.service.compact_if_needed(self.session)
+
+        self.assertTrue(compacted)
+        summary, old = self.ai_service.summarize_scoping_history.call_args.args
+        self.assertEqual(summary, "これまでの要約")
+        # 直近5件はAIの応答から始まるため、その応答も要約側に含めて4件を残す
+        self.assertEqual(len(old), 6)
+
+        values = self.table.update.call_args.args[0]
+        self.assertEqual(values, {"summary": "要約", "compacted_through": 10})
+        self.table.update.return_value.eq.return_value.eq.assert_called_with(
+            "compacted_through", 4
+        )
+        self.table.delete.return_value.eq.return_value.lte.assert_called_with("seq", 10)
+
+        self.assertEqual(self.session.summary, "要約")
+        self.assertEqual(self.session.messages[0].role, "user")
+        self.assertEqual(len(self.session.messages), 4)
+        self.assertEqual(self.session.last_seq, 14)
+
+    async def test_no_compaction_under_budget(self):
+        """正常系: 予算内であれば要約しない"""
+        self.session.messages = conversation(5)
+
+        self.assertFalse(await self.service.compact_if_needed(self.session))
+        self.ai_service.summarize_scoping_history.assert_not_called()
+
+    @patch.object(settings, "SCOPING_KEEP_RECENT_MESSAGES", 2)
+    @patch.object(settings, "SCOPING_HISTORY_TOKEN_BUDGET", 10)
+    async def test_compaction_skipped_when_already_compacted(self):
+        """異常系: 他のリクエストが先に要約していた場合は何もしない"""
+        self.session.messages = conversation(3)
+        self.update_query.execute.return_value = MagicMock(data=[])
+
+        self.assertFalse(await self.service.compact_if_needed(self.session))
+        self.table.delete.assert_not_called()
+        self.assertEqual(self.session.summary, "これまでの要約")
+        self.assertEqual(len(self.session.messages), 6)
+
+    @patch.object(settings, "SCOPING_KEEP_RECENT_MESSAGES", 2)
+    @patch.object(settings, "SCOPING_HISTORY_TOKEN_BUDGET", 10)
+    async def test_compaction_failure_keeps_history(self):
+        """異常系: 要約の生成に失敗しても例外は送出せず、履歴はそのまま残す"""
+        self.session.messages = conversation(3)
+        self.ai_service.summarize_scoping_history.side_effect = Exception("API Error")
+
+        self.assertFalse(await self.service.compact_if_needed(self.session))
+        self.table.update.assert_not_called()
+        self.assertEqual(len(self.session.messages), 6)
+
+
+class TestScopingHistory(unittest.TestCase):
+    """要約付きの会話履歴の組み立ての単体テスト"""
+
+    def test_summary_is_prepended_as_one_turn(self):
+        """正常系: 要約はユーザーの補足とAIの了承の1往復として先頭に置かれる"""
+        history = _build_scoping_history(conversation(1), "要約")
+
+        self.assertEqual(
+            [h["role"] for h in history], ["user", "model", "user", "model"]
+        )
+        self.assertIn("要約", history[0]["parts"][0]["text"])
+
+    def test_without_summary(self):
+        """正常系: 要約がない場合は会話履歴のみ"""
+        self.assertEqual(len(_build_scoping_history(conversation(1))), 2)
+
+
+class TestScopingSessionRouter(unittest.IsolatedAsyncioTestCase):
+    """POST /projects/scoping/sessions/{session_id}/messages の単体テスト"""
+
+    def setUp(self):
+        self.user = MagicMock()
+        self.user.id = "u1"
+        self.session = ScopingSession(id="s1", user_id="u1", expires_at="")
+        self.service = MagicMock(spec=ScopingSessionService)
+        self.service.get = AsyncMock(return_value=self.session)
+        self.service.chat = AsyncMock(return_value=REPLY)
+
+    async def call(self, background_tasks: BackgroundTasks):
+        from app.routers.projects import send_scoping_message
+
+        return await send_scoping_message(
+            uuid4(),
+            ScopingMessageRequest(content="来月末です"),
+            background_tasks,
+            self.user,
+            self.service,
+        )
+
+    async def test_reply_and_compaction_scheduled(self):
+        """正常系: 応答を返し、履歴の要約は応答後のバックグラウンド処理に回す"""
+        background_tasks = BackgroundTasks()
+
+        result = await self.call(background_tasks)
+
+        self.assertEqual(result, REPLY)
+        self.service.chat.assert_awaited_once_with(self.session, "来月末です")
+        self.service.compact_if_needed.assert_not_called()
+        self.assertEqual(len(background_tasks.tasks), 1)
+
+    async def test_unknown_session_returns_404(self):
+        """異常系: セッションが見つからない場合は404エラー"""
+        self.service.get.side_effect = ScopingSessionNotFoundError()
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.call(BackgroundTasks())
+
+        self.assertEqual(ctx.exception.status_code, 404)
+        self.service.chat.assert_not_called()
+
+    async def test_conflict_returns_409(self):
+        """異常系: 同じセッションへの同時送信は409エラー"""
+        self.service.chat.side_effect = ScopingSessionConflictError()
+
+        with self.assertRaises(HTTPException) as ctx:
+            await self.call(BackgroundTasks())
+
+        self.assertEqual(ctx.exception.status_code, 409)
+
+
+if __name__ == "__main__":
+    unittest.main()
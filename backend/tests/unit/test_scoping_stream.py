@@ -0,0 +1,164 @@
+# backend/tests/unit/test_scoping_stream.py
+import json
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from pydantic import ValidationError
+
+from app.core.json_stream import JsonStringFieldStream
+from app.models.scoping import ChatMessage, ScopingChatRequest, ScopingChatResponse
+from app.services.ai_service import AIService
+from tests.unit.fakes import collect_body, fake_gemini_stream, parse_sse
+
+COMPLETE_RESPONSE = {
+    "is_complete": True,
+    "message": "要件が明確になりました。\nWBSを生成します。",
+    "wbs_data": {
+        "name": "ECサイト構築",
+        "description": "企業向けECサイト",
+        "start_date": "2024-04-01",
+        "end_date": "2024-06-30",
+        "milestones": "5月末: β版",
+        "tasks": [
+            {
+                "title": "要件定義",
+                "description": "ヒアリングと要件整理",
+                "estimated_hours": 16,
+                "suggested_role": "PM",
+            },
+        ],
+    },
+}
+
+
+def split_every(text: str, size: int) -> list[str]:
+    """文字列を size 文字ずつの断片に分ける（ストリーミング応答の再現用）"""
+    return [text[i : i + size] for i in range(0, len(text), size)]
+
+
+class TestJsonStringFieldStream(unittest.TestCase):
+    """生成途中のJSONから文字列フィールドを取り出すデコーダの単体テスト"""
+
+    def decode(self, chunks: list[str]) -> str:
+        decoder = JsonStringFieldStream("message")
+        return "".join(decoder.feed(chunk) for chunk in chunks)
+
+    def test_decodes_field_split_across_chunks(self):
+        """正常系: どこで分割されても元の文字列が復元される"""
+        raw = json.dumps(COMPLETE_RESPONSE, ensure_ascii=False)
+        for size in (1, 2, 3, 7, len(raw)):
+            with self.subTest(size=size):
+                self.assertEqual(
+                    self.decode(split_every(raw, size)), COMPLETE_RESPONSE["message"]
+                )
+
+    def test_decodes_unicode_escapes_and_surrogate_pairs(self):
+        """正常系: \\uXXXX やサロゲートペアが断片の境目で分かれていても復元される"""
+        raw = json.dumps({"message": 'は"い"\t😀\\完了'}, ensure_ascii=True)
+        for size in (1, 3, 5):
+            with self.subTest(size=size):
+                self.assertEqual(
+                    self.decode(split_every(raw, size)), 'は"い"\t😀\\完了'
+                )
+
+    def test_stops_at_end_of_field(self):
+        """正常系: フィールドの終端以降は何も返さない"""
+        decoder = JsonStringFieldStream("message")
+
+        self.assertEqual(decoder.feed('{"message": "質問'), "質問")
+        self.assertEqual(decoder.feed('です", "is_complete": false}'), "です")
+        self.assertTrue(decoder.done)
+
+
+class TestStreamInteractiveScoping(unittest.IsolatedAsyncioTestCase):
+    """対話型スコーピングのストリーミング生成の単体テスト"""
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_stream_yields_message_then_result(self, MockClient):
+        """正常系: messageの断片が順に返り、最後にWBSを含む応答全体が返る"""
+        raw = json.dumps(COMPLETE_RESPONSE, ensure_ascii=False)
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.models.generate_content_stream = AsyncMock(
+            return_value=fake_gemini_stream(split_every(raw, 10))
+        )
+
+        service = AIService()
+        messages = [ChatMessage(role="user", content="ECサイトを作りたい")]
+        items = [i async for i in service.stream_interactive_scoping(messages)]
+
+        texts, result = items[:-1], items[-1]
+        self.assertTrue(all(isinstance(t, str) for t in texts))
+        self.assertEqual("".join(texts), COMPLETE_RESPONSE["message"])
+        # 断片ごとに返されている（最後にまとめて返していない）
+        self.assertGreater(len(texts), 1)
+
+        self.assertIsInstance(result, ScopingChatResponse)
+        self.assertTrue(result.is_complete)
+        self.assertEqual(result.wbs_data.tasks[0].title, "要件定義")
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_stream_raises_on_invalid_json(self, MockClient):
+        """異常系: 生成結果がJSONとして不完全な場合は例外を送出する"""
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.models.generate_content_stream = AsyncMock(
+            return_value=fake_gemini_stream(['{"message": "途中で'])
+        )
+
+        service = AIService()
+        messages = [ChatMessage(role="user", content="ECサイトを作りたい")]
+
+        with self.assertRaises(ValidationError):
+            [i async for i in service.stream_interactive_scoping(messages)]
+
+
+class TestStreamScopingRouter(unittest.IsolatedAsyncioTestCase):
+    """POST /projects/scoping/chat/stream の単体テスト"""
+
+    def setUp(self):
+        self.request = ScopingChatRequest(
+            messages=[ChatMessage(role="user", content="ECサイトを作りたい")]
+        )
+
+    async def test_stream_sends_chunks_result_and_done(self):
+        """正常系: chunk → result → done の順にイベントが送られる"""
+        from app.routers.projects import stream_scoping_chat
+
+        result = ScopingChatResponse(**COMPLETE_RESPONSE)
+
+        async def fake_stream(messages):
+            yield "要件が"
+            yield "明確になりました。"
+            yield result
+
+        ai_service = MagicMock()
+        ai_service.stream_interactive_scoping = fake_stream
+
+        response = await stream_scoping_chat(self.request, ai_service)
+        events = parse_sse(await collect_body(response))
+
+        self.assertEqual(response.media_type, "text/event-stream")
+        self.assertEqual([e[0] for e in events], ["chunk", "chunk", "result", "done"])
+        self.assertEqual(events[0][1], {"text": "要件が"})
+        self.assertEqual(events[2][1]["wbs_data"]["name"], "ECサイト構築")
+        self.assertIsInstance(events[3][1]["ttft_ms"], int)
+
+    async def test_stream_sends_error_event_on_failure(self):
+        """異常系: 生成途中で失敗した場合はerrorイベントで終わる"""
+        from app.routers.projects import stream_scoping_chat
+
+        async def fake_stream(messages):
+            yield "要件が"
+            raise Exception("503 UNAVAILABLE")
+
+        ai_service = MagicMock()
+        ai_service.stream_interactive_scoping = fake_stream
+
+        response = await stream_scoping_chat(self.request, ai_service)
+        events = parse_sse(await collect_body(response))
+
+        self.assertEqual(events[0], ("chunk", {"text": "要件が"}))
+        self.assertEqual(events[-1][0], "error")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,127 @@
+# backend/tests/unit/test_weekly_stream.py
+import unittest
+from unittest.mock import AsyncMock, MagicMock, patch
+
+from app.models.week import WeekGenerateRequest
+from app.services.ai_cache import AIResponseCache
+from app.services.ai_service import AIService
+from tests.unit.fakes import collect_body, fake_gemini_stream, parse_sse
+
+DAILY_REPORTS = [{"report_date": "2024-01-08", "content_raw": "API実装"}]
+
+
+class TestStreamWeeklySummary(unittest.IsolatedAsyncioTestCase):
+    """週報ストリーミング生成の単体テスト（Gemini APIはフェイクストリームで代替）"""
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_stream_yields_chunks_in_order(self, MockClient):
+        """正常系: 生成された断片が順番どおりに返る"""
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.models.generate_content_stream = AsyncMock(
+            return_value=fake_gemini_stream(["## 今週の", "週報\n", "- API実装"])
+        )
+
+        service = AIService()
+        chunks = [c async for c in service.stream_weekly_summary(DAILY_REPORTS)]
+
+        self.assertEqual(chunks, ["## 今週の", "週報\n", "- API実装"])
+        mock_client_instance.aio.models.generate_content_stream.assert_awaited_once()
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_stream_no_data(self, MockClient):
+        """正常系: 日報がない場合はAPIを呼ばずにメッセージを返す"""
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.models.generate_content_stream = AsyncMock()
+
+        service = AIService()
+        chunks = [c async for c in service.stream_weekly_summary([])]
+
+        self.assertIn("日報データがありません", chunks[0])
+        mock_client_instance.aio.models.generate_content_stream.assert_not_called()
+
+    @patch("app.services.ai_service.genai.Client")
+    async def test_stream_result_is_cached(self, MockClient):
+        """正常系: 生成済みの週報は2回目以降キャッシュから一括で返る"""
+        mock_client_instance = MockClient.return_value
+        mock_client_instance.aio.models.generate_content_stream = AsyncMock(
+            return_value=fake_gemini_stream(["前半", "後半"])
+        )
+
+        service = AIService(cache=AIResponseCache(None))
+        [c async for c in service.stream_weekly_summary(DAILY_REPORTS)]
+        second = [c async for c in service.stream_weekly_summary(DAILY_REPORTS)]
+
+        self.assertEqual(second, ["前半後半"])
+        mock_client_instance.aio.models.generate_content_stream.assert_awaited_once()
+
+        # 非ストリーミング版とも同じキャッシュを共有する
+        self.assertEqual(
+            await service.generate_weekly_summary(DAILY_REPORTS), "前半後半"
+        )
+
+
+class TestStreamWeeklyRouter(unittest.IsolatedAsyncioTestCase):
+    """POST /weeks/generate/stream の単体テスト"""
+
+    def setUp(self):
+        self.mock_user = MagicMock()
+        self.mock_user.id = "user1"
+
+        self.mock_supabase = MagicMock()
+        query = self.mock_supabase.table.return_value.select.return_value.eq.return_value.gte.return_value.lte.return_value.order.return_value
+        query.execute = AsyncMock(return_value=MagicMock(data=DAILY_REPORTS))
+
+        self.request = WeekGenerateRequest(
+            start_date="2024-01-08", end_date="2024-01-12"
+        )
+
+    async def test_stream_sends_chunks_then_done(self):
+        """正常系: chunkイベントが順に送られ、最後にdoneイベントが送られる"""
+        from app.routers.weeks import stream_weekly_report_preview
+
+        ai_service = MagicMock()
+        ai_service.stream_weekly_summary = lambda reports: fake_gemini_text(
+            ["今週は", "API実装"]
+        )
+
+        response = await stream_weekly_report_preview(
+            self.request, self.mock_user, self.mock_supabase, ai_service
+        )
+        events = parse_sse(await collect_body(response))
+
+        self.assertEqual(response.media_type, "text/event-stream")
+        self.assertEqual(
+            events,
+            [
+                ("chunk", {"text": "今週は"}),
+                ("chunk", {"text": "API実装"}),
+                ("done", {}),
+            ],
+        )
+
+    async def test_stream_sends_error_event_on_failure(self):
+        """異常系: 生成途中で失敗した場合はerrorイベントで終わる"""
+        from app.routers.weeks import stream_weekly_report_preview
+
+        ai_service = MagicMock()
+        ai_service.stream_weekly_summary = lambda reports: fake_gemini_text(
+            ["今週は"], error=Exception("503 UNAVAILABLE")
+        )
+
+        response = await stream_weekly_report_preview(
+            self.request, self.mock_user, self.mock_supabase, ai_service
+        )
+        events = parse_sse(await collect_body(response))
+
+        self.assertEqual(events[0], ("chunk", {"text": "今週は"}))
+        self.assertEqual(events[-1][0], "error")
+
+
+async def fake_gemini_text(chunks: list[str], error: Exception | None = None):
+    """AIService.stream_weekly_summary を模したテキスト断片のストリーム"""
+    async for chunk in fake_gemini_stream(chunks, error):
+        yield chunk.text
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,191 @@
+# backend/tests/unit/test_weekly_summary_budget.py
+import asyncio
+import unittest
+from types import SimpleNamespace
+from unittest.mock import patch
+
+from pydantic import ValidationError
+
+from app.core.config import settings
+from app.core.tokens import estimate_tokens
+from app.models.week import WeekGenerateRequest
+from app.services.ai_service import AIService, _chunk_blocks, _format_daily_report
+
+
+class FakeSummaryModels:
+    """部分要約と最終的な週報生成を区別して応答する generate_content のフェイク"""
+
+    def __init__(self):
+        self.prompts: list[str] = []
+        self.in_flight = 0
+        self.max_in_flight = 0
+
+    async def generate_content(self, model, contents, config=None):
+        self.prompts.append(contents)
+        self.in_flight += 1
+        self.max_in_flight = max(self.max_in_flight, self.in_flight)
+        await asyncio.sleep(0.01)
+        self.in_flight -= 1
+
+        if "中間要約" in contents:
+            return SimpleNamespace(text=f"■ 要約{len(self.prompts)}: 進捗は順調です。")
+        return SimpleNamespace(text="週報本文")
+
+    def chunk_prompts(self) -> list[str]:
+        return [p for p in self.prompts if "中間要約" in p]
+
+
+def make_reports(days: int) -> list[dict]:
+    return [
+        {"report_date": f"2024-01-{day:02d}", "content_raw": "API実装" * 20}
+        for day in range(1, days + 1)
+    ]
+
+
+class TestTokenEstimate(unittest.TestCase):
+    """トークン数の概算と分割の単体テスト"""
+
+    def test_estimate_tokens(self):
+        """正常系: ASCIIは約4文字で1トークン、日本語は1文字1トークン"""
+        self.assertEqual(estimate_tokens(""), 0)
+        self.assertEqual(estimate_tokens("abcdefgh"), 2)
+        self.assertEqual(estimate_tokens("日報"), 2)
+        self.assertEqual(estimate_tokens("API実装"), 3)
+
+    def test_chunk_blocks_keeps_order_and_limits(self):
+        """正常系: 件数とトークン数の上限を守り、順序を保って分割する"""
+        blocks = ["あ" * 10] * 5 + ["い" * 50] + ["う" * 10]
+
+        chunks = _chunk_blocks(blocks, max_tokens=30, max_items=2)
+
+        self.assertEqual(sum(chunks, []), blocks)
+        self.assertEqual([len(c) for c in chunks], [2, 2, 1, 1, 1])
+        # 1件で上限を超えるものは単独のまとまりになる
+        self.assertEqual(chunks[3], ["い" * 50])
+
+
+class TestFormatDailyReport(unittest.TestCase):
+    """週報生成用の日報テキストの単体テスト"""
+
+    def test_uses_digest_instead_of_raw_content(self):
+        """正常系: ダイジェストがあれば要点と工数表を使い、本文の全文は渡さない"""
+        report = {
+            "report_date": "2024-01-08",
+            "content_raw": "長いメモ" * 100,
+            "digest": {
+                "facts": ["API実装完了", "レビュー待ち"],
+                "hours": [{"task": "API実装", "hours": 3}],
+            },
+        }
+
+        text = _format_daily_report(report)
+
+        self.assertEqual(
+            text,
+            "\n■ 2024-01-08\n- API実装完了\n- レビュー待ち\n  (工数: - API実装: 3h)\n",
+        )
+
+    def test_falls_back_to_raw_content_without_facts(self):
+        """正常系: 要点がない日報（既存の日報・AI変換失敗時）は本文を使う"""
+        report = {
+            "report_date": "2024-01-08",
+            "content_raw": "API実装",
+            "digest": {"facts": [], "hours": []},
+        }
+
+        self.assertEqual(_format_daily_report(report), "\n■ 2024-01-08\nAPI実装\n")
+
+    def test_falls_back_to_joined_work_logs_without_digest(self):
+        """正常系: ダイジェストがない場合は結合済みの工数ログを使う"""
+        report = {
+            "report_date": "2024-01-08",
+            "content_raw": "API実装",
+            "task_work_logs": [{"tasks": {"title": "API実装"}, "hours": 2}],
+        }
+
+        self.assertIn("(工数: - API実装: 2h)", _format_daily_report(report))
+
+
+class TestWeeklySummaryBudget(unittest.IsolatedAsyncioTestCase):
+    """長期間の週報生成（分割要約）の単体テスト"""
+
+    def setUp(self):
+        patcher = patch("app.services.ai_service.genai.Client")
+        self.MockClient = patcher.start()
+        self.addCleanup(patcher.stop)
+        self.models = FakeSummaryModels()
+        self.MockClient.return_value.aio.models = self.models
+
+        for name, value in {
+            "WEEKLY_SUMMARY_TOKEN_BUDGET": 1000,
+            "WEEKLY_SUMMARY_CHUNK_TOKENS": 100000,
+            "WEEKLY_SUMMARY_FAN_IN": 7,
+            "WEEKLY_SUMMARY_MAX_CONCURRENCY": 3,
+        }.items():
+            setting = patch.object(settings, name, value)
+            setting.start()
+            self.addCleanup(setting.stop)
+
+    async def test_within_budget_uses_single_call(self):
+        """正常系: 予算内なら日報をそのまま渡して1回で生成する"""
+        result = await AIService().generate_weekly_summary(make_reports(5))
+
+        self.assertEqual(result, "週報本文")
+        self.assertEqual(len(self.models.prompts), 1)
+        self.assertIn("■ 2024-01-01", self.models.prompts[0])
+
+    async def test_over_budget_summarizes_hierarchically(self):
+        """正常系: 予算を超える場合は7件ずつ並行に要約し、要約をさらに要約してから生成する"""
+        with patch.object(settings, "WEEKLY_SUMMARY_TOKEN_BUDGET", 100):
+            result = await AIService().generate_weekly_summary(make_reports(49))
+
+        self.assertEqual(result, "週報本文")
+        # 49件 → 7件の要約 → 1件の要約 → 週報（2段 + 最終生成）
+        self.assertEqual(len(self.models.chunk_prompts()), 7 + 1)
+        self.assertEqual(len(self.models.prompts), 7 + 1 + 1)
+        # 1段目の要約は並行に実行されるが、同時実行数は上限を超えない
+        self.assertEqual(self.models.max_in_flight, 3)
+
+        final_prompt = self.models.prompts[-1]
+        self.assertIn("要約", final_prompt)
+        self.assertNotIn("API実装", final_prompt)
+        self.assertLessEqual(estimate_tokens(final_prompt), 1000)
+
+    async def test_stream_uses_same_budgeting(self):
+        """正常系: ストリーミング版も分割要約してから最終段だけを生成する"""
+
+        async def fake_stream(model, contents, config=None):
+            self.models.prompts.append(contents)
+
+            async def chunks():
+                yield SimpleNamespace(text="週報")
+
+            return chunks()
+
+        self.models.generate_content_stream = fake_stream
+
+        with patch.object(settings, "WEEKLY_SUMMARY_TOKEN_BUDGET", 100):
+            chunks = [
+                text
+                async for text in AIService().stream_weekly_summary(make_reports(14))
+            ]
+
+        self.assertEqual(chunks, ["週報"])
+        self.assertEqual(len(self.models.chunk_prompts()), 2)
+        self.assertNotIn("API実装", self.models.prompts[-1])
+
+
+class TestWeekGenerateRequest(unittest.TestCase):
+    """期間指定のバリデーション"""
+
+    def test_range_validation(self):
+        WeekGenerateRequest(start_date="2024-01-01", end_date="2024-12-31")
+
+        with self.assertRaises(ValidationError):
+            WeekGenerateRequest(start_date="2024-01-08", end_date="2024-01-01")
+        with self.assertRaises(ValidationError):
+            WeekGenerateRequest(start_date="2024-01-01", end_date="2025-01-01")
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -4,7 +4,7 @@
 import { useState, useEffect } from 'react'
 import { useRouter } from 'next/navigation'
 import { createClient } from '@/utils/supabase/client'
-import { generateWeeklyReport, createWeeklyReport } from '@/services/weeks'
+import { streamWeeklyReport, createWeeklyReport } from '@/services/weeks'
 
 import { Button } from '@/components/ui/button'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
@@ -48,12 +48,14 @@ export default function NewWeeklyReportPage() {
     const handleGenerate = async () => {
         if (!token) return
         setLoading(true)
+        setContent('')
         try {
-            const res = await generateWeeklyReport(token, {
-                start_date: startDate,
-                end_date: endDate
-            })
-            setContent(res.content_generated)
+            // 生成された断片から順に表示する
+            await streamWeeklyReport(
+                token,
+                { start_date: startDate, end_date: endDate },
+                text => setContent(prev => prev + text)
+            )
             toast.success('AIが週報を生成しました')
         } catch (e) {
             toast.error('生成に失敗しました')
@@ -3,9 +3,8 @@
 
 import React from 'react'
 import Link from 'next/link'
-import useSWR from 'swr'
 import { createClient } from '@/utils/supabase/client'
-import { fetcher } from '@/utils/fetcher'
+import { usePaginatedList } from '@/utils/pagination'
 import { WeeklyReport } from '@/types'
 
 import { Card, CardContent } from '@/components/ui/card'
@@ -25,9 +24,9 @@ export default function WeeklyReportListPage() {
     }, [])
 
     const API_BASE = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
-    const { data: reports, isLoading } = useSWR<WeeklyReport[]>(
-        token ? [`${API_BASE}/api/v1/weeks`, token] : null,
-        fetcher
+    const { items: reports, isLoading, hasMore, isLoadingMore, loadMore } = usePaginatedList<WeeklyReport>(
+        `${API_BASE}/api/v1/weeks`,
+        token
     )
 
     return (
@@ -49,13 +48,13 @@ export default function WeeklyReportListPage() {
             {isLoading && <div className="flex justify-center py-10"><Loader2 className="animate-spin" /></div>}
 
             <div className="grid gap-4">
-                {reports?.length === 0 && (
+                {token && !isLoading && reports.length === 0 && (
                     <div className="text-center py-10 text-gray-500 bg-gray-50 rounded border border-dashed">
                         まだ週報がありません
                     </div>
                 )}
 
-                {reports?.map(report => (
+                {reports.map(report => (
                     <Link href={`/weeks/${report.id}`} key={report.id}>
                         <Card className="hover:shadow transition-shadow cursor-pointer">
                             <CardContent className="p-4 flex items-center justify-between">
@@ -76,6 +75,13 @@ export default function WeeklyReportListPage() {
                         </Card>
                     </Link>
                 ))}
+
+                {hasMore && (
+                    <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+                        {isLoadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                        もっと見る
+                    </Button>
+                )}
             </div>
         </div>
     )
@@ -2,13 +2,12 @@
 'use client'
 
 import Link from 'next/link'
-import useSWR from 'swr'
-import { fetcher } from '@/utils/fetcher'
+import { usePaginatedList } from '@/utils/pagination'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Badge } from '@/components/ui/badge'
 import { Button } from '@/components/ui/button'
 import { Plus, FolderKanban, Loader2 } from 'lucide-react'
-import { Project } from '@/types'
+import { ProjectSummary } from '@/types'
 
 type ProjectListProps = {
     accessToken: string
@@ -17,9 +16,9 @@ type ProjectListProps = {
 export function ProjectList({ accessToken }: ProjectListProps) {
     const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
-    const { data: projects, isLoading } = useSWR<Project[]>(
-        [`${API_BASE_URL}/api/v1/projects`, accessToken],
-        fetcher
+    const { items: projects, isLoading, hasMore, isLoadingMore, loadMore } = usePaginatedList<ProjectSummary>(
+        `${API_BASE_URL}/api/v1/projects`,
+        accessToken
     )
 
     if (isLoading) {
@@ -42,7 +41,7 @@ export function ProjectList({ accessToken }: ProjectListProps) {
                 </Link>
             </div>
 
-            {!projects || projects.length === 0 ? (
+            {projects.length === 0 ? (
                 <div className="text-center py-8 bg-gray-50 rounded-lg border border-dashed">
                     <p className="text-gray-500 mb-2">まだプロジェクトがありません。</p>
                     <Link href="/projects/new">
@@ -53,8 +52,8 @@ export function ProjectList({ accessToken }: ProjectListProps) {
                 <div className="grid gap-4 md:grid-cols-2">
                     {projects.map((project) => {
                         // 進捗率の計算
-                        const totalTasks = project.tasks.length
-                        const completedTasks = project.tasks.filter(t => t.status === 'done').length
+                        const totalTasks = project.task_count
+                        const completedTasks = project.done_count
                         const progress = totalTasks > 0 ? Math.round((completedTasks / totalTasks) * 100) : 0
 
                         return (
@@ -104,6 +103,15 @@ export function ProjectList({ accessToken }: ProjectListProps) {
                     })}
                 </div>
             )}
+
+            {hasMore && (
+                <div className="flex justify-center">
+                    <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+                        {isLoadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                        もっと見る
+                    </Button>
+                </div>
+            )}
         </div>
     )
 }
\ No newline at end of file
@@ -2,10 +2,10 @@
 'use client'
 
 import Link from 'next/link'
-import useSWR from 'swr'
-import { fetcher } from '@/utils/fetcher'
+import { usePaginatedList } from '@/utils/pagination'
 import { Card, CardContent, CardHeader, CardTitle } from '@/components/ui/card'
 import { Badge } from '@/components/ui/badge'
+import { Button } from '@/components/ui/button'
 import { Report } from '@/types'
 import { Loader2, AlertCircle } from 'lucide-react'
 
@@ -21,14 +21,12 @@ export function ReportList({ accessToken }: ReportListProps) {
     // 環境変数からAPIのURLを取得
     const API_BASE_URL = process.env.NEXT_PUBLIC_API_URL || 'http://localhost:8000'
 
-    // SWRによるデータ取得
+    // SWRによるデータ取得（新しい順に1ページずつ、「もっと見る」で続きを取得）
     // キーを配列 [url, token] にすることで、トークンが変われば再取得される
-    const { data: reports, error, isLoading } = useSWR<Report[]>(
-        [`${API_BASE_URL}/api/v1/reports`, accessToken],
-        fetcher,
+    const { items: reports, error, isLoading, hasMore, isLoadingMore, loadMore } = usePaginatedList<Report>(
+        `${API_BASE_URL}/api/v1/reports`,
+        accessToken,
         {
-            // オプション設定
-            revalidateOnFocus: false, // ウィンドウフォーカス時の再取得を無効化（通信削減）
             dedupingInterval: 60000,  // 1分間はキャッシュを使用
         }
     )
@@ -56,7 +54,7 @@ export function ReportList({ accessToken }: ReportListProps) {
         <div className="space-y-4">
             <h2 className="text-xl font-bold text-gray-800 border-b pb-2">過去の日報一覧</h2>
 
-            {!reports || reports.length === 0 ? (
+            {reports.length === 0 ? (
                 <div className="text-center py-10 text-gray-500 bg-white rounded-lg border border-dashed">
                     まだ日報がありません。上のボタンから作成してみましょう！
                 </div>
@@ -88,6 +86,12 @@ export function ReportList({ accessToken }: ReportListProps) {
                             </Card>
                         </Link>
                     ))}
+                    {hasMore && (
+                        <Button variant="outline" onClick={loadMore} disabled={isLoadingMore}>
+                            {isLoadingMore && <Loader2 className="mr-2 h-4 w-4 animate-spin" />}
+                            もっと見る
+                        </Button>
+                    )}
                 </div>
             )}
         </div>
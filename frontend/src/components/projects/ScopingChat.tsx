@@ -8,7 +8,7 @@ import { Textarea } from '@/components/ui/textarea'
 import { Card, CardContent } from '@/components/ui/card'
 import { Loader2, Send, Sparkles } from 'lucide-react'
 import { toast } from 'sonner'
-import { scopingChat } from '@/services/projects'
+import { createScopingSession, streamScopingMessage } from '@/services/projects'
 import { createClient } from '@/utils/supabase/client'
 
 // WBS生成完了後の遷移ディレイ（ユーザーが完了メッセージを確認できるように）
@@ -29,6 +29,8 @@ export default function ScopingChat({ initialDescription, onComplete, onCancel }
     const [isComplete, setIsComplete] = useState(false)
     const [isComposing, setIsComposing] = useState(false)
     const messagesEndRef = useRef<HTMLDivElement>(null)
+    // 会話履歴はサーバー側のセッションで保持し、送るのは新しいメッセージだけ
+    const sessionIdRef = useRef<string | null>(null)
 
     // WBSデータを親コンポーネントに渡すヘルパー
     const completeScoping = (wbsData: NonNullable<ScopingChatResponse['wbs_data']>) => {
@@ -46,6 +48,29 @@ export default function ScopingChat({ initialDescription, onComplete, onCancel }
         }, COMPLETION_TRANSITION_DELAY_MS)
     }
 
+    // AIの応答をストリーミングで受け取り、届いた分から吹き出しに表示する
+    // history の最後の要素が今回送るユーザーのメッセージ
+    const streamReply = async (token: string, history: ChatMessage[]) => {
+        let received = ''
+        try {
+            if (!sessionIdRef.current) {
+                sessionIdRef.current = (await createScopingSession(token)).id
+            }
+            const content = history[history.length - 1].content
+            const response = await streamScopingMessage(token, sessionIdRef.current, content, (text) => {
+                received += text
+                setMessages([...history, { role: 'assistant', content: received }])
+            })
+            // 最終的な応答で置き換える（ストリーミング中の表示との差分を解消）
+            setMessages([...history, { role: 'assistant', content: response.message }])
+            return response
+        } catch (e) {
+            // 途中まで表示した応答は取り消す
+            setMessages(history)
+            throw e
+        }
+    }
+
     // メッセージを送信する
     const handleSend = async () => {
         if (!input.trim() || loading) return
@@ -64,11 +89,7 @@ export default function ScopingChat({ initialDescription, onComplete, onCancel }
                 return
             }
 
-            const response = await scopingChat(session.access_token, newMessages)
-
-            // AIの応答をメッセージに追加
-            const aiMessage: ChatMessage = { role: 'assistant', content: response.message }
-            setMessages([...newMessages, aiMessage])
+            const response = await streamReply(session.access_token, newMessages)
 
             // ヒアリングが完了した場合
             if (response.is_complete && response.wbs_data) {
@@ -97,9 +118,7 @@ export default function ScopingChat({ initialDescription, onComplete, onCancel }
             const { data: { session } } = await supabase.auth.getSession()
             if (!session) return
 
-            const response = await scopingChat(session.access_token, messages)
-            const aiMessage: ChatMessage = { role: 'assistant', content: response.message }
-            setMessages([...messages, aiMessage])
+            const response = await streamReply(session.access_token, messages)
 
             if (response.is_complete && response.wbs_data) {
                 completeScoping(response.wbs_data)
@@ -154,7 +173,8 @@ export default function ScopingChat({ initialDescription, onComplete, onCancel }
                                 </div>
                             </div>
                         ))}
-                        {loading && (
+                        {/* 応答の最初の断片が届くまでローディングを表示 */}
+                        {loading && messages[messages.length - 1].role !== 'assistant' && (
                             <div className="flex justify-start mb-4">
                                 <div className="bg-white border border-gray-200 rounded-lg px-4 py-2">
                                     <Loader2 className="w-4 h-4 animate-spin text-gray-500" />
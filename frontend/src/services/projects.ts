@@ -1,5 +1,6 @@
 /* frontend/src/services/projects.ts */
-import { Profile, Project, TaskDraft, Task, ActiveTask, ChatMessage, ScopingChatResponse, ProjectData } from '@/types'
+import { Profile, Project, TaskDraft, Task, ActiveTask, ChatMessage, ScopingChatResponse, ScopingSession, ProjectData, Page, ProjectSummary } from '@/types'
+import { readSSE } from '@/utils/sse'
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL + '/api/v1'
 
@@ -19,6 +20,70 @@ export async function scopingChat(
     return res.json()
 }
 
+/**
+ * 対話型スコーピングのストリーミング版
+ * AIの応答メッセージの断片が届くたびに onChunk が呼ばれ、完了後に応答全体(WBSデータを含む)を返す
+ */
+export async function streamScopingChat(
+    token: string,
+    messages: ChatMessage[],
+    onChunk: (text: string) => void
+): Promise<ScopingChatResponse> {
+    const res = await fetch(`${API_BASE}/projects/scoping/chat/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` },
+        body: JSON.stringify({ messages }),
+    })
+    if (!res.ok) throw new Error('対話処理に失敗しました')
+    return readScopingStream(res, onChunk)
+}
+
+/**
+ * 対話型スコーピングのセッションを作成する（会話履歴はサーバー側で保持される）
+ */
+export async function createScopingSession(token: string): Promise<ScopingSession> {
+    const res = await fetch(`${API_BASE}/projects/scoping/sessions`, {
+        method: 'POST',
+        headers: { Authorization: `Bearer ${token}` },
+    })
+    if (!res.ok) throw new Error('対話の開始に失敗しました')
+    return res.json()
+}
+
+/**
+ * セッションに新しいメッセージだけを送り、AIの応答をストリーミングで受け取る
+ * イベントの扱いは streamScopingChat と同じ
+ */
+export async function streamScopingMessage(
+    token: string,
+    sessionId: string,
+    content: string,
+    onChunk: (text: string) => void
+): Promise<ScopingChatResponse> {
+    const res = await fetch(`${API_BASE}/projects/scoping/sessions/${sessionId}/messages/stream`, {
+        method: 'POST',
+        headers: { 'Content-Type': 'application/json', Authorization: `Bearer ${token}` },
+        body: JSON.stringify({ content }),
+    })
+    if (!res.ok) throw new Error('対話処理に失敗しました')
+    return readScopingStream(res, onChunk)
+}
+
+async function readScopingStream(
+    res: Response,
+    onChunk: (text: string) => void
+): Promise<ScopingChatResponse> {
+    let result: ScopingChatResponse | null = null
+    for await (const { event, data } of readSSE(res)) {
+        if (event === 'chunk') onChunk(String(data.text))
+        if (event === 'result') result = data as unknown as ScopingChatResponse
+        if (event === 'error') throw new Error(String(data.message))
+    }
+
+    if (!result) throw new Error('対話処理に失敗しました')
+    return result
+}
+
 /**
  * プロジェクト概要からWBS(タスク案)を生成する
  */
@@ -62,16 +127,17 @@ export async function getMembers(token: string): Promise<Profile[]> {
 }
 
 /**
- * プロジェクト一覧を取得する
+ * プロジェクト一覧を1ページ分取得する（続きは next_cursor を渡して取得）
  */
-export async function getProjects(token: string): Promise<Project[]> {
-    const res = await fetch(`${API_BASE}/projects`, {
+export async function getProjects(token: string, cursor?: string): Promise<Page<ProjectSummary>> {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+    const res = await fetch(`${API_BASE}/projects${query}`, {
         headers: { Authorization: `Bearer ${token}` },
     })
 
     if (!res.ok) {
         console.error('Failed to fetch projects')
-        return []
+        return { items: [], next_cursor: null }
     }
 
     return res.json()
@@ -1,5 +1,5 @@
 /* frontend/src/services/reports.ts */
-import { Report } from '@/types'
+import { Page, Report } from '@/types'
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL + '/api/v1/reports'
 
@@ -33,8 +33,9 @@ export async function createReport(token: string, draft: CreateReportDraft): Pro
  * ※ SWRを使う場合は fetcher を直接使うことも多いですが、
  * SSRや別の場所で使うためにサービス関数としても用意しておくと便利です
  */
-export async function getReports(token: string): Promise<Report[]> {
-    const res = await fetch(`${API_BASE}`, {
+export async function getReports(token: string, cursor?: string): Promise<Page<Report>> {
+    const query = cursor ? `?cursor=${encodeURIComponent(cursor)}` : ''
+    const res = await fetch(`${API_BASE}${query}`, {
         headers: {
             Authorization: `Bearer ${token}`,
         },
@@ -1,5 +1,6 @@
 /* frontend/src/services/weeks.ts */
 import { WeeklyReport } from '@/types'
+import { readSSE } from '@/utils/sse'
 
 const API_BASE = process.env.NEXT_PUBLIC_API_URL + '/api/v1'
 
@@ -23,6 +24,32 @@ export async function generateWeeklyReport(
     return res.json()
 }
 
+/**
+ * 週報ドラフトをストリーミングで生成する（保存はしない）
+ * 生成されたテキストの断片が届くたびに onChunk が呼ばれる
+ */
+export async function streamWeeklyReport(
+    token: string,
+    range: { start_date: string; end_date: string },
+    onChunk: (text: string) => void
+): Promise<void> {
+    const res = await fetch(`${API_BASE}/weeks/generate/stream`, {
+        method: 'POST',
+        headers: {
+            'Content-Type': 'application/json',
+            Authorization: `Bearer ${token}`
+        },
+        body: JSON.stringify(range),
+    })
+
+    if (!res.ok) throw new Error('AI生成に失敗しました')
+
+    for await (const { event, data } of readSSE(res)) {
+        if (event === 'chunk') onChunk(String(data.text))
+        if (event === 'error') throw new Error(String(data.message))
+    }
+}
+
 /**
  * 週報を確定保存する
  */
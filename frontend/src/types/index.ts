@@ -56,6 +56,16 @@ export type Project = {
     tasks: Task[] // 詳細情報を含むTask型に変更
 }
 
+// プロジェクト一覧用 (タスク本体の代わりにDBで集計した値を持つ)
+export type ProjectSummary = Omit<Project, 'tasks'> & {
+    task_count: number
+    todo_count: number
+    in_progress_count: number
+    done_count: number
+    estimated_hours_total: number
+    done_estimated_hours: number
+}
+
 // 自分の担当タスク（入力補助用）
 export type ActiveTask = {
     id: string
@@ -73,6 +83,12 @@ export type WorkLog = {
     }
 }
 
+// 一覧APIのページ (キーセット方式。next_cursor が null なら最終ページ)
+export type Page<T> = {
+    items: T[]
+    next_cursor: string | null
+}
+
 // 週報
 export type WeeklyReport = {
     id: string
@@ -98,6 +114,11 @@ export type ChatMessage = {
     content: string
 }
 
+export type ScopingSession = {
+    id: string
+    expires_at: string
+}
+
 export type ScopingChatResponse = {
     message: string
     is_complete: boolean
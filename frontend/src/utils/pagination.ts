@@ -0,0 +1,47 @@
+/* frontend/src/utils/pagination.ts */
+import useSWRInfinite, { SWRInfiniteConfiguration } from 'swr/infinite'
+import { fetcher } from '@/utils/fetcher'
+import { Page } from '@/types'
+
+/**
+ * カーソル方式の一覧APIを「もっと見る」で順に読み込むフック
+ * @param url 一覧APIのURL (null の場合は取得しない)
+ * @param token APIアクセストークン
+ * @param options SWRの追加オプション
+ */
+export function usePaginatedList<T>(
+    url: string | null,
+    token: string | null,
+    options?: SWRInfiniteConfiguration
+) {
+    const getKey = (pageIndex: number, previousPage: Page<T> | null) => {
+        if (!url || !token) return null
+        // 前のページが最終ページならそれ以上取得しない
+        if (previousPage && !previousPage.next_cursor) return null
+        if (pageIndex === 0) return [url, token]
+        return [`${url}?cursor=${encodeURIComponent(previousPage!.next_cursor!)}`, token]
+    }
+
+    const { data, error, isLoading, isValidating, size, setSize } = useSWRInfinite<Page<T>>(
+        getKey,
+        fetcher,
+        {
+            revalidateOnFocus: false, // ウィンドウフォーカス時の再取得を無効化（通信削減）
+            revalidateFirstPage: false, // 続きを読み込む際に1ページ目を再取得しない
+            ...options,
+        }
+    )
+
+    const items = data ? data.flatMap(page => page.items) : []
+    const lastPage = data?.[data.length - 1]
+
+    return {
+        items,
+        error,
+        isLoading,
+        // 続きのページがあるか
+        hasMore: !!lastPage?.next_cursor,
+        isLoadingMore: isValidating && size > (data?.length ?? 0),
+        loadMore: () => setSize(size + 1),
+    }
+}
@@ -0,0 +1,42 @@
+/* frontend/src/utils/sse.ts */
+
+export type SSEEvent = {
+    event: string
+    data: Record<string, unknown>
+}
+
+/**
+ * fetch のレスポンス本文を Server-Sent Events として読み出す
+ * (EventSource は POST や Authorization ヘッダーを扱えないため、fetch + ReadableStream で処理する)
+ */
+export async function* readSSE(res: Response): AsyncGenerator<SSEEvent> {
+    if (!res.body) return
+
+    const reader = res.body.getReader()
+    const decoder = new TextDecoder()
+    let buffer = ''
+
+    while (true) {
+        const { done, value } = await reader.read()
+        if (done) break
+
+        buffer += decoder.decode(value, { stream: true })
+
+        // イベントは空行区切り
+        let boundary = buffer.indexOf('\n\n')
+        while (boundary !== -1) {
+            const block = buffer.slice(0, boundary)
+            buffer = buffer.slice(boundary + 2)
+
+            let event = 'message'
+            let data = ''
+            for (const line of block.split('\n')) {
+                if (line.startsWith('event: ')) event = line.slice(7)
+                else if (line.startsWith('data: ')) data += line.slice(6)
+            }
+            yield { event, data: data ? JSON.parse(data) : {} }
+
+            boundary = buffer.indexOf('\n\n')
+        }
+    }
+}
@@ -0,0 +1,31 @@
+-- 20261017090000_create_ai_response_cache.sql
+
+-- =============================================
+-- AI Response Cache Table (AI応答の共有キャッシュ)
+-- =============================================
+-- 「モデル名・プロンプト・応答スキーマ」のハッシュをキーに、Geminiの応答を保存します。
+-- バックエンドの全ワーカー・全インスタンスで共有し、同一入力でのAI再呼び出しを防ぎます。
+
+create table public.ai_response_cache (
+  cache_key text primary key,      -- sha256(モデル名 + プロンプト + 応答スキーマ)
+  model text not null,             -- 生成に使ったモデル名
+  response text not null,          -- 応答本文（構造化出力の場合はJSON文字列）
+
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  expires_at timestamp with time zone not null
+);
+
+comment on table public.ai_response_cache is 'AI応答の内容アドレス型キャッシュ';
+
+-- 期限切れ行の削除用
+-- バックエンド（AIResponseCache）が書き込みのついでに一定間隔で
+-- delete from public.ai_response_cache where expires_at < now(); を実行する
+create index ai_response_cache_expires_at_idx
+  on public.ai_response_cache (expires_at);
+
+-- =============================================
+-- Enable RLS
+-- =============================================
+-- バックエンド（service_role）からのみ読み書きする。
+-- 他ユーザーの入力内容を含むため、クライアント向けのポリシーは作成しない。
+alter table public.ai_response_cache enable row level security;
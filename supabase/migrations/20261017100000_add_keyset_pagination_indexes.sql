@@ -0,0 +1,20 @@
+-- 20261017100000_add_keyset_pagination_indexes.sql
+
+-- =============================================
+-- Keyset Pagination Indexes (一覧APIのページング用インデックス)
+-- =============================================
+-- 一覧APIは (created_at, id) の降順でカーソル位置から limit 件だけを読みます。
+-- 絞り込み列 + (created_at desc, id desc) の複合インデックスにより、
+-- 何ページ目であってもソートなしでインデックスを範囲スキャンするだけで済みます。
+
+-- GET /reports: 自分の日報一覧
+create index if not exists daily_reports_user_created_at_id_idx
+  on public.daily_reports (user_id, created_at desc, id desc);
+
+-- GET /weeks: 自分の週報一覧
+create index if not exists weekly_summaries_user_created_at_id_idx
+  on public.weekly_summaries (user_id, created_at desc, id desc);
+
+-- GET /projects: テナント内のプロジェクト一覧（RLSで tenant_id に絞り込まれる）
+create index if not exists projects_tenant_created_at_id_idx
+  on public.projects (tenant_id, created_at desc, id desc);
@@ -0,0 +1,49 @@
+-- 20261017110000_create_project_summaries_view.sql
+
+-- =============================================
+-- Project Summaries View (プロジェクト一覧用の集計ビュー)
+-- =============================================
+-- プロジェクト一覧では、タスク本体の代わりにステータス別の件数と想定工数の合計を返します。
+-- 集計はDB側で行うため、一覧のレスポンスにはタスクが含まれません。
+-- タスク本体はプロジェクト詳細 (GET /projects/{id}) でのみ取得します。
+
+-- タスクをプロジェクト単位で集計するためのインデックス
+-- status / estimated_hours を含めることで、テーブル本体を読まずに集計できる
+create index if not exists tasks_project_id_idx
+  on public.tasks (project_id) include (status, estimated_hours);
+
+-- security_invoker: 呼び出したユーザーの権限で実行し、projects / tasks のRLSをそのまま適用する
+create view public.project_summaries
+with (security_invoker = true) as
+select
+  p.id,
+  p.tenant_id,
+  p.name,
+  p.description,
+  p.status,
+  p.start_date,
+  p.end_date,
+  p.milestones,
+  p.created_at,
+  coalesce(t.task_count, 0) as task_count,
+  coalesce(t.todo_count, 0) as todo_count,
+  coalesce(t.in_progress_count, 0) as in_progress_count,
+  coalesce(t.done_count, 0) as done_count,
+  coalesce(t.estimated_hours_total, 0) as estimated_hours_total,
+  coalesce(t.done_estimated_hours, 0) as done_estimated_hours
+from public.projects p
+left join lateral (
+  select
+    count(*) as task_count,
+    count(*) filter (where status = 'todo') as todo_count,
+    count(*) filter (where status = 'in_progress') as in_progress_count,
+    count(*) filter (where status = 'done') as done_count,
+    sum(estimated_hours) as estimated_hours_total,
+    sum(estimated_hours) filter (where status = 'done') as done_estimated_hours
+  from public.tasks
+  where tasks.project_id = p.id
+) t on true;
+
+comment on view public.project_summaries is 'プロジェクト一覧用: タスクのステータス別件数と想定工数の合計';
+
+grant select on public.project_summaries to authenticated;
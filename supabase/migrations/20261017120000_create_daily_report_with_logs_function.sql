@@ -0,0 +1,67 @@
+-- 20261017120000_create_daily_report_with_logs_function.sql
+
+-- =============================================
+-- create_daily_report_with_logs (日報と工数ログの一括保存)
+-- =============================================
+-- 日報本体と工数ログを1回の呼び出し・1トランザクションで保存し、
+-- 工数ログ（タスク名付き）を結合した日報を返します。
+-- 途中で失敗した場合はどちらも保存されません（日報だけが残ることはありません）。
+--
+-- AIが存在しないタスクIDや範囲外の時間を返した場合に日報ごと失敗しないよう、
+-- 同じテナントに存在するタスクで、numeric(4, 2) に収まる時間のログだけを保存します。
+--
+-- p_work_logs の形式: [{"task_id": "uuid", "hours": 1.5}, ...]
+
+create or replace function public.create_daily_report_with_logs(
+  p_user_id uuid,
+  p_tenant_id uuid,
+  p_content_raw text,
+  p_content_polished text,
+  p_subject text,
+  p_politeness_level integer,
+  p_work_logs jsonb default '[]'::jsonb
+)
+returns jsonb
+language plpgsql
+security invoker -- 呼び出し元の権限で実行し、各テーブルのRLSをそのまま適用する
+set search_path = public
+as $$
+declare
+  v_report public.daily_reports;
+  v_logs jsonb;
+begin
+  insert into public.daily_reports (
+    user_id, tenant_id, content_raw, content_polished, subject, politeness_level
+  )
+  values (
+    p_user_id, p_tenant_id, p_content_raw, p_content_polished, p_subject, p_politeness_level
+  )
+  returning * into v_report;
+
+  insert into public.task_work_logs (tenant_id, daily_report_id, task_id, hours)
+  select p_tenant_id, v_report.id, l.task_id, l.hours
+  from jsonb_to_recordset(coalesce(p_work_logs, '[]'::jsonb)) as l(task_id uuid, hours numeric)
+  where l.hours > 0
+    and l.hours < 100
+    and exists (
+      select 1 from public.tasks t
+      where t.id = l.task_id and t.tenant_id = p_tenant_id
+    );
+
+  -- 一覧・詳細APIの select("*, task_work_logs(*, tasks(title))") と同じ形で返す
+  select coalesce(
+    jsonb_agg(to_jsonb(w) || jsonb_build_object('tasks', jsonb_build_object('title', t.title))),
+    '[]'::jsonb
+  )
+  into v_logs
+  from public.task_work_logs w
+  join public.tasks t on t.id = w.task_id
+  where w.daily_report_id = v_report.id;
+
+  return to_jsonb(v_report) || jsonb_build_object('task_work_logs', v_logs);
+end;
+$$;
+
+comment on function public.create_daily_report_with_logs is '日報と工数ログを1トランザクションで保存し、結合済みの日報を返す';
+
+grant execute on function public.create_daily_report_with_logs to authenticated, service_role;
@@ -0,0 +1,78 @@
+-- 20261017130000_create_project_with_tasks_function.sql
+
+-- =============================================
+-- create_project_with_tasks (プロジェクトとWBSタスクの一括作成)
+-- =============================================
+-- プロジェクト本体と全タスクを1回の呼び出し・1トランザクションで作成し、
+-- タスクを含めたプロジェクトを返します（GET /projects/{id} の select("*, tasks(*)") と同じ形）。
+-- タスクの作成に失敗した場合はプロジェクトも作成されません。
+--
+-- タスクはJSON配列から1回の INSERT ... SELECT でまとめて作成するため、
+-- 数千件のWBSでも行ごとの往復やループは発生しません。
+--
+-- p_tasks の形式:
+--   [{"title": "...", "description": "...", "estimated_hours": 8, "suggested_role": "...",
+--     "assigned_to": "uuid|null", "start_date": "YYYY-MM-DD|null", "end_date": "YYYY-MM-DD|null"}, ...]
+
+create or replace function public.create_project_with_tasks(
+  p_tenant_id uuid,
+  p_name text,
+  p_description text,
+  p_start_date date,
+  p_end_date date,
+  p_milestones text,
+  p_tasks jsonb default '[]'::jsonb
+)
+returns jsonb
+language plpgsql
+security invoker -- 呼び出し元の権限で実行し、各テーブルのRLSをそのまま適用する
+set search_path = public
+as $$
+declare
+  v_project public.projects;
+  v_tasks jsonb;
+begin
+  insert into public.projects (
+    tenant_id, name, description, start_date, end_date, milestones, status
+  )
+  values (
+    p_tenant_id, p_name, p_description, p_start_date, p_end_date, p_milestones, 'planning'
+  )
+  returning * into v_project;
+
+  -- 入力順(ord)を保ったまま一括で作成し、作成された行をそのままJSONにまとめる
+  with inserted as (
+    insert into public.tasks (
+      project_id, tenant_id, title, description, estimated_hours, suggested_role,
+      assigned_to, start_date, end_date
+    )
+    select
+      v_project.id, p_tenant_id, t.title, t.description, t.estimated_hours, t.suggested_role,
+      t.assigned_to, t.start_date, t.end_date
+    from rows from (
+      jsonb_to_recordset(coalesce(p_tasks, '[]'::jsonb)) as (
+        title text,
+        description text,
+        estimated_hours integer,
+        suggested_role text,
+        assigned_to uuid,
+        start_date date,
+        end_date date
+      )
+    ) with ordinality as t(
+      title, description, estimated_hours, suggested_role, assigned_to, start_date, end_date, ord
+    )
+    order by t.ord
+    returning *
+  )
+  select coalesce(jsonb_agg(to_jsonb(inserted)), '[]'::jsonb)
+  into v_tasks
+  from inserted;
+
+  return to_jsonb(v_project) || jsonb_build_object('tasks', v_tasks);
+end;
+$$;
+
+comment on function public.create_project_with_tasks is 'プロジェクトと全タスクを1トランザクションで作成し、タスクを含めたプロジェクトを返す';
+
+grant execute on function public.create_project_with_tasks to authenticated, service_role;
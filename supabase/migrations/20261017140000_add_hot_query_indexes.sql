@@ -0,0 +1,29 @@
+-- 20261017140000_add_hot_query_indexes.sql
+
+-- =============================================
+-- Hot Query Indexes (よく使う絞り込み条件のインデックス)
+-- =============================================
+-- 各APIが毎回使う絞り込み条件に対応する複合インデックスを追加します。
+-- 実行計画でインデックスが使われていることは supabase/tests/database/query_plans.test.sql で確認します。
+--
+-- ※ weekly_summaries の (user_id, created_at) は
+--    20261017100000_add_keyset_pagination_indexes.sql の
+--    weekly_summaries_user_created_at_id_idx で既にカバーされているため追加しません。
+
+-- POST /weeks/generate, 週報バッチ: ユーザーの指定期間の日報を日付順に取得
+-- (user_id, report_date, id) の順はバッチのキーセットページングの並び順とも一致する
+create index if not exists daily_reports_user_report_date_idx
+  on public.daily_reports (user_id, report_date, id);
+
+-- POST /reports, GET /tasks/my-active: 自分に割り当てられた未完了タスク
+create index if not exists tasks_assigned_to_status_idx
+  on public.tasks (assigned_to, status);
+
+-- 日報取得時の task_work_logs の埋め込み（daily_report_id での結合）
+-- 外部キーには自動でインデックスが作られないため明示的に作成する
+create index if not exists task_work_logs_daily_report_id_idx
+  on public.task_work_logs (daily_report_id);
+
+-- GET /members: 同じテナントに所属するメンバー一覧
+create index if not exists profiles_tenant_id_idx
+  on public.profiles (tenant_id);
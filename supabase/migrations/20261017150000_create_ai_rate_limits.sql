@@ -0,0 +1,141 @@
+-- 20261017150000_create_ai_rate_limits.sql
+
+-- =============================================
+-- AI Rate Limits Table (Gemini APIの送信レート制限)
+-- =============================================
+-- バックエンドの全ワーカー・全インスタンスで共有するトークンバケットです。
+-- Geminiへリクエストを送る前に acquire_ai_rate_limit でトークンを1つ取得し、
+-- 結果に応じて adjust_ai_rate_limit でレートを調整します（AIMD）。
+--   - 成功: rate_per_minute を一定量ずつ増やす（上限はクォータ）
+--   - 429 : rate_per_minute に係数を掛けて下げ、バケットを空にする
+
+create table public.ai_rate_limits (
+  bucket_key text primary key,            -- 例: "gemini"
+  tokens double precision not null,       -- 現在のトークン数（updated_at 時点）
+  rate_per_minute double precision not null, -- 現在の補充レート（AIMDで増減する）
+
+  updated_at timestamp with time zone not null,
+  throttled_at timestamp with time zone   -- 最後に429でレートを下げた時刻
+);
+
+comment on table public.ai_rate_limits is 'Gemini APIへの送信レートを全ワーカーで共有するトークンバケット';
+
+-- =============================================
+-- Enable RLS
+-- =============================================
+-- バックエンド（service_role）からのみ読み書きする。
+alter table public.ai_rate_limits enable row level security;
+
+-- =============================================
+-- acquire_ai_rate_limit (トークンの取得)
+-- =============================================
+-- トークンを1つ取得できれば 0 を、できなければ補充されるまでの待ち秒数を返します。
+-- p_reserve を指定した呼び出し（週報バッチなど）は、その数だけトークンを残して取得します。
+-- 行ロックで直列化するため、複数ワーカーから同時に呼ばれてもトークンを取りすぎません。
+
+create or replace function public.acquire_ai_rate_limit(
+  p_bucket_key text,
+  p_max_rpm double precision,
+  p_burst double precision,
+  p_reserve double precision default 0
+)
+returns double precision
+language plpgsql
+security invoker
+set search_path = public
+as $$
+declare
+  v_bucket public.ai_rate_limits;
+  v_now timestamp with time zone := clock_timestamp();
+  v_rate double precision;
+  v_tokens double precision;
+begin
+  insert into public.ai_rate_limits (bucket_key, tokens, rate_per_minute, updated_at)
+  values (p_bucket_key, p_burst, p_max_rpm, v_now)
+  on conflict (bucket_key) do nothing;
+
+  select * into v_bucket
+  from public.ai_rate_limits
+  where bucket_key = p_bucket_key
+  for update;
+
+  -- クォータの設定が下がった場合に備えて上限で抑える
+  v_rate := least(v_bucket.rate_per_minute, p_max_rpm);
+  -- 前回からの経過時間分を補充する（上限は p_burst）
+  v_tokens := least(
+    p_burst,
+    v_bucket.tokens + extract(epoch from v_now - v_bucket.updated_at) * v_rate / 60
+  );
+
+  if v_tokens >= 1 + p_reserve then
+    update public.ai_rate_limits
+    set tokens = v_tokens - 1, rate_per_minute = v_rate, updated_at = v_now
+    where bucket_key = p_bucket_key;
+    return 0;
+  end if;
+
+  update public.ai_rate_limits
+  set tokens = v_tokens, rate_per_minute = v_rate, updated_at = v_now
+  where bucket_key = p_bucket_key;
+  return (1 + p_reserve - v_tokens) * 60 / v_rate;
+end;
+$$;
+
+-- =============================================
+-- adjust_ai_rate_limit (AIMDによるレート調整)
+-- =============================================
+-- 成功時は p_increase_rpm だけ加算し、429 を受けた時は p_decrease_factor を掛けて下げます。
+-- 同時に送っていた複数のリクエストが一斉に429になっても1回分だけ下げるよう、
+-- 前回下げてから p_cooldown_seconds 以内の429は無視します。
+-- 調整後のレート(rpm)を返します。
+
+create or replace function public.adjust_ai_rate_limit(
+  p_bucket_key text,
+  p_throttled boolean,
+  p_max_rpm double precision,
+  p_min_rpm double precision,
+  p_increase_rpm double precision,
+  p_decrease_factor double precision,
+  p_cooldown_seconds double precision
+)
+returns double precision
+language plpgsql
+security invoker
+set search_path = public
+as $$
+declare
+  v_now timestamp with time zone := clock_timestamp();
+  v_rate double precision;
+begin
+  if p_throttled then
+    update public.ai_rate_limits
+    set
+      rate_per_minute = greatest(p_min_rpm, rate_per_minute * p_decrease_factor),
+      tokens = 0,
+      updated_at = v_now,
+      throttled_at = v_now
+    where bucket_key = p_bucket_key
+      and (
+        throttled_at is null
+        or throttled_at < v_now - make_interval(secs => p_cooldown_seconds)
+      )
+    returning rate_per_minute into v_rate;
+  else
+    update public.ai_rate_limits
+    set rate_per_minute = least(p_max_rpm, rate_per_minute + p_increase_rpm)
+    where bucket_key = p_bucket_key
+    returning rate_per_minute into v_rate;
+  end if;
+
+  if v_rate is null then
+    select rate_per_minute into v_rate
+    from public.ai_rate_limits
+    where bucket_key = p_bucket_key;
+  end if;
+
+  return v_rate;
+end;
+$$;
+
+grant execute on function public.acquire_ai_rate_limit to service_role;
+grant execute on function public.adjust_ai_rate_limit to service_role;
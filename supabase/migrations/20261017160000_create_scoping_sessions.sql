@@ -0,0 +1,48 @@
+-- 20261017160000_create_scoping_sessions.sql
+
+-- =============================================
+-- Scoping Sessions (対話型スコーピングのセッション)
+-- =============================================
+-- 会話履歴をサーバー側で保持し、クライアントは新しいメッセージだけを送ります。
+-- 履歴が一定のトークン数を超えたら、古いやり取りを summary に要約して
+-- scoping_messages から削除します（Geminiへ送る履歴の長さを一定に保つ）。
+
+create table public.scoping_sessions (
+  id uuid default gen_random_uuid() primary key,
+  user_id uuid references public.profiles(id) on delete cascade not null,
+
+  summary text,                               -- 要約済みのやり取りの要約
+  compacted_through integer default 0 not null, -- 要約済みのメッセージの最後の seq
+  is_complete boolean default false not null, -- WBSの生成まで完了したか
+
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  expires_at timestamp with time zone not null
+);
+
+comment on table public.scoping_sessions is '対話型スコーピングのセッション（要約済みの履歴を含む）';
+
+create table public.scoping_messages (
+  session_id uuid references public.scoping_sessions(id) on delete cascade not null,
+  seq integer not null,                       -- セッション内の通し番号（1始まり）
+  role text not null check (role in ('user', 'assistant')),
+  content text not null,
+
+  created_at timestamp with time zone default timezone('utc'::text, now()) not null,
+  -- 同じセッションに同時に2つのターンを書き込もうとした場合は後の方が失敗する
+  primary key (session_id, seq)
+);
+
+comment on table public.scoping_messages is '対話型スコーピングのメッセージ（未要約の分のみ）';
+
+-- 期限切れセッションの掃除用
+-- delete from public.scoping_sessions where expires_at < now();
+create index scoping_sessions_expires_at_idx
+  on public.scoping_sessions (expires_at);
+
+-- =============================================
+-- Enable RLS
+-- =============================================
+-- バックエンド（service_role）からのみ読み書きする。
+-- 所有者の確認はバックエンドで行う（user_id で絞り込む）。
+alter table public.scoping_sessions enable row level security;
+alter table public.scoping_messages enable row level security;
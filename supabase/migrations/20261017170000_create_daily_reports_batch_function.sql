@@ -0,0 +1,125 @@
+-- 20261017170000_create_daily_reports_batch_function.sql
+
+-- =============================================
+-- create_daily_report_with_logs (日付指定に対応)
+-- =============================================
+-- まとめて登録する過去の日報のために p_report_date を追加します（省略時は当日）。
+-- 引数が変わると別の関数として追加されるため、旧シグネチャは削除してから作り直します。
+
+drop function if exists public.create_daily_report_with_logs(
+  uuid, uuid, text, text, text, integer, jsonb
+);
+
+create or replace function public.create_daily_report_with_logs(
+  p_user_id uuid,
+  p_tenant_id uuid,
+  p_content_raw text,
+  p_content_polished text,
+  p_subject text,
+  p_politeness_level integer,
+  p_work_logs jsonb default '[]'::jsonb,
+  p_report_date date default null
+)
+returns jsonb
+language plpgsql
+security invoker -- 呼び出し元の権限で実行し、各テーブルのRLSをそのまま適用する
+set search_path = public
+as $$
+declare
+  v_report public.daily_reports;
+  v_logs jsonb;
+begin
+  insert into public.daily_reports (
+    user_id, tenant_id, content_raw, content_polished, subject, politeness_level, report_date
+  )
+  values (
+    p_user_id, p_tenant_id, p_content_raw, p_content_polished, p_subject, p_politeness_level,
+    coalesce(p_report_date, current_date)
+  )
+  returning * into v_report;
+
+  insert into public.task_work_logs (tenant_id, daily_report_id, task_id, hours)
+  select p_tenant_id, v_report.id, l.task_id, l.hours
+  from jsonb_to_recordset(coalesce(p_work_logs, '[]'::jsonb)) as l(task_id uuid, hours numeric)
+  where l.hours > 0
+    and l.hours < 100
+    and exists (
+      select 1 from public.tasks t
+      where t.id = l.task_id and t.tenant_id = p_tenant_id
+    );
+
+  -- 一覧・詳細APIの select("*, task_work_logs(*, tasks(title))") と同じ形で返す
+  select coalesce(
+    jsonb_agg(to_jsonb(w) || jsonb_build_object('tasks', jsonb_build_object('title', t.title))),
+    '[]'::jsonb
+  )
+  into v_logs
+  from public.task_work_logs w
+  join public.tasks t on t.id = w.task_id
+  where w.daily_report_id = v_report.id;
+
+  return to_jsonb(v_report) || jsonb_build_object('task_work_logs', v_logs);
+end;
+$$;
+
+comment on function public.create_daily_report_with_logs is '日報と工数ログを1トランザクションで保存し、結合済みの日報を返す';
+
+grant execute on function public.create_daily_report_with_logs to authenticated, service_role;
+
+-- =============================================
+-- create_daily_reports_with_logs (複数の日報の一括保存)
+-- =============================================
+-- 複数の日報（と工数ログ）を1回の呼び出しで保存し、入力と同じ順で結果の配列を返します。
+-- 日報ごとにセーブポイントを置くため、1件の失敗で他の日報が巻き戻ることはありません。
+--   - 成功: 結合済みの日報（create_daily_report_with_logs の戻り値）
+--   - 失敗: {"error": "エラーメッセージ"}（その日報と工数ログは保存されません）
+--
+-- p_reports の形式:
+--   [{"content_raw": "...", "content_polished": "...", "subject": "...",
+--     "politeness_level": 3, "report_date": "2026-10-01" or null,
+--     "work_logs": [{"task_id": "uuid", "hours": 1.5}, ...]}, ...]
+
+create or replace function public.create_daily_reports_with_logs(
+  p_user_id uuid,
+  p_tenant_id uuid,
+  p_reports jsonb
+)
+returns jsonb
+language plpgsql
+security invoker
+set search_path = public
+as $$
+declare
+  v_item jsonb;
+  v_results jsonb := '[]'::jsonb;
+begin
+  for v_item in
+    select r.value
+    from jsonb_array_elements(coalesce(p_reports, '[]'::jsonb)) with ordinality as r(value, ord)
+    order by r.ord
+  loop
+    begin
+      v_results := v_results || jsonb_build_array(
+        public.create_daily_report_with_logs(
+          p_user_id,
+          p_tenant_id,
+          v_item->>'content_raw',
+          v_item->>'content_polished',
+          v_item->>'subject',
+          (v_item->>'politeness_level')::integer,
+          coalesce(v_item->'work_logs', '[]'::jsonb),
+          (v_item->>'report_date')::date
+        )
+      );
+    exception when others then
+      v_results := v_results || jsonb_build_array(jsonb_build_object('error', sqlerrm));
+    end;
+  end loop;
+
+  return v_results;
+end;
+$$;
+
+comment on function public.create_daily_reports_with_logs is '複数の日報と工数ログを1回の呼び出しで保存し、日報ごとの結果を返す';
+
+grant execute on function public.create_daily_reports_with_logs to authenticated, service_role;
@@ -0,0 +1,175 @@
+-- 20261017180000_add_digest_to_daily_reports.sql
+
+-- =============================================
+-- daily_reports.digest (週報生成用の日報ダイジェスト)
+-- =============================================
+-- 週報の生成では、日報ごとに本文の全文と工数ログを読み直して整形していました。
+-- 日報の保存時に「要点の箇条書き」と「工数表」を一度だけ作って保存しておき、
+-- 週報の生成（プレビュー・週次バッチ）ではこのダイジェストを使います。
+--
+-- 形式:
+--   {"facts": ["要点", ...], "hours": [{"task": "タスク名", "hours": 1.5}, ...]}
+--   - facts: AI変換時に抽出した要点（空の場合、週報生成は content_raw を使う）
+--   - hours: 保存された工数ログ（タスク名は保存時点のもの）
+
+alter table public.daily_reports
+  add column if not exists digest jsonb;
+
+comment on column public.daily_reports.digest is '週報生成用のダイジェスト（要点と工数表）';
+
+-- =============================================
+-- build_daily_report_digest
+-- =============================================
+-- 保存済みの工数ログから工数表を組み立て、要点と合わせてダイジェストを返します。
+
+create or replace function public.build_daily_report_digest(
+  p_report_id uuid,
+  p_facts jsonb default null
+)
+returns jsonb
+language sql
+stable
+security invoker
+set search_path = public
+as $$
+  select jsonb_build_object(
+    'facts', coalesce(p_facts, '[]'::jsonb),
+    'hours', coalesce(
+      jsonb_agg(jsonb_build_object('task', t.title, 'hours', w.hours) order by t.title),
+      '[]'::jsonb
+    )
+  )
+  from public.task_work_logs w
+  join public.tasks t on t.id = w.task_id
+  where w.daily_report_id = p_report_id;
+$$;
+
+grant execute on function public.build_daily_report_digest to authenticated, service_role;
+
+-- 既存の日報は要点なし（週報生成は content_raw を使う）で工数表だけを埋める
+update public.daily_reports r
+set digest = public.build_daily_report_digest(r.id)
+where r.digest is null;
+
+-- =============================================
+-- create_daily_report_with_logs (ダイジェストの保存に対応)
+-- =============================================
+-- p_key_facts（AIが抽出した要点）を追加し、工数ログの保存後にダイジェストを書き込みます。
+
+drop function if exists public.create_daily_report_with_logs(
+  uuid, uuid, text, text, text, integer, jsonb, date
+);
+
+create or replace function public.create_daily_report_with_logs(
+  p_user_id uuid,
+  p_tenant_id uuid,
+  p_content_raw text,
+  p_content_polished text,
+  p_subject text,
+  p_politeness_level integer,
+  p_work_logs jsonb default '[]'::jsonb,
+  p_report_date date default null,
+  p_key_facts jsonb default '[]'::jsonb
+)
+returns jsonb
+language plpgsql
+security invoker -- 呼び出し元の権限で実行し、各テーブルのRLSをそのまま適用する
+set search_path = public
+as $$
+declare
+  v_report public.daily_reports;
+  v_logs jsonb;
+begin
+  insert into public.daily_reports (
+    user_id, tenant_id, content_raw, content_polished, subject, politeness_level, report_date
+  )
+  values (
+    p_user_id, p_tenant_id, p_content_raw, p_content_polished, p_subject, p_politeness_level,
+    coalesce(p_report_date, current_date)
+  )
+  returning * into v_report;
+
+  insert into public.task_work_logs (tenant_id, daily_report_id, task_id, hours)
+  select p_tenant_id, v_report.id, l.task_id, l.hours
+  from jsonb_to_recordset(coalesce(p_work_logs, '[]'::jsonb)) as l(task_id uuid, hours numeric)
+  where l.hours > 0
+    and l.hours < 100
+    and exists (
+      select 1 from public.tasks t
+      where t.id = l.task_id and t.tenant_id = p_tenant_id
+    );
+
+  -- 工数表は除外後の（実際に保存された）工数ログから作る
+  update public.daily_reports
+  set digest = public.build_daily_report_digest(v_report.id, p_key_facts)
+  where id = v_report.id
+  returning * into v_report;
+
+  -- 一覧・詳細APIの select("*, task_work_logs(*, tasks(title))") と同じ形で返す
+  select coalesce(
+    jsonb_agg(to_jsonb(w) || jsonb_build_object('tasks', jsonb_build_object('title', t.title))),
+    '[]'::jsonb
+  )
+  into v_logs
+  from public.task_work_logs w
+  join public.tasks t on t.id = w.task_id
+  where w.daily_report_id = v_report.id;
+
+  return to_jsonb(v_report) || jsonb_build_object('task_work_logs', v_logs);
+end;
+$$;
+
+comment on function public.create_daily_report_with_logs is '日報と工数ログを1トランザクションで保存し、結合済みの日報を返す';
+
+grant execute on function public.create_daily_report_with_logs to authenticated, service_role;
+
+-- =============================================
+-- create_daily_reports_with_logs (要点の受け渡しに対応)
+-- =============================================
+-- p_reports の各要素に "key_facts": ["要点", ...] を追加します（省略時は要点なし）。
+
+create or replace function public.create_daily_reports_with_logs(
+  p_user_id uuid,
+  p_tenant_id uuid,
+  p_reports jsonb
+)
+returns jsonb
+language plpgsql
+security invoker
+set search_path = public
+as $$
+declare
+  v_item jsonb;
+  v_results jsonb := '[]'::jsonb;
+begin
+  for v_item in
+    select r.value
+    from jsonb_array_elements(coalesce(p_reports, '[]'::jsonb)) with ordinality as r(value, ord)
+    order by r.ord
+  loop
+    begin
+      v_results := v_results || jsonb_build_array(
+        public.create_daily_report_with_logs(
+          p_user_id,
+          p_tenant_id,
+          v_item->>'content_raw',
+          v_item->>'content_polished',
+          v_item->>'subject',
+          (v_item->>'politeness_level')::integer,
+          coalesce(v_item->'work_logs', '[]'::jsonb),
+          (v_item->>'report_date')::date,
+          coalesce(v_item->'key_facts', '[]'::jsonb)
+        )
+      );
+    exception when others then
+      v_results := v_results || jsonb_build_array(jsonb_build_object('error', sqlerrm));
+    end;
+  end loop;
+
+  return v_results;
+end;
+$$;
+
+comment on function public.create_daily_reports_with_logs is '複数の日報と工数ログを1回の呼び出しで保存し、日報ごとの結果を返す';
+
+grant execute on function public.create_daily_reports_with_logs to authenticated, service_role;
@@ -0,0 +1,202 @@
+-- 20261017190000_create_task_hours_daily.sql
+
+-- =============================================
+-- Task Hours Daily (タスク×日の工数集計)
+-- =============================================
+-- プロジェクト・タスクごとの実績工数を見るには、日報と工数ログを全件読んで集計する必要がありました。
+-- 工数ログの追加・更新・削除のたびにトリガーで差分だけを反映する集計テーブルを用意し、
+-- 工数のダッシュボード (GET /projects/{id}/hours) は「日数×タスク数」の行だけを読みます。
+--
+-- マテリアライズドビューの再計算と違い、集計は工数ログと同じトランザクションで更新されるため
+-- 常に最新で、更新の手間も変更された行の数にしか比例しません。
+
+-- =============================================
+-- 1. task_work_logs.work_date
+-- =============================================
+-- 日報の日付を工数ログにも持たせます（日報の削除で工数ログが連鎖削除される場合も、
+-- 削除されるログだけで集計のどの行から引けばよいかが分かるようにするため）。
+
+alter table public.task_work_logs
+  add column if not exists work_date date;
+
+update public.task_work_logs w
+set work_date = r.report_date
+from public.daily_reports r
+where r.id = w.daily_report_id
+  and w.work_date is null;
+
+alter table public.task_work_logs
+  alter column work_date set not null;
+
+comment on column public.task_work_logs.work_date is '作業日（日報の report_date、トリガーで設定）';
+
+-- 工数ログの作成時に日報の日付を設定する
+create or replace function public.set_task_work_log_date()
+returns trigger
+language plpgsql
+security invoker
+set search_path = public
+as $$
+begin
+  select r.report_date into new.work_date
+  from public.daily_reports r
+  where r.id = new.daily_report_id;
+  return new;
+end;
+$$;
+
+create trigger task_work_logs_set_work_date
+  before insert or update of daily_report_id on public.task_work_logs
+  for each row execute function public.set_task_work_log_date();
+
+-- 日報の日付が変わった場合は工数ログの日付も合わせる（集計は下のトリガーで移し替えられる）
+create or replace function public.sync_task_work_log_dates()
+returns trigger
+language plpgsql
+security invoker
+set search_path = public
+as $$
+begin
+  update public.task_work_logs
+  set work_date = new.report_date
+  where daily_report_id = new.id;
+  return null;
+end;
+$$;
+
+create trigger daily_reports_sync_work_date
+  after update of report_date on public.daily_reports
+  for each row
+  when (old.report_date is distinct from new.report_date)
+  execute function public.sync_task_work_log_dates();
+
+-- =============================================
+-- 2. task_hours_daily (集計テーブル)
+-- =============================================
+
+create table public.task_hours_daily (
+  task_id uuid references public.tasks(id) on delete cascade not null,
+  work_date date not null,
+
+  project_id uuid references public.projects(id) on delete cascade not null, -- プロジェクト単位の絞り込み用
+  tenant_id uuid references public.tenants(id) not null, -- RLS用
+
+  hours numeric(8, 2) not null default 0, -- その日のタスクの工数合計(h)
+  log_count integer not null default 0,   -- 集計した工数ログの件数（0になったら行を削除する）
+
+  primary key (task_id, work_date)
+);
+
+comment on table public.task_hours_daily is 'タスク×日の工数集計（task_work_logs のトリガーで差分更新）';
+
+-- GET /projects/{id}/hours: プロジェクトの指定期間の集計
+create index task_hours_daily_project_work_date_idx
+  on public.task_hours_daily (project_id, work_date);
+
+-- 既存の工数ログを集計する
+insert into public.task_hours_daily (task_id, work_date, project_id, tenant_id, hours, log_count)
+select w.task_id, w.work_date, t.project_id, w.tenant_id, sum(w.hours), count(*)
+from public.task_work_logs w
+join public.tasks t on t.id = w.task_id
+group by w.task_id, w.work_date, t.project_id, w.tenant_id;
+
+-- =============================================
+-- 3. Enable RLS
+-- =============================================
+-- 参照は工数ログと同じく同じテナントのみ。書き込みは下のトリガーからのみ行う。
+alter table public.task_hours_daily enable row level security;
+
+create policy "Users can view team task hours"
+  on public.task_hours_daily for select
+  using ( tenant_id = public.get_my_tenant_id() );
+
+-- =============================================
+-- 4. maintain_task_hours_daily (差分の反映)
+-- =============================================
+-- 更新は「旧い値を引いて新しい値を足す」として扱うため、タスクや日付が変わった場合も正しく移し替えられます。
+-- 加算は insert ... on conflict で行うため、同じタスク・同じ日のログが同時に追加されても取りこぼしません。
+
+create or replace function public.maintain_task_hours_daily()
+returns trigger
+language plpgsql
+security definer -- 集計テーブルにはユーザーの書き込み権限がないため、所有者の権限で更新する
+set search_path = public
+as $$
+begin
+  if tg_op in ('UPDATE', 'DELETE') then
+    update public.task_hours_daily
+    set hours = hours - old.hours,
+        log_count = log_count - 1
+    where task_id = old.task_id and work_date = old.work_date;
+
+    delete from public.task_hours_daily
+    where task_id = old.task_id and work_date = old.work_date and log_count <= 0;
+  end if;
+
+  if tg_op in ('INSERT', 'UPDATE') then
+    insert into public.task_hours_daily (task_id, work_date, project_id, tenant_id, hours, log_count)
+    select new.task_id, new.work_date, t.project_id, new.tenant_id, new.hours, 1
+    from public.tasks t
+    where t.id = new.task_id
+    on conflict (task_id, work_date) do update
+    set hours = task_hours_daily.hours + excluded.hours,
+        log_count = task_hours_daily.log_count + 1;
+  end if;
+
+  return null;
+end;
+$$;
+
+create trigger task_work_logs_maintain_hours
+  after insert or delete or update of task_id, work_date, hours on public.task_work_logs
+  for each row execute function public.maintain_task_hours_daily();
+
+-- =============================================
+-- 5. get_project_hours (GET /projects/{id}/hours)
+-- =============================================
+-- プロジェクトの指定期間（省略時は全期間）の集計を、日別・タスク別にまとめて返します。
+-- 集計テーブルの「日数×タスク数」の行だけを読み、結果は「日数＋タスク数」の大きさになります。
+--
+-- 戻り値:
+--   {"total_hours": 12.5,
+--    "days": [{"work_date": "2026-10-01", "hours": 3.5}, ...],        -- 日付順
+--    "tasks": [{"task_id": "uuid", "title": "...", "hours": 8}, ...]} -- 工数の多い順
+
+create or replace function public.get_project_hours(
+  p_project_id uuid,
+  p_start_date date default null,
+  p_end_date date default null
+)
+returns jsonb
+language sql
+stable
+security invoker -- 呼び出し元の権限で実行し、task_hours_daily / tasks のRLSをそのまま適用する
+set search_path = public
+as $$
+  with hours as (
+    select h.task_id, h.work_date, h.hours
+    from public.task_hours_daily h
+    where h.project_id = p_project_id
+      and (p_start_date is null or h.work_date >= p_start_date)
+      and (p_end_date is null or h.work_date <= p_end_date)
+  )
+  select jsonb_build_object(
+    'total_hours', coalesce((select sum(hours) from hours), 0),
+    'days', coalesce((
+      select jsonb_agg(jsonb_build_object('work_date', d.work_date, 'hours', d.hours) order by d.work_date)
+      from (select work_date, sum(hours) as hours from hours group by work_date) d
+    ), '[]'::jsonb),
+    'tasks', coalesce((
+      select jsonb_agg(
+        jsonb_build_object('task_id', x.task_id, 'title', t.title, 'hours', x.hours)
+        order by x.hours desc, t.title
+      )
+      from (select task_id, sum(hours) as hours from hours group by task_id) x
+      join public.tasks t on t.id = x.task_id
+    ), '[]'::jsonb)
+  );
+$$;
+
+comment on function public.get_project_hours is 'プロジェクトの実績工数を日別・タスク別に集計して返す';
+
+grant execute on function public.get_project_hours to authenticated, service_role;
@@ -0,0 +1,127 @@
+-- 20261017200000_make_weekly_batch_idempotent.sql
+
+-- =============================================
+-- 週報バッチの冪等化・再開対応
+-- =============================================
+-- 週報バッチは重複チェックをせずに Insert していたため、途中で落ちて再実行すると
+-- 成功済みのユーザーの週報が重複し、Geminiの呼び出しも無駄になっていました。
+--   - weekly_summaries に (user_id, week_start_date) の一意キーを追加する
+--   - ユーザーごとの処理結果を weekly_batch_checkpoints に記録し、
+--     再実行時は成功済みのユーザーを飛ばして、失敗・未処理のユーザーだけを処理する
+
+-- =============================================
+-- 1. weekly_summaries の一意キー
+-- =============================================
+-- 既存の重複は、同じユーザー・同じ週で最も新しいものだけを残す
+delete from public.weekly_summaries a
+using public.weekly_summaries b
+where a.user_id = b.user_id
+  and a.week_start_date = b.week_start_date
+  and (a.created_at, a.id) < (b.created_at, b.id);
+
+-- user_id が NULL の「チーム全体の週報」は対象外（NULL同士は重複とみなされない）
+create unique index if not exists weekly_summaries_user_week_start_key
+  on public.weekly_summaries (user_id, week_start_date);
+
+-- =============================================
+-- 2. weekly_batch_checkpoints (ユーザーごとの処理結果)
+-- =============================================
+
+create table public.weekly_batch_checkpoints (
+  week_start_date date not null,
+  user_id uuid references public.profiles(id) on delete cascade not null,
+  tenant_id uuid references public.tenants(id) not null,
+
+  status text not null check (status in ('succeeded', 'failed')),
+  error text,                             -- 失敗した理由（成功時は NULL）
+  attempts integer not null default 1,    -- 処理した回数（成功済みのユーザーは再実行で処理しない）
+
+  updated_at timestamp with time zone default timezone('utc'::text, now()) not null,
+
+  primary key (week_start_date, user_id)
+);
+
+comment on table public.weekly_batch_checkpoints is '週報バッチのユーザーごとの処理結果（再実行時は成功済みのユーザーを飛ばす）';
+
+-- =============================================
+-- Enable RLS
+-- =============================================
+-- バックエンドのバッチ（service_role）からのみ読み書きする。
+alter table public.weekly_batch_checkpoints enable row level security;
+
+-- =============================================
+-- 3. save_weekly_batch_results (週報と処理結果の保存)
+-- =============================================
+-- 生成した週報の保存と「成功」の記録を1トランザクションで行います。
+-- どちらか一方だけが残ることはないため、再実行で同じユーザーの週報を生成し直すことはありません。
+-- 同じユーザー・同じ週の週報が既にある場合（ユーザーが先に確定した週報など）は上書きせず、成功として記録します。
+--
+-- p_rows の形式:
+--   [{"tenant_id": "uuid", "user_id": "uuid", "content": "...",
+--     "week_start_date": "2026-10-12", "week_end_date": "2026-10-16"}, ...]
+
+create or replace function public.save_weekly_batch_results(p_rows jsonb)
+returns integer
+language plpgsql
+security invoker
+set search_path = public
+as $$
+declare
+  v_saved integer;
+begin
+  insert into public.weekly_summaries (tenant_id, user_id, content, week_start_date, week_end_date)
+  select s.tenant_id, s.user_id, s.content, s.week_start_date, s.week_end_date
+  from jsonb_to_recordset(coalesce(p_rows, '[]'::jsonb))
+    as s(tenant_id uuid, user_id uuid, content text, week_start_date date, week_end_date date)
+  on conflict (user_id, week_start_date) do nothing;
+
+  get diagnostics v_saved = row_count;
+
+  insert into public.weekly_batch_checkpoints (week_start_date, user_id, tenant_id, status)
+  select s.week_start_date, s.user_id, s.tenant_id, 'succeeded'
+  from jsonb_to_recordset(coalesce(p_rows, '[]'::jsonb))
+    as s(tenant_id uuid, user_id uuid, week_start_date date)
+  on conflict (week_start_date, user_id) do update
+  set status = 'succeeded',
+      error = null,
+      attempts = weekly_batch_checkpoints.attempts + 1,
+      updated_at = timezone('utc'::text, now());
+
+  return v_saved;
+end;
+$$;
+
+comment on function public.save_weekly_batch_results is '週報バッチの生成結果を保存し、ユーザーごとに成功を記録する';
+
+grant execute on function public.save_weekly_batch_results to service_role;
+
+-- =============================================
+-- 4. record_weekly_batch_failures (失敗の記録)
+-- =============================================
+-- AI生成・保存に失敗したユーザーを記録します（次回の実行で再び処理されます）。
+--
+-- p_rows の形式:
+--   [{"tenant_id": "uuid", "user_id": "uuid", "week_start_date": "2026-10-12", "error": "..."}, ...]
+
+create or replace function public.record_weekly_batch_failures(p_rows jsonb)
+returns void
+language sql
+security invoker
+set search_path = public
+as $$
+  insert into public.weekly_batch_checkpoints (week_start_date, user_id, tenant_id, status, error)
+  select s.week_start_date, s.user_id, s.tenant_id, 'failed', s.error
+  from jsonb_to_recordset(coalesce(p_rows, '[]'::jsonb))
+    as s(tenant_id uuid, user_id uuid, week_start_date date, error text)
+  on conflict (week_start_date, user_id) do update
+  set status = 'failed',
+      error = excluded.error,
+      attempts = weekly_batch_checkpoints.attempts + 1,
+      updated_at = timezone('utc'::text, now())
+  -- 並行して実行された別のバッチが成功を記録していれば上書きしない
+  where weekly_batch_checkpoints.status = 'failed';
+$$;
+
+comment on function public.record_weekly_batch_failures is '週報バッチで失敗したユーザーを記録する';
+
+grant execute on function public.record_weekly_batch_failures to service_role;
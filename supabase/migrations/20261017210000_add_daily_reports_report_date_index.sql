@@ -0,0 +1,18 @@
+-- 20261017210000_add_daily_reports_report_date_index.sql
+
+-- =============================================
+-- daily_reports (report_date, user_id) インデックス
+-- =============================================
+-- 週報バッチは対象週の日報を全ユーザー分まとめて読みます。
+-- (user_id, report_date, id) のインデックスだけでは「対象週に日報を書いたユーザー」を user_id 順に
+-- 取り出すために全ユーザーの過去の日報までたどる必要があり、コストが日報の総数に比例していました。
+--
+-- バッチは日ごとに report_date = 対象日 で絞り込み、user_id のキーセットでユーザーを取得します。
+-- このインデックスでは対象日の範囲だけを user_id 順に読めるため、
+-- 読む行数は対象週の日報の件数にしか比例しません。
+-- ユーザーごとの日報の取得は、従来どおり daily_reports_user_report_date_idx を使います。
+--
+-- 実行計画は supabase/tests/database/query_plans.test.sql で確認します。
+
+create index if not exists daily_reports_report_date_user_id_idx
+  on public.daily_reports (report_date, user_id);
@@ -0,0 +1,278 @@
+-- supabase/tests/database/query_plans.test.sql
+
+-- =============================================
+-- Query Plan Regression Tests (実行計画の回帰テスト)
+-- =============================================
+-- 各APIが発行するクエリと同じ条件で EXPLAIN を取り、
+-- 想定したインデックスが使われていること（全件スキャンになっていないこと）を確認します。
+--
+-- 実行方法（ローカルのSupabaseを起動した状態で）:
+--   supabase test db
+--
+-- ・データ量が少ないとプランナーは常に Seq Scan を選ぶため、本番相当の件数を投入して ANALYZE します。
+-- ・投入したデータはトランザクションごとロールバックされ、DBには残りません。
+-- ・postgres ロールで実行するためRLSの条件は付きません（RLSによる tenant_id の絞り込みは明示的に書いています）。
+
+begin;
+
+create extension if not exists pgtap with schema extensions;
+
+select plan(11);
+
+-- =============================================
+-- 1. テストデータの投入
+-- =============================================
+-- テナント 100件 / ユーザー 1,000人（1テナント10人）
+-- 日報 20,000件（1人20件） / 工数ログ 40,000件 / 週報 10,000件
+-- プロジェクト 2,000件（1テナント20件） / タスク 20,000件（1人20件、半分は完了済み）
+
+insert into public.tenants (id, name)
+select ('10000000-0000-0000-0000-' || lpad(g::text, 12, '0'))::uuid, 'tenant ' || g
+from generate_series(1, 100) as g;
+
+insert into auth.users (id, email)
+select ('00000000-0000-0000-0000-' || lpad(g::text, 12, '0'))::uuid, 'user' || g || '@example.com'
+from generate_series(1, 1000) as g;
+
+-- 新規登録トリガーで作成されたプロフィールにテナントを割り当てる
+insert into public.profiles (id, tenant_id, full_name)
+select
+  ('00000000-0000-0000-0000-' || lpad(g::text, 12, '0'))::uuid,
+  ('10000000-0000-0000-0000-' || lpad((1 + (g - 1) / 10)::text, 12, '0'))::uuid,
+  'user ' || g
+from generate_series(1, 1000) as g
+on conflict (id) do update set tenant_id = excluded.tenant_id;
+
+insert into public.daily_reports (user_id, tenant_id, content_raw, report_date, created_at)
+select
+  p.id,
+  p.tenant_id,
+  'report ' || d,
+  date '2026-01-01' + d,
+  timestamp with time zone '2026-01-01 18:00:00+09' + d * interval '1 day'
+from public.profiles p
+cross join generate_series(1, 20) as d
+where p.full_name like 'user %';
+
+insert into public.weekly_summaries (tenant_id, user_id, content, week_start_date, week_end_date, created_at)
+select
+  p.tenant_id,
+  p.id,
+  'summary ' || w,
+  date '2026-01-05' + w * 7,
+  date '2026-01-09' + w * 7,
+  timestamp with time zone '2026-01-09 18:00:00+09' + w * interval '7 days'
+from public.profiles p
+cross join generate_series(1, 10) as w
+where p.full_name like 'user %';
+
+insert into public.projects (id, tenant_id, name)
+select
+  ('20000000-0000-0000-0000-' || lpad(((t - 1) * 20 + k)::text, 12, '0'))::uuid,
+  ('10000000-0000-0000-0000-' || lpad(t::text, 12, '0'))::uuid,
+  'project ' || k
+from generate_series(1, 100) as t
+cross join generate_series(1, 20) as k;
+
+-- ユーザーごとに所属テナントの各プロジェクトへ1件ずつタスクを割り当てる
+insert into public.tasks (project_id, tenant_id, title, status, assigned_to)
+select
+  ('20000000-0000-0000-0000-' || lpad(((u - 1) / 10 * 20 + k)::text, 12, '0'))::uuid,
+  ('10000000-0000-0000-0000-' || lpad((1 + (u - 1) / 10)::text, 12, '0'))::uuid,
+  'task ' || k,
+  case when k % 2 = 0 then 'done' else 'todo' end,
+  ('00000000-0000-0000-0000-' || lpad(u::text, 12, '0'))::uuid
+from generate_series(1, 1000) as u
+cross join generate_series(1, 20) as k;
+
+insert into public.task_work_logs (tenant_id, daily_report_id, task_id, hours)
+select r.tenant_id, r.id, t.id, 1.5
+from public.daily_reports r
+cross join lateral (
+  select id from public.tasks where assigned_to = r.user_id limit 2
+) as t;
+
+analyze public.tenants, public.profiles, public.daily_reports, public.weekly_summaries,
+  public.projects, public.tasks, public.task_work_logs, public.task_hours_daily;
+
+-- =============================================
+-- 2. 判定用のヘルパー
+-- =============================================
+-- クエリの実行計画(JSON)に指定したインデックスが含まれていれば true
+-- (Index Scan / Index Only Scan / Bitmap Index Scan のいずれでもよい)
+create function pg_temp.uses_index(p_query text, p_index text)
+returns boolean
+language plpgsql
+as $$
+declare
+  v_plan json;
+begin
+  execute 'explain (format json) ' || p_query into v_plan;
+  return v_plan::text like '%"Index Name": "' || p_index || '"%';
+end;
+$$;
+
+-- クエリの実行計画(JSON)に Seq Scan が含まれていれば true
+create function pg_temp.uses_seq_scan(p_query text)
+returns boolean
+language plpgsql
+as $$
+declare
+  v_plan json;
+begin
+  execute 'explain (format json) ' || p_query into v_plan;
+  return v_plan::text like '%"Node Type": "Seq Scan"%';
+end;
+$$;
+
+-- =============================================
+-- 3. 各APIのクエリ
+-- =============================================
+-- 対象ユーザー: user1 (tenant1)
+
+-- POST /weeks/generate: 指定期間の日報を日付順に取得
+select ok(
+  pg_temp.uses_index($q$
+    select * from public.daily_reports
+    where user_id = '00000000-0000-0000-0000-000000000001'
+      and report_date >= '2026-01-05' and report_date <= '2026-01-09'
+    order by report_date
+  $q$, 'daily_reports_user_report_date_idx'),
+  'POST /weeks/generate uses daily_reports_user_report_date_idx'
+);
+
+-- POST /reports, GET /tasks/my-active: 自分に割り当てられた未完了タスク
+select ok(
+  pg_temp.uses_index($q$
+    select id, title from public.tasks
+    where assigned_to = '00000000-0000-0000-0000-000000000001'
+      and status <> 'done'
+  $q$, 'tasks_assigned_to_status_idx'),
+  'active tasks lookup uses tasks_assigned_to_status_idx'
+);
+
+-- GET /reports: 日報一覧（1ページ分）と工数ログの埋め込み
+-- PostgRESTの埋め込みと同様に、日報ごとに daily_report_id で工数ログを結合する
+select ok(
+  pg_temp.uses_index($q$
+    select r.*, logs.task_work_logs
+    from public.daily_reports r
+    left join lateral (
+      select json_agg(l) as task_work_logs
+      from public.task_work_logs l
+      where l.daily_report_id = r.id
+    ) as logs on true
+    where r.user_id = '00000000-0000-0000-0000-000000000001'
+    order by r.created_at desc, r.id desc
+    limit 21
+  $q$, 'daily_reports_user_created_at_id_idx'),
+  'GET /reports uses daily_reports_user_created_at_id_idx'
+);
+
+select ok(
+  pg_temp.uses_index($q$
+    select r.*, logs.task_work_logs
+    from public.daily_reports r
+    left join lateral (
+      select json_agg(l) as task_work_logs
+      from public.task_work_logs l
+      where l.daily_report_id = r.id
+    ) as logs on true
+    where r.user_id = '00000000-0000-0000-0000-000000000001'
+    order by r.created_at desc, r.id desc
+    limit 21
+  $q$, 'task_work_logs_daily_report_id_idx'),
+  'GET /reports embeds task_work_logs via task_work_logs_daily_report_id_idx'
+);
+
+-- GET /weeks: 週報一覧（1ページ分）
+select ok(
+  pg_temp.uses_index($q$
+    select * from public.weekly_summaries
+    where user_id = '00000000-0000-0000-0000-000000000001'
+    order by created_at desc, id desc
+    limit 21
+  $q$, 'weekly_summaries_user_created_at_id_idx'),
+  'GET /weeks uses weekly_summaries_user_created_at_id_idx'
+);
+
+-- GET /members: 同じテナントのメンバー一覧
+select ok(
+  pg_temp.uses_index($q$
+    select id, full_name, role from public.profiles
+    where tenant_id = '10000000-0000-0000-0000-000000000001'
+  $q$, 'profiles_tenant_id_idx'),
+  'GET /members uses profiles_tenant_id_idx'
+);
+
+-- GET /projects: プロジェクト一覧（集計ビュー、RLSで tenant_id に絞り込まれる）
+select ok(
+  pg_temp.uses_index($q$
+    select * from public.project_summaries
+    where tenant_id = '10000000-0000-0000-0000-000000000001'
+    order by created_at desc, id desc
+    limit 21
+  $q$, 'projects_tenant_created_at_id_idx'),
+  'GET /projects uses projects_tenant_created_at_id_idx'
+);
+
+select ok(
+  pg_temp.uses_index($q$
+    select * from public.project_summaries
+    where tenant_id = '10000000-0000-0000-0000-000000000001'
+    order by created_at desc, id desc
+    limit 21
+  $q$, 'tasks_project_id_idx'),
+  'GET /projects aggregates tasks via tasks_project_id_idx'
+);
+
+-- GET /projects/{id}/hours: プロジェクトの指定期間の工数集計（get_project_hours と同じ条件）
+select ok(
+  pg_temp.uses_index($q$
+    select task_id, work_date, hours from public.task_hours_daily
+    where project_id = '20000000-0000-0000-0000-000000000001'
+      and work_date >= '2026-01-05' and work_date <= '2026-01-09'
+  $q$, 'task_hours_daily_project_work_date_idx'),
+  'GET /projects/{id}/hours uses task_hours_daily_project_work_date_idx'
+);
+
+-- 週報バッチ: 対象日に日報を書いたユーザーを user_id のキーセットで取得（2ページ目以降の条件）
+select ok(
+  pg_temp.uses_index($q$
+    select user_id from public.daily_reports
+    where report_date = '2026-01-05'
+      and user_id > '00000000-0000-0000-0000-000000000500'
+    order by user_id
+    limit 500
+  $q$, 'daily_reports_report_date_user_id_idx'),
+  'weekly batch user listing uses daily_reports_report_date_user_id_idx'
+);
+
+-- 週報バッチ: ユーザーをまとめて対象週の日報を取得（件数が多い場合は同じ並び順のキーセットで続きを取得）
+-- (user_id, report_date) と (report_date, user_id) のどちらを使っても読む範囲は対象週に限られる
+select ok(
+  not pg_temp.uses_seq_scan($q$
+    select id, user_id, tenant_id, report_date, content_raw, digest
+    from public.daily_reports
+    where user_id in (
+        '00000000-0000-0000-0000-000000000101',
+        '00000000-0000-0000-0000-000000000102',
+        '00000000-0000-0000-0000-000000000103',
+        '00000000-0000-0000-0000-000000000104',
+        '00000000-0000-0000-0000-000000000105',
+        '00000000-0000-0000-0000-000000000106',
+        '00000000-0000-0000-0000-000000000107',
+        '00000000-0000-0000-0000-000000000108',
+        '00000000-0000-0000-0000-000000000109',
+        '00000000-0000-0000-0000-000000000110'
+      )
+      and report_date >= '2026-01-05' and report_date <= '2026-01-09'
+    order by user_id, report_date, id
+    limit 500
+  $q$),
+  'weekly batch report fetch does not scan all daily_reports'
+);
+
+select * from finish();
+
+rollback;